@@ -0,0 +1,124 @@
+"""
+Benchmark de calcular_h2h contra o laço original (product(hibridos, repeat=2) x locais) da página
+04_Analise_h2h, em dados agrupados sintéticos. Confere também se as duas saídas são iguais.
+
+Uso (na raiz do repositório):
+    python benchmarks/h2h.py
+    python benchmarks/h2h.py --hibridos 60 --locais 150 --sem-referencia
+"""
+import argparse
+import os
+import sys
+import time
+from itertools import product
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data_processing.analise_h2h import calcular_h2h  # noqa: E402
+
+
+def h2h_original(df_analise_h2h):
+    """Laço da página antes da vetorização, mantido como referência."""
+    resultados_h2h = []
+    hibridos = pd.Series(df_analise_h2h['nome']).dropna().unique()
+    locais = pd.Series(df_analise_h2h['fazendaRef']).dropna().unique()
+    for head, check in product(hibridos, repeat=2):
+        if head != check:
+            for local in locais:
+                row_head = df_analise_h2h[(df_analise_h2h['nome'] == head) & (
+                    df_analise_h2h['fazendaRef'] == local)]
+                row_check = df_analise_h2h[(df_analise_h2h['nome'] == check) & (
+                    df_analise_h2h['fazendaRef'] == local)]
+                if not row_head.empty and not row_check.empty:
+                    head_mean = row_head.iloc[0]['prod_sc_ha_corr'] if 'prod_sc_ha_corr' in row_head else None
+                    check_mean = row_check.iloc[0]['prod_sc_ha_corr'] if 'prod_sc_ha_corr' in row_check else None
+                    diff = head_mean - check_mean if head_mean is not None and check_mean is not None else None
+                    vitoria = int(diff > 0) if diff is not None else None
+                    resultados_h2h.append({
+                        'fazendaRef': local,
+                        'nomeFazenda': row_head.iloc[0]['nomeFazenda'] if 'nomeFazenda' in row_head else None,
+                        'indexTratamento_Head': row_head.iloc[0]['indexTratamento'] if 'indexTratamento' in row_head else None,
+                        'indexTratamento_Check': row_check.iloc[0]['indexTratamento'] if 'indexTratamento' in row_check else None,
+                        'Head': head,
+                        'Check': check,
+                        'Head_umd': row_head.iloc[0]['humidade'] if 'humidade' in row_head else None,
+                        'Check_umd': row_check.iloc[0]['humidade'] if 'humidade' in row_check else None,
+                        'Head_numPlantas_ha': row_head.iloc[0]['numPlantas_ha'] if 'numPlantas_ha' in row_head else None,
+                        'Check_numPlantas_ha': row_check.iloc[0]['numPlantas_ha'] if 'numPlantas_ha' in row_check else None,
+                        'Head_mean': head_mean,
+                        'Check_mean': check_mean,
+                        'Difference': diff,
+                        'Number_of_Win': vitoria,
+                        'Percentage_of_Win': vitoria * 100 if vitoria is not None else None,
+                        'Number_Of_Comparison': 1
+                    })
+    return pd.DataFrame(resultados_h2h)
+
+
+def dados_sinteticos(hibridos, locais, presenca=0.8, semente=0):
+    """Uma linha por (híbrido, local) presente, como o df_agrupado da página, com alguns nulos."""
+    rng = np.random.default_rng(semente)
+    nomes = np.array([f"HIB{i:03d}" for i in range(hibridos)])
+    fazendas = np.array([f"FZ{j:04d}" for j in range(locais)])
+    hibrido, local = np.meshgrid(np.arange(hibridos), np.arange(locais))
+    hibrido, local = hibrido.ravel(), local.ravel()
+    presentes = rng.random(hibrido.size) < presenca
+    hibrido, local = hibrido[presentes], local[presentes]
+    ordem = rng.permutation(hibrido.size)
+    hibrido, local = hibrido[ordem], local[ordem]
+    n = hibrido.size
+    producao = rng.normal(180, 25, n)
+    producao[rng.random(n) < 0.02] = np.nan
+    return pd.DataFrame({
+        "fazendaRef": fazendas[local],
+        "nomeFazenda": np.char.add("Fazenda ", fazendas[local]),
+        "nome": nomes[hibrido],
+        "humidade": rng.uniform(12, 25, n),
+        "numPlantas_ha": rng.uniform(50_000, 80_000, n),
+        "prod_sc_ha_corr": producao,
+    })
+
+
+def cronometrar(funcao, *args):
+    inicio = time.perf_counter()
+    resultado = funcao(*args)
+    return resultado, time.perf_counter() - inicio
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--hibridos", type=int, default=20)
+    parser.add_argument("--locais", type=int, default=40)
+    parser.add_argument("--repeticoes", type=int, default=5,
+                        help="execuções de calcular_h2h (vale a menor)")
+    parser.add_argument("--sem-referencia", action="store_true",
+                        help="não roda o laço original (lento em tamanhos grandes)")
+    args = parser.parse_args()
+
+    df = dados_sinteticos(args.hibridos, args.locais)
+    print(f"{args.hibridos} híbridos x {args.locais} locais: {len(df)} linhas agrupadas")
+
+    tempos = []
+    for _ in range(args.repeticoes):
+        novo, segundos = cronometrar(calcular_h2h, df)
+        tempos.append(segundos)
+    print(f"calcular_h2h: {min(tempos) * 1000:.1f} ms ({len(novo)} comparações)")
+
+    if args.sem_referencia:
+        return
+    original, segundos = cronometrar(h2h_original, df)
+    print(f"laço original: {segundos:.2f} s ({len(original)} comparações)")
+    # O laço original deixa tudo em object; a comparação é só de valores
+    colunas = list(original.columns)
+    pd.testing.assert_frame_equal(
+        novo[colunas].astype(object).fillna(np.nan).infer_objects(),
+        original.astype(object).fillna(np.nan).infer_objects(),
+        check_dtype=False)
+    print(f"saídas iguais; ganho de {segundos / min(tempos):.0f}x")
+
+
+if __name__ == "__main__":
+    main()
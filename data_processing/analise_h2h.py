@@ -0,0 +1,302 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+from scipy import stats
+
+from data_processing.repositorio_dados import impressao_digital
+
+# =========================
+# Head to Head (H2H): comparação de todos os pares de híbridos em cada local
+# =========================
+
+# Colunas levadas do head e do check para cada comparação
+COLUNAS_PAR_H2H = ["indexTratamento", "humidade", "numPlantas_ha", "prod_sc_ha_corr"]
+
+# Reamostragens do intervalo de confiança bootstrap da diferença média (semente fixa: resultado estável no cache)
+REAMOSTRAS_BOOTSTRAP = 1000
+SEMENTE_BOOTSTRAP = 0
+
+
+def _base_h2h(df, coluna_hibrido, coluna_local):
+    """
+    Uma linha por (local, híbrido): a primeira em que o híbrido aparece no local.
+    _hibrido e _local são os códigos na ordem de aparição (linhas com nulos são descartadas).
+    """
+    base = pd.DataFrame({
+        "_hibrido": pd.factorize(df[coluna_hibrido])[0],
+        "_local": pd.factorize(df[coluna_local])[0],
+        "_nome": df[coluna_hibrido].to_numpy(dtype=object),
+        "fazendaRef": df[coluna_local].to_numpy(dtype=object),
+        "nomeFazenda": df["nomeFazenda"].to_numpy(dtype=object) if "nomeFazenda" in df.columns else None,
+    })
+    for coluna in COLUNAS_PAR_H2H:
+        if coluna in df.columns:
+            base[coluna] = df[coluna].to_numpy()
+    base = base[(base["_hibrido"] >= 0) & (base["_local"] >= 0)]
+    return base.drop_duplicates(["_local", "_hibrido"])
+
+
+def _valores_par(pares, coluna, lado, tipo=None):
+    """Valores da coluna no lado ('head'/'check') de cada par, ou None se a coluna não existe."""
+    nome = f"{coluna}_{lado}"
+    if nome not in pares.columns:
+        return None
+    valores = pares[nome].to_numpy()
+    return valores.astype(tipo) if tipo is not None else valores
+
+
+def calcular_h2h(df, coluna_hibrido="nome", coluna_local="fazendaRef"):
+    """
+    Compara, em cada local, todos os pares ordenados (head, check) de híbridos diferentes.
+    Cada híbrido é representado pela primeira linha em que aparece no local e os pares saem de
+    uma única auto-junção por local, sem varrer o DataFrame a cada comparação.
+    Retorna uma linha por comparação (ordenada por head, check e local, na ordem de aparição) com
+    produtividades, diferença, vitória (1 se head > check) e número de comparações (sempre 1).
+    """
+    base = _base_h2h(df, coluna_hibrido, coluna_local)
+    if base.empty:
+        return pd.DataFrame()
+
+    pares = base.merge(base.drop(columns=["fazendaRef", "nomeFazenda"]), on="_local",
+                       suffixes=("_head", "_check"))
+    pares = pares[pares["_hibrido_head"] != pares["_hibrido_check"]].sort_values(
+        ["_hibrido_head", "_hibrido_check", "_local"], kind="stable")
+    if pares.empty:
+        return pd.DataFrame()
+
+    head_mean = _valores_par(pares, "prod_sc_ha_corr", "head", np.float64)
+    check_mean = _valores_par(pares, "prod_sc_ha_corr", "check", np.float64)
+    diferenca = vitoria = None
+    if head_mean is not None and check_mean is not None:
+        diferenca = head_mean - check_mean
+        vitoria = (diferenca > 0).astype(np.int64)
+
+    return pd.DataFrame({
+        "fazendaRef": pares["fazendaRef"].to_numpy(),
+        "nomeFazenda": pares["nomeFazenda"].to_numpy(),
+        "indexTratamento_Head": _valores_par(pares, "indexTratamento", "head"),
+        "indexTratamento_Check": _valores_par(pares, "indexTratamento", "check"),
+        "Head": pares["_nome_head"].to_numpy(),
+        "Check": pares["_nome_check"].to_numpy(),
+        "Head_umd": _valores_par(pares, "humidade", "head", np.float64),
+        "Check_umd": _valores_par(pares, "humidade", "check", np.float64),
+        "Head_numPlantas_ha": _valores_par(pares, "numPlantas_ha", "head", np.float64),
+        "Check_numPlantas_ha": _valores_par(pares, "numPlantas_ha", "check", np.float64),
+        "Head_mean": head_mean,
+        "Check_mean": check_mean,
+        "Difference": diferenca,
+        "Number_of_Win": vitoria,
+        "Percentage_of_Win": vitoria * 100 if vitoria is not None else None,
+        "Number_Of_Comparison": 1,
+    }, index=pd.RangeIndex(len(pares)))
+
+
+def _intervalo_bootstrap(grupos, diferencas, total_grupos, nivel=0.95,
+                         reamostras=REAMOSTRAS_BOOTSTRAP, semente=SEMENTE_BOOTSTRAP):
+    """
+    IC percentil bootstrap da média da diferença de cada grupo (par head x check), com todas as
+    reamostragens de todos os grupos sorteadas em bloco. Grupos sem diferença válida ficam NaN.
+    """
+    validos = ~np.isnan(diferencas)
+    ordem = np.argsort(grupos[validos], kind="stable")
+    grupos = grupos[validos][ordem]
+    diferencas = diferencas[validos][ordem]
+    tamanhos = np.bincount(grupos, minlength=total_grupos)
+    inicios = np.concatenate([[0], np.cumsum(tamanhos)[:-1]])
+    com_dados = np.flatnonzero(tamanhos > 0)
+
+    limites = np.full((2, total_grupos), np.nan)
+    if len(diferencas) == 0:
+        return limites
+    rng = np.random.default_rng(semente)
+    medias = np.empty((reamostras, len(com_dados)))
+    # Limita o bloco sorteado a ~5 milhões de valores por vez
+    lote = max(1, 5_000_000 // len(diferencas))
+    for inicio in range(0, reamostras, lote):
+        fim = min(inicio + lote, reamostras)
+        sorteio = inicios[grupos] + (
+            rng.random((fim - inicio, len(diferencas))) * tamanhos[grupos]).astype(np.int64)
+        somas = np.add.reduceat(diferencas[sorteio], inicios[com_dados], axis=1)
+        medias[inicio:fim] = somas / tamanhos[com_dados]
+    alfa = (1 - nivel) / 2
+    limites[:, com_dados] = np.quantile(medias, [alfa, 1 - alfa], axis=0)
+    return limites
+
+
+def _testes_pareados(resumo, pares):
+    """
+    Teste t pareado e teste do sinal (bilateral) da diferença head - check de todos os pares de uma
+    vez (distribuições do scipy.stats sobre os vetores do resumo) e IC 95% bootstrap da diferença média.
+    """
+    n = pares.groupby("_grupo")["diferenca"].count().reindex(
+        range(len(resumo)), fill_value=0).to_numpy()
+    with np.errstate(invalid="ignore", divide="ignore"):
+        t = resumo["Difference_mean"].to_numpy() / (resumo["Difference_sd"].to_numpy() / np.sqrt(n))
+    p_t = np.where(n > 1, 2 * stats.t.sf(np.abs(t), np.maximum(n - 1, 1)), np.nan)
+
+    derrotas = pares.assign(derrota=pares["diferenca"] < 0).groupby(
+        "_grupo")["derrota"].sum().reindex(range(len(resumo)), fill_value=0).to_numpy()
+    vitorias = resumo["Number_of_Win"].to_numpy()
+    decisivos = vitorias + derrotas
+    p_sinal = np.where(decisivos > 0, np.minimum(
+        1.0, 2 * stats.binom.cdf(np.minimum(vitorias, derrotas), decisivos, 0.5)), np.nan)
+
+    ic = _intervalo_bootstrap(pares["_grupo"].to_numpy(), pares["diferenca"].to_numpy(), len(resumo))
+    return resumo.assign(t_statistic=np.where(n > 1, t, np.nan), p_value_t=p_t, p_value_sign=p_sinal,
+                         CI95_low=ic[0], CI95_high=ic[1])
+
+
+def resumir_h2h(df, coluna_hibrido="nome", coluna_local="fazendaRef", coluna_valor="prod_sc_ha_corr"):
+    """
+    Resumo do H2H por par (head, check), sem guardar as comparações por local: vitórias,
+    comparações (locais em comum), % de vitórias, médias do head e do check, média/desvio padrão
+    da diferença, testes t pareado e do sinal e IC 95% bootstrap da diferença média.
+    Os pares seguem a ordem de aparição dos híbridos, como em calcular_h2h.
+    """
+    base = _base_h2h(df, coluna_hibrido, coluna_local)
+    if base.empty or coluna_valor not in base.columns:
+        return pd.DataFrame()
+    nomes = base.drop_duplicates("_hibrido").set_index("_hibrido")["_nome"]
+
+    # Auto-junção só com códigos e valor; agregada na sequência
+    valores = base[["_local", "_hibrido", coluna_valor]].astype({coluna_valor: np.float64})
+    pares = valores.merge(valores, on="_local", suffixes=("_head", "_check"))
+    pares = pares[pares["_hibrido_head"] != pares["_hibrido_check"]]
+    if pares.empty:
+        return pd.DataFrame()
+    pares = pares.assign(
+        diferenca=pares[f"{coluna_valor}_head"] - pares[f"{coluna_valor}_check"])
+    pares["vitoria"] = (pares["diferenca"] > 0).astype(np.int64)
+    pares["_grupo"] = pares.groupby(["_hibrido_head", "_hibrido_check"], sort=True).ngroup()
+
+    resumo = pares.groupby(["_hibrido_head", "_hibrido_check"], sort=True).agg(
+        Head_mean=(f"{coluna_valor}_head", "mean"),
+        Check_mean=(f"{coluna_valor}_check", "mean"),
+        Difference_mean=("diferenca", "mean"),
+        Difference_sd=("diferenca", "std"),
+        Number_of_Win=("vitoria", "sum"),
+        Number_Of_Comparison=("vitoria", "size"),
+    ).reset_index()
+    resumo.insert(0, "Head", nomes.reindex(resumo["_hibrido_head"]).to_numpy())
+    resumo.insert(1, "Check", nomes.reindex(resumo["_hibrido_check"]).to_numpy())
+    resumo["Percentage_of_Win"] = resumo["Number_of_Win"] / resumo["Number_Of_Comparison"] * 100
+    resumo = _testes_pareados(resumo, pares)
+    return resumo.drop(columns=["_hibrido_head", "_hibrido_check"])
+
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def _resumo_h2h_em_cache(impressao, _df):
+    return resumir_h2h(_df)
+
+
+def resumo_h2h(df):
+    """Resumo H2H por par (head, check), guardado em cache pela impressão digital dos dados filtrados."""
+    return _resumo_h2h_em_cache(impressao_digital(df), df)
+
+
+def detalhar_h2h(df, head, checks, coluna_hibrido="nome", coluna_local="fazendaRef"):
+    """Comparações por local (esquema de calcular_h2h) só do head contra os checks informados."""
+    if isinstance(checks, str):
+        checks = [checks]
+    selecionados = df[df[coluna_hibrido].isin([head] + list(checks))]
+    detalhe = calcular_h2h(selecionados, coluna_hibrido, coluna_local)
+    if detalhe.empty:
+        return detalhe
+    return detalhe[(detalhe["Head"] == head) & detalhe["Check"].isin(checks)].reset_index(drop=True)
+
+
+# =========================
+# H2H comercial (GD): repetições de um híbrido no mesmo local e safra entram pela média
+# =========================
+
+# Colunas médias por (local, safra, híbrido)
+COLUNAS_MEDIA_COMERCIAL = ["prod_sc_ha_corr", "umidade"]
+
+
+def indexar_h2h_comercial(df, coluna_hibrido="hibrido", coluna_local="cidade_siglaEstado", coluna_safra="safra"):
+    """
+    Agrupa os resultados GD uma única vez por (local, safra, híbrido), com a média das repetições
+    e o número de parcelas. As médias ficam ordenadas por híbrido, com a faixa de linhas de cada
+    híbrido, para que o detalhamento de um par não precise varrer o DataFrame.
+    _local identifica cada combinação (local, safra), que é a unidade de comparação.
+    """
+    if df.empty or coluna_local not in df.columns or coluna_hibrido not in df.columns:
+        return None
+    colunas_local = [col for col in [coluna_local, coluna_safra] if col in df.columns]
+    chaves = colunas_local + [coluna_hibrido]
+    valores = [col for col in COLUNAS_MEDIA_COMERCIAL if col in df.columns]
+    agrupado = df.groupby(chaves, observed=True, sort=False)
+    medias = agrupado[valores].mean()
+    medias["parcelas"] = agrupado.size()
+    medias = medias.reset_index()
+    medias["_local"] = medias.groupby(colunas_local, observed=True, sort=False).ngroup()
+    medias = medias.sort_values(coluna_hibrido, key=lambda s: s.astype(str), kind="stable",
+                                ignore_index=True)
+
+    nomes = medias[coluna_hibrido].to_numpy(dtype=object)
+    inicios = np.flatnonzero(np.r_[True, nomes[1:] != nomes[:-1]]) if len(nomes) else np.array([], dtype=int)
+    fins = np.r_[inicios[1:], len(nomes)]
+    return {
+        "medias": medias,
+        "faixas": {nomes[i]: (i, f) for i, f in zip(inicios, fins)},
+        "coluna_hibrido": coluna_hibrido,
+        "colunas_local": colunas_local,
+    }
+
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def _indice_h2h_comercial_em_cache(impressao, _df):
+    return indexar_h2h_comercial(_df)
+
+
+def indice_h2h_comercial(df):
+    """Índice de indexar_h2h_comercial, em cache pela impressão digital dos dados filtrados."""
+    return _indice_h2h_comercial_em_cache(impressao_digital(df), df)
+
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def _resumo_h2h_comercial_em_cache(impressao, _df):
+    indice = _indice_h2h_comercial_em_cache(impressao, _df)
+    if indice is None:
+        return pd.DataFrame()
+    return resumir_h2h(indice["medias"], indice["coluna_hibrido"], "_local")
+
+
+def resumo_h2h_comercial(df):
+    """
+    Resumo H2H de todos os pares de híbridos dos dados GD (mesmas colunas de resumir_h2h), com cada
+    (local, safra) como unidade de comparação. Em cache pela impressão digital dos dados filtrados.
+    """
+    return _resumo_h2h_comercial_em_cache(impressao_digital(df), df)
+
+
+def detalhar_h2h_comercial(indice, head, check):
+    """
+    Comparações por local e safra entre head e check, a partir das faixas do índice.
+    Colunas: Local, Safra, Head, Check, Head_mean, Check_mean, Difference, Number_of_Win,
+    Head_umd, Check_umd, Head_parcelas, Check_parcelas.
+    """
+    if indice is None or head not in indice["faixas"] or check not in indice["faixas"]:
+        return pd.DataFrame()
+    medias = indice["medias"]
+    lado_head = medias.iloc[slice(*indice["faixas"][head])]
+    lado_check = medias.iloc[slice(*indice["faixas"][check])]
+    pares = lado_head.merge(lado_check.drop(columns=indice["colunas_local"]), on="_local",
+                            suffixes=("_head", "_check")).sort_values("_local", kind="stable")
+    coluna_local, coluna_safra = (indice["colunas_local"] + [None])[:2]
+
+    diferenca = pares["prod_sc_ha_corr_head"] - pares["prod_sc_ha_corr_check"]
+    return pd.DataFrame({
+        "Local": pares[coluna_local].to_numpy(),
+        "Safra": pares[coluna_safra].to_numpy() if coluna_safra else None,
+        "Head": head,
+        "Check": check,
+        "Head_mean": pares["prod_sc_ha_corr_head"].to_numpy(),
+        "Check_mean": pares["prod_sc_ha_corr_check"].to_numpy(),
+        "Difference": diferenca.to_numpy(),
+        "Number_of_Win": (diferenca > 0).astype(np.int64).to_numpy(),
+        "Head_umd": pares["umidade_head"].to_numpy() if "umidade_head" in pares.columns else np.nan,
+        "Check_umd": pares["umidade_check"].to_numpy() if "umidade_check" in pares.columns else np.nan,
+        "Head_parcelas": pares["parcelas_head"].to_numpy(),
+        "Check_parcelas": pares["parcelas_check"].to_numpy(),
+    }, index=pd.RangeIndex(len(pares)))
@@ -0,0 +1,249 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# =========================
+# Cache persistente em disco (Parquet) para tabelas brutas e DataFrames tratados
+# =========================
+
+DIRETORIO_CACHE = os.path.join(os.path.dirname(
+    os.path.dirname(os.path.abspath(__file__))), ".cache_dados")
+ARQUIVO_MANIFESTO = "manifesto.json"
+# Validade padrão das entradas (segundos) e tamanho máximo ocupado pelo cache (bytes)
+TTL_PADRAO = 12 * 60 * 60
+TAMANHO_MAXIMO = 2 * 1024 ** 3
+
+_trava = threading.Lock()
+
+
+def _caminho(nome_arquivo):
+    return os.path.join(DIRETORIO_CACHE, nome_arquivo)
+
+
+def _ler_manifesto():
+    try:
+        with open(_caminho(ARQUIVO_MANIFESTO), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _gravar_manifesto(manifesto):
+    temporario = _caminho(ARQUIVO_MANIFESTO + ".tmp")
+    with open(temporario, "w", encoding="utf-8") as f:
+        json.dump(manifesto, f, ensure_ascii=False, indent=1)
+    os.replace(temporario, _caminho(ARQUIVO_MANIFESTO))
+
+
+def _remover_arquivo(nome_arquivo):
+    try:
+        os.remove(_caminho(nome_arquivo))
+    except OSError:
+        pass
+
+
+def _hash_arquivo(caminho):
+    sha = hashlib.sha256()
+    with open(caminho, "rb") as f:
+        for bloco in iter(lambda: f.read(1024 * 1024), b""):
+            sha.update(bloco)
+    return sha.hexdigest()
+
+
+def salvar_dataframe(nome, df, versao=None):
+    """
+    Grava o DataFrame em Parquet e registra no manifesto (hash do conteúdo, versão, tamanho).
+    Retorna o hash do conteúdo, ou None se o DataFrame não puder ser convertido para Arrow.
+    """
+    os.makedirs(DIRETORIO_CACHE, exist_ok=True)
+    nome_seguro = re.sub(r"[^\w.-]", "_", nome)
+    temporario = _caminho(f"{nome_seguro}.{threading.get_ident()}.tmp")
+    try:
+        pq.write_table(pa.Table.from_pandas(df), temporario)
+    except (pa.ArrowException, TypeError, ValueError):
+        _remover_arquivo(os.path.basename(temporario))
+        return None
+    hash_conteudo = _hash_arquivo(temporario)
+    nome_arquivo = f"{nome_seguro}-{hash_conteudo[:16]}.parquet"
+    os.replace(temporario, _caminho(nome_arquivo))
+
+    agora = time.time()
+    with _trava:
+        manifesto = _ler_manifesto()
+        anterior = manifesto.get(nome)
+        if anterior and anterior["arquivo"] != nome_arquivo:
+            _remover_arquivo(anterior["arquivo"])
+        manifesto[nome] = {
+            "arquivo": nome_arquivo,
+            "hash": hash_conteudo,
+            "versao": versao,
+            "linhas": len(df),
+            "bytes": os.path.getsize(_caminho(nome_arquivo)),
+            "criado_em": agora,
+            "acessado_em": agora
+        }
+        _aplicar_evicao(manifesto)
+        _gravar_manifesto(manifesto)
+    return hash_conteudo
+
+
+def ler_dataframe(nome, versao=None, ttl=TTL_PADRAO):
+    """
+    Lê o DataFrame do cache (leitura com memory map).
+    Retorna None se não existir, estiver expirado ou tiver sido gerado para outra versão.
+    """
+    with _trava:
+        manifesto = _ler_manifesto()
+        entrada = manifesto.get(nome)
+        if entrada is None:
+            return None
+        if time.time() - entrada["criado_em"] > ttl or entrada.get("versao") != versao:
+            return None
+        caminho = _caminho(entrada["arquivo"])
+        if not os.path.exists(caminho):
+            return None
+        entrada["acessado_em"] = time.time()
+        _gravar_manifesto(manifesto)
+    return pq.read_table(caminho, memory_map=True).to_pandas()
+
+
+def obter_hash(nome):
+    """Hash do conteúdo gravado para a entrada, ou None se ela não existir."""
+    entrada = _ler_manifesto().get(nome)
+    return entrada["hash"] if entrada else None
+
+
+def calcular_versao(nomes, extra=""):
+    """Versão derivada dos hashes das entradas (ex.: tabelas brutas usadas num tratamento)."""
+    hashes = [obter_hash(nome) for nome in nomes]
+    if any(h is None for h in hashes):
+        return None
+    return hashlib.sha256("|".join(hashes + [str(extra)]).encode()).hexdigest()
+
+
+def _aplicar_evicao(manifesto, ttl=TTL_PADRAO, tamanho_maximo=TAMANHO_MAXIMO):
+    """Remove entradas expiradas e, se preciso, as menos acessadas até caber no limite de tamanho."""
+    agora = time.time()
+    for nome, entrada in list(manifesto.items()):
+        if agora - entrada["criado_em"] > ttl:
+            _remover_arquivo(entrada["arquivo"])
+            del manifesto[nome]
+    total = sum(entrada["bytes"] for entrada in manifesto.values())
+    for nome, entrada in sorted(manifesto.items(), key=lambda item: item[1]["acessado_em"]):
+        if total <= tamanho_maximo:
+            break
+        _remover_arquivo(entrada["arquivo"])
+        total -= entrada["bytes"]
+        del manifesto[nome]
+
+
+def limpar_cache():
+    """Remove todas as entradas do cache em disco."""
+    with _trava:
+        for entrada in _ler_manifesto().values():
+            _remover_arquivo(entrada["arquivo"])
+        if os.path.isdir(DIRETORIO_CACHE):
+            _gravar_manifesto({})
+
+
+def salvar_dataframes(dataframes, prefixo="", versao=None):
+    """Grava vários DataFrames (nome -> DataFrame). Retorna True se todos foram gravados."""
+    gravados = [salvar_dataframe(prefixo + nome, df, versao)
+                for nome, df in dataframes.items()]
+    return all(h is not None for h in gravados)
+
+
+def ler_dataframes(nomes, prefixo="", versao=None, ttl=TTL_PADRAO):
+    """
+    Lê vários DataFrames do cache. Retorna o dicionário nome -> DataFrame,
+    ou None se algum deles não estiver disponível (todos ou nenhum).
+    """
+    dataframes = {}
+    for nome in nomes:
+        df = ler_dataframe(prefixo + nome, versao, ttl)
+        if df is None:
+            return None
+        dataframes[nome] = df
+    return dataframes
+
+
+# =========================
+# Snapshots colunares de planilhas Excel (lidas com openpyxl uma única vez por conteúdo)
+# =========================
+
+SUBDIRETORIO_EXCEL = "excel"
+# Trava própria: a leitura de uma planilha grande não bloqueia o restante do cache
+_trava_excel = threading.Lock()
+
+
+def _assinatura_excel(caminho):
+    estado = os.stat(caminho)
+    return {"mtime_ns": estado.st_mtime_ns, "tamanho": estado.st_size}
+
+
+def _gravar_snapshot_excel(base, df):
+    """Grava o snapshot em Parquet; colunas com tipos mistos (comuns em planilhas) vão para pickle."""
+    try:
+        tabela = pa.Table.from_pandas(df)
+        formato = "parquet"
+    except (pa.ArrowException, TypeError, ValueError):
+        tabela = None
+        formato = "pkl"
+    temporario = f"{base}.{threading.get_ident()}.tmp"
+    if tabela is not None:
+        pq.write_table(tabela, temporario)
+    else:
+        df.to_pickle(temporario)
+    os.replace(temporario, f"{base}.{formato}")
+    return formato
+
+
+def ler_excel(caminho, **opcoes_leitura):
+    """
+    Lê a planilha pelo snapshot em .cache_dados/excel, gerando-o na primeira leitura.
+    O snapshot vale enquanto o arquivo tiver o mesmo mtime e tamanho; se eles mudarem, o conteúdo é
+    comparado pelo hash e a planilha só é lida de novo (pd.read_excel) se o conteúdo mudou.
+    opcoes_leitura são repassadas ao pd.read_excel e fazem parte da chave do snapshot.
+    """
+    diretorio = _caminho(SUBDIRETORIO_EXCEL)
+    chave = json.dumps([os.path.abspath(caminho), opcoes_leitura], sort_keys=True, default=str)
+    base = os.path.join(diretorio, hashlib.sha256(chave.encode()).hexdigest()[:24])
+    assinatura = _assinatura_excel(caminho)
+
+    with _trava_excel:
+        try:
+            with open(base + ".json", encoding="utf-8") as f:
+                registro = json.load(f)
+        except (OSError, ValueError):
+            registro = None
+        snapshot = f"{base}.{registro['formato']}" if registro else None
+        if registro and os.path.exists(snapshot):
+            valido = all(registro[k] == v for k, v in assinatura.items())
+            if not valido and registro["hash"] == _hash_arquivo(caminho):
+                # Arquivo copiado/tocado sem mudar o conteúdo: só atualiza a assinatura
+                registro.update(assinatura)
+                with open(base + ".json", "w", encoding="utf-8") as f:
+                    json.dump(registro, f)
+                valido = True
+            if valido:
+                if registro["formato"] == "parquet":
+                    return pq.read_table(snapshot, memory_map=True).to_pandas()
+                return pd.read_pickle(snapshot)
+
+        hash_conteudo = _hash_arquivo(caminho)
+        df = pd.read_excel(caminho, **opcoes_leitura)
+        os.makedirs(diretorio, exist_ok=True)
+        formato = _gravar_snapshot_excel(base, df)
+        if registro and registro["formato"] != formato:
+            _remover_arquivo(os.path.join(SUBDIRETORIO_EXCEL, os.path.basename(snapshot)))
+        with open(base + ".json", "w", encoding="utf-8") as f:
+            json.dump({"origem": os.path.abspath(caminho), "hash": hash_conteudo,
+                       "formato": formato, **assinatura}, f)
+        return df
@@ -0,0 +1,122 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import streamlit as st
+from postgrest.exceptions import APIError
+from supabase import create_client
+
+# =========================
+# Carregamento paginado e paralelo de tabelas do Supabase
+# =========================
+
+# Tamanho padrão da página: coincide com o limite de linhas do PostgREST no Supabase
+TAMANHO_PAGINA = 1000
+# Número máximo de tabelas baixadas ao mesmo tempo
+MAX_WORKERS = 6
+# SQLSTATE do Postgres para coluna inexistente (undefined_column)
+CODIGO_COLUNA_INEXISTENTE = "42703"
+
+
+@st.cache_resource
+def obter_cliente_supabase(url, chave):
+    """Cria (uma única vez por processo) o cliente do Supabase."""
+    return create_client(url, chave)
+
+
+def buscar_tabela_paginada(cliente, nome_tabela, coluna_chave="uuid", tamanho_pagina=TAMANHO_PAGINA, desde=None):
+    """
+    Busca todas as linhas de uma tabela em páginas ordenadas pela coluna chave (keyset).
+    Se desde=(coluna, valor) for informado, busca apenas as linhas com coluna >= valor.
+    """
+    linhas = []
+    paginas = 0
+    ultimo = None
+    try:
+        while True:
+            consulta = cliente.table(nome_tabela).select(
+                "*").order(coluna_chave)
+            if desde is not None:
+                consulta = consulta.gte(desde[0], desde[1])
+            if ultimo is not None:
+                consulta = consulta.gt(coluna_chave, ultimo)
+            dados = consulta.limit(tamanho_pagina).execute().data or []
+            paginas += 1
+            linhas.extend(dados)
+            if len(dados) < tamanho_pagina:
+                break
+            ultimo = dados[-1][coluna_chave]
+    except APIError as erro:
+        # Só a tabela sem a coluna chave cai para paginação por intervalo (offset); timeouts,
+        # autenticação e erros do servidor propagam
+        if paginas > 0 or erro.code != CODIGO_COLUNA_INEXISTENTE:
+            raise
+        return buscar_tabela_por_intervalo(cliente, nome_tabela, tamanho_pagina, desde)
+    return pd.DataFrame(linhas), paginas
+
+
+def buscar_tabela_por_intervalo(cliente, nome_tabela, tamanho_pagina=TAMANHO_PAGINA, desde=None,
+                                colunas_ordem=None):
+    """
+    Busca todas as linhas de uma tabela usando paginação por intervalo (range).
+    As páginas seguem uma ordem fixa (colunas_ordem ou, sem elas, todas as colunas da tabela),
+    para que o offset não repita nem pule linhas entre uma página e outra.
+    """
+    if colunas_ordem is None:
+        amostra = cliente.table(nome_tabela).select("*").limit(1).execute().data or []
+        if not amostra:
+            return pd.DataFrame(), 1
+        # Colunas json não têm operador de ordenação no Postgres
+        colunas_ordem = [coluna for coluna, valor in amostra[0].items()
+                         if not isinstance(valor, (dict, list))]
+    linhas = []
+    paginas = 0
+    inicio = 0
+    while True:
+        consulta = cliente.table(nome_tabela).select("*")
+        for coluna in colunas_ordem:
+            consulta = consulta.order(coluna)
+        if desde is not None:
+            consulta = consulta.gte(desde[0], desde[1])
+        dados = consulta.range(
+            inicio, inicio + tamanho_pagina - 1).execute().data or []
+        paginas += 1
+        linhas.extend(dados)
+        if len(dados) < tamanho_pagina:
+            break
+        inicio += tamanho_pagina
+    return pd.DataFrame(linhas), paginas
+
+
+def carregar_tabelas_paralelo(cliente, tabelas, chaves=None, tamanho_pagina=TAMANHO_PAGINA, max_workers=MAX_WORKERS):
+    """
+    Baixa várias tabelas em paralelo (pool de threads limitado).
+    Retorna o dicionário nome_tabela -> DataFrame e um relatório com linhas, páginas e tempo por tabela.
+    """
+    chaves = chaves or {}
+
+    def carregar(nome_tabela):
+        inicio = time.time()
+        df, paginas = buscar_tabela_paginada(
+            cliente, nome_tabela, chaves.get(nome_tabela, "uuid"), tamanho_pagina)
+        return nome_tabela, df, paginas, time.time() - inicio
+
+    dataframes = {}
+    relatorio = []
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(tabelas)))) as executor:
+        for nome_tabela, df, paginas, segundos in executor.map(carregar, tabelas):
+            dataframes[nome_tabela] = df
+            relatorio.append({
+                "tabela": nome_tabela,
+                "linhas": len(df),
+                "paginas": paginas,
+                "tempo_s": round(segundos, 2)
+            })
+    return dataframes, pd.DataFrame(relatorio, columns=["tabela", "linhas", "paginas", "tempo_s"])
+
+
+@st.cache_data(show_spinner=False)
+def carregar_tabelas_supabase(url, chave, tabelas, chaves=None):
+    """Versão com cache de carregar_tabelas_paralelo, indexada pelo projeto e pelas tabelas."""
+    cliente = obter_cliente_supabase(url, chave)
+    return carregar_tabelas_paralelo(cliente, list(tabelas), chaves)
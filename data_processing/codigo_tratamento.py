@@ -1,17 +1,66 @@
 import pandas as pd
 import numpy as np
-from datetime import datetime
+
+from data_processing.juncao_dimensoes import juntar_dimensoes
+from data_processing.otimizacao_tipos import otimizar_tipos
 
 # =========================
-# Função utilitária para gerar o DataFrame tratado
+# Pipeline único de tratamento das avaliações de milho (Faixa e Densidade)
 # =========================
 
+# Versão do formato das saídas: altere quando o tratamento mudar (invalida o cache em disco)
+VERSAO_TRATAMENTO = 4
 
-def gerar_df_avTratamentoMilho(session_state):
-    # Carrega os DataFrames do session_state
-    df_av2TratamentoMilho = session_state.get("df_av2TratamentoMilho")
-    df_av3TratamentoMilho = session_state.get("df_av3TratamentoMilho")
-    df_av4TratamentoMilho = session_state.get("df_av4TratamentoMilho")
+# Tipos de teste tratados pelo pipeline
+TIPOS_TESTE = ("Faixa", "Densidade")
+
+# Colunas que formam a 'key' de cada tipo de teste (na Densidade a população também separa os tratamentos)
+COLUNAS_KEY = {
+    "Faixa": ["fazendaRef", "nome", "indexTratamento"],
+    "Densidade": ["fazendaRef", "nome", "populacao", "indexTratamento"]
+}
+
+# Colunas removidas de av2/av3 antes do merge com av4 (na Densidade a população é mantida)
+COLUNAS_REMOVER_TRATAMENTO = {
+    "Faixa": [
+        "uuid", "dataSync", "acao", "cultivar", "tipoTeste", "nome",
+        "populacao", "indexTratamento", "avaliacaoRef", "idBaseRef", "fazendaRef"
+    ],
+    "Densidade": [
+        "uuid", "dataSync", "acao", "cultivar", "tipoTeste", "nome",
+        "indexTratamento", "avaliacaoRef", "idBaseRef", "fazendaRef"
+    ]
+}
+
+# Colunas de texto com poucos valores distintos, guardadas como category nos DataFrames tratados
+COLUNAS_CATEGORICAS = [
+    "nome", "tipoTeste", "cultivar", "nomeFazenda", "nomeProdutor", "nomeCidade", "siglaEstado",
+    "estado", "macroRegiaoMilho", "conjuntaGeralMilhoSafrinha", "subConjuntaMilhoSafrinha",
+    "mrhMilho", "regional", "displayName"
+]
+
+# Colunas inteiras de contagem e de código, reduzidas para int32 nos DataFrames tratados; as demais
+# (datas em epoch, população, pesos) seguem int64 para as contas das páginas
+COLUNAS_INTEIRAS_COMPACTAS = ["indexTratamento", "numeroLinhas", "codigoCidade"] + [
+    f"planta{planta}{medida}" for planta in range(1, 6)
+    for medida in ("NumFileiras", "NumGraosPorFileira", "NumPlantas10metros", "NumPlantasAcamadas",
+                   "NumPlantasDominadas", "NumPlantasQuebradas", "ColmoPodre")
+]
+
+
+def separar_por_tipo_teste(df, tipos_teste=TIPOS_TESTE):
+    """Separa o DataFrame pela coluna tipoTeste numa única passada (tipo ausente -> DataFrame vazio)."""
+    if df is None or 'tipoTeste' not in df.columns:
+        return {tipo: pd.DataFrame() for tipo in tipos_teste}
+    grupos = dict(tuple(df.groupby('tipoTeste', sort=False)))
+    return {tipo: grupos.get(tipo, pd.DataFrame()) for tipo in tipos_teste}
+
+
+def preparar_dimensoes(session_state):
+    """
+    Prepara uma única vez as tabelas de dimensão (avaliação, fazenda, cidade, estado,
+    base de municípios e usuários) usadas nos merges de todos os tipos de teste.
+    """
     df_fazenda = session_state.get("df_fazenda")
     df_cidade = session_state.get("df_cidade")
     df_estado = session_state.get("df_estado")
@@ -20,94 +69,12 @@ def gerar_df_avTratamentoMilho(session_state):
         "df_base_municipios_regioes_soja_milho")
     df_users = session_state.get("df_users")
 
-    # Filtra apenas linhas onde tipoTeste == 'Faixa'
-    def filtrar_faixa(df):
-        if df is not None and 'tipoTeste' in df.columns:
-            return df[df['tipoTeste'] == 'Faixa']
-        return pd.DataFrame()
-
-    df_av2TratamentoMilho_faixa = filtrar_faixa(df_av2TratamentoMilho)
-    df_av3TratamentoMilho_faixa = filtrar_faixa(df_av3TratamentoMilho)
-    df_av4TratamentoMilho_faixa = filtrar_faixa(df_av4TratamentoMilho)
-
     # Reduz o df_avaliacao para as colunas necessárias para merge
     df_avaliacao_reduzido = None
     if df_avaliacao is not None and not df_avaliacao.empty:
         df_avaliacao_reduzido = df_avaliacao[["uuid", "fazendaRef"]].rename(
             columns={"uuid": "avaliacaoRef"})
 
-    # Função para merge entre tratamento e avaliação
-    def merge_tratamento(df_tratamento, df_avaliacao_reduzido):
-        if df_tratamento is not None and not df_tratamento.empty and df_avaliacao_reduzido is not None:
-            return df_tratamento.merge(
-                df_avaliacao_reduzido,
-                on="avaliacaoRef",
-                how="left"
-            )
-        return pd.DataFrame()
-
-    # Realiza os merges iniciais
-    df_av2TratamentoMilho_merged = merge_tratamento(
-        df_av2TratamentoMilho_faixa, df_avaliacao_reduzido)
-    df_av3TratamentoMilho_merged = merge_tratamento(
-        df_av3TratamentoMilho_faixa, df_avaliacao_reduzido)
-    df_av4TratamentoMilho_merged = merge_tratamento(
-        df_av4TratamentoMilho_faixa, df_avaliacao_reduzido)
-
-    # Cria coluna 'key' para identificar tratamentos únicos
-    def criar_coluna_key(df):
-        if not df.empty:
-            df["key"] = (
-                df["fazendaRef"].astype(str) + "_" +
-                df["nome"].astype(str) + "_" +
-                df["indexTratamento"].astype(str)
-            )
-        return df
-
-    # Remove colunas indesejadas
-    def remover_colunas(df, colunas):
-        if not df.empty:
-            return df.drop(columns=[c for c in colunas if c in df.columns])
-        return df
-
-    # Aplica a criação da coluna 'key' nos DataFrames de tratamento
-    if not df_av4TratamentoMilho_merged.empty:
-        df_av4TratamentoMilho_merged = criar_coluna_key(
-            df_av4TratamentoMilho_merged)
-    if not df_av3TratamentoMilho_merged.empty:
-        df_av3TratamentoMilho_merged = criar_coluna_key(
-            df_av3TratamentoMilho_merged)
-    if not df_av2TratamentoMilho_merged.empty:
-        df_av2TratamentoMilho_merged = criar_coluna_key(
-            df_av2TratamentoMilho_merged)
-
-    # Remove colunas que não serão usadas
-    colunas_remover = [
-        "uuid", "dataSync", "acao", "cultivar", "tipoTeste", "nome",
-        "populacao", "indexTratamento", "avaliacaoRef", "idBaseRef", "fazendaRef"
-    ]
-    df_av2TratamentoMilho_merged = remover_colunas(
-        df_av2TratamentoMilho_merged, colunas_remover)
-    df_av3TratamentoMilho_merged = remover_colunas(
-        df_av3TratamentoMilho_merged, colunas_remover)
-
-    # Realiza merges entre os DataFrames de tratamento
-    df_avTratamentoMilho = pd.DataFrame()
-    if not df_av4TratamentoMilho_merged.empty and not df_av3TratamentoMilho_merged.empty:
-        df_avTratamentoMilho = df_av4TratamentoMilho_merged.merge(
-            df_av3TratamentoMilho_merged,
-            on="key",
-            how="left",
-            suffixes=("_av4", "_av3")
-        )
-    if not df_avTratamentoMilho.empty and not df_av2TratamentoMilho_merged.empty:
-        df_avTratamentoMilho = df_avTratamentoMilho.merge(
-            df_av2TratamentoMilho_merged,
-            on="key",
-            how="left",
-            suffixes=("", "_av2")
-        )
-
     # Remove colunas desnecessárias do DataFrame de fazenda
     colunas_remover_fazenda = [
         "dataSync", "acao", "isMilho", "isSoja", "latitude", "longitude", "altitude",
@@ -120,14 +87,6 @@ def gerar_df_avTratamentoMilho(session_state):
     # Renomeia uuid para fazendaRef
     if df_fazenda is not None and not df_fazenda.empty and 'uuid' in df_fazenda.columns:
         df_fazenda = df_fazenda.rename(columns={'uuid': 'fazendaRef'})
-    # Merge com fazenda
-    if not df_avTratamentoMilho.empty and df_fazenda is not None and not df_fazenda.empty:
-        df_avTratamentoMilho = df_avTratamentoMilho.merge(
-            df_fazenda,
-            on='fazendaRef',
-            how='left',
-            suffixes=('', '_fazenda')
-        )
 
     # Remove colunas desnecessárias do DataFrame de cidade
     colunas_remover_cidade = ["dataSync", "acao", "codigoCidade", "firebase"]
@@ -137,20 +96,6 @@ def gerar_df_avTratamentoMilho(session_state):
     # Renomeia uuid para cidadeRef
     if df_cidade is not None and not df_cidade.empty and 'uuid' in df_cidade.columns:
         df_cidade = df_cidade.rename(columns={'uuid': 'cidadeRef'})
-    # Merge com cidade
-    if not df_avTratamentoMilho.empty and df_cidade is not None and not df_cidade.empty:
-        df_avTratamentoMilho = df_avTratamentoMilho.merge(
-            df_cidade,
-            on='cidadeRef',
-            how='left',
-            suffixes=('', '_cidade')
-        )
-    # Cria coluna cidade_siglaEstado para facilitar merges posteriores
-    if not df_avTratamentoMilho.empty and 'nomeCidade' in df_avTratamentoMilho.columns and 'siglaEstado' in df_avTratamentoMilho.columns:
-        df_avTratamentoMilho['cidade_siglaEstado'] = (
-            df_avTratamentoMilho['nomeCidade'].astype(
-                str) + '_' + df_avTratamentoMilho['siglaEstado'].astype(str)
-        )
 
     # Remove colunas desnecessárias do DataFrame de estado
     colunas_remover_estado = ["dataSync", "acao", "paisRef", "firebase"]
@@ -158,27 +103,12 @@ def gerar_df_avTratamentoMilho(session_state):
         df_estado = df_estado.drop(
             columns=[c for c in colunas_remover_estado if c in df_estado.columns])
     # Renomeia colunas para facilitar merge
-    df_estado_renomeado = df_estado
-    if df_estado_renomeado is not None and not df_estado_renomeado.empty:
-        df_estado_renomeado = df_estado_renomeado.rename(columns={
+    if df_estado is not None and not df_estado.empty:
+        df_estado = df_estado.rename(columns={
             'uuid': 'estadoRef',
             'codigoEstado': 'estado',
             'nomeEstado': 'siglaEstado'
         })
-    # Merge com estado
-    if not df_avTratamentoMilho.empty and df_estado_renomeado is not None and not df_estado_renomeado.empty:
-        df_avTratamentoMilho = df_avTratamentoMilho.merge(
-            df_estado_renomeado,
-            on='estadoRef',
-            how='left',
-            suffixes=('', '_estado')
-        )
-    # Atualiza cidade_siglaEstado após merge
-    if not df_avTratamentoMilho.empty and 'nomeCidade' in df_avTratamentoMilho.columns and 'siglaEstado' in df_avTratamentoMilho.columns:
-        df_avTratamentoMilho['cidade_siglaEstado'] = (
-            df_avTratamentoMilho['nomeCidade'].astype(
-                str) + '_' + df_avTratamentoMilho['siglaEstado'].astype(str)
-        )
 
     # Remove colunas desnecessárias do DataFrame de municípios
     colunas_remover_base_municipios = [
@@ -189,14 +119,6 @@ def gerar_df_avTratamentoMilho(session_state):
             columns=[
                 c for c in colunas_remover_base_municipios if c in df_base_municipios_regioes_soja_milho.columns]
         )
-    # Merge com base de municípios
-    if not df_avTratamentoMilho.empty and df_base_municipios_regioes_soja_milho is not None and not df_base_municipios_regioes_soja_milho.empty:
-        df_avTratamentoMilho = df_avTratamentoMilho.merge(
-            df_base_municipios_regioes_soja_milho,
-            on='cidade_siglaEstado',
-            how='left',
-            suffixes=('', '_base_municipios')
-        )
 
     # Prepara df_users para merge
     if isinstance(df_users, pd.DataFrame) and not df_users.empty:
@@ -207,17 +129,98 @@ def gerar_df_avTratamentoMilho(session_state):
             if 'uuid' in df_users.columns:
                 df_users = df_users.rename(
                     columns={'uuid': 'dtcResponsavelRef'})
-    # Merge com usuários
-    if not df_avTratamentoMilho.empty and isinstance(df_users, pd.DataFrame) and not df_users.empty:
-        df_avTratamentoMilho = df_avTratamentoMilho.merge(
-            df_users,
-            on='dtcResponsavelRef',
-            how='left',
-            suffixes=('', '_user')
+
+    return {
+        "avaliacao": df_avaliacao_reduzido,
+        "fazenda": df_fazenda,
+        "cidade": df_cidade,
+        "estado": df_estado,
+        "base_municipios": df_base_municipios_regioes_soja_milho,
+        "users": df_users
+    }
+
+
+def montar_tratamento(df_av2, df_av3, df_av4, dimensoes, colunas_key, colunas_remover):
+    """
+    Junta av4/av3/av2 de um tipo de teste pela 'key' e acrescenta as dimensões já preparadas.
+    Retorna o DataFrame combinado e os intermediários av2, av3 e av4.
+    """
+    df_avaliacao_reduzido = dimensoes["avaliacao"]
+
+    # Função para merge entre tratamento e avaliação
+    def merge_tratamento(df_tratamento):
+        if df_tratamento is not None and not df_tratamento.empty and df_avaliacao_reduzido is not None:
+            return df_tratamento.merge(
+                df_avaliacao_reduzido,
+                on="avaliacaoRef",
+                how="left"
+            )
+        return pd.DataFrame()
+
+    # Cria coluna 'key' para identificar tratamentos únicos
+    def criar_coluna_key(df):
+        if not df.empty:
+            df["key"] = df[colunas_key[0]].astype(str)
+            for coluna in colunas_key[1:]:
+                df["key"] = df["key"] + "_" + df[coluna].astype(str)
+        return df
+
+    # Remove colunas indesejadas
+    def remover_colunas(df, colunas):
+        if not df.empty:
+            return df.drop(columns=[c for c in colunas if c in df.columns])
+        return df
+
+    # Realiza os merges iniciais e cria a coluna 'key'
+    df_av2_merged = criar_coluna_key(merge_tratamento(df_av2))
+    df_av3_merged = criar_coluna_key(merge_tratamento(df_av3))
+    df_av4_merged = criar_coluna_key(merge_tratamento(df_av4))
+
+    # Remove colunas que não serão usadas
+    df_av2_merged = remover_colunas(df_av2_merged, colunas_remover)
+    df_av3_merged = remover_colunas(df_av3_merged, colunas_remover)
+
+    # Realiza merges entre os DataFrames de tratamento
+    df = pd.DataFrame()
+    if not df_av4_merged.empty and not df_av3_merged.empty:
+        df = df_av4_merged.merge(
+            df_av3_merged,
+            on="key",
+            how="left",
+            suffixes=("_av4", "_av3")
         )
+    if not df.empty and not df_av2_merged.empty:
+        df = df.merge(
+            df_av2_merged,
+            on="key",
+            how="left",
+            suffixes=("", "_av2")
+        )
+
+    # Cria (ou atualiza) cidade_siglaEstado, chave da base de municípios
+    def atualizar_cidade_sigla_estado(colunas):
+        if 'nomeCidade' in colunas and 'siglaEstado' in colunas:
+            colunas['cidade_siglaEstado'] = (
+                colunas['nomeCidade'].astype(str) + '_' + colunas['siglaEstado'].astype(str)
+            )
+
+    # Junta as dimensões por busca nas chaves (fazenda -> cidade -> estado -> municípios -> usuários)
+    df = juntar_dimensoes(df, [
+        {"dimensao": dimensoes["fazenda"], "chave": "fazendaRef", "sufixo": "_fazenda"},
+        {"dimensao": dimensoes["cidade"], "chave": "cidadeRef", "sufixo": "_cidade",
+         "apos": atualizar_cidade_sigla_estado},
+        {"dimensao": dimensoes["estado"], "chave": "estadoRef", "sufixo": "_estado",
+         "apos": atualizar_cidade_sigla_estado},
+        {"dimensao": dimensoes["base_municipios"], "chave": "cidade_siglaEstado",
+         "sufixo": "_base_municipios"},
+        {"dimensao": dimensoes["users"], "chave": "dtcResponsavelRef", "sufixo": "_user"},
+    ])
 
-    # Colunas calculadas
+    return df, df_av2_merged, df_av3_merged, df_av4_merged
 
+
+def calcular_colunas_derivadas(df):
+    """Calcula as colunas agronômicas (médias, produtividade, percentuais, datas e ciclos)."""
     # Dicionário de colunas para cálculo de médias
     colunas_medias = {
         "media_NumPlantas10metros": [
@@ -300,190 +303,180 @@ def gerar_df_avTratamentoMilho(session_state):
     }
     # Calcula as médias para cada grupo de colunas
     for nome_media, colunas in colunas_medias.items():
-        if all(col in df_avTratamentoMilho.columns for col in colunas):
-            temp = df_avTratamentoMilho[colunas].replace(0, np.nan)
-            df_avTratamentoMilho[nome_media] = temp.mean(axis=1, skipna=True)
+        if all(col in df.columns for col in colunas):
+            temp = df[colunas].replace(0, np.nan)
+            df[nome_media] = temp.mean(axis=1, skipna=True)
 
     # Cálculo de colunas agronômicas e percentuais
     umidade_padrao = 13.5
     # Corrige PMG para umidade padrão
-    if "media_PMG" in df_avTratamentoMilho.columns and "media_umd_PMG" in df_avTratamentoMilho.columns:
-        df_avTratamentoMilho["corr_PMG"] = df_avTratamentoMilho.apply(
-            lambda row: (
-                row["media_PMG"] * (100 - row["media_umd_PMG"]
-                                    ) / (100 - umidade_padrao)
-                if pd.notnull(row["media_PMG"]) and pd.notnull(row["media_umd_PMG"]) and row["media_PMG"] != 0 and row["media_umd_PMG"] != 0
-                else np.nan
-            ),
-            axis=1
+    if "media_PMG" in df.columns and "media_umd_PMG" in df.columns:
+        cond = (
+            df["media_PMG"].notnull() &
+            df["media_umd_PMG"].notnull() &
+            (df["media_PMG"] != 0) &
+            (df["media_umd_PMG"] != 0)
+        )
+        df["corr_PMG"] = np.where(
+            cond,
+            df["media_PMG"] * (100 - df["media_umd_PMG"]) /
+            (100 - umidade_padrao),
+            np.nan
         )
     # Área da parcela
-    if all(col in df_avTratamentoMilho.columns for col in ["numeroLinhas", "comprimentoLinha", "espacamento"]):
+    if all(col in df.columns for col in ["numeroLinhas", "comprimentoLinha", "espacamento"]):
         cond = (
-            df_avTratamentoMilho["numeroLinhas"].notnull() &
-            df_avTratamentoMilho["comprimentoLinha"].notnull() &
-            df_avTratamentoMilho["espacamento"].notnull() &
-            (df_avTratamentoMilho["numeroLinhas"] > 0) &
-            (df_avTratamentoMilho["comprimentoLinha"] > 0) &
-            (df_avTratamentoMilho["espacamento"] > 0)
-        )
-        df_avTratamentoMilho["area_parcela_m2"] = np.where(
+            df["numeroLinhas"].notnull() &
+            df["comprimentoLinha"].notnull() &
+            df["espacamento"].notnull() &
+            (df["numeroLinhas"] > 0) &
+            (df["comprimentoLinha"] > 0) &
+            (df["espacamento"] > 0)
+        )
+        df["area_parcela_m2"] = np.where(
             cond,
-            df_avTratamentoMilho["numeroLinhas"] *
-            df_avTratamentoMilho["comprimentoLinha"] *
-            df_avTratamentoMilho["espacamento"],
+            df["numeroLinhas"] *
+            df["comprimentoLinha"] *
+            df["espacamento"],
             np.nan
         )
     # Produtividade kg/ha
-    if all(col in df_avTratamentoMilho.columns for col in ["pesoParcela", "area_parcela_m2"]):
+    if all(col in df.columns for col in ["pesoParcela", "area_parcela_m2"]):
         cond = (
-            df_avTratamentoMilho["pesoParcela"].notnull() &
-            df_avTratamentoMilho["area_parcela_m2"].notnull() &
-            (df_avTratamentoMilho["pesoParcela"] > 0) &
-            (df_avTratamentoMilho["area_parcela_m2"] > 0)
+            df["pesoParcela"].notnull() &
+            df["area_parcela_m2"].notnull() &
+            (df["pesoParcela"] > 0) &
+            (df["area_parcela_m2"] > 0)
         )
-        df_avTratamentoMilho["prod_kg_ha"] = np.where(
+        df["prod_kg_ha"] = np.where(
             cond,
-            (df_avTratamentoMilho["pesoParcela"] /
-             df_avTratamentoMilho["area_parcela_m2"]) * 10000,
+            (df["pesoParcela"] /
+             df["area_parcela_m2"]) * 10000,
             np.nan
         )
     # Produtividade corrigida para umidade padrão
-    if all(col in df_avTratamentoMilho.columns for col in ["prod_kg_ha", "humidade"]):
+    if all(col in df.columns for col in ["prod_kg_ha", "humidade"]):
         cond = (
-            df_avTratamentoMilho["prod_kg_ha"].notnull() &
-            df_avTratamentoMilho["humidade"].notnull() &
-            (df_avTratamentoMilho["prod_kg_ha"] > 0) &
-            (df_avTratamentoMilho["humidade"] > 0)
+            df["prod_kg_ha"].notnull() &
+            df["humidade"].notnull() &
+            (df["prod_kg_ha"] > 0) &
+            (df["humidade"] > 0)
         )
-        df_avTratamentoMilho["prod_kg_ha_corr"] = np.where(
+        df["prod_kg_ha_corr"] = np.where(
             cond,
-            df_avTratamentoMilho["prod_kg_ha"] *
-            (100 - df_avTratamentoMilho["humidade"]) / (100 - umidade_padrao),
+            df["prod_kg_ha"] *
+            (100 - df["humidade"]) / (100 - umidade_padrao),
             np.nan
         )
     # Produtividade em sacas/ha corrigida
-    if "prod_kg_ha_corr" in df_avTratamentoMilho.columns:
+    if "prod_kg_ha_corr" in df.columns:
         cond = (
-            df_avTratamentoMilho["prod_kg_ha_corr"].notnull() &
-            (df_avTratamentoMilho["prod_kg_ha_corr"] > 0)
+            df["prod_kg_ha_corr"].notnull() &
+            (df["prod_kg_ha_corr"] > 0)
         )
-        df_avTratamentoMilho["prod_sc_ha_corr"] = np.where(
+        df["prod_sc_ha_corr"] = np.where(
             cond,
-            df_avTratamentoMilho["prod_kg_ha_corr"] / 60,
+            df["prod_kg_ha_corr"] / 60,
             np.nan
         )
 
     # Cálculo de número de plantas por hectare
 
-    if all(col in df_avTratamentoMilho.columns for col in ["media_NumPlantas10metros", "espacamento"]):
+    if all(col in df.columns for col in ["media_NumPlantas10metros", "espacamento"]):
         cond = (
-            df_avTratamentoMilho["media_NumPlantas10metros"].notnull() &
-            df_avTratamentoMilho["espacamento"].notnull() &
-            (df_avTratamentoMilho["media_NumPlantas10metros"] > 0) &
-            (df_avTratamentoMilho["espacamento"] > 0)
+            df["media_NumPlantas10metros"].notnull() &
+            df["espacamento"].notnull() &
+            (df["media_NumPlantas10metros"] > 0) &
+            (df["espacamento"] > 0)
         )
-        df_avTratamentoMilho["numPlantas_ha"] = np.where(
+        df["numPlantas_ha"] = np.where(
             cond,
-            df_avTratamentoMilho["media_NumPlantas10metros"] *
-            1000 / df_avTratamentoMilho["espacamento"],
+            df["media_NumPlantas10metros"] *
+            1000 / df["espacamento"],
             np.nan
         )
 
     # Percentual de plantas acamadas
-    if all(col in df_avTratamentoMilho.columns for col in ["media_NumPlantasAcamadas", "media_NumPlantas10metros"]):
+    if all(col in df.columns for col in ["media_NumPlantasAcamadas", "media_NumPlantas10metros"]):
         cond = (
-            df_avTratamentoMilho["media_NumPlantasAcamadas"].notnull() &
-            df_avTratamentoMilho["media_NumPlantas10metros"].notnull() &
-            (df_avTratamentoMilho["media_NumPlantas10metros"] > 0)
+            df["media_NumPlantasAcamadas"].notnull() &
+            df["media_NumPlantas10metros"].notnull() &
+            (df["media_NumPlantas10metros"] > 0)
         )
-        df_avTratamentoMilho["perc_Acamadas"] = np.where(
+        df["perc_Acamadas"] = np.where(
             cond,
-            (df_avTratamentoMilho["media_NumPlantasAcamadas"] /
-             df_avTratamentoMilho["media_NumPlantas10metros"]) * 100,
+            (df["media_NumPlantasAcamadas"] /
+             df["media_NumPlantas10metros"]) * 100,
             0
         )
     # Percentual de plantas quebradas
-    if all(col in df_avTratamentoMilho.columns for col in ["media_NumPlantasQuebradas", "media_NumPlantas10metros"]):
+    if all(col in df.columns for col in ["media_NumPlantasQuebradas", "media_NumPlantas10metros"]):
         cond = (
-            df_avTratamentoMilho["media_NumPlantasQuebradas"].notnull() &
-            df_avTratamentoMilho["media_NumPlantas10metros"].notnull() &
-            (df_avTratamentoMilho["media_NumPlantas10metros"] > 0)
+            df["media_NumPlantasQuebradas"].notnull() &
+            df["media_NumPlantas10metros"].notnull() &
+            (df["media_NumPlantas10metros"] > 0)
         )
-        df_avTratamentoMilho["perc_Quebradas"] = np.where(
+        df["perc_Quebradas"] = np.where(
             cond,
-            (df_avTratamentoMilho["media_NumPlantasQuebradas"] /
-             df_avTratamentoMilho["media_NumPlantas10metros"]) * 100,
+            (df["media_NumPlantasQuebradas"] /
+             df["media_NumPlantas10metros"]) * 100,
             0
         )
     # Percentual de plantas dominadas
-    if all(col in df_avTratamentoMilho.columns for col in ["media_NumPlantasDominadas", "media_NumPlantas10metros"]):
+    if all(col in df.columns for col in ["media_NumPlantasDominadas", "media_NumPlantas10metros"]):
         cond = (
-            df_avTratamentoMilho["media_NumPlantasDominadas"].notnull() &
-            df_avTratamentoMilho["media_NumPlantas10metros"].notnull() &
-            (df_avTratamentoMilho["media_NumPlantas10metros"] > 0)
+            df["media_NumPlantasDominadas"].notnull() &
+            df["media_NumPlantas10metros"].notnull() &
+            (df["media_NumPlantas10metros"] > 0)
         )
-        df_avTratamentoMilho["perc_Dominadas"] = np.where(
+        df["perc_Dominadas"] = np.where(
             cond,
-            (df_avTratamentoMilho["media_NumPlantasDominadas"] /
-             df_avTratamentoMilho["media_NumPlantas10metros"]) * 100,
+            (df["media_NumPlantasDominadas"] /
+             df["media_NumPlantas10metros"]) * 100,
             0
         )
 
     # Percentual de plantas com colmo podre
-    if all(col in df_avTratamentoMilho.columns for col in ["media_ColmoPodre", "media_NumPlantas10metros"]):
+    if all(col in df.columns for col in ["media_ColmoPodre", "media_NumPlantas10metros"]):
         cond = (
-            df_avTratamentoMilho["media_ColmoPodre"].notnull() &
-            df_avTratamentoMilho["media_NumPlantas10metros"].notnull() &
-            (df_avTratamentoMilho["media_NumPlantas10metros"] > 0)
+            df["media_ColmoPodre"].notnull() &
+            df["media_NumPlantas10metros"].notnull() &
+            (df["media_NumPlantas10metros"] > 0)
         )
-        df_avTratamentoMilho["perc_ColmoPodre"] = np.where(
+        df["perc_ColmoPodre"] = np.where(
             cond,
-            (df_avTratamentoMilho["media_ColmoPodre"] /
-             df_avTratamentoMilho["media_NumPlantas10metros"]) * 100,
+            (df["media_ColmoPodre"] /
+             df["media_NumPlantas10metros"]) * 100,
             0
         )
 
     # Percentual Total# Cálculo do percentual total (soma dos percentuais de acamadas, quebradas, dominadas e colmo podre)
-    if all(col in df_avTratamentoMilho.columns for col in ["perc_Acamadas", "perc_Quebradas", "perc_Dominadas", "perc_ColmoPodre"]):
-        df_avTratamentoMilho["perc_Total"] = (
-            df_avTratamentoMilho["perc_Acamadas"].fillna(0) +
-            df_avTratamentoMilho["perc_Quebradas"].fillna(0) +
-            df_avTratamentoMilho["perc_Dominadas"].fillna(0) +
-            df_avTratamentoMilho["perc_ColmoPodre"].fillna(0)
-        )
-    # Função para padronizar altura para metros
-
-    def padronizar_altura_para_metros(valor):
-        try:
-            if pd.isnull(valor):
-                return np.nan
-            if isinstance(valor, str):
-                valor = valor.replace(',', '.').strip()
-            valor = float(valor)
-            if valor > 10:
-                return valor / 100
-            return valor
-        except Exception:
-            return np.nan
+    if all(col in df.columns for col in ["perc_Acamadas", "perc_Quebradas", "perc_Dominadas", "perc_ColmoPodre"]):
+        df["perc_Total"] = (
+            df["perc_Acamadas"].fillna(0) +
+            df["perc_Quebradas"].fillna(0) +
+            df["perc_Dominadas"].fillna(0) +
+            df["perc_ColmoPodre"].fillna(0)
+        )
+    # Padroniza altura para metros (valores acima de 10 estão em centímetros)
+    def padronizar_altura_para_metros(serie):
+        if serie.dtype == object:
+            serie = pd.to_numeric(
+                serie.astype(str).str.replace(',', '.').str.strip(), errors='coerce')
+        valores = pd.to_numeric(serie, errors='coerce').astype(float)
+        return valores.where(~(valores > 10), valores / 100)
 
     # Aplica padronização de altura para metros
-    if "media_ALT" in df_avTratamentoMilho.columns:
-        df_avTratamentoMilho["media_ALT_m"] = df_avTratamentoMilho["media_ALT"].apply(
-            padronizar_altura_para_metros)
-    if "media_AIE" in df_avTratamentoMilho.columns:
-        df_avTratamentoMilho["media_AIE_m"] = df_avTratamentoMilho["media_AIE"].apply(
-            padronizar_altura_para_metros)
-
-    # Função para converter timestamp para data no formato brasileiro
-    def timestamp_para_data_br(valor):
-        try:
-            if pd.notnull(valor) and valor != 0:
-                return pd.to_datetime(valor, unit='s').strftime('%d/%m/%Y')
-            else:
-                return ""
-        except Exception:
-            return ""
+    if "media_ALT" in df.columns:
+        df["media_ALT_m"] = padronizar_altura_para_metros(df["media_ALT"])
+    if "media_AIE" in df.columns:
+        df["media_AIE_m"] = padronizar_altura_para_metros(df["media_AIE"])
+
+    # Converte timestamp (segundos) para data; zero, vazio ou inválido -> NaT
+    def timestamp_para_data(serie):
+        valores = pd.to_numeric(serie, errors='coerce')
+        valores = valores.where(valores != 0)
+        return pd.to_datetime(valores, unit='s', errors='coerce').dt.normalize()
 
     # Mapeamento de colunas de data para nomes amigáveis
     col_map = {
@@ -492,64 +485,89 @@ def gerar_df_avTratamentoMilho(session_state):
         "dataFlorescimentoFeminina": "dataFlorFem",
         "dataFlorescimentoMasculina": "dataFlorMasc"
     }
-    # Aplica conversão de timestamp para data
+    # Aplica conversão de timestamp para data (datetime64; a formatação fica para a exibição)
     for col_orig, col_novo in col_map.items():
-        if col_orig in df_avTratamentoMilho.columns:
-            df_avTratamentoMilho[col_novo] = df_avTratamentoMilho[col_orig].apply(
-                timestamp_para_data_br)
-
-    # Função para calcular diferença de datas em dias
-    def diff_dias(data_fim, data_ini):
-        try:
-            if pd.isnull(data_fim) or pd.isnull(data_ini) or data_fim == '' or data_ini == '':
-                return np.nan
-            d1 = datetime.strptime(str(data_fim), '%d/%m/%Y')
-            d2 = datetime.strptime(str(data_ini), '%d/%m/%Y')
-            return (d1 - d2).days
-        except Exception:
-            return np.nan
+        if col_orig in df.columns:
+            df[col_novo] = timestamp_para_data(df[col_orig])
 
     # Calcula colunas de diferença de datas em dias
-    if all(col in df_avTratamentoMilho.columns for col in ["colheita", "plantio"]):
-        df_avTratamentoMilho["ciclo_dias"] = df_avTratamentoMilho.apply(
-            lambda row: diff_dias(row["colheita"], row["plantio"]), axis=1)
-    if all(col in df_avTratamentoMilho.columns for col in ["dataFlorFem", "plantio"]):
-        df_avTratamentoMilho["flor_fem_dias"] = df_avTratamentoMilho.apply(
-            lambda row: diff_dias(row["dataFlorFem"], row["plantio"]), axis=1)
-    if all(col in df_avTratamentoMilho.columns for col in ["dataFlorMasc", "plantio"]):
-        df_avTratamentoMilho["flor_masc_dias"] = df_avTratamentoMilho.apply(
-            lambda row: diff_dias(row["dataFlorMasc"], row["plantio"]), axis=1)
+    for col_novo, col_fim in (("ciclo_dias", "colheita"), ("flor_fem_dias", "dataFlorFem"), ("flor_masc_dias", "dataFlorMasc")):
+        if all(col in df.columns for col in [col_fim, "plantio"]):
+            df[col_novo] = (df[col_fim] - df["plantio"]).dt.days
 
     # Cálculo de número de plantas por hectare
-    if all(col in df_avTratamentoMilho.columns for col in ["media_NumPlantas10metros", "espacamento"]):
+    if all(col in df.columns for col in ["media_NumPlantas10metros", "espacamento"]):
         cond = (
-            df_avTratamentoMilho["media_NumPlantas10metros"].notnull() &
-            df_avTratamentoMilho["espacamento"].notnull() &
-            (df_avTratamentoMilho["media_NumPlantas10metros"] > 0) &
-            (df_avTratamentoMilho["espacamento"] > 0)
+            df["media_NumPlantas10metros"].notnull() &
+            df["espacamento"].notnull() &
+            (df["media_NumPlantas10metros"] > 0) &
+            (df["espacamento"] > 0)
         )
-        df_avTratamentoMilho["numPlantas_ha"] = np.where(
+        df["numPlantas_ha"] = np.where(
             cond,
-            df_avTratamentoMilho["media_NumPlantas10metros"] *
-            1000 / df_avTratamentoMilho["espacamento"],
+            df["media_NumPlantas10metros"] *
+            1000 / df["espacamento"],
             np.nan
         )
 
     # Remove usuário de teste específico do DataFrame final
-    if "displayName" in df_avTratamentoMilho.columns:
-        df_avTratamentoMilho = df_avTratamentoMilho[df_avTratamentoMilho["displayName"] != "raullanconi"]
+    if "displayName" in df.columns:
+        df = df[df["displayName"] != "raullanconi"]
 
     # Converte nomeFazenda e nomeProdutor para caixa alta, se existirem
     for col in ["nomeFazenda", "nomeProdutor"]:
-        if col in df_avTratamentoMilho.columns:
-            df_avTratamentoMilho[col] = pd.Series(
-                df_avTratamentoMilho[col], index=df_avTratamentoMilho.index).astype(str).str.upper()
+        if col in df.columns:
+            df[col] = pd.Series(
+                df[col], index=df.index).astype(str).str.upper()
 
     # Correção específica para indexTratamento 208 e 219
-    if "indexTratamento" in df_avTratamentoMilho.columns and "nome" in df_avTratamentoMilho.columns:
-        mask = (df_avTratamentoMilho['indexTratamento'] == 208) | (
-            df_avTratamentoMilho['indexTratamento'] == 219)
-        df_avTratamentoMilho.loc[mask, 'nome'] = 'CS 9801 VIP3'
+    if "indexTratamento" in df.columns and "nome" in df.columns:
+        mask = (df['indexTratamento'] == 208) | (
+            df['indexTratamento'] == 219)
+        df.loc[mask, 'nome'] = 'CS 9801 VIP3'
+
+    return df
+
+
+def gerar_tratamentos(session_state, tipos_teste=TIPOS_TESTE):
+    """
+    Gera os DataFrames tratados de todos os tipos de teste numa única execução:
+    as tabelas av2/av3/av4 são separadas por tipoTeste uma vez e as dimensões preparadas uma vez.
+    Retorna o dicionário tipo_teste -> (df_final, df_av2_merged, df_av3_merged, df_av4_merged)
+    e um relatório da memória do DataFrame final antes e depois da otimização de tipos.
+    """
+    av2_por_tipo = separar_por_tipo_teste(
+        session_state.get("df_av2TratamentoMilho"), tipos_teste)
+    av3_por_tipo = separar_por_tipo_teste(
+        session_state.get("df_av3TratamentoMilho"), tipos_teste)
+    av4_por_tipo = separar_por_tipo_teste(
+        session_state.get("df_av4TratamentoMilho"), tipos_teste)
+    dimensoes = preparar_dimensoes(session_state)
+
+    resultados = {}
+    relatorio = []
+    for tipo in tipos_teste:
+        df, df_av2_merged, df_av3_merged, df_av4_merged = montar_tratamento(
+            av2_por_tipo[tipo], av3_por_tipo[tipo], av4_por_tipo[tipo], dimensoes,
+            COLUNAS_KEY[tipo], COLUNAS_REMOVER_TRATAMENTO[tipo])
+        df, memoria = otimizar_tipos(
+            calcular_colunas_derivadas(df), COLUNAS_CATEGORICAS, COLUNAS_INTEIRAS_COMPACTAS)
+        resultados[tipo] = (df, df_av2_merged, df_av3_merged, df_av4_merged)
+        relatorio.append({
+            "tipo_teste": tipo,
+            "linhas": len(df),
+            "mb_antes": round(memoria["bytes_antes"] / 1024 ** 2, 2),
+            "mb_depois": round(memoria["bytes_depois"] / 1024 ** 2, 2),
+            "mb_economizados": round((memoria["bytes_antes"] - memoria["bytes_depois"]) / 1024 ** 2, 2)
+        })
+    return resultados, pd.DataFrame(relatorio)
+
+
+def gerar_df_avTratamentoMilho(session_state):
+    """DataFrame tratado dos testes de Faixa e os intermediários av2, av3 e av4."""
+    return gerar_tratamentos(session_state, ("Faixa",))[0]["Faixa"]
+
 
-    # Retorna o DataFrame final já tratado e os intermediários
-    return df_avTratamentoMilho, df_av2TratamentoMilho_merged, df_av3TratamentoMilho_merged, df_av4TratamentoMilho_merged
+def gerar_df_avTratamentoMilhoDensidade(session_state):
+    """DataFrame tratado dos testes de Densidade e os intermediários av2, av3 e av4."""
+    return gerar_tratamentos(session_state, ("Densidade",))[0]["Densidade"]
@@ -0,0 +1,381 @@
+import os
+import time
+
+import pandas as pd
+import streamlit as st
+
+from data_processing.cache_disco import ler_excel
+from data_processing.carregamento_supabase import carregar_tabelas_supabase
+from data_processing.formatacao import converter_datas
+from data_processing.memoizacao import chave_pagina
+from data_processing.outliers import aplicar_outliers, estatisticas_outliers
+from data_processing.repositorio_dados import obter_dataframe, obter_versao, publicar_dados
+from data_processing.sincronizacao_supabase import registrar_snapshots, sincronizar_tabelas
+
+# =========================
+# Dados comerciais (GD Milho): tratamento único compartilhado pelas páginas comerciais
+# =========================
+
+TABELAS_COMERCIAL = ("resultados", "fazenda", "usuarios")
+# Coluna usada na paginação por chave (keyset) de cada tabela comercial
+CHAVES_COMERCIAL = {"resultados": "id",
+                    "fazenda": "id", "usuarios": "usuario_id"}
+
+# Safras disponíveis: a atual vem do Supabase, as anteriores das planilhas em datasets/
+ANOS_GD = ("2025", "2024", "2023")
+ARQUIVOS_GD_HISTORICO = {
+    "2024": os.path.join("datasets", "gd_milho_2024.xlsx"),
+    "2023": os.path.join("datasets", "gd_milho_2023.xlsx"),
+}
+CAMINHO_BASE_MUNICIPIOS = os.path.join(
+    "datasets", "base_municipios_regioes_soja_milho.xlsx")
+COLUNAS_OUTLIERS = ['prod_sc_ha_corr', 'umidade']
+# Critérios de outliers (rótulo -> método de data_processing.outliers)
+CRITERIOS_OUTLIERS = {
+    "Z-score (média/desvio padrão)": "zscore",
+    "Z robusto (mediana/MAD)": "mad",
+    "IQR (quartis)": "iqr",
+}
+# Agrupamentos oferecidos para as estatísticas de outliers (rótulo -> coluna; None = safra inteira)
+AGRUPAMENTOS_OUTLIERS = {
+    "Nenhum (safra inteira)": None,
+    "Safra": "safra",
+    "Macro Região": "macroRegiaoMilho",
+    "Híbrido": "hibrido",
+}
+
+COLUNAS_REMOVER_RESULTADOS = [
+    "criado_em",
+    "cultura",
+    "pop_inicial",
+    "tratamento_id",
+    "area_total",
+    "observacoes",
+    "fazenda_id",
+    "modificado_por",
+    "modificado_em",
+    "pmg",
+    "avariados"
+]
+COLUNAS_REMOVER_FAZENDA = [
+    "criado_em",
+    "modificado_por",
+    "textura_solo",
+    "fertilidade_solo",
+    "isIrrigado",
+    "tipo_GD",
+    "latitude",
+    "longitude",
+    "altitude",
+    "observacoes",
+    "aut_imagem",
+    "modificado_em",
+    "criado_por",
+    "codigo_estado",
+    "cidade_id",
+    "estado_id"
+]
+ESTADOS_SIGLAS = {
+    "Acre": "AC", "Alagoas": "AL", "Amapá": "AP", "Amazonas": "AM", "Bahia": "BA",
+    "Ceará": "CE", "Distrito Federal": "DF", "Espírito Santo": "ES", "Goiás": "GO",
+    "Maranhão": "MA", "Mato Grosso": "MT", "Mato Grosso do Sul": "MS", "Minas Gerais": "MG",
+    "Pará": "PA", "Paraíba": "PB", "Paraná": "PR", "Pernambuco": "PE", "Piauí": "PI",
+    "Rio de Janeiro": "RJ", "Rio Grande do Norte": "RN", "Rio Grande do Sul": "RS",
+    "Rondônia": "RO", "Roraima": "RR", "Santa Catarina": "SC", "São Paulo": "SP",
+    "Sergipe": "SE", "Tocantins": "TO"
+}
+RENOMEAR_GD = {
+    "produtor": "cliente",
+    "nome_cidade": "cidade",
+    "tratamento": "hibrido",
+    "umid_colheita": "umidade",
+    "nome_usuario": "responsavel"
+}
+COLUNAS_ORDEM_GD = [
+    "cliente",
+    "siglaEstado",
+    "cidade",
+    "cidade_siglaEstado",
+    "hibrido",
+    "pop_final",
+    "data_plantio",
+    "data_colheita",
+    "prod_sc_ha_corr",
+    "umidade",
+    "safra",
+    "responsavel"
+]
+COLUNAS_BASE_MUNICIPIOS = ["cidade_siglaEstado", "mrhMilho", "macroRegiaoMilho",
+                           "subConjuntaMilhoSafrinha", "conjuntaGeralMilhoSafrinha"]
+
+
+def _definir_safra(epoca):
+    if pd.isna(epoca) or str(epoca).strip() == "":
+        return "2025"
+    epoca_str = str(epoca).strip().lower()
+    if epoca_str == "safrinha":
+        return "2025"
+    elif epoca_str == "safra":
+        return "2024-2025"
+    else:
+        return "2025"
+
+
+def tratar_resultados(df_resultados):
+    """Limpeza da tabela resultados: números, caixa alta, produtividade corrigida a 13.5%, key e safra."""
+    if df_resultados is None or df_resultados.empty:
+        return None
+    df = df_resultados.drop(
+        columns=[col for col in COLUNAS_REMOVER_RESULTADOS if col in df_resultados.columns], errors="ignore")
+    # Converter datas para datetime (formatadas só na exibição)
+    df = converter_datas(df, ["data_plantio", "data_colheita"])
+    # Remover pontos da coluna pop_final
+    if "pop_final" in df.columns:
+        df["pop_final"] = df["pop_final"].astype(
+            str).str.replace('.', '', regex=False)
+    # Trocar vírgula por ponto em umid_colheita e resultado
+    for col_float in ["umid_colheita", "resultado"]:
+        if col_float in df.columns:
+            df[col_float] = df[col_float].astype(
+                str).str.replace(',', '.', regex=False)
+    # Converter fazenda e produtor para caixa alta
+    for col_upper in ["fazenda", "produtor"]:
+        if col_upper in df.columns:
+            df[col_upper] = df[col_upper].astype(str).str.upper()
+    # Criar coluna prod_sc_ha_corr corrigindo a umidade para 13.5%
+    if "umid_colheita" in df.columns and "resultado" in df.columns:
+        df["umid_colheita"] = pd.to_numeric(df["umid_colheita"], errors="coerce")
+        df["resultado"] = pd.to_numeric(df["resultado"], errors="coerce")
+        df["prod_sc_ha_corr"] = (df["resultado"] * (
+            (100 - df["umid_colheita"]) / (100 - 13.5))).round(1)
+    # Criar coluna key como concatenação de fazenda_produtor
+    if "fazenda" in df.columns and "produtor" in df.columns:
+        df["key"] = df["fazenda"].astype(str) + "_" + df["produtor"].astype(str)
+    # Criar coluna safra baseada na coluna epoca
+    if "epoca" in df.columns:
+        df["safra"] = df["epoca"].apply(_definir_safra)
+    # Remover linhas onde prod_sc_ha_corr é 0 ou vazio
+    if "prod_sc_ha_corr" in df.columns:
+        df = df[df["prod_sc_ha_corr"].notna() & (df["prod_sc_ha_corr"] != 0)]
+    return df
+
+
+def tratar_fazenda(df_fazenda):
+    """Limpeza da tabela fazenda: colunas não usadas, caixa alta e key fazenda_produtor."""
+    if df_fazenda is None or df_fazenda.empty:
+        return None
+    df = df_fazenda.drop(
+        columns=[col for col in COLUNAS_REMOVER_FAZENDA if col in df_fazenda.columns], errors="ignore")
+    for col in ["produtor", "fazenda"]:
+        if col in df.columns:
+            df[col] = df[col].astype(str).str.upper()
+    if "fazenda" in df.columns and "produtor" in df.columns:
+        df["key"] = df["fazenda"].astype(str) + "_" + df["produtor"].astype(str)
+    return df
+
+
+def montar_gd_milho_2025(df_resultados, df_fazenda, df_usuarios):
+    """
+    GD Milho da safra atual: resultados tratados + cidade/estado da fazenda + nome do responsável,
+    com siglaEstado, cidade_siglaEstado e as colunas renomeadas/ordenadas para as análises.
+    Linhas sem cidade ou híbrido são descartadas. Retorna None se faltarem dados.
+    """
+    df_resultados_tratado = tratar_resultados(df_resultados)
+    df_fazenda_tratada = tratar_fazenda(df_fazenda)
+    if df_resultados_tratado is None or df_resultados_tratado.empty or df_fazenda_tratada is None \
+            or "key" not in df_resultados_tratado.columns or "key" not in df_fazenda_tratada.columns:
+        return None
+    # Seleciona apenas as colunas chave e as desejadas de fazenda
+    cols_fazenda = ["key"] + [col for col in ["nome_cidade", "nome_estado"]
+                              if col in df_fazenda_tratada.columns]
+    gd_milho_2025 = df_resultados_tratado.merge(
+        df_fazenda_tratada[cols_fazenda], on="key", how="left")
+
+    # Nome do usuário que cadastrou o resultado
+    if df_usuarios is not None and not df_usuarios.empty and "criado_por" in gd_milho_2025.columns:
+        usuarios_df = df_usuarios[[
+            col for col in df_usuarios.columns if col in ("usuario_id", "nome")]].rename(columns={"nome": "nome_usuario"})
+        gd_milho_2025 = gd_milho_2025.merge(
+            usuarios_df, left_on="criado_por", right_on="usuario_id", how="left"
+        ).drop(columns=["usuario_id"], errors="ignore")
+
+    if "nome_estado" in gd_milho_2025.columns:
+        gd_milho_2025["siglaEstado"] = gd_milho_2025["nome_estado"].map(ESTADOS_SIGLAS)
+    if "nome_usuario" in gd_milho_2025.columns:
+        gd_milho_2025["nome_usuario"] = gd_milho_2025["nome_usuario"].astype(str).str.upper()
+    if gd_milho_2025.empty:
+        return gd_milho_2025
+
+    # Criar coluna cidade_siglaEstado ANTES da renomeação/reordenação
+    col_cidade = "nome_cidade" if "nome_cidade" in gd_milho_2025.columns else (
+        "cidade" if "cidade" in gd_milho_2025.columns else None)
+    if col_cidade and "siglaEstado" in gd_milho_2025.columns:
+        gd_milho_2025["cidade_siglaEstado"] = gd_milho_2025[col_cidade].astype(
+            str) + "_" + gd_milho_2025["siglaEstado"].astype(str)
+
+    gd_milho_2025 = gd_milho_2025.rename(columns=RENOMEAR_GD)
+    gd_milho_2025 = gd_milho_2025[[col for col in COLUNAS_ORDEM_GD if col in gd_milho_2025.columns]]
+    # Remover linhas onde cidade ou hibrido estão vazios ou nulos
+    return gd_milho_2025[
+        gd_milho_2025['cidade'].notna() & (gd_milho_2025['cidade'] != '') &
+        gd_milho_2025['hibrido'].notna() & (gd_milho_2025['hibrido'] != '')
+    ]
+
+
+def _assinatura_arquivos():
+    """(caminho, mtime, tamanho) das planilhas usadas; muda a chave do cache quando algum arquivo muda."""
+    assinatura = []
+    for caminho in list(ARQUIVOS_GD_HISTORICO.values()) + [CAMINHO_BASE_MUNICIPIOS]:
+        if os.path.exists(caminho):
+            estado = os.stat(caminho)
+            assinatura.append((caminho, estado.st_mtime_ns, estado.st_size))
+    return tuple(assinatura)
+
+
+@st.cache_resource(max_entries=4, show_spinner=False)
+def _bases_gd(versao, assinatura):
+    """GD Milho bruto de cada safra (None quando indisponível), montado uma vez por versão dos dados."""
+    bases = {"2025": montar_gd_milho_2025(
+        obter_dataframe("resultados"), obter_dataframe("fazenda"), obter_dataframe("usuarios"))}
+    for ano, caminho in ARQUIVOS_GD_HISTORICO.items():
+        bases[ano] = ler_excel(caminho) if os.path.exists(caminho) else None
+    return bases
+
+
+def _regioes_por_cidade():
+    """cidade_siglaEstado -> colunas de região de base_municipios (primeira ocorrência de cada cidade)."""
+    if not os.path.exists(CAMINHO_BASE_MUNICIPIOS):
+        return None
+    base_municipios = ler_excel(CAMINHO_BASE_MUNICIPIOS)
+    return base_municipios[[col for col in COLUNAS_BASE_MUNICIPIOS if col in base_municipios.columns]
+                           ].drop_duplicates("cidade_siglaEstado").set_index("cidade_siglaEstado")
+
+
+def _grupos_outliers(gd_milho, agrupar_por):
+    """Rótulo do grupo de cada linha: coluna própria ou, para as regiões, busca pela cidade em base_municipios."""
+    if agrupar_por is None:
+        return None
+    if agrupar_por in gd_milho.columns:
+        return gd_milho[agrupar_por]
+    regioes = _regioes_por_cidade()
+    if regioes is None or agrupar_por not in regioes.columns or "cidade_siglaEstado" not in gd_milho.columns:
+        return None
+    return gd_milho["cidade_siglaEstado"].map(regioes[agrupar_por])
+
+
+@st.cache_resource(max_entries=16, show_spinner=False)
+def _estatisticas_gd(versao, assinatura, ano, colunas, agrupar_por, metodo):
+    gd_milho = _bases_gd(versao, assinatura)[ano]
+    if gd_milho is None or gd_milho.empty:
+        return None
+    return estatisticas_outliers(gd_milho, list(colunas), _grupos_outliers(gd_milho, agrupar_por), metodo)
+
+
+@st.cache_resource(max_entries=32, show_spinner=False)
+def _tratamento_gd(versao, assinatura, ano, threshold, agrupar_por, metodo):
+    # As estatísticas por grupo ficam em cache à parte: mudar o threshold só refaz a comparação
+    estatisticas = _estatisticas_gd(versao, assinatura, ano, tuple(COLUNAS_OUTLIERS), agrupar_por, metodo)
+    if estatisticas is None:
+        return None, None, None
+    return aplicar_outliers(_bases_gd(versao, assinatura)[ano], estatisticas, threshold)
+
+
+@st.cache_resource(max_entries=16, show_spinner=False)
+def _df_comercial(versao, assinatura, anos, threshold, agrupar_por, metodo):
+    lista_df = [tratado for tratado, _, _ in (_tratamento_gd(versao, assinatura, ano, threshold, agrupar_por, metodo)
+                                              for ano in anos)
+                if tratado is not None and not tratado.empty]
+    if not lista_df:
+        return None
+    df_comercial = converter_datas(pd.concat(lista_df, ignore_index=True), [
+                                   "data_plantio", "data_colheita"])
+    # Merge com base_municipios
+    if os.path.exists(CAMINHO_BASE_MUNICIPIOS):
+        base_municipios = ler_excel(CAMINHO_BASE_MUNICIPIOS)
+        base_municipios = base_municipios[[
+            col for col in COLUNAS_BASE_MUNICIPIOS if col in base_municipios.columns]]
+        df_comercial = df_comercial.merge(
+            base_municipios, on="cidade_siglaEstado", how="left")
+    return df_comercial
+
+
+def _copia(df):
+    # Cópia rasa (copy-on-write): a página pode criar colunas sem alterar o DataFrame em cache
+    return df.copy(deep=False) if df is not None else None
+
+
+def obter_gd_milho(ano):
+    """GD Milho bruto (antes da remoção de outliers) da safra informada, ou None."""
+    return _copia(_bases_gd(obter_versao(), _assinatura_arquivos())[ano])
+
+
+def obter_gd_milho_tratado(ano, threshold=3.0, agrupar_por=None, metodo="zscore"):
+    """
+    (sem outliers, outliers com log_remocao, parâmetros por coluna e grupo) da safra, ou (None, None, None).
+    agrupar_por: coluna de AGRUPAMENTOS_OUTLIERS; metodo: "zscore", "mad" ou "iqr" (ver data_processing.outliers).
+    """
+    tratado, outliers, parametros = _tratamento_gd(
+        obter_versao(), _assinatura_arquivos(), ano, float(threshold), agrupar_por, metodo)
+    return _copia(tratado), _copia(outliers), _copia(parametros)
+
+
+def chave_comercial(pagina, filtros=(), **parametros):
+    """
+    chave_pagina para resultados derivados dos dados comerciais: soma a assinatura das planilhas de
+    datasets/, que também alimentam obter_gd_milho*/obter_df_comercial. Não percorre os DataFrames.
+    """
+    return chave_pagina(pagina, filtros, assinatura=_assinatura_arquivos(), **parametros)
+
+
+def obter_df_comercial(threshold=3.0, anos=ANOS_GD, agrupar_por=None, metodo="zscore"):
+    """
+    df_comercial: safras informadas sem outliers, concatenadas e com as regiões de base_municipios.
+    Montado uma vez por (versão dos dados, planilhas, safras, critério de outliers) e compartilhado
+    entre páginas e sessões; cada chamada devolve uma cópia rasa.
+    """
+    return _copia(_df_comercial(obter_versao(), _assinatura_arquivos(), tuple(anos), float(threshold),
+                                agrupar_por, metodo))
+
+
+def barra_carregamento_comercial(url, chave):
+    """
+    Botões da sidebar das páginas comerciais: carga com cache, carga sem cache e atualização
+    incremental das tabelas comerciais, publicadas no repositório compartilhado, e o relatório da
+    última carga da sessão.
+    """
+    with st.sidebar:
+        st.markdown("### 🔄 Carregamento de Dados Comerciais")
+        st.markdown("Escolha como deseja carregar os dados:")
+        if st.button("🔄 Carregar Dados Comerciais com cache (mais rápido)"):
+            dataframes, relatorio_carga = carregar_tabelas_supabase(
+                url, chave, TABELAS_COMERCIAL, CHAVES_COMERCIAL)
+            publicar_dados(dataframes)
+            st.session_state["relatorio_carga_comercial"] = relatorio_carga
+            registrar_snapshots(url, dataframes, CHAVES_COMERCIAL)
+            st.success("✅ Dados comerciais carregados e armazenados!")
+        if st.button("♻️ Carregar Dados Comerciais sem cache (mais lento)"):
+            start_time = time.time()
+            carregar_tabelas_supabase.clear()  # limpa o cache da função
+            dataframes, relatorio_carga = carregar_tabelas_supabase(
+                url, chave, TABELAS_COMERCIAL, CHAVES_COMERCIAL)
+            publicar_dados(dataframes)
+            st.session_state["relatorio_carga_comercial"] = relatorio_carga
+            registrar_snapshots(url, dataframes, CHAVES_COMERCIAL, substituir=True)
+            total_time = time.time() - start_time
+            st.success(
+                f"✅ Dados comerciais carregados direto do Supabase! (Tempo: {total_time:.2f}s)")
+        if st.button("⚡ Atualizar Dados Comerciais incremental (somente alterações)"):
+            start_time = time.time()
+            dataframes, relatorio_carga = sincronizar_tabelas(
+                url, chave, TABELAS_COMERCIAL, CHAVES_COMERCIAL)
+            publicar_dados(dataframes)
+            st.session_state["relatorio_carga_comercial"] = relatorio_carga
+            total_time = time.time() - start_time
+            linhas_alteradas = int(relatorio_carga["linhas_alteradas"].sum())
+            st.success(
+                f"✅ {linhas_alteradas} linhas sincronizadas em {total_time:.2f}s")
+        # Relatório de linhas e tempo de carregamento por tabela
+        if "relatorio_carga_comercial" in st.session_state:
+            with st.expander("📊 Relatório de carregamento", expanded=False):
+                st.dataframe(st.session_state["relatorio_carga_comercial"],
+                             hide_index=True, use_container_width=True)
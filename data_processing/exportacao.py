@@ -0,0 +1,529 @@
+import datetime
+import hashlib
+import io
+import os
+import re
+import tempfile
+import threading
+import time
+import zipfile
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import streamlit as st
+import xlsxwriter
+
+from data_processing.formatacao import FORMATO_DATA_BR, formatar_datas_br
+from data_processing.repositorio_dados import impressao_digital
+
+# =========================
+# Exportação sob demanda: arquivos Excel gerados só quando o usuário pede, guardados num
+# cache LRU limitado em bytes e compartilhado entre as sessões
+# =========================
+
+MIME_EXCEL = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+# Tamanho máximo somado dos arquivos guardados (bytes)
+TAMANHO_MAXIMO_ARQUIVOS = 256 * 1024 ** 2
+# Opções do xlsxwriter: textos que parecem URL continuam texto (como no openpyxl)
+OPCOES_XLSXWRITER = {"options": {"strings_to_urls": False}}
+
+_arquivos = OrderedDict()
+_tamanho = {"bytes": 0}
+_trava = threading.Lock()
+
+
+def _planilhas(dados):
+    return dados if isinstance(dados, dict) else {"Sheet1": dados}
+
+
+def chave_arquivo(dados, **opcoes):
+    """Hash das impressões digitais das planilhas e das opções de escrita (to_excel)."""
+    partes = [(nome, impressao_digital(df)) for nome, df in _planilhas(dados).items()]
+    return hashlib.sha256(repr((partes, sorted(opcoes.items()))).encode()).hexdigest()
+
+
+def _escrever_excel(dados, formatar_datas=False, **opcoes):
+    opcoes.setdefault("index", False)
+    buffer = io.BytesIO()
+    with pd.ExcelWriter(buffer, engine="xlsxwriter", engine_kwargs=OPCOES_XLSXWRITER) as writer:
+        for nome, df in _planilhas(dados).items():
+            if formatar_datas:
+                df = formatar_datas_br(df)
+            df.to_excel(writer, sheet_name=nome, **opcoes)
+    return buffer.getvalue()
+
+
+def _guardar(chave, conteudo):
+    with _trava:
+        if chave in _arquivos:
+            return
+        _arquivos[chave] = conteudo
+        _tamanho["bytes"] += len(conteudo)
+        # Remove os menos usados recentemente, preservando sempre o arquivo recém-gerado
+        while _tamanho["bytes"] > TAMANHO_MAXIMO_ARQUIVOS and len(_arquivos) > 1:
+            _, removido = _arquivos.popitem(last=False)
+            _tamanho["bytes"] -= len(removido)
+
+
+def gerar_excel(dados, chave=None, formatar_datas=False, **opcoes):
+    """
+    Bytes do Excel (xlsxwriter) de um DataFrame ou de {nome da planilha: DataFrame}.
+    opcoes vão para to_excel (index=False por padrão); formatar_datas aplica formatar_datas_br só
+    na escrita. O arquivo fica em cache por (impressões digitais, opções); os menos usados saem
+    quando o total passa de TAMANHO_MAXIMO_ARQUIVOS.
+    """
+    chave = chave or chave_arquivo(dados, formatar_datas=formatar_datas, **opcoes)
+    with _trava:
+        if chave in _arquivos:
+            _arquivos.move_to_end(chave)
+            return _arquivos[chave]
+    conteudo = _escrever_excel(dados, formatar_datas, **opcoes)
+    _guardar(chave, conteudo)
+    return conteudo
+
+
+def _rotulo_gerar(label):
+    return label.replace("⬇️ Baixar", "📄 Gerar", 1).replace("Baixar", "Gerar", 1)
+
+
+def botao_excel(label, dados, file_name, key=None, chave=None, formatar_datas=False, **opcoes):
+    """
+    Download de Excel gerado só no clique: o primeiro botão escreve o arquivo (ou o lê do cache)
+    e libera o download. Se os dados mudarem (filtros), volta a pedir a geração.
+    key distingue botões com o mesmo file_name na página. chave identifica o conteúdo sem
+    percorrer os dados (ex.: chave_pagina, que cobre versão e filtros); sem ela, vale a impressão
+    digital das planilhas, que lê o DataFrame inteiro a cada execução. formatar_datas aplica
+    formatar_datas_br na geração, em vez de a página passar uma cópia formatada.
+    """
+    key = key or f"excel_{file_name}"
+    if chave is None:
+        chave = chave_arquivo(dados, formatar_datas=formatar_datas, **opcoes)
+    else:
+        chave = hashlib.sha256(repr((chave, key, formatar_datas, sorted(opcoes.items()))).encode()).hexdigest()
+    _registrar_no_pacote(key, file_name, dados, chave, opcoes)
+    if st.session_state.get(f"pedido_{key}") != chave:
+        if not st.button(_rotulo_gerar(label), key=f"gerar_{key}"):
+            return
+        st.session_state[f"pedido_{key}"] = chave
+    with st.spinner("Gerando arquivo..."):
+        conteudo = gerar_excel(dados, chave=chave, formatar_datas=formatar_datas, **opcoes)
+    st.download_button(
+        label=label,
+        data=conteudo,
+        file_name=file_name,
+        mime=MIME_EXCEL,
+        key=f"baixar_{key}",
+        on_click="ignore"
+    )
+
+
+# =========================
+# Exportação em fluxo de DataFrames grandes: escrita em blocos num arquivo temporário (xlsxwriter em
+# constant_memory, CSV e Parquet), guardada em disco e apagada quando deixa de ser usada. O download
+# ainda lê o arquivo inteiro para a memória, mas só na execução em que o usuário o pede
+# =========================
+
+DIRETORIO_EXPORTACOES = os.path.join(tempfile.gettempdir(), "streamlit_dp_exportacoes")
+LINHAS_POR_BLOCO = 50_000
+# Arquivos sem uso há mais que isso (segundos) são apagados, inclusive os de sessões encerradas
+VALIDADE_EXPORTACOES = 60 * 60
+# Limites de uma planilha Excel (linhas incluem o cabeçalho)
+LIMITE_LINHAS_EXCEL = 1_048_576
+LIMITE_COLUNAS_EXCEL = 16_384
+
+# Formatos de exportação (rótulo -> extensão)
+FORMATOS_EXPORTACAO = {
+    "Excel (.xlsx)": "xlsx",
+    "CSV (.csv)": "csv",
+    "Parquet (.parquet)": "parquet",
+}
+MIMES_EXPORTACAO = {
+    "xlsx": MIME_EXCEL,
+    "csv": "text/csv",
+    "parquet": "application/octet-stream",
+}
+
+
+def _blocos(df, linhas=LINHAS_POR_BLOCO):
+    # Pelo menos um bloco, para que um DataFrame vazio ainda gere o cabeçalho
+    for inicio in range(0, max(len(df), 1), linhas):
+        yield df.iloc[inicio:inicio + linhas]
+
+
+def _verificar_limites_excel(df, nome="O DataFrame"):
+    if len(df) + 1 > LIMITE_LINHAS_EXCEL or len(df.columns) > LIMITE_COLUNAS_EXCEL:
+        raise ValueError(
+            f"{nome} ({len(df)} linhas x {len(df.columns)} colunas) excede o limite de uma "
+            "planilha Excel. Exporte em CSV ou Parquet.")
+
+
+def _abrir_workbook(caminho):
+    # constant_memory: cada linha vai para o disco assim que a próxima começa a ser escrita
+    return xlsxwriter.Workbook(caminho, {
+        "constant_memory": True,
+        "strings_to_urls": False,
+        "nan_inf_to_errors": True,
+        "remove_timezone": True,
+        "default_date_format": "dd/mm/yyyy",
+    })
+
+
+# Tipos que o xlsxwriter escreve diretamente; nas colunas object, os demais (listas, dicionários,
+# Decimal etc.) vão como texto
+TIPOS_CELULA_EXCEL = (str, int, float, bool, datetime.date, datetime.time, datetime.timedelta)
+
+
+def _celula_excel(valor):
+    if valor is None or isinstance(valor, TIPOS_CELULA_EXCEL):
+        if isinstance(valor, datetime.datetime) and valor.tzinfo is not None:
+            return valor.replace(tzinfo=None)
+        return valor
+    return str(valor)
+
+
+def _valores_excel(bloco):
+    """Bloco como objetos aceitos pelo xlsxwriter: nulos viram None, datas perdem o fuso."""
+    bloco = bloco.copy()
+    for coluna, tipo in enumerate(bloco.dtypes):
+        serie = bloco.iloc[:, coluna]
+        if isinstance(tipo, pd.DatetimeTZDtype):
+            bloco.isetitem(coluna, serie.dt.tz_localize(None))
+        elif tipo == object:
+            bloco.isetitem(coluna, serie.map(_celula_excel, na_action="ignore"))
+    return bloco.astype(object).where(bloco.notna(), None)
+
+
+def _escrever_planilha(workbook, df, nome=None):
+    """Escreve o DataFrame numa nova aba, linha a linha (ordem exigida pelo constant_memory)."""
+    planilha = workbook.add_worksheet(nome)
+    planilha.write_row(0, 0, [str(coluna) for coluna in df.columns])
+    linha = 1
+    for bloco in _blocos(df):
+        valores = _valores_excel(bloco)
+        for registro in valores.itertuples(index=False, name=None):
+            planilha.write_row(linha, 0, registro)
+            linha += 1
+
+
+def _escrever_xlsx(df, caminho):
+    _verificar_limites_excel(df)
+    workbook = _abrir_workbook(caminho)
+    _escrever_planilha(workbook, df)
+    workbook.close()
+
+
+def _escrever_csv(df, caminho):
+    """Separador ';' e vírgula decimal (padrão do Excel em português), datas em dd/mm/aaaa."""
+    with open(caminho, "w", encoding="utf-8-sig", newline="") as arquivo:
+        for numero, bloco in enumerate(_blocos(df)):
+            bloco.to_csv(arquivo, index=False, header=numero == 0, sep=";", decimal=",",
+                         date_format=FORMATO_DATA_BR)
+
+
+def _escrever_parquet(df, caminho):
+    """Um row group por bloco, com o esquema do DataFrame inteiro."""
+    try:
+        esquema = pa.Schema.from_pandas(df, preserve_index=False)
+        with pq.ParquetWriter(caminho, esquema) as escritor:
+            for bloco in _blocos(df):
+                escritor.write_table(pa.Table.from_pandas(bloco, schema=esquema, preserve_index=False))
+    except (pa.ArrowException, TypeError) as erro:
+        raise ValueError(
+            f"O DataFrame tem colunas com tipos mistos e não pode ser gravado em Parquet ({erro}). "
+            "Exporte em CSV ou Excel.") from erro
+
+
+_ESCRITORES = {
+    "xlsx": _escrever_xlsx,
+    "csv": _escrever_csv,
+    "parquet": _escrever_parquet,
+}
+
+
+def _remover_exportacao(caminho):
+    try:
+        os.remove(caminho)
+    except OSError:
+        pass
+
+
+def limpar_exportacoes(validade=VALIDADE_EXPORTACOES):
+    """Apaga os arquivos de exportação sem uso há mais de validade segundos."""
+    if not os.path.isdir(DIRETORIO_EXPORTACOES):
+        return
+    limite = time.time() - validade
+    for nome in os.listdir(DIRETORIO_EXPORTACOES):
+        caminho = os.path.join(DIRETORIO_EXPORTACOES, nome)
+        try:
+            if os.path.getmtime(caminho) < limite:
+                os.remove(caminho)
+        except OSError:
+            pass
+
+
+def exportar_em_arquivo(df, formato):
+    """
+    Escreve o DataFrame num arquivo temporário, bloco a bloco, no formato ("xlsx", "csv" ou
+    "parquet"). Retorna o caminho; quem chama apaga o arquivo quando não precisar mais dele.
+    Levanta ValueError se o DataFrame não couber no formato.
+    """
+    limpar_exportacoes()
+    os.makedirs(DIRETORIO_EXPORTACOES, exist_ok=True)
+    descritor, caminho = tempfile.mkstemp(suffix=f".{formato}", dir=DIRETORIO_EXPORTACOES)
+    os.close(descritor)
+    try:
+        _ESCRITORES[formato](df, caminho)
+    except BaseException:
+        _remover_exportacao(caminho)
+        raise
+    return caminho
+
+
+def _baixar_do_disco(label, caminho, file_name, mime, key, preparado=False):
+    """
+    Download de um arquivo em disco. O st.download_button lê o arquivo inteiro para a memória
+    sempre que é desenhado, então ele só aparece na execução de um clique explícito (a geração,
+    preparado=True, ou "Preparar download") e some na execução seguinte. Nas demais execuções o
+    arquivo fica só no disco; o pico de memória de um download continua sendo o arquivo inteiro.
+    """
+    # Uso recente mantém o arquivo longe da limpeza por validade
+    os.utime(caminho)
+    if not preparado and not st.button("📥 Preparar download", key=f"preparar_{key}"):
+        return
+    with open(caminho, "rb") as arquivo:
+        st.download_button(
+            label=label,
+            data=arquivo,
+            file_name=file_name,
+            mime=mime,
+            key=f"baixar_{key}",
+            on_click="ignore"
+        )
+
+
+def botao_exportacao_em_fluxo(label, df, nome_arquivo, formato, chave, key):
+    """
+    Gera no clique o arquivo de exportação em disco e oferece o download a partir dele (ver
+    _baixar_do_disco: o arquivo só é lido para a memória no clique que pede o download).
+    chave identifica o conteúdo (ex.: nome do DataFrame, versão dos dados e formato) sem hashear
+    o DataFrame inteiro; quando muda, o arquivo anterior é apagado e a geração volta a ser pedida.
+    """
+    estado = f"exportacao_{key}"
+    anterior = st.session_state.get(estado)
+    if anterior and (anterior["chave"] != chave or not os.path.exists(anterior["caminho"])):
+        _remover_exportacao(anterior["caminho"])
+        del st.session_state[estado]
+        anterior = None
+    gerado = anterior is None
+    if gerado:
+        if not st.button(_rotulo_gerar(label), key=f"gerar_{key}"):
+            return
+        try:
+            with st.spinner("Gerando arquivo..."):
+                caminho = exportar_em_arquivo(df, formato)
+        except (ValueError, TypeError) as erro:
+            st.error(str(erro))
+            return
+        anterior = st.session_state[estado] = {"chave": chave, "caminho": caminho}
+
+    st.caption(f"Arquivo pronto: {os.path.getsize(anterior['caminho']) / 1024 ** 2:.1f} MB")
+    _baixar_do_disco(label, anterior["caminho"], f"{nome_arquivo}.{formato}", MIMES_EXPORTACAO[formato],
+                     key, preparado=gerado)
+
+
+# =========================
+# Pacote de análise: todas as tabelas exportáveis de uma ou mais páginas num só arquivo (Excel com
+# uma aba por tabela ou ZIP de CSV/Parquet), gerado numa thread em segundo plano
+# =========================
+
+# Formatos do pacote (rótulo -> formato de cada tabela)
+FORMATOS_PACOTE = {
+    "Excel (uma aba por tabela)": "xlsx",
+    "ZIP de CSV": "csv",
+    "ZIP de Parquet": "parquet",
+}
+# Pacotes gerados ao mesmo tempo (os demais esperam na fila)
+TRABALHADORES_PACOTE = 2
+
+_executor_pacotes = ThreadPoolExecutor(max_workers=TRABALHADORES_PACOTE, thread_name_prefix="pacote")
+_trabalhos = {}
+_trava_trabalhos = threading.Lock()
+
+
+def iniciar_pacote(pagina):
+    """
+    Marca o início da página: as tabelas dos botao_excel desta execução passam a compor o pacote
+    de pagina. O pacote de cada página visitada fica na sessão até a próxima visita a ela.
+    """
+    st.session_state["pacote_pagina"] = pagina
+    st.session_state.setdefault("pacotes_exportacao", {})[pagina] = {}
+
+
+def _registrar_no_pacote(key, file_name, dados, chave, opcoes):
+    # Registro pela key do botão: botões da página com o mesmo file_name não se sobrescrevem
+    pagina = st.session_state.get("pacote_pagina")
+    if pagina is None:
+        return
+    st.session_state["pacotes_exportacao"].setdefault(pagina, {})[key] = {
+        "nome": os.path.splitext(file_name)[0], "dados": dados, "chave": chave,
+        "index": opcoes.get("index", False)}
+
+
+def _tabelas_do_pacote(paginas):
+    """
+    (página, nome, DataFrame) de cada tabela; dicionários de planilhas viram uma tabela por aba.
+    Nomes repetidos na mesma página (botões com o mesmo file_name) ganham sufixo _2, _3...
+    """
+    pacotes = st.session_state.get("pacotes_exportacao", {})
+    tabelas = []
+    for pagina in paginas:
+        usados = set()
+        for registro in pacotes.get(pagina, {}).values():
+            for aba, df in _planilhas(registro["dados"]).items():
+                nome = registro["nome"] if not isinstance(registro["dados"], dict) else f"{registro['nome']}_{aba}"
+                nome_tabela, numero = nome, 2
+                while nome_tabela.lower() in usados:
+                    nome_tabela, numero = f"{nome}_{numero}", numero + 1
+                usados.add(nome_tabela.lower())
+                tabelas.append((pagina, nome_tabela, df.reset_index() if registro["index"] else df))
+    return tabelas
+
+
+def _nomes_de_abas(tabelas):
+    """Nomes válidos e únicos de aba (até 31 caracteres, sem []:*?/\\) para cada tabela."""
+    usados = set()
+    nomes = []
+    for pagina, nome, _ in tabelas:
+        base = re.sub(r"[\[\]:*?/\\]", "_", f"{pagina.split('_')[0]} {nome}")[:31]
+        candidato, numero = base, 2
+        while candidato.lower() in usados:
+            sufixo = f"~{numero}"
+            candidato, numero = base[:31 - len(sufixo)] + sufixo, numero + 1
+        usados.add(candidato.lower())
+        nomes.append(candidato)
+    return nomes
+
+
+def _caminho_pacote(chave, formato):
+    extensao = "xlsx" if formato == "xlsx" else "zip"
+    return os.path.join(DIRETORIO_EXPORTACOES, f"pacote-{chave[:32]}.{extensao}")
+
+
+def _atualizar_trabalho(chave, **campos):
+    with _trava_trabalhos:
+        _trabalhos[chave].update(campos)
+
+
+def _gerar_pacote(chave, tabelas, formato):
+    """Executada na thread: escreve o pacote num temporário e o move para o caminho final."""
+    caminho = _caminho_pacote(chave, formato)
+    temporario = f"{caminho}.{threading.get_ident()}.tmp"
+    try:
+        if formato == "xlsx":
+            for (_, nome, df) in tabelas:
+                _verificar_limites_excel(df, f"A tabela {nome}")
+            workbook = _abrir_workbook(temporario)
+            for numero, ((_, nome, df), aba) in enumerate(zip(tabelas, _nomes_de_abas(tabelas))):
+                _atualizar_trabalho(chave, progresso=numero / len(tabelas),
+                                    etapa=f"Escrevendo {nome} ({numero + 1} de {len(tabelas)})")
+                _escrever_planilha(workbook, df, aba)
+            workbook.close()
+        else:
+            # Parquet já é comprimido; CSV ganha com o deflate do ZIP
+            compressao = zipfile.ZIP_STORED if formato == "parquet" else zipfile.ZIP_DEFLATED
+            with zipfile.ZipFile(temporario, "w", compression=compressao) as arquivo_zip:
+                for numero, (pagina, nome, df) in enumerate(tabelas):
+                    _atualizar_trabalho(chave, progresso=numero / len(tabelas),
+                                        etapa=f"Escrevendo {nome} ({numero + 1} de {len(tabelas)})")
+                    try:
+                        formato_tabela = formato
+                        caminho_tabela = exportar_em_arquivo(df, formato_tabela)
+                    except ValueError:
+                        # Tabelas com tipos mistos (ex.: estatísticas descritivas) não vão para
+                        # Parquet; entram no pacote em CSV em vez de derrubar o pacote inteiro
+                        formato_tabela = "csv"
+                        caminho_tabela = exportar_em_arquivo(df, formato_tabela)
+                    try:
+                        arquivo_zip.write(caminho_tabela, f"{pagina}/{nome}.{formato_tabela}")
+                    finally:
+                        _remover_exportacao(caminho_tabela)
+        os.replace(temporario, caminho)
+        _atualizar_trabalho(chave, progresso=1.0, etapa="Pronto", caminho=caminho)
+    except Exception as erro:
+        _remover_exportacao(temporario)
+        _atualizar_trabalho(chave, erro=str(erro))
+
+
+def _estado_pacote(chave, formato):
+    """Cópia do estado do trabalho; pacote já gerado (por qualquer sessão) conta como pronto."""
+    with _trava_trabalhos:
+        trabalho = _trabalhos.get(chave)
+        if trabalho is not None and trabalho["caminho"] and not os.path.exists(trabalho["caminho"]):
+            del _trabalhos[chave]
+            trabalho = None
+        if trabalho is None and os.path.exists(_caminho_pacote(chave, formato)):
+            trabalho = _trabalhos[chave] = {"progresso": 1.0, "etapa": "Pronto", "erro": None,
+                                            "caminho": _caminho_pacote(chave, formato)}
+        return dict(trabalho) if trabalho else None
+
+
+def _enviar_pacote(chave, tabelas, formato):
+    limpar_exportacoes()
+    os.makedirs(DIRETORIO_EXPORTACOES, exist_ok=True)
+    with _trava_trabalhos:
+        if chave in _trabalhos and not _trabalhos[chave]["erro"]:
+            return
+        _trabalhos[chave] = {"progresso": 0.0, "etapa": "Na fila", "erro": None, "caminho": None}
+    _executor_pacotes.submit(_gerar_pacote, chave, tabelas, formato)
+
+
+def _painel_pacote(chave, tabelas, formato, nome_arquivo, acompanhando):
+    trabalho = _estado_pacote(chave, formato)
+    if trabalho is None or trabalho["erro"]:
+        if trabalho is not None:
+            st.error(f"Falha ao gerar o pacote: {trabalho['erro']}")
+        if st.button("📄 Gerar pacote", key="gerar_pacote"):
+            _enviar_pacote(chave, tabelas, formato)
+            # Execução completa para recriar o painel acompanhando o progresso
+            st.rerun()
+        return
+    if trabalho["caminho"] is None:
+        st.progress(trabalho["progresso"], text=trabalho["etapa"])
+        return
+    if acompanhando:
+        # Terminou: uma execução completa recria o painel sem a atualização periódica
+        st.rerun()
+    _baixar_do_disco("⬇️ Baixar pacote", trabalho["caminho"],
+                     f"{nome_arquivo}.{os.path.splitext(trabalho['caminho'])[1][1:]}",
+                     MIME_EXCEL if formato == "xlsx" else "application/zip", "pacote")
+
+
+def secao_pacote(pagina):
+    """
+    Expander, no fim da página, que exporta as tabelas dos botões de download desta página (e de
+    outras já visitadas na sessão) num só arquivo. A geração roda em segundo plano com barra de
+    progresso, e o arquivo pronto fica em cache pelas impressões digitais das tabelas.
+    """
+    pacotes = st.session_state.get("pacotes_exportacao", {})
+    with st.expander("📦 Exportar todas as tabelas (pacote)", expanded=False):
+        paginas = st.multiselect("Páginas incluídas:", sorted(pacotes),
+                                 default=[pagina] if pagina in pacotes else [], key="pacote_paginas")
+        formato = FORMATOS_PACOTE[st.radio("Formato:", list(FORMATOS_PACOTE), horizontal=True,
+                                           key="pacote_formato")]
+        tabelas = _tabelas_do_pacote(paginas)
+        if not tabelas:
+            st.info("Nenhuma tabela exportável nas páginas selecionadas.")
+            return
+        st.caption(f"{len(tabelas)} tabelas: {', '.join(nome for _, nome, _ in tabelas)}")
+        registros = [(p, key, registro["chave"]) for p in paginas
+                     for key, registro in pacotes[p].items()]
+        chave = hashlib.sha256(repr((formato, registros)).encode()).hexdigest()
+
+        trabalho = _estado_pacote(chave, formato)
+        acompanhando = trabalho is not None and trabalho["caminho"] is None and not trabalho["erro"]
+        nome_arquivo = f"pacote_{'_'.join(p.split('_')[0] for p in paginas)}"
+        st.fragment(_painel_pacote, run_every=1 if acompanhando else None)(
+            chave, tabelas, formato, nome_arquivo, acompanhando)
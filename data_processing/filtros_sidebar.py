@@ -0,0 +1,196 @@
+import math
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from data_processing.repositorio_dados import impressao_digital, obter_versao
+
+# =========================
+# Filtros em cascata da sidebar, com índice invertido por versão dos dados
+# =========================
+
+# (coluna, rótulo, chave no session_state) dos filtros das páginas de análise
+FILTROS_MILHO = [
+    ("macroRegiaoMilho", "Macro Região", "macro"),
+    ("conjuntaGeralMilhoSafrinha", "Conjunta Geral", "conjunta"),
+    ("subConjuntaMilhoSafrinha", "Sub Conjunta", "subconjunta"),
+    ("mrhMilho", "MRH", "mrh"),
+    ("regional", "Regional", "regional"),
+    ("siglaEstado", "Estado", "estado"),
+    ("nomeCidade", "Cidade", "cidade"),
+    ("nomeProdutor", "Produtor", "produtor"),
+    ("nomeFazenda", "Fazenda", "fazenda"),
+    ("nome", "Híbridos", "hibrido"),
+    ("displayName", "DTC Responsável", "responsavel"),
+]
+
+# Acima deste número de opções o filtro mostra busca e páginas em vez de uma caixa por opção
+LIMITE_OPCOES_VISIVEIS = 30
+OPCOES_POR_PAGINA = 20
+
+# Nas páginas de densidade a população também é filtrável (logo após os híbridos)
+FILTROS_DENSIDADE = FILTROS_MILHO[:10] + [
+    ("populacao_av4", "Densidade", "densidade")] + FILTROS_MILHO[10:]
+
+
+def _ordem_de_exibicao(serie, valores):
+    """
+    Posições dos valores na ordem de exibição: ordem das categorias nas colunas categóricas, valor
+    nativo nas numéricas, de data e de texto (100000 depois de 60000) e texto só para objetos mistos.
+    """
+    posicoes = range(len(valores))
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        ordem_categorias = {categoria: i for i, categoria in enumerate(serie.cat.categories)}
+        return sorted(posicoes, key=lambda i: ordem_categorias[valores[i]])
+    try:
+        return sorted(posicoes, key=lambda i: valores[i])
+    except TypeError:
+        return sorted(posicoes, key=lambda i: str(valores[i]))
+
+
+def _indexar_coluna(serie):
+    """
+    Índice invertido de uma coluna: código de cada linha (-1 para nulos), valores distintos
+    na ordem de exibição e, por valor, as posições das linhas (ordenadas por código).
+    """
+    codigos, valores = pd.factorize(serie)
+    codigos = codigos.astype(np.int32)
+    valores = list(valores)
+    linhas_por_codigo = np.argsort(codigos, kind="stable")
+    inicios = np.searchsorted(
+        codigos[linhas_por_codigo], np.arange(len(valores) + 1))
+    return {
+        "codigos": codigos,
+        "valores": valores,
+        "posicao": {valor: i for i, valor in enumerate(valores)},
+        "ordem": _ordem_de_exibicao(serie, valores),
+        "linhas_por_codigo": linhas_por_codigo,
+        "inicios": inicios,
+    }
+
+
+def _endereco(valores):
+    return valores.__array_interface__["data"][0], valores.strides, valores.dtype.str
+
+
+def _identidade_coluna(serie):
+    """
+    Identidade barata do conteúdo de uma coluna: endereço, passos e tipo do array numpy, que as
+    cópias rasas (copy-on-write) compartilham e que filtros e alterações trocam. Nas categóricas
+    vale o array de códigos mais o dtype (as categorias). Só as demais colunas de extensão
+    (Int64, textos do Arrow) usam a impressão digital.
+    """
+    if isinstance(serie.dtype, np.dtype):
+        return _endereco(serie.to_numpy())
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        return _endereco(serie.array.codes) + (id(serie.dtype),)
+    return impressao_digital(serie.to_frame())
+
+
+@st.cache_resource(max_entries=8, show_spinner=False)
+def indexar_filtros(nome_df, versao, linhas, colunas, identidades, _df):
+    """
+    Índices invertidos das colunas de filtro, calculados uma vez por conteúdo dessas colunas
+    (identidades de _identidade_coluna). Cada índice guarda a sua coluna: enquanto a entrada
+    existir, o endereço (e o dtype) não é reaproveitado por outro DataFrame.
+    """
+    return {col: {**_indexar_coluna(_df[col]), "serie": _df[col]} for col in colunas if col in _df.columns}
+
+
+def _mascara_selecao(indice, codigos_selecionados, total_linhas):
+    """Bitmap das linhas que têm algum dos valores selecionados."""
+    mascara = np.zeros(total_linhas, dtype=bool)
+    for codigo in codigos_selecionados:
+        mascara[indice["linhas_por_codigo"][indice["inicios"][codigo]:indice["inicios"][codigo + 1]]] = True
+    return mascara
+
+
+def _opcoes_disponiveis(indice, mascara):
+    """Valores presentes nas linhas do bitmap, na ordem de exibição."""
+    codigos = indice["codigos"] if mascara is None else indice["codigos"][mascara]
+    presentes = np.bincount(
+        codigos[codigos >= 0], minlength=len(indice["valores"])) > 0
+    return [indice["valores"][i] for i in indice["ordem"] if presentes[i]]
+
+
+def _limpar_selecao(key, options):
+    st.session_state[f"sel_{key}"] = []
+    for opt in options:
+        if f"{key}_{opt}" in st.session_state:
+            del st.session_state[f"{key}_{opt}"]
+
+
+def _pagina_de_opcoes(key, options):
+    """Campo de busca e seletor de página; devolve só as opções da página atual."""
+    busca = st.text_input("Buscar", key=f"busca_{key}", placeholder="Digite parte do nome")
+    termo = busca.strip().casefold()
+    if termo:
+        options = [opt for opt in options if termo in str(opt).casefold()]
+    paginas = max(1, math.ceil(len(options) / OPCOES_POR_PAGINA))
+    if paginas > 1:
+        # A busca pode reduzir o número de páginas: volta para a primeira em vez de estourar o limite
+        if st.session_state.get(f"pagina_{key}", 1) > paginas:
+            st.session_state[f"pagina_{key}"] = 1
+        pagina = st.number_input(
+            f"Página (de {paginas})", min_value=1, max_value=paginas, step=1, key=f"pagina_{key}")
+    else:
+        pagina = 1
+    inicio = (int(pagina) - 1) * OPCOES_POR_PAGINA
+    return options[inicio:inicio + OPCOES_POR_PAGINA]
+
+
+def selecionar_opcoes(label, key, options):
+    """
+    Expander de filtro com uma caixa por opção, dentro do contêiner atual. A seleção fica em
+    st.session_state["sel_<key>"] (lista, compatível com os presets), já sem valores ausentes de
+    options. Com mais de LIMITE_OPCOES_VISIVEIS opções, só a página atual da busca é desenhada e
+    as seleções fora dela são mantidas, de modo que o número de widgets não cresce com a base.
+    Devolve as opções selecionadas, na ordem de options.
+    """
+    selecao = set(st.session_state.get(f"sel_{key}", [])) & set(options)
+    with st.expander(label, expanded=False):
+        if len(options) > LIMITE_OPCOES_VISIVEIS:
+            visiveis = _pagina_de_opcoes(key, options)
+            if selecao:
+                st.caption(f"{len(selecao)} selecionado(s)")
+                st.button("Limpar seleção", key=f"limpar_{key}",
+                          on_click=_limpar_selecao, args=(key, options))
+        else:
+            visiveis = options
+        for opt in visiveis:
+            if st.checkbox(str(opt), value=opt in selecao, key=f"{key}_{opt}"):
+                selecao.add(opt)
+            else:
+                selecao.discard(opt)
+    selecionadas = [opt for opt in options if opt in selecao]
+    st.session_state[f"sel_{key}"] = selecionadas
+    return selecionadas
+
+
+def filtrar_na_sidebar(nome_df, df, filtros=FILTROS_MILHO):
+    """
+    Desenha os filtros em cascata na sidebar (as opções de cada nível consideram as seleções dos
+    níveis anteriores) e devolve as linhas selecionadas. As seleções ficam em st.session_state
+    ("sel_<chave>"), compartilhadas entre as páginas. Sem seleção, devolve o próprio DataFrame.
+    """
+    colunas = tuple(col for col, _, _ in filtros if col in df.columns)
+    indices = indexar_filtros(nome_df, obter_versao(), len(df), colunas,
+                              tuple(_identidade_coluna(df[col]) for col in colunas), df)
+    mascara = None
+    with st.sidebar:
+        for col, label, key in filtros:
+            if f"sel_{key}" not in st.session_state:
+                st.session_state[f"sel_{key}"] = []
+            indice = indices.get(col)
+            if indice is None:
+                continue
+            selecionadas = selecionar_opcoes(
+                label, key, _opcoes_disponiveis(indice, mascara))
+            if selecionadas:
+                mascara_coluna = _mascara_selecao(
+                    indice, [indice["posicao"][v] for v in selecionadas], len(df))
+                mascara = mascara_coluna if mascara is None else mascara & mascara_coluna
+    if mascara is None:
+        return df
+    return df[mascara]
@@ -0,0 +1,31 @@
+import pandas as pd
+
+# =========================
+# Camada de apresentação: formatação de datas só na exibição/exportação
+# =========================
+
+FORMATO_DATA_BR = '%d/%m/%Y'
+
+
+def converter_datas(df, colunas):
+    """Converte as colunas informadas para datetime64 (valores inválidos viram NaT)."""
+    for col in colunas:
+        if col in df.columns:
+            df[col] = pd.to_datetime(df[col], errors='coerce')
+    return df
+
+
+def formatar_datas_br(df, colunas=None):
+    """
+    Cópia do DataFrame com as colunas datetime64 formatadas como 'dd/mm/YYYY' (vazio quando não há data).
+    Sem colunas informadas, formata todas as colunas de data. Os DataFrames tratados mantêm datetime64.
+    """
+    if df is None:
+        return df
+    if colunas is None:
+        colunas = df.select_dtypes(include=["datetime", "datetimetz"]).columns
+    df = df.copy()
+    for col in colunas:
+        if col in df.columns and pd.api.types.is_datetime64_any_dtype(df[col]):
+            df[col] = df[col].dt.strftime(FORMATO_DATA_BR).fillna("")
+    return df
@@ -0,0 +1,101 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+from scipy import stats
+
+from data_processing.repositorio_dados import impressao_digital
+
+# =========================
+# Índice ambiental: regressão da produção de cada híbrido na média do local (Finlay-Wilkinson /
+# Eberhart-Russell), com todos os híbridos ajustados numa única passada agrupada
+# =========================
+
+# Colunas da tabela de adaptabilidade e estabilidade (coluna -> rótulo de exibição)
+COLUNAS_ESTABILIDADE = {
+    "observacoes": "Observações",
+    "media": "Média (sc/ha)",
+    "intercepto": "Intercepto (a)",
+    "inclinacao": "Inclinação (b)",
+    "erro_padrao_b": "Erro padrão de b",
+    "p_valor_b1": "p-valor (b = 1)",
+    "r2": "R²",
+    "variancia_residual": "Variância residual (s²d)",
+}
+
+
+def _ajustar_por_hibrido(x, y, grupos):
+    """
+    Mínimos quadrados de y = a + b*x de cada grupo em forma fechada, a partir de somas de
+    desvios em relação às médias do grupo (estável numericamente e sem laço por híbrido).
+    """
+    pontos = pd.DataFrame({"x": x, "y": y, "grupo": grupos}).dropna()
+    agrupado = pontos.groupby("grupo", observed=True, sort=False)
+    medias = agrupado[["x", "y"]].transform("mean")
+    pontos["dxx"] = (pontos["x"] - medias["x"]) ** 2
+    pontos["dxy"] = (pontos["x"] - medias["x"]) * (pontos["y"] - medias["y"])
+    pontos["dyy"] = (pontos["y"] - medias["y"]) ** 2
+    agrupado = pontos.groupby("grupo", observed=True, sort=False)
+    somas = agrupado[["dxx", "dxy", "dyy"]].sum()
+    ajustes = agrupado.agg(observacoes=("x", "size"), media_x=("x", "mean"), media=("y", "mean"),
+                           x_min=("x", "min"), x_max=("x", "max"))
+
+    n = ajustes["observacoes"].to_numpy(dtype=np.float64)
+    sxx, sxy, syy = (somas[col].to_numpy() for col in ("dxx", "dxy", "dyy"))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        inclinacao = np.where((n > 1) & (sxx > 0), sxy / sxx, np.nan)
+        soma_residuos = np.clip(syy - inclinacao * sxy, 0, None)
+        variancia_residual = np.where(n > 2, soma_residuos / (n - 2), np.nan)
+        erro_padrao_b = np.sqrt(variancia_residual / sxx)
+        estatistica_b1 = (inclinacao - 1) / erro_padrao_b
+        r2 = np.where(syy > 0, sxy * sxy / (sxx * syy), np.nan)
+    ajustes["inclinacao"] = inclinacao
+    ajustes["intercepto"] = ajustes["media"] - inclinacao * ajustes["media_x"]
+    ajustes["r2"] = np.where(np.isnan(inclinacao), np.nan, r2)
+    ajustes["variancia_residual"] = variancia_residual
+    ajustes["erro_padrao_b"] = erro_padrao_b
+    ajustes["p_valor_b1"] = 2 * stats.t.sf(np.abs(estatistica_b1), n - 2)
+    return ajustes.drop(columns="media_x")
+
+
+def calcular_indice_ambiental(df, coluna_hibrido="nome", coluna_local="fazendaRef",
+                              coluna_valor="prod_sc_ha_corr"):
+    """
+    Médias dos locais e parâmetros de adaptabilidade e estabilidade de cada híbrido.
+    Retorna {"medias_locais": coluna_local, media_local_sc_ha e indice_ambiental (média do local
+    menos a média dos locais); "ajustes": por híbrido, observações, média, intercepto, inclinação (b de
+    Finlay-Wilkinson / Eberhart-Russell), erro padrão de b, p-valor de b = 1, R², variância
+    residual (s²d) e x_min/x_max para desenhar a reta}.
+    """
+    medias_locais = (
+        df.groupby(coluna_local, observed=True, sort=False)[coluna_valor].mean()
+        .rename("media_local_sc_ha").reset_index()
+    )
+    medias_locais["indice_ambiental"] = medias_locais["media_local_sc_ha"] - \
+        medias_locais["media_local_sc_ha"].mean()
+
+    x = df[coluna_local].map(medias_locais.set_index(coluna_local)["media_local_sc_ha"])
+    ajustes = _ajustar_por_hibrido(
+        pd.to_numeric(x, errors="coerce").to_numpy(dtype=np.float64),
+        pd.to_numeric(df[coluna_valor], errors="coerce").to_numpy(dtype=np.float64),
+        df[coluna_hibrido].to_numpy())
+    ajustes.index.name = coluna_hibrido
+    return {"medias_locais": medias_locais, "ajustes": ajustes}
+
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def _indice_ambiental_em_cache(impressao, coluna_hibrido, coluna_local, coluna_valor, _df):
+    return calcular_indice_ambiental(_df, coluna_hibrido, coluna_local, coluna_valor)
+
+
+def indice_ambiental(df, coluna_hibrido="nome", coluna_local="fazendaRef", coluna_valor="prod_sc_ha_corr"):
+    """Resultado de calcular_indice_ambiental, em cache pela impressão digital das colunas usadas."""
+    colunas = [coluna_hibrido, coluna_local, coluna_valor]
+    return _indice_ambiental_em_cache(impressao_digital(df[colunas]), coluna_hibrido, coluna_local,
+                                      coluna_valor, df[colunas])
+
+
+def tabela_estabilidade(ajustes):
+    """Parâmetros por híbrido com os rótulos de exibição, do mais produtivo para o menos."""
+    tabela = ajustes[list(COLUNAS_ESTABILIDADE)].sort_values("media", ascending=False)
+    tabela = tabela.rename(columns=COLUNAS_ESTABILIDADE).reset_index()
+    return tabela.rename(columns={tabela.columns[0]: "Híbrido"})
@@ -0,0 +1,46 @@
+import pandas as pd
+
+# =========================
+# Junção da tabela de fatos com tabelas de dimensão (esquema estrela)
+# =========================
+
+
+def _buscar_na_dimensao(df_dim, chave, valores_chave, indice):
+    """Colunas da dimensão (exceto a chave) alinhadas às linhas da tabela de fatos; sem correspondência -> NaN."""
+    return df_dim.drop(columns=[chave]).set_axis(pd.Index(df_dim[chave])).reindex(
+        valores_chave.to_numpy()).set_axis(indice)
+
+
+def juntar_dimensoes(df, etapas):
+    """
+    Equivale a uma sequência de merges (how='left', suffixes=('', sufixo)) da tabela de fatos com
+    cada dimensão, mas resolve cada etapa por busca no índice da chave da dimensão, sem copiar a
+    tabela acumulada a cada passo. O DataFrame final é montado uma única vez.
+
+    etapas: lista de dicionários com
+        "dimensao": DataFrame da dimensão (None ou vazio -> etapa ignorada),
+        "chave": coluna de junção,
+        "sufixo": sufixo para colunas da dimensão que já existem na tabela acumulada,
+        "apos" (opcional): função que recebe o dicionário nome -> Series e acrescenta colunas calculadas.
+    Dimensões com chave repetida são juntadas com merge, como antes.
+    """
+    if df.empty:
+        return df
+    colunas = {col: df[col] for col in df.columns}
+    for etapa in etapas:
+        df_dim = etapa["dimensao"]
+        chave = etapa["chave"]
+        if df_dim is not None and not df_dim.empty:
+            if df_dim[chave].is_unique:
+                encontrados = _buscar_na_dimensao(
+                    df_dim, chave, colunas[chave], df.index)
+                for col in encontrados.columns:
+                    nome = col + etapa["sufixo"] if col in colunas else col
+                    colunas[nome] = encontrados[col]
+            else:
+                df = pd.DataFrame(colunas).merge(
+                    df_dim, on=chave, how='left', suffixes=('', etapa["sufixo"]))
+                colunas = {col: df[col] for col in df.columns}
+        if etapa.get("apos") is not None:
+            etapa["apos"](colunas)
+    return pd.concat(colunas, axis=1)
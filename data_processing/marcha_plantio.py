@@ -0,0 +1,119 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from data_processing.repositorio_dados import impressao_digital
+
+# =========================
+# Marcha de plantio: percentual cumulativo de plantios por ano, com busca ordenada nas datas
+# =========================
+
+# Resoluções da curva (rótulo -> frequência do pd.date_range)
+RESOLUCOES_MARCHA = {
+    "Semanal": "W-MON",
+    "Diária": "D",
+}
+
+# Colunas pelas quais as curvas de cada ano podem ser separadas (rótulo -> coluna)
+SEPARACOES_MARCHA = {
+    "Nenhuma (só o ano)": None,
+    "Safra": "safra",
+    "Macro Região": "macroRegiaoMilho",
+    "Híbrido": "hibrido",
+}
+
+# Ano bissexto em que as datas de anos diferentes são sobrepostas (mesmo dia e mês)
+ANO_REFERENCIA = 2000
+
+
+def _grade_do_ano(ano, freq, inicio, fim, primeiro, ultimo):
+    """
+    Datas da curva num ano. inicio/fim ("MM-DD") fixam a janela; sem eles, a janela vai do primeiro
+    ao último plantio do ano, com a última data da grade cobrindo o último plantio (curva chega a 100%).
+    """
+    data_inicio = pd.Timestamp(f"{ano}-{inicio}") if inicio else primeiro
+    data_fim = pd.Timestamp(f"{ano}-{fim}") if fim else ultimo
+    grade = pd.date_range(start=data_inicio, end=data_fim, freq=freq)
+    if not fim and (grade.empty or grade[-1] < ultimo):
+        grade = grade.append(pd.date_range(start=ultimo, periods=1, freq=freq))
+    return grade
+
+
+def calcular_marcha_plantio(df, coluna_data="data_plantio", separar_por=None, freq="W-MON",
+                            inicio=None, fim=None):
+    """
+    Curva cumulativa de plantios de cada ano de plantio (e de cada valor de separar_por, se
+    informado). As datas são ordenadas uma única vez, junto com o código do grupo, e a contagem
+    até cada data da grade sai de um único np.searchsorted para todos os grupos.
+    Retorna uma linha por (grupo, data) com Ano, [separar_por], Data, Data_Referencia (mesmo dia
+    e mês em ANO_REFERENCIA, para sobrepor anos), Plantios_Acumulados, Total_Plantios,
+    Percentual_Cumulativo e Data_Formatada.
+    """
+    colunas_saida = ["Ano"] + ([separar_por] if separar_por else []) + [
+        "Data", "Data_Referencia", "Plantios_Acumulados", "Total_Plantios",
+        "Percentual_Cumulativo", "Data_Formatada"]
+    datas = pd.to_datetime(df[coluna_data], errors="coerce")
+    validas = datas.notna().to_numpy()
+    if not validas.any():
+        return pd.DataFrame(columns=colunas_saida)
+    datas = datas[validas].dt.normalize()
+    anos = datas.dt.year.to_numpy()
+    dias = datas.to_numpy().astype("datetime64[D]").astype(np.int64)
+
+    # Grupo = (ano, separar_por); nulos em separar_por formam um grupo próprio
+    chaves = pd.DataFrame({"Ano": anos})
+    if separar_por:
+        chaves[separar_por] = df[separar_por].to_numpy()[validas]
+    agrupado = chaves.groupby(list(chaves.columns), dropna=False)
+    codigos = agrupado.ngroup().to_numpy()
+    rotulos = agrupado.size().index.to_frame(index=False)
+
+    # Chave composta código*amplitude + dia: uma só ordenação agrupa por grupo e data
+    dia_minimo = dias.min()
+    amplitude = int(dias.max() - dia_minimo) + 2
+    chave = np.sort(codigos.astype(np.int64) * amplitude + (dias - dia_minimo))
+    totais = np.bincount(codigos, minlength=len(rotulos))
+    inicios_grupo = np.r_[0, np.cumsum(totais)[:-1]]
+
+    # Grade de datas por ano (comum a todos os grupos do ano, para sobrepor regiões e híbridos)
+    extremos = pd.Series(dias).groupby(anos).agg(["min", "max"])
+    grades = {
+        ano: _grade_do_ano(ano, freq, inicio, fim,
+                           pd.Timestamp(np.datetime64(int(primeiro), "D")),
+                           pd.Timestamp(np.datetime64(int(ultimo), "D")))
+        for ano, (primeiro, ultimo) in extremos.iterrows()
+    }
+    tamanhos = np.array([len(grades[ano]) for ano in rotulos["Ano"]])
+    if not tamanhos.sum():
+        return pd.DataFrame(columns=colunas_saida)
+    grupo_da_linha = np.repeat(np.arange(len(rotulos)), tamanhos)
+    datas_grade = pd.DatetimeIndex(np.concatenate([grades[ano].to_numpy() for ano in rotulos["Ano"]]))
+    dias_grade = datas_grade.to_numpy().astype("datetime64[D]").astype(np.int64)
+
+    # Datas fora do intervalo observado são limitadas a [dia_minimo - 1, dia_maximo], o que
+    # mantém cada consulta dentro da faixa do próprio grupo
+    deslocamento = np.clip(dias_grade - dia_minimo, -1, amplitude - 2)
+    posicoes = np.searchsorted(chave, grupo_da_linha * amplitude + deslocamento, side="right")
+    acumulados = posicoes - inicios_grupo[grupo_da_linha]
+
+    marcha = rotulos.iloc[grupo_da_linha].reset_index(drop=True)
+    marcha["Data"] = datas_grade
+    marcha["Data_Referencia"] = pd.to_datetime(
+        {"year": ANO_REFERENCIA, "month": datas_grade.month, "day": datas_grade.day})
+    marcha["Plantios_Acumulados"] = acumulados
+    marcha["Total_Plantios"] = totais[grupo_da_linha]
+    marcha["Percentual_Cumulativo"] = acumulados / marcha["Total_Plantios"] * 100
+    marcha["Data_Formatada"] = datas_grade.strftime("%d/%m")
+    return marcha[colunas_saida]
+
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def _marcha_plantio_em_cache(impressao, coluna_data, separar_por, freq, inicio, fim, _df):
+    return calcular_marcha_plantio(_df, coluna_data, separar_por, freq, inicio, fim)
+
+
+def marcha_plantio(df, coluna_data="data_plantio", separar_por=None, freq="W-MON", inicio=None, fim=None):
+    """Curva de calcular_marcha_plantio, em cache pela impressão digital das colunas usadas."""
+    colunas = [coluna_data] + ([separar_por] if separar_por else [])
+    return _marcha_plantio_em_cache(impressao_digital(df[colunas]), coluna_data, separar_por,
+                                    freq, inicio, fim, df[colunas])
@@ -0,0 +1,49 @@
+import hashlib
+
+import pandas as pd
+import streamlit as st
+
+from data_processing.filtros_sidebar import FILTROS_MILHO
+from data_processing.repositorio_dados import obter_versao
+
+# =========================
+# Memoização por página: tabelas, figuras e arquivos pesados reaproveitados entre reruns
+# enquanto a versão dos dados, os filtros ativos e os parâmetros da página não mudam
+# =========================
+
+
+def chave_pagina(pagina, filtros=FILTROS_MILHO, **parametros):
+    """
+    Hash de (página, versão dos dados, seleções ativas dos filtros da sidebar, parâmetros).
+    Deve ser calculada depois de filtrar_na_sidebar, que já limpou as seleções inválidas.
+    Parâmetros são as opções da página que alteram os resultados (widgets, thresholds etc.).
+    """
+    selecoes = [(key, sorted(map(str, st.session_state.get(f"sel_{key}", []))))
+                for _, _, key in filtros]
+    conteudo = repr((pagina, obter_versao(), selecoes, sorted(parametros.items())))
+    return hashlib.sha256(conteudo.encode()).hexdigest()
+
+
+@st.cache_resource(max_entries=256, show_spinner=False)
+def _memoizado(chave, nome, _calcular):
+    return _calcular()
+
+
+def _copia(resultado):
+    # Cópia rasa (copy-on-write) dos DataFrames, como em obter_dataframe: o resultado em cache é
+    # compartilhado entre sessões
+    if isinstance(resultado, (pd.DataFrame, pd.Series)):
+        return resultado.copy(deep=False)
+    if isinstance(resultado, tuple):
+        return tuple(_copia(item) for item in resultado)
+    return resultado
+
+
+def memoizar(chave, nome, calcular):
+    """
+    Resultado de calcular() guardado por (chave da página, nome). Só é recalculado quando a chave
+    muda; widgets sem efeito nos dados (expanders, opções de outro gráfico) reaproveitam o cache.
+    Figuras e dicionários são compartilhados: a página não deve alterá-los depois de obtidos.
+    """
+    return _copia(_memoizado(chave, nome, calcular))
+
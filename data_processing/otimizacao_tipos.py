@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+
+# =========================
+# Tipos compactos para os DataFrames tratados (category e numéricos de menor largura)
+# =========================
+
+
+def _reduzir_inteiro(serie):
+    """
+    int64 -> int32 quando todos os valores cabem. Contas posteriores em int32 (produtos, somas
+    elemento a elemento, deslocamentos de época) estouram antes das em int64; por isso só as colunas
+    de contagem e de código listadas por quem chama passam por aqui.
+    """
+    limites = np.iinfo(np.int32)
+    if serie.empty or (serie.min() >= limites.min and serie.max() <= limites.max):
+        return serie.astype(np.int32)
+    return serie
+
+
+def _reduzir_float(serie):
+    """float64 -> float32 somente se todos os valores são representados sem perda."""
+    convertida = serie.astype(np.float32)
+    valores = serie.to_numpy()
+    if np.array_equal(convertida.to_numpy(dtype=np.float64), valores, equal_nan=True):
+        return convertida
+    return serie
+
+
+def otimizar_tipos(df, colunas_categoricas=(), colunas_inteiras=()):
+    """
+    Converte as colunas de texto informadas para category (filtros e agrupamentos passam a usar
+    códigos inteiros) e reduz a largura das colunas numéricas quando não há perda de valores:
+    float64 em geral, int64 só nas colunas_inteiras (contagens e códigos).
+    Retorna o DataFrame otimizado e um dicionário com os bytes antes e depois.
+    """
+    bytes_antes = int(df.memory_usage(deep=True).sum())
+    novas = {}
+    for col in df.columns:
+        serie = df[col]
+        if col in colunas_categoricas:
+            if pd.api.types.is_object_dtype(serie) or pd.api.types.is_string_dtype(serie):
+                novas[col] = serie.astype("category")
+        elif serie.dtype == np.int64 and col in colunas_inteiras:
+            novas[col] = _reduzir_inteiro(serie)
+        elif serie.dtype == np.float64:
+            novas[col] = _reduzir_float(serie)
+    if novas:
+        df = df.assign(**novas)
+    bytes_depois = int(df.memory_usage(deep=True).sum())
+    return df, {"bytes_antes": bytes_antes, "bytes_depois": bytes_depois}
@@ -0,0 +1,120 @@
+import numpy as np
+import pandas as pd
+
+# =========================
+# Remoção de outliers vetorizada: z-score, z robusto (mediana/MAD) e IQR, global ou por grupo
+# =========================
+
+# Rótulos usados no log de remoção: (base inferior, base superior, escala, nome do score)
+METODOS_OUTLIERS = {
+    "zscore": ("média", "média", "std", "z-score"),
+    "mad": ("mediana", "mediana", "MAD", "z robusto"),
+    "iqr": ("Q1", "Q3", "IQR", "distância/IQR"),
+}
+# Fatores que tornam o MAD e o desvio absoluto médio comparáveis ao desvio padrão numa normal
+FATOR_MAD = 1.4826
+FATOR_DESVIO_MEDIO = 1.2533
+
+
+def estatisticas_outliers(df, colunas, grupos=None, metodo="zscore"):
+    """
+    Estatísticas de cada coluna por grupo, calculadas uma única vez (independem do threshold).
+    grupos: None (todas as linhas juntas) ou Series alinhada ao df com o rótulo do grupo de cada
+    linha (nulos formam um grupo próprio).
+    Retorna {"codigos": grupo de cada linha, "grupos": rótulos, "metodo": metodo,
+    "colunas": coluna -> DataFrame por grupo com n, base_inferior, base_superior e escala}.
+    """
+    if metodo not in METODOS_OUTLIERS:
+        raise ValueError(f"Método de outliers desconhecido: {metodo}")
+    if grupos is None:
+        codigos, rotulos = np.zeros(len(df), dtype=np.int64), pd.Index([None])
+    else:
+        codigos, rotulos = pd.factorize(pd.Series(grupos).to_numpy(), use_na_sentinel=False)
+        rotulos = pd.Index(rotulos)
+
+    estatisticas = {}
+    for coluna in colunas:
+        valores = pd.Series(pd.to_numeric(df[coluna], errors="coerce").to_numpy(dtype=np.float64))
+        agrupado = valores.groupby(codigos)
+        if metodo == "zscore":
+            base_inferior = base_superior = agrupado.mean()
+            escala = agrupado.std()
+        elif metodo == "mad":
+            base_inferior = base_superior = agrupado.median()
+            desvios = (valores - base_inferior.reindex(codigos).to_numpy()).abs().groupby(codigos)
+            escala = desvios.median() * FATOR_MAD
+            # MAD zero (mais da metade dos valores iguais): usa o desvio absoluto médio
+            escala = escala.mask(escala == 0, desvios.mean() * FATOR_DESVIO_MEDIO)
+        else:
+            base_inferior = agrupado.quantile(0.25)
+            base_superior = agrupado.quantile(0.75)
+            escala = base_superior - base_inferior
+        estatisticas[coluna] = pd.DataFrame({
+            "n": agrupado.count(),
+            "base_inferior": base_inferior,
+            "base_superior": base_superior,
+            "escala": escala,
+        }).reindex(range(len(rotulos)))
+    return {"codigos": codigos, "grupos": rotulos, "metodo": metodo, "colunas": estatisticas}
+
+
+def _formatar(valores):
+    return np.char.mod("%.2f", valores)
+
+
+def aplicar_outliers(df, estatisticas, threshold=3.0):
+    """
+    Marca como outlier a linha com algum valor fora de [base_inferior - threshold*escala,
+    base_superior + threshold*escala] do seu grupo. Só compara arrays: trocar o threshold
+    reaproveita as estatísticas.
+    Retorna (DataFrame sem outliers, outliers com a coluna log_remocao, parâmetros por coluna e grupo).
+    """
+    rotulo_inferior, rotulo_superior, rotulo_escala, rotulo_score = METODOS_OUTLIERS[estatisticas["metodo"]]
+    codigos = estatisticas["codigos"]
+    outlier_mask = np.zeros(len(df), dtype=bool)
+    log_remocao = np.full(len(df), "", dtype=object)
+    parametros = []
+    for coluna, por_grupo in estatisticas["colunas"].items():
+        valores = pd.to_numeric(df[coluna], errors="coerce").to_numpy(dtype=np.float64)
+        limite_inferior = por_grupo["base_inferior"] - threshold * por_grupo["escala"]
+        limite_superior = por_grupo["base_superior"] + threshold * por_grupo["escala"]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            distancia = np.maximum(por_grupo["base_inferior"].to_numpy()[codigos] - valores,
+                                   valores - por_grupo["base_superior"].to_numpy()[codigos])
+            if estatisticas["metodo"] == "iqr":
+                distancia = np.maximum(distancia, 0)
+            score = distancia / por_grupo["escala"].to_numpy()[codigos]
+        mask = score > threshold
+        outlier_mask |= mask
+
+        # Log só das linhas marcadas, montado em bloco
+        abaixo = mask & (valores < por_grupo["base_inferior"].to_numpy()[codigos])
+        acima = mask & ~abaixo
+        for marcadas, lado, rotulo, sinal, limites in (
+                (abaixo, "abaixo", rotulo_inferior, "-", limite_inferior),
+                (acima, "acima", rotulo_superior, "+", limite_superior)):
+            if marcadas.any():
+                log_remocao[marcadas] += (
+                    f"Outlier em {coluna} ({lado} do limiar: {rotulo} {sinal} {threshold}*{rotulo_escala} = "
+                    + _formatar(limites.to_numpy()[codigos[marcadas]]).astype(object)
+                    + f", {rotulo_score}="
+                    + _formatar(score[marcadas]).astype(object) + "); ")
+        parametros.append(por_grupo.assign(
+            coluna=coluna, grupo=estatisticas["grupos"],
+            limite_inferior=limite_inferior, limite_superior=limite_superior))
+
+    df_removidos = df[outlier_mask].copy()
+    if not df_removidos.empty:
+        df_removidos['log_remocao'] = pd.Series(
+            log_remocao[outlier_mask], index=df_removidos.index).str.strip('; ')
+    df_limpo = df[~outlier_mask].copy()
+    colunas_parametros = ["coluna", "grupo", "n", "base_inferior",
+                          "base_superior", "escala", "limite_inferior", "limite_superior"]
+    parametros = pd.concat(parametros, ignore_index=True)[colunas_parametros] if parametros else \
+        pd.DataFrame(columns=colunas_parametros)
+    return df_limpo, df_removidos, parametros
+
+
+def remover_outliers(df, colunas, threshold=3.0, grupos=None, metodo="zscore"):
+    """Estatísticas e remoção numa chamada (ver estatisticas_outliers e aplicar_outliers)."""
+    return aplicar_outliers(df, estatisticas_outliers(df, colunas, grupos, metodo), threshold)
@@ -0,0 +1,72 @@
+import hashlib
+import threading
+from types import MappingProxyType
+
+import pandas as pd
+import streamlit as st
+
+# =========================
+# Repositório de dados compartilhado pelo processo (todas as sessões e páginas)
+# =========================
+
+# Copy-on-write: filtros e colunas novas nas páginas geram cópias próprias,
+# sem alterar (nem duplicar em memória) os DataFrames compartilhados
+pd.set_option("mode.copy_on_write", True)
+
+
+@st.cache_resource
+def _obter_repositorio():
+    """Estado único do processo: versão atual e DataFrames publicados."""
+    return {"versao": 0, "dados": MappingProxyType({})}, threading.Lock()
+
+
+def publicar_dados(dataframes, substituir=False):
+    """
+    Publica DataFrames no repositório e incrementa a versão.
+    Os dados anteriores não são alterados: quem já os leu continua com a versão antiga.
+    Retorna a nova versão.
+    """
+    repositorio, trava = _obter_repositorio()
+    with trava:
+        dados = {} if substituir else dict(repositorio["dados"])
+        dados.update(dataframes)
+        repositorio["dados"] = MappingProxyType(dados)
+        repositorio["versao"] += 1
+        return repositorio["versao"]
+
+
+def obter_versao():
+    """Versão atual dos dados (muda a cada recarga)."""
+    repositorio, _ = _obter_repositorio()
+    return repositorio["versao"]
+
+
+def obter_dados():
+    """Visão somente leitura (nome -> DataFrame) da versão atual dos dados."""
+    repositorio, _ = _obter_repositorio()
+    return repositorio["dados"]
+
+
+def dados_disponiveis(*nomes):
+    """True se todos os DataFrames informados já foram publicados."""
+    dados = obter_dados()
+    return all(nome in dados for nome in nomes)
+
+
+def obter_dataframe(nome, padrao=None):
+    """
+    DataFrame compartilhado para uso numa página. Devolve uma cópia rasa (copy-on-write),
+    de modo que alterações feitas pela página não afetam as demais sessões.
+    """
+    df = obter_dados().get(nome)
+    if df is None:
+        return padrao
+    return df.copy(deep=False)
+
+
+def impressao_digital(df):
+    """Hash do conteúdo (e das colunas) de um DataFrame, usado como chave de cache de resultados derivados."""
+    if df is None:
+        return None
+    conteudo = pd.util.hash_pandas_object(df, index=True).to_numpy()
+    return hashlib.sha256(conteudo.tobytes() + "|".join(map(str, df.columns)).encode()).hexdigest()
@@ -0,0 +1,137 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import streamlit as st
+
+from data_processing.carregamento_supabase import (
+    MAX_WORKERS, TAMANHO_PAGINA, buscar_tabela_paginada, obter_cliente_supabase)
+
+# =========================
+# Sincronização incremental (delta) de tabelas do Supabase
+# =========================
+
+# Colunas de marca d'água, em ordem de preferência:
+# dataSync nas tabelas do app de avaliações e modificado_em nas tabelas comerciais
+COLUNAS_MARCA = ("dataSync", "modificado_em")
+
+
+@st.cache_resource
+def _obter_snapshots():
+    """Snapshots locais por (projeto, tabela), compartilhados pelo processo."""
+    return {}, threading.Lock()
+
+
+def detectar_coluna_marca(df):
+    """Retorna a coluna de marca d'água presente no DataFrame, ou None."""
+    for coluna in COLUNAS_MARCA:
+        if coluna in df.columns:
+            return coluna
+    return None
+
+
+def calcular_marca(df, coluna_marca):
+    """Maior valor da coluna de marca d'água (em tipo nativo do Python), ou None."""
+    if coluna_marca is None or df.empty:
+        return None
+    marca = df[coluna_marca].dropna().max()
+    if pd.isna(marca):
+        return None
+    return marca.item() if hasattr(marca, "item") else marca
+
+
+def aplicar_upsert(df_snapshot, df_delta, coluna_chave):
+    """Substitui no snapshot as linhas alteradas (pela chave) e acrescenta as novas."""
+    if df_delta.empty:
+        return df_snapshot
+    manter = ~df_snapshot[coluna_chave].isin(df_delta[coluna_chave])
+    return pd.concat([df_snapshot[manter], df_delta], ignore_index=True)
+
+
+def registrar_snapshots(url, dataframes, chaves=None, substituir=False):
+    """Registra DataFrames já carregados como snapshot (por padrão, sem sobrescrever os existentes)."""
+    chaves = chaves or {}
+    snapshots, trava = _obter_snapshots()
+    with trava:
+        for nome_tabela, df in dataframes.items():
+            if substituir or (url, nome_tabela) not in snapshots:
+                snapshots[(url, nome_tabela)] = {
+                    "df": df,
+                    "coluna_chave": chaves.get(nome_tabela, "uuid")
+                }
+
+
+def sincronizar_tabela(cliente, url, nome_tabela, coluna_chave="uuid", tamanho_pagina=TAMANHO_PAGINA):
+    """
+    Atualiza o snapshot de uma tabela buscando apenas as linhas alteradas desde a última marca d'água.
+    Faz carga completa quando não há snapshot, quando a tabela não tem coluna de marca
+    ou quando o esquema (conjunto de colunas) mudou.
+    Observação: linhas excluídas no Supabase só saem do snapshot numa carga completa.
+    """
+    snapshots, trava = _obter_snapshots()
+    with trava:
+        snapshot = snapshots.get((url, nome_tabela))
+
+    modo = "completa"
+    df_snapshot = snapshot["df"] if snapshot is not None else None
+    coluna_marca = detectar_coluna_marca(
+        df_snapshot) if df_snapshot is not None else None
+    marca = calcular_marca(
+        df_snapshot, coluna_marca) if coluna_marca is not None else None
+
+    if marca is not None and coluna_chave in df_snapshot.columns:
+        df_delta, paginas = buscar_tabela_paginada(
+            cliente, nome_tabela, coluna_chave, tamanho_pagina, desde=(coluna_marca, marca))
+        if df_delta.empty:
+            # Sem alterações: confere o esquema com uma única linha
+            amostra = cliente.table(nome_tabela).select(
+                "*").limit(1).execute().data or []
+            colunas_remotas = set(amostra[0].keys()) if amostra else set(
+                df_snapshot.columns)
+        else:
+            colunas_remotas = set(df_delta.columns)
+        if colunas_remotas == set(df_snapshot.columns):
+            modo = "delta"
+            df = aplicar_upsert(df_snapshot, df_delta, coluna_chave)
+            linhas_alteradas = len(df_delta)
+
+    if modo == "completa":
+        df, paginas = buscar_tabela_paginada(
+            cliente, nome_tabela, coluna_chave, tamanho_pagina)
+        linhas_alteradas = len(df)
+
+    with trava:
+        snapshots[(url, nome_tabela)] = {
+            "df": df, "coluna_chave": coluna_chave}
+    return df, modo, linhas_alteradas, paginas
+
+
+def sincronizar_tabelas(url, chave, tabelas, chaves=None, max_workers=MAX_WORKERS):
+    """
+    Sincroniza várias tabelas (em paralelo) a partir dos snapshots locais.
+    Retorna o dicionário nome_tabela -> DataFrame e um relatório por tabela.
+    """
+    chaves = chaves or {}
+    cliente = obter_cliente_supabase(url, chave)
+
+    def sincronizar(nome_tabela):
+        inicio = time.time()
+        df, modo, linhas_alteradas, paginas = sincronizar_tabela(
+            cliente, url, nome_tabela, chaves.get(nome_tabela, "uuid"))
+        return nome_tabela, df, modo, linhas_alteradas, paginas, time.time() - inicio
+
+    dataframes = {}
+    relatorio = []
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(tabelas)))) as executor:
+        for nome_tabela, df, modo, linhas_alteradas, paginas, segundos in executor.map(sincronizar, tabelas):
+            dataframes[nome_tabela] = df
+            relatorio.append({
+                "tabela": nome_tabela,
+                "modo": modo,
+                "linhas": len(df),
+                "linhas_alteradas": linhas_alteradas,
+                "paginas": paginas,
+                "tempo_s": round(segundos, 2)
+            })
+    return dataframes, pd.DataFrame(relatorio, columns=["tabela", "modo", "linhas", "linhas_alteradas", "paginas", "tempo_s"])
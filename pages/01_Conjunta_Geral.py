@@ -1,7 +1,11 @@
 from st_aggrid import GridOptionsBuilder
 import streamlit as st
+from data_processing.repositorio_dados import obter_dataframe
+from data_processing.formatacao import formatar_datas_br
+from data_processing.filtros_sidebar import filtrar_na_sidebar
+from data_processing.memoizacao import chave_pagina, memoizar
+from data_processing.exportacao import botao_excel, iniciar_pacote, secao_pacote
 import pandas as pd
-import io
 from st_aggrid import AgGrid, GridOptionsBuilder
 import numpy as np
 import plotly.express as px
@@ -37,54 +41,23 @@ st.markdown(
     unsafe_allow_html=True
 )
 
-# Verifica se o DataFrame tratado está disponível no session_state
-if "df_avTratamentoMilho" not in st.session_state:
+# Verifica se o DataFrame tratado está disponível no repositório compartilhado
+df_avTratamentoMilho = obter_dataframe("df_avTratamentoMilho")
+if df_avTratamentoMilho is None:
     st.error("O DataFrame de tratamento de milho não foi carregado. Volte para a página inicial e carregue os dados.")
     st.stop()
 
-# Usar o DataFrame tratado já pronto do session_state
-df_avTratamentoMilho = st.session_state["df_avTratamentoMilho"]
-
-filter_keys = [
-    ("macroRegiaoMilho", "Macro Região", "macro"),
-    ("conjuntaGeralMilhoSafrinha", "Conjunta Geral", "conjunta"),
-    ("subConjuntaMilhoSafrinha", "Sub Conjunta", "subconjunta"),
-    ("mrhMilho", "MRH", "mrh"),
-    ("regional", "Regional", "regional"),
-    ("siglaEstado", "Estado", "estado"),
-    ("nomeCidade", "Cidade", "cidade"),
-    ("nomeProdutor", "Produtor", "produtor"),
-    ("nomeFazenda", "Fazenda", "fazenda"),
-    ("nome", "Híbridos", "hibrido"),
-    ("displayName", "DTC Responsável", "responsavel"),
-]
-
-# Inicializa seleções no session_state
-for col, _, key in filter_keys:
-    if f"sel_{key}" not in st.session_state:
-        st.session_state[f"sel_{key}"] = []
-
 # =========================
 # Seleção de filtros
 # =========================
 
-with st.sidebar:
-    df_filtrado = df_avTratamentoMilho.copy()
-    for col, label, key in filter_keys:
-        options = sorted(
-            df_filtrado[col].dropna().unique(), key=lambda x: str(x))
-        # Limpa seleções inválidas
-        st.session_state[f"sel_{key}"] = [
-            v for v in st.session_state[f"sel_{key}"] if v in options]
-        selecionadas = []
-        with st.expander(label, expanded=False):
-            for opt in options:
-                checked = opt in st.session_state[f"sel_{key}"]
-                if st.checkbox(opt, value=checked, key=f"{key}_{opt}"):
-                    selecionadas.append(opt)
-        st.session_state[f"sel_{key}"] = selecionadas
-        if selecionadas:
-            df_filtrado = df_filtrado[df_filtrado[col].isin(selecionadas)]
+df_filtrado = filtrar_na_sidebar("df_avTratamentoMilho", df_avTratamentoMilho)
+
+iniciar_pacote("01_Conjunta_Geral")
+
+# Chave da página (versão dos dados + filtros ativos): enquanto não muda, tabelas, figuras e
+# arquivos Excel vêm do cache e cliques que não alteram os dados não recalculam a página
+chave = chave_pagina("01_Conjunta_Geral")
 
 # =========================
 # Criação do DataFrame principal de análise
@@ -129,74 +102,80 @@ colunas_renomeadas = [
 colunas = [c[0] for c in colunas_renomeadas]
 novos_nomes = {c[0]: c[1] for c in colunas_renomeadas}
 
-# Cria o DataFrame de visualização customizada a partir do df_analise_conjunta
-colunas_existentes = [c for c in colunas if c in df_analise_conjunta.columns]
-df_analise_conjunta_visualizacao = df_analise_conjunta[colunas_existentes].rename(
-    columns=novos_nomes)
-
 # Exibe o DataFrame filtrado original
 titulo_expander = "Dados Originais - Análise Conjunta da Produção e Componentes de Produção"
 with st.expander(titulo_expander, expanded=False):
-    st.dataframe(df_filtrado, use_container_width=True)
+    st.dataframe(memoizar(chave, "dados_originais", lambda: formatar_datas_br(df_filtrado)),
+                 use_container_width=True)
 
     # Botão para exportar em Excel o DataFrame filtrado original
-    buffer_filtro = io.BytesIO()
-    df_filtrado.to_excel(buffer_filtro, index=False)  # type: ignore
-    buffer_filtro.seek(0)
-    st.download_button(
+    botao_excel(
         label="⬇️ Baixar Excel (dados originais - análise conjunta)",
-        data=buffer_filtro,
-        file_name="dados_originais_analise_conjunta.xlsx",
-        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        dados=df_filtrado,
+        chave=chave,
+        formatar_datas=True,
+        file_name="dados_originais_analise_conjunta.xlsx"
     )
 
 # =========================
 # Configuração visual e funcional do AgGrid
 # =========================
 
-# Cria o construtor de opções do grid a partir do DataFrame customizado
-# Permite configurar colunas, filtros, menus e estilos
-gb = GridOptionsBuilder.from_dataframe(df_analise_conjunta_visualizacao)
-
-# Configuração de casas decimais para colunas numéricas
-colunas_formatar = {
-    "Prod@13.5% (kg/ha)": 1,
-    "Prod@13.5% (sc/ha)": 1,
-    "Pop (plantas/ha)": 0,
-    "AIE (m)": 2,
-    "ALT (m)": 2,
-    "PMG Umd (%)": 1,
-    "PMG@13.5% (g)": 1,
-    "Num Fileiras": 1,
-    "Num Grãos/Fileira": 0,
-    "Ardidos (%)": 1,
-    "Perda Total (%)": 1,
-    "Ciclo (dias)": 0
-}
 
-for col in df_analise_conjunta_visualizacao.columns:
-    if col in colunas_formatar:
-        casas = colunas_formatar[col]
-        gb.configure_column(
-            col,
-            headerClass='ag-header-bold',
-            menuTabs=['generalMenuTab', 'filterMenuTab', 'columnsMenuTab'],
-            valueFormatter=f"value != null ? value.toFixed({casas}) : ''"
-        )
-    else:
-        gb.configure_column(
-            col,
-            headerClass='ag-header-bold',
-            menuTabs=['generalMenuTab', 'filterMenuTab', 'columnsMenuTab']
-        )
-# Configura opções padrão para todas as colunas
-# (não editável, agrupável, filtrável, redimensionável, fonte 12px)
-gb.configure_default_column(editable=False, groupable=True,
-                            filter=True, resizable=True, cellStyle={'fontSize': '12px'})
-# Ajusta a altura do cabeçalho
-gb.configure_grid_options(headerHeight=30)
-# Gera o dicionário final de opções do grid
-grid_options = gb.build()
+def montar_visualizacao():
+    # Cria o DataFrame de visualização customizada a partir do df_analise_conjunta
+    colunas_existentes = [c for c in colunas if c in df_analise_conjunta.columns]
+    df_analise_conjunta_visualizacao = df_analise_conjunta[colunas_existentes].rename(
+        columns=novos_nomes)
+
+    # Cria o construtor de opções do grid a partir do DataFrame customizado
+    # Permite configurar colunas, filtros, menus e estilos
+    gb = GridOptionsBuilder.from_dataframe(df_analise_conjunta_visualizacao)
+
+    # Configuração de casas decimais para colunas numéricas
+    colunas_formatar = {
+        "Prod@13.5% (kg/ha)": 1,
+        "Prod@13.5% (sc/ha)": 1,
+        "Pop (plantas/ha)": 0,
+        "AIE (m)": 2,
+        "ALT (m)": 2,
+        "PMG Umd (%)": 1,
+        "PMG@13.5% (g)": 1,
+        "Num Fileiras": 1,
+        "Num Grãos/Fileira": 0,
+        "Ardidos (%)": 1,
+        "Perda Total (%)": 1,
+        "Ciclo (dias)": 0
+    }
+
+    for col in df_analise_conjunta_visualizacao.columns:
+        if col in colunas_formatar:
+            casas = colunas_formatar[col]
+            gb.configure_column(
+                col,
+                headerClass='ag-header-bold',
+                menuTabs=['generalMenuTab', 'filterMenuTab', 'columnsMenuTab'],
+                valueFormatter=f"value != null ? value.toFixed({casas}) : ''"
+            )
+        else:
+            gb.configure_column(
+                col,
+                headerClass='ag-header-bold',
+                menuTabs=['generalMenuTab', 'filterMenuTab', 'columnsMenuTab']
+            )
+    # Configura opções padrão para todas as colunas
+    # (não editável, agrupável, filtrável, redimensionável, fonte 12px)
+    gb.configure_default_column(editable=False, groupable=True,
+                                filter=True, resizable=True, cellStyle={'fontSize': '12px'})
+    # Ajusta a altura do cabeçalho
+    gb.configure_grid_options(headerHeight=30)
+    # Gera o dicionário final de opções do grid
+    grid_options = gb.build()
+    return df_analise_conjunta_visualizacao, grid_options
+
+
+df_analise_conjunta_visualizacao, grid_options = memoizar(
+    chave, "visualizacao", montar_visualizacao)
 
 # =========================
 # Estilização customizada do AgGrid
@@ -248,14 +227,10 @@ AgGrid(
 )
 
 # Botão para exportar em Excel o DataFrame customizado
-buffer = io.BytesIO()
-df_analise_conjunta_visualizacao.to_excel(buffer, index=False)  # type: ignore
-buffer.seek(0)
-st.download_button(
+botao_excel(
     label="⬇️ Baixar Excel (Produção e Componentes Produtivos)",
-    data=buffer,
-    file_name="producao_componentes.xlsx",
-    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    dados=df_analise_conjunta_visualizacao,
+    file_name="producao_componentes.xlsx"
 )
 
 # =========================
@@ -275,42 +250,48 @@ def agrupa_index(idx):
     return idx
 
 
-df_analise_conjunta['indexTratamentoAgrupado'] = df_analise_conjunta['indexTratamento'].apply(
-    agrupa_index)
+def agrupar_parcelas(df_analise_conjunta):
+    df_analise_conjunta['indexTratamentoAgrupado'] = df_analise_conjunta['indexTratamento'].apply(
+        agrupa_index)
 
-# Define as colunas de agrupamento e as colunas numéricas para média
-group_cols = ['fazendaRef', 'indexTratamentoAgrupado']
-colunas_numericas = df_analise_conjunta.select_dtypes(
-    include='number').columns.tolist()
-colunas_numericas = [c for c in colunas_numericas if c not in [
-    'indexTratamento', 'indexTratamentoAgrupado']]
+    # Define as colunas de agrupamento e as colunas numéricas para média
+    group_cols = ['fazendaRef', 'indexTratamentoAgrupado']
+    colunas_numericas = df_analise_conjunta.select_dtypes(
+        include='number').columns.tolist()
+    colunas_numericas = [c for c in colunas_numericas if c not in [
+        'indexTratamento', 'indexTratamentoAgrupado']]
 
-# Substitui zeros por NaN nas colunas numéricas antes do agrupamento
-df_analise_conjunta[colunas_numericas] = df_analise_conjunta[colunas_numericas].replace(
-    0, np.nan)
+    # Substitui zeros por NaN nas colunas numéricas antes do agrupamento
+    df_analise_conjunta[colunas_numericas] = df_analise_conjunta[colunas_numericas].replace(
+        0, np.nan)
 
-# Realiza o agrupamento e calcula a média das colunas numéricas
-df_analise_conjunta_agrupado = (
-    df_analise_conjunta
-    .groupby(group_cols, as_index=False)[colunas_numericas]
-    .mean()
-)
+    # Realiza o agrupamento e calcula a média das colunas numéricas
+    df_analise_conjunta_agrupado = (
+        df_analise_conjunta
+        .groupby(group_cols, as_index=False, observed=True)[colunas_numericas]
+        .mean()
+    )
 
-# Recupera o nome do híbrido para cada (fazendaRef, indexTratamentoAgrupado)
-df_nome = (
-    df_analise_conjunta
-    .groupby(['fazendaRef', 'indexTratamentoAgrupado'])['nome']
-    .first()
-    .reset_index()
-)
+    # Recupera o nome do híbrido para cada (fazendaRef, indexTratamentoAgrupado)
+    df_nome = (
+        df_analise_conjunta
+        .groupby(['fazendaRef', 'indexTratamentoAgrupado'], observed=True)['nome']
+        .first()
+        .reset_index()
+    )
+
+    # Junta o nome ao DataFrame agrupado
+    df_analise_conjunta_agrupado = pd.merge(
+        df_analise_conjunta_agrupado,
+        df_nome,
+        on=['fazendaRef', 'indexTratamentoAgrupado'],
+        how='left'
+    )
+    return df_analise_conjunta, df_analise_conjunta_agrupado
 
-# Junta o nome ao DataFrame agrupado
-df_analise_conjunta_agrupado = pd.merge(
-    df_analise_conjunta_agrupado,
-    df_nome,
-    on=['fazendaRef', 'indexTratamentoAgrupado'],
-    how='left'
-)
+
+df_analise_conjunta, df_analise_conjunta_agrupado = memoizar(
+    chave, "agrupamento", lambda: agrupar_parcelas(df_analise_conjunta))
 
 # =========================
 # Seleção, reordenação e renomeação das colunas para visualização do agrupado
@@ -334,10 +315,59 @@ colunas_agrupado_renomeadas = [
 ]
 colunas_agrupado = [c[0] for c in colunas_agrupado_renomeadas]
 novos_nomes_agrupado = {c[0]: c[1] for c in colunas_agrupado_renomeadas}
-colunas_agrupado_existentes = [
-    c for c in colunas_agrupado if c in df_analise_conjunta_agrupado.columns]
-df_analise_conjunta_agrupado_visualizacao = df_analise_conjunta_agrupado[colunas_agrupado_existentes].rename(
-    columns=novos_nomes_agrupado)  # type: ignore
+
+
+def montar_visualizacao_agrupado():
+    colunas_agrupado_existentes = [
+        c for c in colunas_agrupado if c in df_analise_conjunta_agrupado.columns]
+    df_analise_conjunta_agrupado_visualizacao = df_analise_conjunta_agrupado[colunas_agrupado_existentes].rename(
+        columns=novos_nomes_agrupado)  # type: ignore
+    gb_agrupado = GridOptionsBuilder.from_dataframe(
+        df_analise_conjunta_agrupado_visualizacao)
+
+    # Configuração de casas decimais para colunas numéricas do agrupado
+    colunas_formatar_agrupado = {
+        "Prod@13.5% (kg/ha)": 1,
+        "Prod@13.5% (sc/ha)": 1,
+        "Pop (plantas/ha)": 0,
+        "AIE (m)": 2,
+        "ALT (m)": 2,
+        "PMG Umd (%)": 1,
+        "PMG@13.5% (g)": 1,
+        "Num Fileiras": 1,
+        "Num Grãos/Fileira": 0,
+        "Ardidos (%)": 1,
+        "Perda Total (%)": 1,
+        "Ciclo (dias)": 0
+    }
+
+    for col in df_analise_conjunta_agrupado_visualizacao.columns:
+        if col in colunas_formatar_agrupado:
+            casas = colunas_formatar_agrupado[col]
+            gb_agrupado.configure_column(
+                col,
+                headerClass='ag-header-bold',
+                menuTabs=['generalMenuTab', 'filterMenuTab', 'columnsMenuTab'],
+                valueFormatter=f"value != null ? value.toFixed({casas}) : ''"
+            )
+        else:
+            gb_agrupado.configure_column(
+                col,
+                headerClass='ag-header-bold',
+                menuTabs=['generalMenuTab', 'filterMenuTab', 'columnsMenuTab']
+            )
+    # Configura opções padrão para todas as colunas
+    # (não editável, agrupável, filtrável, redimensionável, fonte 12px)
+    gb_agrupado.configure_default_column(editable=False, groupable=True,
+                                         filter=True, resizable=True, cellStyle={'fontSize': '12px'})
+    # Ajusta a altura do cabeçalho
+    gb_agrupado.configure_grid_options(headerHeight=30)
+    grid_options_agrupado = gb_agrupado.build()
+    return df_analise_conjunta_agrupado_visualizacao, grid_options_agrupado
+
+
+df_analise_conjunta_agrupado_visualizacao, grid_options_agrupado = memoizar(
+    chave, "visualizacao_agrupado", montar_visualizacao_agrupado)
 
 # =========================
 # Exibição do DataFrame agrupado customizado com AgGrid
@@ -360,47 +390,6 @@ st.markdown(
     """,
     unsafe_allow_html=True
 )
-gb_agrupado = GridOptionsBuilder.from_dataframe(
-    df_analise_conjunta_agrupado_visualizacao)
-
-# Configuração de casas decimais para colunas numéricas do agrupado
-colunas_formatar_agrupado = {
-    "Prod@13.5% (kg/ha)": 1,
-    "Prod@13.5% (sc/ha)": 1,
-    "Pop (plantas/ha)": 0,
-    "AIE (m)": 2,
-    "ALT (m)": 2,
-    "PMG Umd (%)": 1,
-    "PMG@13.5% (g)": 1,
-    "Num Fileiras": 1,
-    "Num Grãos/Fileira": 0,
-    "Ardidos (%)": 1,
-    "Perda Total (%)": 1,
-    "Ciclo (dias)": 0
-}
-
-for col in df_analise_conjunta_agrupado_visualizacao.columns:
-    if col in colunas_formatar_agrupado:
-        casas = colunas_formatar_agrupado[col]
-        gb_agrupado.configure_column(
-            col,
-            headerClass='ag-header-bold',
-            menuTabs=['generalMenuTab', 'filterMenuTab', 'columnsMenuTab'],
-            valueFormatter=f"value != null ? value.toFixed({casas}) : ''"
-        )
-    else:
-        gb_agrupado.configure_column(
-            col,
-            headerClass='ag-header-bold',
-            menuTabs=['generalMenuTab', 'filterMenuTab', 'columnsMenuTab']
-        )
-# Configura opções padrão para todas as colunas
-# (não editável, agrupável, filtrável, redimensionável, fonte 12px)
-gb_agrupado.configure_default_column(editable=False, groupable=True,
-                                     filter=True, resizable=True, cellStyle={'fontSize': '12px'})
-# Ajusta a altura do cabeçalho
-gb_agrupado.configure_grid_options(headerHeight=30)
-grid_options_agrupado = gb_agrupado.build()
 
 AgGrid(
     df_analise_conjunta_agrupado_visualizacao,
@@ -414,15 +403,10 @@ AgGrid(
 )
 
 # Botão para exportar em Excel o DataFrame agrupado customizado
-buffer_agrupado_vis = io.BytesIO()
-df_analise_conjunta_agrupado_visualizacao.to_excel(
-    buffer_agrupado_vis, index=False)  # type: ignore
-buffer_agrupado_vis.seek(0)
-st.download_button(
+botao_excel(
     label="⬇️ Baixar Excel (Resumo da Conjunta de Produção)",
-    data=buffer_agrupado_vis,
-    file_name="conjunta_producao.xlsx",
-    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    dados=df_analise_conjunta_agrupado_visualizacao,
+    file_name="conjunta_producao.xlsx"
 )
 
 # =========================
@@ -436,60 +420,68 @@ st.markdown(
     """,
     unsafe_allow_html=True
 )
-# Seleciona colunas numéricas principais para o resumo
-colunas_resumo = [
-    'humidade', 'prod_kg_ha_corr', 'prod_sc_ha_corr', 'numPlantas_ha', 'media_AIE_m', 'media_ALT_m',
-    'media_umd_PMG', 'corr_PMG', 'media_NumFileiras', 'media_NumGraosPorFileira',
-    'graosArdidos', 'perc_Total', 'ciclo_dias'
-]
-colunas_resumo_existentes = [
-    c for c in colunas_resumo if c in df_analise_conjunta.columns]
-df_resumo_hibrido = df_analise_conjunta.groupby(
-    'nome')[colunas_resumo_existentes].mean().reset_index()
-# Renomeia colunas para visualização
-renomear_resumo = {
-    'nome': 'Híbrido',
-    'humidade': 'Umd (%)',
-    'prod_kg_ha_corr': 'Prod@13.5% (kg/ha)',
-    'prod_sc_ha_corr': 'Prod@13.5% (sc/ha)',
-    'numPlantas_ha': 'Pop (plantas/ha)',
-    'media_AIE_m': 'AIE (m)',
-    'media_ALT_m': 'ALT (m)',
-    'media_umd_PMG': 'PMG Umd (%)',
-    'corr_PMG': 'PMG@13.5% (g)',
-    'media_NumFileiras': 'Num Fileiras',
-    'media_NumGraosPorFileira': 'Num Grãos/Fileira',
-    'graosArdidos': 'Ardidos (%)',
-    'perc_Total': 'Perda Total (%)',
-    'ciclo_dias': 'Ciclo (dias)'
-}
-df_resumo_hibrido = df_resumo_hibrido.rename(columns=renomear_resumo)
-# Configura AgGrid
-_gb_resumo_hibrido = GridOptionsBuilder.from_dataframe(df_resumo_hibrido)
-colunas_formatar_resumo = {
-    'Prod@13.5% (kg/ha)': 1,
-    'Prod@13.5% (sc/ha)': 1,
-    'Pop (plantas/ha)': 0,
-    'Umd (%)': 1,
-    'AIE (m)': 2,
-    'ALT (m)': 2,
-    'PMG Umd (%)': 1,
-    'PMG@13.5% (g)': 1,
-    'Num Fileiras': 1,
-    'Num Grãos/Fileira': 0,
-    'Ardidos (%)': 1,
-    'Perda Total (%)': 1,
-    'Ciclo (dias)': 0
-}
-for col in df_resumo_hibrido.columns:
-    if col in colunas_formatar_resumo:
-        casas = colunas_formatar_resumo[col]
-        _gb_resumo_hibrido.configure_column(
-            col, valueFormatter=f"value != null ? value.toFixed({casas}) : ''", headerClass='ag-header-bold')
-_gb_resumo_hibrido.configure_default_column(
-    editable=False, groupable=True, filter=True, resizable=True, cellStyle={'fontSize': '12px'})
-_gb_resumo_hibrido.configure_grid_options(headerHeight=30)
-_grid_options_resumo_hibrido = _gb_resumo_hibrido.build()
+
+
+def montar_resumo_hibrido():
+    # Seleciona colunas numéricas principais para o resumo
+    colunas_resumo = [
+        'humidade', 'prod_kg_ha_corr', 'prod_sc_ha_corr', 'numPlantas_ha', 'media_AIE_m', 'media_ALT_m',
+        'media_umd_PMG', 'corr_PMG', 'media_NumFileiras', 'media_NumGraosPorFileira',
+        'graosArdidos', 'perc_Total', 'ciclo_dias'
+    ]
+    colunas_resumo_existentes = [
+        c for c in colunas_resumo if c in df_analise_conjunta.columns]
+    df_resumo_hibrido = df_analise_conjunta.groupby(
+        'nome', observed=True)[colunas_resumo_existentes].mean().reset_index()
+    # Renomeia colunas para visualização
+    renomear_resumo = {
+        'nome': 'Híbrido',
+        'humidade': 'Umd (%)',
+        'prod_kg_ha_corr': 'Prod@13.5% (kg/ha)',
+        'prod_sc_ha_corr': 'Prod@13.5% (sc/ha)',
+        'numPlantas_ha': 'Pop (plantas/ha)',
+        'media_AIE_m': 'AIE (m)',
+        'media_ALT_m': 'ALT (m)',
+        'media_umd_PMG': 'PMG Umd (%)',
+        'corr_PMG': 'PMG@13.5% (g)',
+        'media_NumFileiras': 'Num Fileiras',
+        'media_NumGraosPorFileira': 'Num Grãos/Fileira',
+        'graosArdidos': 'Ardidos (%)',
+        'perc_Total': 'Perda Total (%)',
+        'ciclo_dias': 'Ciclo (dias)'
+    }
+    df_resumo_hibrido = df_resumo_hibrido.rename(columns=renomear_resumo)
+    # Configura AgGrid
+    _gb_resumo_hibrido = GridOptionsBuilder.from_dataframe(df_resumo_hibrido)
+    colunas_formatar_resumo = {
+        'Prod@13.5% (kg/ha)': 1,
+        'Prod@13.5% (sc/ha)': 1,
+        'Pop (plantas/ha)': 0,
+        'Umd (%)': 1,
+        'AIE (m)': 2,
+        'ALT (m)': 2,
+        'PMG Umd (%)': 1,
+        'PMG@13.5% (g)': 1,
+        'Num Fileiras': 1,
+        'Num Grãos/Fileira': 0,
+        'Ardidos (%)': 1,
+        'Perda Total (%)': 1,
+        'Ciclo (dias)': 0
+    }
+    for col in df_resumo_hibrido.columns:
+        if col in colunas_formatar_resumo:
+            casas = colunas_formatar_resumo[col]
+            _gb_resumo_hibrido.configure_column(
+                col, valueFormatter=f"value != null ? value.toFixed({casas}) : ''", headerClass='ag-header-bold')
+    _gb_resumo_hibrido.configure_default_column(
+        editable=False, groupable=True, filter=True, resizable=True, cellStyle={'fontSize': '12px'})
+    _gb_resumo_hibrido.configure_grid_options(headerHeight=30)
+    _grid_options_resumo_hibrido = _gb_resumo_hibrido.build()
+    return df_resumo_hibrido, _grid_options_resumo_hibrido
+
+
+df_resumo_hibrido, _grid_options_resumo_hibrido = memoizar(
+    chave, "resumo_hibrido", montar_resumo_hibrido)
 AgGrid(
     df_resumo_hibrido,
     gridOptions=_grid_options_resumo_hibrido,
@@ -502,15 +494,10 @@ AgGrid(
 )
 
 # Botão para exportar em Excel o DataFrame de resumo por híbrido
-buffer_resumo_hibrido = io.BytesIO()
-df_resumo_hibrido.to_excel(buffer_resumo_hibrido,
-                           index=False, engine='xlsxwriter')  # type: ignore
-buffer_resumo_hibrido.seek(0)
-st.download_button(
+botao_excel(
     label="⬇️ Baixar Excel (Resumo por Híbrido)",
-    data=buffer_resumo_hibrido,
-    file_name="resumo_por_hibrido.xlsx",
-    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    dados=df_resumo_hibrido,
+    file_name="resumo_por_hibrido.xlsx"
 )
 
 # =========================
@@ -529,26 +516,89 @@ variaveis = [
     'perc_Total'
 ]
 
-estatisticas_dict = {}
-for col_var in variaveis:
-    serie = df_analise_conjunta_agrupado[col_var].dropna()
-    estatisticas_dict[col_var] = {
-        'Total de observações': serie.count(),
-        'Média': serie.mean(),
-        'Erro Padrão': serie.sem(),
-        'Desvio Padrão': serie.std(),
-        'Mínimo': serie.min(),
-        '1º Quartil (25%)': serie.quantile(0.25),
-        'Mediana': serie.median(),
-        '3º Quartil (75%)': serie.quantile(0.75),
-        'Máximo': serie.max(),
-        'CV (%)': 100 * serie.std() / serie.mean() if serie.mean() != 0 else float('nan'),
-        # LSD simplificado: 1.96 * erro padrão (aproximação para 95% de confiança)
-        'LSD': 1.96 * serie.sem() if serie.count() > 1 else float('nan'),
-        'Locais': df_analise_conjunta_agrupado['fazendaRef'].nunique()
+
+def montar_estatisticas():
+    estatisticas_dict = {}
+    for col_var in variaveis:
+        serie = df_analise_conjunta_agrupado[col_var].dropna()
+        estatisticas_dict[col_var] = {
+            'Total de observações': serie.count(),
+            'Média': serie.mean(),
+            'Erro Padrão': serie.sem(),
+            'Desvio Padrão': serie.std(),
+            'Mínimo': serie.min(),
+            '1º Quartil (25%)': serie.quantile(0.25),
+            'Mediana': serie.median(),
+            '3º Quartil (75%)': serie.quantile(0.75),
+            'Máximo': serie.max(),
+            'CV (%)': 100 * serie.std() / serie.mean() if serie.mean() != 0 else float('nan'),
+            # LSD simplificado: 1.96 * erro padrão (aproximação para 95% de confiança)
+            'LSD': 1.96 * serie.sem() if serie.count() > 1 else float('nan'),
+            'Locais': df_analise_conjunta_agrupado['fazendaRef'].nunique()
+        }
+
+    estatisticas_df = pd.DataFrame(estatisticas_dict)
+    estatisticas_aggrid = estatisticas_df.reset_index().rename(columns={
+        'index': 'Medida'})
+
+    # Renomear as colunas conforme solicitado
+    colunas_renomeadas_aggrid = {
+        'prod_kg_ha_corr': 'Prod@13.5% (kg/ha)',
+        'prod_sc_ha_corr': 'Prod@13.5% (sc/ha)',
+        'numPlantas_ha': 'Pop (plantas/ha)',
+        'media_AIE_m': 'AIE (m)',
+        'media_ALT_m': 'ALT (m)',
+        'corr_PMG': 'PMG@13.5% (g)',
+        'media_NumFileiras': 'Num Fileiras',
+        'media_NumGraosPorFileira': 'Num Grãos/Fileira',
+        'graosArdidos': 'Ardidos (%)',
+        'perc_Total': 'Perda Total (%)'
+    }
+    estatisticas_aggrid = estatisticas_aggrid.rename(
+        columns=colunas_renomeadas_aggrid)
+
+    gb_estatisticas = GridOptionsBuilder.from_dataframe(estatisticas_aggrid)
+
+    # Configuração de casas decimais para colunas numéricas das estatísticas
+    colunas_formatar_estatisticas = {
+        'Prod@13.5% (kg/ha)': 1,
+        'Prod@13.5% (sc/ha)': 1,
+        'Pop (plantas/ha)': 0,
+        'AIE (m)': 2,
+        'ALT (m)': 2,
+        'PMG@13.5% (g)': 1,
+        'Num Fileiras': 1,
+        'Num Grãos/Fileira': 0,
+        'Ardidos (%)': 1,
+        'Perda Total (%)': 1
     }
 
-estatisticas_df = pd.DataFrame(estatisticas_dict)
+    for col in estatisticas_aggrid.columns:
+        if col in colunas_formatar_estatisticas:
+            casas = colunas_formatar_estatisticas[col]
+            gb_estatisticas.configure_column(
+                col,
+                headerClass='ag-header-bold',
+                menuTabs=['generalMenuTab', 'filterMenuTab', 'columnsMenuTab'],
+                valueFormatter=f"value != null ? value.toFixed({casas}) : ''"
+            )
+        else:
+            gb_estatisticas.configure_column(
+                col,
+                headerClass='ag-header-bold',
+                menuTabs=['generalMenuTab', 'filterMenuTab', 'columnsMenuTab']
+            )
+    # Configura opções padrão para todas as colunas
+    # (não editável, agrupável, filtrável, redimensionável, fonte 12px)
+    gb_estatisticas.configure_default_column(editable=False, groupable=True,
+                                             filter=True, resizable=True, cellStyle={'fontSize': '12px'})
+    gb_estatisticas.configure_grid_options(headerHeight=30)
+    grid_options_estatisticas = gb_estatisticas.build()
+    return estatisticas_aggrid, grid_options_estatisticas
+
+
+estatisticas_aggrid, grid_options_estatisticas = memoizar(
+    chave, "estatisticas", montar_estatisticas)
 
 
 # Exibição do DataFrame de estatísticas com AgGrid
@@ -570,62 +620,6 @@ st.markdown(
     """,
     unsafe_allow_html=True
 )
-estatisticas_aggrid = estatisticas_df.reset_index().rename(columns={
-    'index': 'Medida'})
-
-# Renomear as colunas conforme solicitado
-colunas_renomeadas_aggrid = {
-    'prod_kg_ha_corr': 'Prod@13.5% (kg/ha)',
-    'prod_sc_ha_corr': 'Prod@13.5% (sc/ha)',
-    'numPlantas_ha': 'Pop (plantas/ha)',
-    'media_AIE_m': 'AIE (m)',
-    'media_ALT_m': 'ALT (m)',
-    'corr_PMG': 'PMG@13.5% (g)',
-    'media_NumFileiras': 'Num Fileiras',
-    'media_NumGraosPorFileira': 'Num Grãos/Fileira',
-    'graosArdidos': 'Ardidos (%)',
-    'perc_Total': 'Perda Total (%)'
-}
-estatisticas_aggrid = estatisticas_aggrid.rename(
-    columns=colunas_renomeadas_aggrid)
-
-gb_estatisticas = GridOptionsBuilder.from_dataframe(estatisticas_aggrid)
-
-# Configuração de casas decimais para colunas numéricas das estatísticas
-colunas_formatar_estatisticas = {
-    'Prod@13.5% (kg/ha)': 1,
-    'Prod@13.5% (sc/ha)': 1,
-    'Pop (plantas/ha)': 0,
-    'AIE (m)': 2,
-    'ALT (m)': 2,
-    'PMG@13.5% (g)': 1,
-    'Num Fileiras': 1,
-    'Num Grãos/Fileira': 0,
-    'Ardidos (%)': 1,
-    'Perda Total (%)': 1
-}
-
-for col in estatisticas_aggrid.columns:
-    if col in colunas_formatar_estatisticas:
-        casas = colunas_formatar_estatisticas[col]
-        gb_estatisticas.configure_column(
-            col,
-            headerClass='ag-header-bold',
-            menuTabs=['generalMenuTab', 'filterMenuTab', 'columnsMenuTab'],
-            valueFormatter=f"value != null ? value.toFixed({casas}) : ''"
-        )
-    else:
-        gb_estatisticas.configure_column(
-            col,
-            headerClass='ag-header-bold',
-            menuTabs=['generalMenuTab', 'filterMenuTab', 'columnsMenuTab']
-        )
-# Configura opções padrão para todas as colunas
-# (não editável, agrupável, filtrável, redimensionável, fonte 12px)
-gb_estatisticas.configure_default_column(editable=False, groupable=True,
-                                         filter=True, resizable=True, cellStyle={'fontSize': '12px'})
-gb_estatisticas.configure_grid_options(headerHeight=30)
-grid_options_estatisticas = gb_estatisticas.build()
 
 AgGrid(
     estatisticas_aggrid,
@@ -639,15 +633,10 @@ AgGrid(
 )
 
 # Botão para exportar o DataFrame de estatísticas (AgGrid) para Excel
-buffer_estatisticas_aggrid = io.BytesIO()
-estatisticas_aggrid.to_excel(
-    buffer_estatisticas_aggrid, index=False)  # type: ignore
-buffer_estatisticas_aggrid.seek(0)
-st.download_button(
+botao_excel(
     label="⬇️ Baixar Excel (Estatísticas - análise conjunta)",
-    data=buffer_estatisticas_aggrid,
-    file_name="estatisticas_descritivas_analise_conjunta.xlsx",
-    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    dados=estatisticas_aggrid,
+    file_name="estatisticas_descritivas_analise_conjunta.xlsx"
 )
 
 # =========================
@@ -671,110 +660,50 @@ st.markdown(
     unsafe_allow_html=True
 )
 
-# Expander para Prod@13.5% (kg/ha)
-with st.expander('Histograma - Prod@13.5% (kg/ha)', expanded=True):
-    dados = df_filtrado['prod_kg_ha_corr'].dropna()
-    media = dados.mean()
-    fig = go.Figure()
-    fig.add_trace(go.Histogram(
-        x=dados,
-        name='Prod@13.5% (kg/ha)',
-        marker_color='#0070C0',  # mudar cor da barra
-        opacity=0.5,
-        xbins=dict(size=500)
-    ))
-    fig.add_vline(
-        x=media,
-        line_dash='dot',
-        line_color='red',
-        annotation_text=f"Média: {media:.1f}",
-        annotation_position="top right",
-        annotation_font_color='red',
-        annotation_font_size=20
-    )
-    fig.update_layout(
-        title='Distribuição da Prod@13.5% (kg/ha)',
-        xaxis_title='Prod@13.5% (kg/ha)',
-        yaxis_title='Frequência',
-        bargap=0.05,
-        plot_bgcolor='#f5f7fa',
-        barmode='overlay',
-        xaxis=dict(
-            title_font=dict(size=18, color='black'),
-            tickfont=dict(size=16, color='black')
-        ),
-        yaxis=dict(
-            title_font=dict(size=18, color='black'),
-            tickfont=dict(size=16, color='black')
-        ),
-        legend=dict(font=dict(size=14))
-    )
-    st.plotly_chart(fig, use_container_width=True)
+# (coluna, rótulo, largura das classes do histograma, casas decimais da média, título do histograma,
+# título do box plot); box plot None: só histograma
+GRAFICOS_DISTRIBUICAO = [
+    ('prod_kg_ha_corr', 'Prod@13.5% (kg/ha)', 500, 1,
+     'Distribuição da Prod@13.5% (kg/ha)', 'Box Plot da Produção @13.5% (kg/ha)'),
+    ('prod_sc_ha_corr', 'Prod@13.5% (sc/ha)', 10, 1,
+     'Distribuição da Prod@13.5% (sc/ha)', 'Box Plot da Produção @13.5% (sc/ha)'),
+    ('numPlantas_ha', 'Pop (plantas/ha)', 5000, 1,
+     'Distribuição da Pop (plantas/ha)', 'Box Plot da População de Plantas (plantas/ha)'),
+    ('media_AIE_m', 'AIE (m)', 0.1, 2, 'Distribuição da AIE (m)', 'Box Plot do AIE (m)'),
+    ('media_ALT_m', 'ALT (m)', 0.5, 2, 'Distribuição da ALT (m)', 'Box Plot da ALT (m)'),
+    ('corr_PMG', 'PMG@13.5% (g)', 100, 2, 'Distribuição da PMG@13.5% (g)', 'Box Plot do PMG@13.5% (g)'),
+    ('media_NumFileiras', 'Num Fileiras', 2, 2,
+     'Distribuição do Número de Fileiras', 'Box Plot do Número de Fileiras'),
+    ('media_NumGraosPorFileira', 'Num Grãos/Fileira', 10, 2,
+     'Distribuição do Número de Grãos por Fileira', 'Box Plot do Número de Grãos por Fileira'),
+    ('graosArdidos', 'Ardidos (%)', 2, 2, 'Distribuição de Ardidos (%)', None),
+    ('perc_Total', 'Perda Total (%)', 10, 2, 'Distribuição de Perda Total (%)', 'Box Plot da Perda Total (%)'),
+]
 
-# Expander para Prod@13.5% (sc/ha)
-with st.expander('Histograma - Prod@13.5% (sc/ha)', expanded=False):
-    dados = df_filtrado['prod_sc_ha_corr'].dropna()
-    media = dados.mean()
-    fig = go.Figure()
-    fig.add_trace(go.Histogram(
-        x=dados,
-        name='Prod@13.5% (sc/ha)',
-        marker_color='#0070C0',  # mudar cor da barra
-        opacity=0.5,
-        xbins=dict(size=10)
-    ))
-    fig.add_vline(
-        x=media,
-        line_dash='dot',
-        line_color='red',
-        annotation_text=f"Média: {media:.1f}",
-        annotation_position="top right",
-        annotation_font_color='red',
-        annotation_font_size=20
-    )
-    fig.update_layout(
-        title='Distribuição da Prod@13.5% (sc/ha)',
-        xaxis_title='Prod@13.5% (sc/ha)',
-        yaxis_title='Frequência',
-        bargap=0.05,
-        plot_bgcolor='#f5f7fa',
-        barmode='overlay',
-        xaxis=dict(
-            title_font=dict(size=18, color='black'),
-            tickfont=dict(size=16, color='black')
-        ),
-        yaxis=dict(
-            title_font=dict(size=18, color='black'),
-            tickfont=dict(size=16, color='black')
-        ),
-        legend=dict(font=dict(size=14))
-    )
-    st.plotly_chart(fig, use_container_width=True)
 
-# Expander para Pop (plantas/ha)
-with st.expander('Histograma - Pop (plantas/ha)', expanded=False):
-    dados = df_filtrado['numPlantas_ha'].dropna()
+def montar_histograma(coluna, rotulo, largura, casas, titulo):
+    dados = df_filtrado[coluna].dropna()
     media = dados.mean()
     fig = go.Figure()
     fig.add_trace(go.Histogram(
         x=dados,
-        name='Pop (plantas/ha)',
+        name=rotulo,
         marker_color='#0070C0',  # mudar cor da barra
         opacity=0.5,
-        xbins=dict(size=5000)
+        xbins=dict(size=largura)
     ))
     fig.add_vline(
         x=media,
         line_dash='dot',
         line_color='red',
-        annotation_text=f"Média: {media:.1f}",
+        annotation_text=f"Média: {media:.{casas}f}",
         annotation_position="top right",
         annotation_font_color='red',
         annotation_font_size=20
     )
     fig.update_layout(
-        title='Distribuição da Pop (plantas/ha)',
-        xaxis_title='Pop (plantas/ha)',
+        title=titulo,
+        xaxis_title=rotulo,
         yaxis_title='Frequência',
         bargap=0.05,
         plot_bgcolor='#f5f7fa',
@@ -789,635 +718,65 @@ with st.expander('Histograma - Pop (plantas/ha)', expanded=False):
         ),
         legend=dict(font=dict(size=14))
     )
-    st.plotly_chart(fig, use_container_width=True)
+    return fig
 
-# Expander para AIE (m)
-with st.expander('Histograma - AIE (m)', expanded=False):
-    dados = df_filtrado['media_AIE_m'].dropna()
-    media = dados.mean()
-    fig = go.Figure()
-    fig.add_trace(go.Histogram(
-        x=dados,
-        name='AIE (m)',
-        marker_color='#0070C0',  # mudar cor da barra
-        opacity=0.5,
-        xbins=dict(size=0.1)
-    ))
-    fig.add_vline(
-        x=media,
-        line_dash='dot',
-        line_color='red',
-        annotation_text=f"Média: {media:.2f}",
-        annotation_position="top right",
-        annotation_font_color='red',
-        annotation_font_size=20
-    )
-    fig.update_layout(
-        title='Distribuição da AIE (m)',
-        xaxis_title='AIE (m)',
-        yaxis_title='Frequência',
-        bargap=0.05,
-        plot_bgcolor='#f5f7fa',
-        barmode='overlay',
-        xaxis=dict(
-            title_font=dict(size=18, color='black'),
-            tickfont=dict(size=16, color='black')
-        ),
-        yaxis=dict(
-            title_font=dict(size=18, color='black'),
-            tickfont=dict(size=16, color='black')
-        ),
-        legend=dict(font=dict(size=14))
-    )
-    st.plotly_chart(fig, use_container_width=True)
 
-# Expander para ALT (m)
-with st.expander('Histograma - ALT (m)', expanded=False):
-    dados = df_filtrado['media_ALT_m'].dropna()
+def montar_box_plot(coluna, rotulo, casas, titulo):
+    dados = df_filtrado[coluna].dropna()
     media = dados.mean()
     fig = go.Figure()
-    fig.add_trace(go.Histogram(
+    fig.add_trace(go.Box(
         x=dados,
-        name='ALT (m)',
-        marker_color='#0070C0',  # mudar cor da barra
-        opacity=0.5,
-        xbins=dict(size=0.5)
+        name=rotulo,
+        marker_color='#0070C0',
+        boxmean=False,
+        boxpoints='outliers',
+        line=dict(color='#0070C0')
     ))
-    fig.add_vline(
-        x=media,
-        line_dash='dot',
-        line_color='red',
-        annotation_text=f"Média: {media:.2f}",
-        annotation_position="top right",
-        annotation_font_color='red',
-        annotation_font_size=20
-    )
-    fig.update_layout(
-        title='Distribuição da ALT (m)',
-        xaxis_title='ALT (m)',
-        yaxis_title='Frequência',
-        bargap=0.05,
-        plot_bgcolor='#f5f7fa',
-        barmode='overlay',
-        xaxis=dict(
-            title_font=dict(size=18, color='black'),
-            tickfont=dict(size=16, color='black')
-        ),
-        yaxis=dict(
-            title_font=dict(size=18, color='black'),
-            tickfont=dict(size=16, color='black')
-        ),
-        legend=dict(font=dict(size=14))
-    )
-    st.plotly_chart(fig, use_container_width=True)
-
-# Expander para PMG@13.5% (g)
-with st.expander('Histograma - PMG@13.5% (g)', expanded=False):
-    dados = df_filtrado['corr_PMG'].dropna()
-    media = dados.mean()
-    fig = go.Figure()
-    fig.add_trace(go.Histogram(
-        x=dados,
-        name='PMG@13.5% (g)',
-        marker_color='#0070C0',  # mudar cor da barra
-        opacity=0.5,
-        xbins=dict(size=100)
+    # Adiciona a média como ponto vermelho
+    fig.add_trace(go.Scatter(
+        x=[media],
+        y=[rotulo],
+        mode='markers+text',
+        marker=dict(color='red', size=14, symbol='diamond'),
+        text=[f"Média: {media:.{casas}f}"],
+        textposition='top right',
+        textfont=dict(color='red', size=16),
+        showlegend=False
     ))
-    fig.add_vline(
-        x=media,
-        line_dash='dot',
-        line_color='red',
-        annotation_text=f"Média: {media:.2f}",
-        annotation_position="top right",
-        annotation_font_color='red',
-        annotation_font_size=20
-    )
     fig.update_layout(
-        title='Distribuição da PMG@13.5% (g)',
-        xaxis_title='PMG@13.5% (g)',
-        yaxis_title='Frequência',
-        bargap=0.05,
+        title=titulo,
+        xaxis_title=rotulo,
         plot_bgcolor='#f5f7fa',
-        barmode='overlay',
         xaxis=dict(
             title_font=dict(size=18, color='black'),
             tickfont=dict(size=16, color='black')
         ),
         yaxis=dict(
-            title_font=dict(size=18, color='black'),
             tickfont=dict(size=16, color='black')
         ),
-        legend=dict(font=dict(size=14))
+        showlegend=False
     )
-    st.plotly_chart(fig, use_container_width=True)
+    return fig
 
-# Expander para Num Fileiras
-with st.expander('Histograma - Num Fileiras', expanded=False):
-    dados = df_filtrado['media_NumFileiras'].dropna()
-    media = dados.mean()
-    fig = go.Figure()
-    fig.add_trace(go.Histogram(
-        x=dados,
-        name='Num Fileiras',
-        marker_color='#0070C0',  # mudar cor da barra
-        opacity=0.5,
-        xbins=dict(size=2)
-    ))
-    fig.add_vline(
-        x=media,
-        line_dash='dot',
-        line_color='red',
-        annotation_text=f"Média: {media:.2f}",
-        annotation_position="top right",
-        annotation_font_color='red',
-        annotation_font_size=20
-    )
-    fig.update_layout(
-        title='Distribuição do Número de Fileiras',
-        xaxis_title='Num Fileiras',
-        yaxis_title='Frequência',
-        bargap=0.05,
-        plot_bgcolor='#f5f7fa',
-        barmode='overlay',
-        xaxis=dict(
-            title_font=dict(size=18, color='black'),
-            tickfont=dict(size=16, color='black')
-        ),
-        yaxis=dict(
-            title_font=dict(size=18, color='black'),
-            tickfont=dict(size=16, color='black')
-        ),
-        legend=dict(font=dict(size=14))
-    )
-    st.plotly_chart(fig, use_container_width=True)
 
-# Expander para Num Grãos/Fileira
-with st.expander('Histograma - Num Grãos/Fileira', expanded=False):
-    dados = df_filtrado['media_NumGraosPorFileira'].dropna()
-    media = dados.mean()
-    fig = go.Figure()
-    fig.add_trace(go.Histogram(
-        x=dados,
-        name='Num Grãos/Fileira',
-        marker_color='#0070C0',  # mudar cor da barra
-        opacity=0.5,
-        xbins=dict(size=10)
-    ))
-    fig.add_vline(
-        x=media,
-        line_dash='dot',
-        line_color='red',
-        annotation_text=f"Média: {media:.2f}",
-        annotation_position="top right",
-        annotation_font_color='red',
-        annotation_font_size=20
-    )
-    fig.update_layout(
-        title='Distribuição do Número de Grãos por Fileira',
-        xaxis_title='Num Grãos/Fileira',
-        yaxis_title='Frequência',
-        bargap=0.05,
-        plot_bgcolor='#f5f7fa',
-        barmode='overlay',
-        xaxis=dict(
-            title_font=dict(size=18, color='black'),
-            tickfont=dict(size=16, color='black')
-        ),
-        yaxis=dict(
-            title_font=dict(size=18, color='black'),
-            tickfont=dict(size=16, color='black')
-        ),
-        legend=dict(font=dict(size=14))
-    )
-    st.plotly_chart(fig, use_container_width=True)
+# Histogramas (o primeiro já aberto); as figuras vêm do cache enquanto os filtros não mudam
+for i, (coluna, rotulo, largura, casas, titulo, _) in enumerate(GRAFICOS_DISTRIBUICAO):
+    with st.expander(f'Histograma - {rotulo}', expanded=i == 0):
+        fig = memoizar(chave, f"histograma_{coluna}",
+                       lambda: montar_histograma(coluna, rotulo, largura, casas, titulo))
+        st.plotly_chart(fig, use_container_width=True)
 
-# Expander para Ardidos (%)
-with st.expander('Histograma - Ardidos (%)', expanded=False):
-    dados = df_filtrado['graosArdidos'].dropna()
-    media = dados.mean()
-    fig = go.Figure()
-    fig.add_trace(go.Histogram(
-        x=dados,
-        name='Ardidos (%)',
-        marker_color='#0070C0',  # mudar cor da barra
-        opacity=0.5,
-        xbins=dict(size=2)
-    ))
-    fig.add_vline(
-        x=media,
-        line_dash='dot',
-        line_color='red',
-        annotation_text=f"Média: {media:.2f}",
-        annotation_position="top right",
-        annotation_font_color='red',
-        annotation_font_size=20
-    )
-    fig.update_layout(
-        title='Distribuição de Ardidos (%)',
-        xaxis_title='Ardidos (%)',
-        yaxis_title='Frequência',
-        bargap=0.05,
-        plot_bgcolor='#f5f7fa',
-        barmode='overlay',
-        xaxis=dict(
-            title_font=dict(size=18, color='black'),
-            tickfont=dict(size=16, color='black')
-        ),
-        yaxis=dict(
-            title_font=dict(size=18, color='black'),
-            tickfont=dict(size=16, color='black')
-        ),
-        legend=dict(font=dict(size=14))
-    )
-    st.plotly_chart(fig, use_container_width=True)
-
-# Expander para Perda Total (%)
-with st.expander('Histograma - Perda Total (%)', expanded=False):
-    dados = df_filtrado['perc_Total'].dropna()
-    media = dados.mean()
-    fig = go.Figure()
-    fig.add_trace(go.Histogram(
-        x=dados,
-        name='Perda Total (%)',
-        marker_color='#0070C0',  # mudar cor da barra
-        opacity=0.5,
-        xbins=dict(size=10)
-    ))
-    fig.add_vline(
-        x=media,
-        line_dash='dot',
-        line_color='red',
-        annotation_text=f"Média: {media:.2f}",
-        annotation_position="top right",
-        annotation_font_color='red',
-        annotation_font_size=20
-    )
-    fig.update_layout(
-        title='Distribuição de Perda Total (%)',
-        xaxis_title='Perda Total (%)',
-        yaxis_title='Frequência',
-        bargap=0.05,
-        plot_bgcolor='#f5f7fa',
-        barmode='overlay',
-        xaxis=dict(
-            title_font=dict(size=18, color='black'),
-            tickfont=dict(size=16, color='black')
-        ),
-        yaxis=dict(
-            title_font=dict(size=18, color='black'),
-            tickfont=dict(size=16, color='black')
-        ),
-        legend=dict(font=dict(size=14))
-    )
-    st.plotly_chart(fig, use_container_width=True)
-
-# Expander para Box Plot - Prod@13.5% (kg/ha)
-with st.expander('Box Plot - Prod@13.5% (kg/ha)', expanded=False):
-    dados = df_filtrado['prod_kg_ha_corr'].dropna()
-    media = dados.mean()
-    fig = go.Figure()
-    fig.add_trace(go.Box(
-        x=dados,
-        name='Prod@13.5% (kg/ha)',
-        marker_color='#0070C0',
-        boxmean=False,
-        boxpoints='outliers',
-        line=dict(color='#0070C0')
-    ))
-    # Adiciona a média como ponto vermelho
-    fig.add_trace(go.Scatter(
-        x=[media],
-        y=['Prod@13.5% (kg/ha)'],
-        mode='markers+text',
-        marker=dict(color='red', size=14, symbol='diamond'),
-        text=[f"Média: {media:.1f}"],
-        textposition='top right',
-        textfont=dict(color='red', size=16),
-        showlegend=False
-    ))
-    fig.update_layout(
-        title='Box Plot da Produção @13.5% (kg/ha)',
-        xaxis_title='Prod@13.5% (kg/ha)',
-        plot_bgcolor='#f5f7fa',
-        xaxis=dict(
-            title_font=dict(size=18, color='black'),
-            tickfont=dict(size=16, color='black')
-        ),
-        yaxis=dict(
-            tickfont=dict(size=16, color='black')
-        ),
-        showlegend=False
-    )
-    st.plotly_chart(fig, use_container_width=True)
-
-# Expander para Box Plot - Prod@13.5% (sc/ha)
-with st.expander('Box Plot - Prod@13.5% (sc/ha)', expanded=False):
-    dados = df_filtrado['prod_sc_ha_corr'].dropna()
-    media = dados.mean()
-    fig = go.Figure()
-    fig.add_trace(go.Box(
-        x=dados,
-        name='Prod@13.5% (sc/ha)',
-        marker_color='#0070C0',
-        boxmean=False,
-        boxpoints='outliers',
-        line=dict(color='#0070C0')
-    ))
-    # Adiciona a média como ponto vermelho
-    fig.add_trace(go.Scatter(
-        x=[media],
-        y=['Prod@13.5% (sc/ha)'],
-        mode='markers+text',
-        marker=dict(color='red', size=14, symbol='diamond'),
-        text=[f"Média: {media:.1f}"],
-        textposition='top right',
-        textfont=dict(color='red', size=16),
-        showlegend=False
-    ))
-    fig.update_layout(
-        title='Box Plot da Produção @13.5% (sc/ha)',
-        xaxis_title='Prod@13.5% (sc/ha)',
-        plot_bgcolor='#f5f7fa',
-        xaxis=dict(
-            title_font=dict(size=18, color='black'),
-            tickfont=dict(size=16, color='black')
-        ),
-        yaxis=dict(
-            tickfont=dict(size=16, color='black')
-        ),
-        showlegend=False
-    )
-    st.plotly_chart(fig, use_container_width=True)
-
-# Expander para Box Plot - Pop (plantas/ha)
-with st.expander('Box Plot - Pop (plantas/ha)', expanded=False):
-    dados = df_filtrado['numPlantas_ha'].dropna()
-    media = dados.mean()
-    fig = go.Figure()
-    fig.add_trace(go.Box(
-        x=dados,
-        name='Pop (plantas/ha)',
-        marker_color='#0070C0',
-        boxmean=False,
-        boxpoints='outliers',
-        line=dict(color='#0070C0')
-    ))
-    # Adiciona a média como ponto vermelho
-    fig.add_trace(go.Scatter(
-        x=[media],
-        y=['Pop (plantas/ha)'],
-        mode='markers+text',
-        marker=dict(color='red', size=14, symbol='diamond'),
-        text=[f"Média: {media:.1f}"],
-        textposition='top right',
-        textfont=dict(color='red', size=16),
-        showlegend=False
-    ))
-    fig.update_layout(
-        title='Box Plot da População de Plantas (plantas/ha)',
-        xaxis_title='Pop (plantas/ha)',
-        plot_bgcolor='#f5f7fa',
-        xaxis=dict(
-            title_font=dict(size=18, color='black'),
-            tickfont=dict(size=16, color='black')
-        ),
-        yaxis=dict(
-            tickfont=dict(size=16, color='black')
-        ),
-        showlegend=False
-    )
-    st.plotly_chart(fig, use_container_width=True)
-
-# Expander para Box Plot - AIE (m)
-with st.expander('Box Plot - AIE (m)', expanded=False):
-    dados = df_filtrado['media_AIE_m'].dropna()
-    media = dados.mean()
-    fig = go.Figure()
-    fig.add_trace(go.Box(
-        x=dados,
-        name='AIE (m)',
-        marker_color='#0070C0',
-        boxmean=False,
-        boxpoints='outliers',
-        line=dict(color='#0070C0')
-    ))
-    # Adiciona a média como ponto vermelho
-    fig.add_trace(go.Scatter(
-        x=[media],
-        y=['AIE (m)'],
-        mode='markers+text',
-        marker=dict(color='red', size=14, symbol='diamond'),
-        text=[f"Média: {media:.2f}"],
-        textposition='top right',
-        textfont=dict(color='red', size=16),
-        showlegend=False
-    ))
-    fig.update_layout(
-        title='Box Plot do AIE (m)',
-        xaxis_title='AIE (m)',
-        plot_bgcolor='#f5f7fa',
-        xaxis=dict(
-            title_font=dict(size=18, color='black'),
-            tickfont=dict(size=16, color='black')
-        ),
-        yaxis=dict(
-            tickfont=dict(size=16, color='black')
-        ),
-        showlegend=False
-    )
-    st.plotly_chart(fig, use_container_width=True)
-
-# Expander para Box Plot - ALT (m)
-with st.expander('Box Plot - ALT (m)', expanded=False):
-    dados = df_filtrado['media_ALT_m'].dropna()
-    media = dados.mean()
-    fig = go.Figure()
-    fig.add_trace(go.Box(
-        x=dados,
-        name='ALT (m)',
-        marker_color='#0070C0',
-        boxmean=False,
-        boxpoints='outliers',
-        line=dict(color='#0070C0')
-    ))
-    # Adiciona a média como ponto vermelho
-    fig.add_trace(go.Scatter(
-        x=[media],
-        y=['ALT (m)'],
-        mode='markers+text',
-        marker=dict(color='red', size=14, symbol='diamond'),
-        text=[f"Média: {media:.2f}"],
-        textposition='top right',
-        textfont=dict(color='red', size=16),
-        showlegend=False
-    ))
-    fig.update_layout(
-        title='Box Plot da ALT (m)',
-        xaxis_title='ALT (m)',
-        plot_bgcolor='#f5f7fa',
-        xaxis=dict(
-            title_font=dict(size=18, color='black'),
-            tickfont=dict(size=16, color='black')
-        ),
-        yaxis=dict(
-            tickfont=dict(size=16, color='black')
-        ),
-        showlegend=False
-    )
-    st.plotly_chart(fig, use_container_width=True)
+# Box plots
+for coluna, rotulo, _, casas, _, titulo_box in GRAFICOS_DISTRIBUICAO:
+    if titulo_box is None:
+        continue
+    with st.expander(f'Box Plot - {rotulo}', expanded=False):
+        fig = memoizar(chave, f"box_plot_{coluna}",
+                       lambda: montar_box_plot(coluna, rotulo, casas, titulo_box))
+        st.plotly_chart(fig, use_container_width=True)
 
-# Expander para Box Plot - PMG@13.5% (g)
-with st.expander('Box Plot - PMG@13.5% (g)', expanded=False):
-    dados = df_filtrado['corr_PMG'].dropna()
-    media = dados.mean()
-    fig = go.Figure()
-    fig.add_trace(go.Box(
-        x=dados,
-        name='PMG@13.5% (g)',
-        marker_color='#0070C0',
-        boxmean=False,
-        boxpoints='outliers',
-        line=dict(color='#0070C0')
-    ))
-    # Adiciona a média como ponto vermelho
-    fig.add_trace(go.Scatter(
-        x=[media],
-        y=['PMG@13.5% (g)'],
-        mode='markers+text',
-        marker=dict(color='red', size=14, symbol='diamond'),
-        text=[f"Média: {media:.2f}"],
-        textposition='top right',
-        textfont=dict(color='red', size=16),
-        showlegend=False
-    ))
-    fig.update_layout(
-        title='Box Plot do PMG@13.5% (g)',
-        xaxis_title='PMG@13.5% (g)',
-        plot_bgcolor='#f5f7fa',
-        xaxis=dict(
-            title_font=dict(size=18, color='black'),
-            tickfont=dict(size=16, color='black')
-        ),
-        yaxis=dict(
-            tickfont=dict(size=16, color='black')
-        ),
-        showlegend=False
-    )
-    st.plotly_chart(fig, use_container_width=True)
-
-# Expander para Box Plot - Num Fileiras
-with st.expander('Box Plot - Num Fileiras', expanded=False):
-    dados = df_filtrado['media_NumFileiras'].dropna()
-    media = dados.mean()
-    fig = go.Figure()
-    fig.add_trace(go.Box(
-        x=dados,
-        name='Num Fileiras',
-        marker_color='#0070C0',
-        boxmean=False,
-        boxpoints='outliers',
-        line=dict(color='#0070C0')
-    ))
-    # Adiciona a média como ponto vermelho
-    fig.add_trace(go.Scatter(
-        x=[media],
-        y=['Num Fileiras'],
-        mode='markers+text',
-        marker=dict(color='red', size=14, symbol='diamond'),
-        text=[f"Média: {media:.2f}"],
-        textposition='top right',
-        textfont=dict(color='red', size=16),
-        showlegend=False
-    ))
-    fig.update_layout(
-        title='Box Plot do Número de Fileiras',
-        xaxis_title='Num Fileiras',
-        plot_bgcolor='#f5f7fa',
-        xaxis=dict(
-            title_font=dict(size=18, color='black'),
-            tickfont=dict(size=16, color='black')
-        ),
-        yaxis=dict(
-            tickfont=dict(size=16, color='black')
-        ),
-        showlegend=False
-    )
-    st.plotly_chart(fig, use_container_width=True)
-
-# Expander para Box Plot - Num Grãos/Fileira
-with st.expander('Box Plot - Num Grãos/Fileira', expanded=False):
-    dados = df_filtrado['media_NumGraosPorFileira'].dropna()
-    media = dados.mean()
-    fig = go.Figure()
-    fig.add_trace(go.Box(
-        x=dados,
-        name='Num Grãos/Fileira',
-        marker_color='#0070C0',
-        boxmean=False,
-        boxpoints='outliers',
-        line=dict(color='#0070C0')
-    ))
-    # Adiciona a média como ponto vermelho
-    fig.add_trace(go.Scatter(
-        x=[media],
-        y=['Num Grãos/Fileira'],
-        mode='markers+text',
-        marker=dict(color='red', size=14, symbol='diamond'),
-        text=[f"Média: {media:.2f}"],
-        textposition='top right',
-        textfont=dict(color='red', size=16),
-        showlegend=False
-    ))
-    fig.update_layout(
-        title='Box Plot do Número de Grãos por Fileira',
-        xaxis_title='Num Grãos/Fileira',
-        plot_bgcolor='#f5f7fa',
-        xaxis=dict(
-            title_font=dict(size=18, color='black'),
-            tickfont=dict(size=16, color='black')
-        ),
-        yaxis=dict(
-            tickfont=dict(size=16, color='black')
-        ),
-        showlegend=False
-    )
-    st.plotly_chart(fig, use_container_width=True)
-
-# Expander para Box Plot - Perda Total (%)
-with st.expander('Box Plot - Perda Total (%)', expanded=False):
-    dados = df_filtrado['perc_Total'].dropna()
-    media = dados.mean()
-    fig = go.Figure()
-    fig.add_trace(go.Box(
-        x=dados,
-        name='Perda Total (%)',
-        marker_color='#0070C0',
-        boxmean=False,
-        boxpoints='outliers',
-        line=dict(color='#0070C0')
-    ))
-    # Adiciona a média como ponto vermelho
-    fig.add_trace(go.Scatter(
-        x=[media],
-        y=['Perda Total (%)'],
-        mode='markers+text',
-        marker=dict(color='red', size=14, symbol='diamond'),
-        text=[f"Média: {media:.2f}"],
-        textposition='top right',
-        textfont=dict(color='red', size=16),
-        showlegend=False
-    ))
-    fig.update_layout(
-        title='Box Plot da Perda Total (%)',
-        xaxis_title='Perda Total (%)',
-        plot_bgcolor='#f5f7fa',
-        xaxis=dict(
-            title_font=dict(size=18, color='black'),
-            tickfont=dict(size=16, color='black')
-        ),
-        yaxis=dict(
-            tickfont=dict(size=16, color='black')
-        ),
-        showlegend=False
-    )
-    st.plotly_chart(fig, use_container_width=True)
+# =========================
+# Pacote com todas as tabelas exportáveis
+# =========================
+secao_pacote("01_Conjunta_Geral")
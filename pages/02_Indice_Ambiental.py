@@ -1,6 +1,11 @@
 import streamlit as st
+from data_processing.repositorio_dados import obter_dataframe
+from data_processing.formatacao import formatar_datas_br
+from data_processing.filtros_sidebar import filtrar_na_sidebar
+from data_processing.memoizacao import chave_pagina
+from data_processing.indice_ambiental import indice_ambiental, tabela_estabilidade
+from data_processing.exportacao import botao_excel, iniciar_pacote, secao_pacote
 import pandas as pd
-import io
 from st_aggrid import AgGrid, GridOptionsBuilder
 import numpy as np
 import plotly.express as px
@@ -37,54 +42,20 @@ st.markdown(
     unsafe_allow_html=True
 )
 
-# Verifica se o DataFrame tratado está disponível no session_state
-if "df_avTratamentoMilho" not in st.session_state:
+# Verifica se o DataFrame tratado está disponível no repositório compartilhado
+df_avTratamentoMilho = obter_dataframe("df_avTratamentoMilho")
+if df_avTratamentoMilho is None:
     st.error("O DataFrame de tratamento de milho não foi carregado. Volte para a página inicial e carregue os dados.")
     st.stop()
 
-# Usar o DataFrame tratado já pronto do session_state
-df_avTratamentoMilho = st.session_state["df_avTratamentoMilho"]
-
-filter_keys = [
-    ("macroRegiaoMilho", "Macro Região", "macro"),
-    ("conjuntaGeralMilhoSafrinha", "Conjunta Geral", "conjunta"),
-    ("subConjuntaMilhoSafrinha", "Sub Conjunta", "subconjunta"),
-    ("mrhMilho", "MRH", "mrh"),
-    ("regional", "Regional", "regional"),
-    ("siglaEstado", "Estado", "estado"),
-    ("nomeCidade", "Cidade", "cidade"),
-    ("nomeProdutor", "Produtor", "produtor"),
-    ("nomeFazenda", "Fazenda", "fazenda"),
-    ("nome", "Híbridos", "hibrido"),
-    ("displayName", "DTC Responsável", "responsavel"),
-]
-
-# Inicializa seleções no session_state
-for col, _, key in filter_keys:
-    if f"sel_{key}" not in st.session_state:
-        st.session_state[f"sel_{key}"] = []
-
 # =========================
 # Seleção de filtros
 # =========================
 
-with st.sidebar:
-    df_filtrado = df_avTratamentoMilho.copy()
-    for col, label, key in filter_keys:
-        options = sorted(
-            df_filtrado[col].dropna().unique(), key=lambda x: str(x))
-        # Limpa seleções inválidas
-        st.session_state[f"sel_{key}"] = [
-            v for v in st.session_state[f"sel_{key}"] if v in options]
-        selecionadas = []
-        with st.expander(label, expanded=False):
-            for opt in options:
-                checked = opt in st.session_state[f"sel_{key}"]
-                if st.checkbox(opt, value=checked, key=f"{key}_{opt}"):
-                    selecionadas.append(opt)
-        st.session_state[f"sel_{key}"] = selecionadas
-        if selecionadas:
-            df_filtrado = df_filtrado[df_filtrado[col].isin(selecionadas)]
+df_filtrado = filtrar_na_sidebar("df_avTratamentoMilho", df_avTratamentoMilho)
+chave = chave_pagina("02_Indice_Ambiental")
+
+iniciar_pacote("02_Indice_Ambiental")
 
 # =========================
 # Criação do DataFrame principal de análise
@@ -137,17 +108,15 @@ df_analise_conjunta_visualizacao = df_analise_conjunta[colunas_existentes].renam
 # Exibe o DataFrame filtrado original
 titulo_expander = "Dados Originais - Análise Conjunta da Produção e Componentes de Produção"
 with st.expander(titulo_expander, expanded=False):
-    st.dataframe(df_filtrado, use_container_width=True)
+    st.dataframe(formatar_datas_br(df_filtrado), use_container_width=True)
 
     # Botão para exportar em Excel o DataFrame filtrado original
-    buffer_filtro = io.BytesIO()
-    df_filtrado.to_excel(buffer_filtro, index=False)  # type: ignore
-    buffer_filtro.seek(0)
-    st.download_button(
+    botao_excel(
         label="⬇️ Baixar Excel (dados originais - análise conjunta)",
-        data=buffer_filtro,
-        file_name="dados_originais_analise_conjunta.xlsx",
-        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        dados=df_filtrado,
+        chave=chave,
+        formatar_datas=True,
+        file_name="dados_originais_analise_conjunta.xlsx"
     )
 
 # =========================
@@ -249,15 +218,10 @@ with st.expander("Ver tabela de Produção e Componentes Produtivos", expanded=F
     )
 
     # Botão para exportar em Excel o DataFrame customizado
-    buffer = io.BytesIO()
-    df_analise_conjunta_visualizacao.to_excel(
-        buffer, index=False)  # type: ignore
-    buffer.seek(0)
-    st.download_button(
+    botao_excel(
         label="⬇️ Baixar Excel (Produção e Componentes Produtivos)",
-        data=buffer,
-        file_name="producao_componentes.xlsx",
-        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        dados=df_analise_conjunta_visualizacao,
+        file_name="producao_componentes.xlsx"
     )
 
 # =========================
@@ -294,14 +258,14 @@ df_analise_conjunta[colunas_numericas] = df_analise_conjunta[colunas_numericas].
 # Realiza o agrupamento e calcula a média das colunas numéricas
 df_analise_conjunta_agrupado = (
     df_analise_conjunta
-    .groupby(group_cols, as_index=False)[colunas_numericas]
+    .groupby(group_cols, as_index=False, observed=True)[colunas_numericas]
     .mean()
 )
 
 # Recupera o nome do híbrido para cada (fazendaRef, indexTratamentoAgrupado)
 df_nome = (
     df_analise_conjunta
-    .groupby(['fazendaRef', 'indexTratamentoAgrupado'])['nome']
+    .groupby(['fazendaRef', 'indexTratamentoAgrupado'], observed=True)['nome']
     .first()
     .reset_index()
 )
@@ -421,15 +385,10 @@ with st.expander("Ver tabela de Dados Conjuntos por Híbrido", expanded=False):
     )
 
     # Botão para exportar em Excel o DataFrame agrupado customizado
-    buffer_agrupado_vis = io.BytesIO()
-    df_analise_conjunta_agrupado_visualizacao.to_excel(
-        buffer_agrupado_vis, index=False)  # type: ignore
-    buffer_agrupado_vis.seek(0)
-    st.download_button(
+    botao_excel(
         label="⬇️ Baixar Excel (Resumo da Conjunta de Produção)",
-        data=buffer_agrupado_vis,
-        file_name="conjunta_producao.xlsx",
-        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        dados=df_analise_conjunta_agrupado_visualizacao,
+        file_name="conjunta_producao.xlsx"
     )
 
 # =========================
@@ -453,15 +412,12 @@ st.markdown(
     unsafe_allow_html=True
 )
 
-# Calcula a média de produção por local (fazendaRef) - NÃO AGRUPADO
-media_local_nao_agrupado = df_analise_conjunta.groupby(
-    'fazendaRef')['prod_sc_ha_corr'].mean().reset_index()
-media_local_nao_agrupado = media_local_nao_agrupado.rename(
-    columns={'prod_sc_ha_corr': 'media_local_sc_ha'})
+# Médias dos locais e retas de todos os híbridos numa única passada (em cache pelos dados filtrados) - NÃO AGRUPADO
+indice_nao_agrupado = indice_ambiental(df_analise_conjunta)
 
 # Junta a média de cada local ao DataFrame principal - NÃO AGRUPADO
 df_indice_ambiental_nao_agrupado = df_analise_conjunta.merge(
-    media_local_nao_agrupado, on='fazendaRef', how='left')
+    indice_nao_agrupado['medias_locais'][['fazendaRef', 'media_local_sc_ha']], on='fazendaRef', how='left')
 
 # Gráfico NÃO AGRUPADO
 fig_nao_agrupado = px.scatter(
@@ -498,16 +454,14 @@ for i, hibrido in enumerate(hibridos_nao_agrupado):
                 cor = px.colors.qualitative.Plotly[i % len(
                     px.colors.qualitative.Plotly)]
             cores_nao_agrupado[hibrido] = cor
+ajustes_nao_agrupado = indice_nao_agrupado['ajustes']
 for hibrido in hibridos_nao_agrupado:
-    dados_hibrido = df_indice_ambiental_nao_agrupado[df_indice_ambiental_nao_agrupado['nome'] == hibrido]
-    x = dados_hibrido['media_local_sc_ha']
-    y = dados_hibrido['prod_sc_ha_corr']
-    mask = pd.notnull(x) & pd.notnull(y)
-    if mask.sum() > 1:
-        coef = np.polyfit(x[mask], y[mask], 1)
-        x_fit = np.linspace(x[mask].min(), x[mask].max(), 100)
-        y_fit = coef[0] * x_fit + coef[1]
-        import plotly.graph_objects as go
+    if hibrido not in ajustes_nao_agrupado.index:
+        continue
+    ajuste = ajustes_nao_agrupado.loc[hibrido]
+    if pd.notnull(ajuste['inclinacao']):
+        x_fit = np.array([ajuste['x_min'], ajuste['x_max']])
+        y_fit = ajuste['intercepto'] + ajuste['inclinacao'] * x_fit
         fig_nao_agrupado.add_trace(go.Scatter(
             x=x_fit,
             y=y_fit,
@@ -533,6 +487,13 @@ fig_nao_agrupado.update_layout(
 )
 st.plotly_chart(fig_nao_agrupado, use_container_width=True)
 
+with st.expander("Adaptabilidade e estabilidade por híbrido (todas parcelas)", expanded=False):
+    st.caption(
+        "Inclinação (b) da reta de Finlay-Wilkinson / Eberhart-Russell: b > 1 indica resposta acima da média "
+        "à melhoria do ambiente, b < 1 maior estabilidade em ambientes desfavoráveis. O p-valor testa b = 1; "
+        "R² e a variância residual (s²d) medem a previsibilidade do híbrido.")
+    st.dataframe(tabela_estabilidade(ajustes_nao_agrupado), hide_index=True, use_container_width=True)
+
 # =========================
 # Tabela: Produção x Média do Local x Diferença (absoluta e relativa) - NÃO AGRUPADO
 # =========================
@@ -642,15 +603,10 @@ with st.expander("Ver tabela detalhada por híbrido/local (todas parcelas)", exp
         custom_css=custom_css,
         key="aggrid_indice_ambiental_detalhado_nao_agrupado_static"
     )
-    buffer_tabela_nao_agrupado = io.BytesIO()
-    df_tabela_indice_nao_agrupado.to_excel(
-        buffer_tabela_nao_agrupado, index=False, engine='xlsxwriter')  # type: ignore
-    buffer_tabela_nao_agrupado.seek(0)
-    st.download_button(
+    botao_excel(
         label="⬇️ Baixar Excel (Índice Ambiental - Diferenças - Todas parcelas)",
-        data=buffer_tabela_nao_agrupado,
-        file_name="indice_ambiental_diferencas_todas_parcelas.xlsx",
-        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        dados=df_tabela_indice_nao_agrupado,
+        file_name="indice_ambiental_diferencas_todas_parcelas.xlsx"
     )
     # Tabela resumo por híbrido (médias) - NÃO AGRUPADO
     st.markdown(
@@ -677,7 +633,7 @@ with st.expander("Ver tabela detalhada por híbrido/local (todas parcelas)", exp
     df_tabela_media_nao_agrupado['Diferença Relativa (%)'] = 100 * \
         df_tabela_media_nao_agrupado['Diferença Absoluta (sc/ha)'] / \
         df_tabela_media_nao_agrupado['media_local_sc_ha']
-    resumo_hibrido_nao_agrupado = df_tabela_media_nao_agrupado.groupby('nome').agg({
+    resumo_hibrido_nao_agrupado = df_tabela_media_nao_agrupado.groupby('nome', observed=True).agg({
         'Diferença Absoluta (sc/ha)': 'mean',
         'Diferença Relativa (%)': 'mean'
     }).reset_index()
@@ -712,16 +668,11 @@ with st.expander("Ver tabela detalhada por híbrido/local (todas parcelas)", exp
         custom_css=custom_css,
         key="aggrid_resumo_hibrido_nao_agrupado"
     )
-    buffer_resumo_nao_agrupado = io.BytesIO()
-    resumo_hibrido_nao_agrupado.to_excel(buffer_resumo_nao_agrupado, index=False,
-                                         engine='xlsxwriter')  # type: ignore
-    buffer_resumo_nao_agrupado.seek(0)
-    st.download_button(
+    botao_excel(
         label="⬇️ Baixar Excel (Resumo por Híbrido - Todas parcelas)",
-        data=buffer_resumo_nao_agrupado,
-        file_name="resumo_diferencas_por_hibrido_todas_parcelas.xlsx",
-        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-    )  # type: ignore
+        dados=resumo_hibrido_nao_agrupado,
+        file_name="resumo_diferencas_por_hibrido_todas_parcelas.xlsx"
+    )
 
 # =========================
 # Gráfico de Índice Ambiental Agrupado (MÉDIA DAS PARCELAS)
@@ -744,15 +695,12 @@ st.markdown(
     unsafe_allow_html=True
 )
 
-# Calcula a média de produção por local (fazendaRef)
-media_local = df_analise_conjunta_agrupado.groupby(
-    'fazendaRef')['prod_sc_ha_corr'].mean().reset_index()
-media_local = media_local.rename(
-    columns={'prod_sc_ha_corr': 'media_local_sc_ha'})
+# Médias dos locais e retas de todos os híbridos numa única passada (em cache pelos dados filtrados)
+indice_agrupado = indice_ambiental(df_analise_conjunta_agrupado)
 
 # Junta a média de cada local ao DataFrame principal
 df_indice_ambiental = df_analise_conjunta_agrupado.merge(
-    media_local, on='fazendaRef', how='left')
+    indice_agrupado['medias_locais'][['fazendaRef', 'media_local_sc_ha']], on='fazendaRef', how='left')
 
 # Gráfico
 fig = px.scatter(
@@ -795,16 +743,14 @@ for i, hibrido in enumerate(hibridos):
                 cor = px.colors.qualitative.Plotly[i % len(
                     px.colors.qualitative.Plotly)]
             cores[hibrido] = cor
+ajustes_agrupado = indice_agrupado['ajustes']
 for hibrido in hibridos:
-    dados_hibrido = df_indice_ambiental[df_indice_ambiental['nome'] == hibrido]
-    x = dados_hibrido['media_local_sc_ha']
-    y = dados_hibrido['prod_sc_ha_corr']
-    mask = pd.notnull(x) & pd.notnull(y)
-    if mask.sum() > 1:
-        coef = np.polyfit(x[mask], y[mask], 1)
-        x_fit = np.linspace(x[mask].min(), x[mask].max(), 100)
-        y_fit = coef[0] * x_fit + coef[1]
-        import plotly.graph_objects as go
+    if hibrido not in ajustes_agrupado.index:
+        continue
+    ajuste = ajustes_agrupado.loc[hibrido]
+    if pd.notnull(ajuste['inclinacao']):
+        x_fit = np.array([ajuste['x_min'], ajuste['x_max']])
+        y_fit = ajuste['intercepto'] + ajuste['inclinacao'] * x_fit
         fig.add_trace(go.Scatter(
             x=x_fit,
             y=y_fit,
@@ -829,6 +775,13 @@ fig.update_layout(
 )
 st.plotly_chart(fig, use_container_width=True, key='indice_ambiental_agrupado')
 
+with st.expander("Adaptabilidade e estabilidade por híbrido (agrupado)", expanded=False):
+    st.caption(
+        "Inclinação (b) da reta de Finlay-Wilkinson / Eberhart-Russell: b > 1 indica resposta acima da média "
+        "à melhoria do ambiente, b < 1 maior estabilidade em ambientes desfavoráveis. O p-valor testa b = 1; "
+        "R² e a variância residual (s²d) medem a previsibilidade do híbrido.")
+    st.dataframe(tabela_estabilidade(ajustes_agrupado), hide_index=True, use_container_width=True)
+
 # =========================
 # Tabela: Produção x Média do Local x Diferença (absoluta e relativa) - AGRUPADO
 # =========================
@@ -943,15 +896,10 @@ with st.expander("Ver tabela detalhada por híbrido/local (agrupado)", expanded=
         key="aggrid_indice_ambiental_detalhado_agrupado_static"
     )
     # Botão para exportar a tabela detalhada agrupada
-    buffer_tabela_agrupado = io.BytesIO()
-    df_tabela_indice_agrupado.to_excel(
-        buffer_tabela_agrupado, index=False, engine='xlsxwriter')  # type: ignore
-    buffer_tabela_agrupado.seek(0)
-    st.download_button(
+    botao_excel(
         label="⬇️ Baixar Excel (Índice Ambiental Agrupado - Diferenças)",
-        data=buffer_tabela_agrupado,
-        file_name="indice_ambiental_agrupado_diferencas.xlsx",
-        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        dados=df_tabela_indice_agrupado,
+        file_name="indice_ambiental_agrupado_diferencas.xlsx"
     )
 
     # Exibe a tabela transposta em um novo expander
@@ -994,7 +942,7 @@ with st.expander("Ver tabela detalhada por híbrido/local (agrupado)", expanded=
         df_tabela_media_agrupado['media_local_sc_ha']
     df_tabela_media_agrupado['Diferença Relativa (%)'] = 100 * df_tabela_media_agrupado['Diferença Absoluta (sc/ha)'] / \
         df_tabela_media_agrupado['media_local_sc_ha']
-    resumo_hibrido_agrupado = df_tabela_media_agrupado.groupby('nome').agg({
+    resumo_hibrido_agrupado = df_tabela_media_agrupado.groupby('nome', observed=True).agg({
         'Diferença Absoluta (sc/ha)': 'mean',
         'Diferença Relativa (%)': 'mean'
     }).reset_index()
@@ -1031,13 +979,13 @@ with st.expander("Ver tabela detalhada por híbrido/local (agrupado)", expanded=
         key="aggrid_resumo_hibrido_agrupado"
     )
     # Botão para exportar a tabela resumo por híbrido agrupado
-    buffer_resumo_agrupado = io.BytesIO()
-    resumo_hibrido_agrupado.to_excel(
-        buffer_resumo_agrupado, index=False, engine='xlsxwriter')  # type: ignore
-    buffer_resumo_agrupado.seek(0)
-    st.download_button(
+    botao_excel(
         label="⬇️ Baixar Excel (Resumo por Híbrido - Agrupado)",
-        data=buffer_resumo_agrupado,
-        file_name="resumo_diferencas_por_hibrido_agrupado.xlsx",
-        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        dados=resumo_hibrido_agrupado,
+        file_name="resumo_diferencas_por_hibrido_agrupado.xlsx"
     )
+
+# =========================
+# Pacote com todas as tabelas exportáveis
+# =========================
+secao_pacote("02_Indice_Ambiental")
@@ -1,6 +1,10 @@
 import streamlit as st
+from data_processing.repositorio_dados import obter_dataframe
+from data_processing.formatacao import formatar_datas_br
+from data_processing.filtros_sidebar import filtrar_na_sidebar
+from data_processing.memoizacao import chave_pagina
+from data_processing.exportacao import botao_excel, iniciar_pacote, secao_pacote
 import pandas as pd
-import io
 from st_aggrid import AgGrid, GridOptionsBuilder
 import numpy as np
 import plotly.express as px
@@ -92,58 +96,20 @@ st.markdown(
     unsafe_allow_html=True
 )
 
-# Verifica se o DataFrame tratado está disponível no session_state
-if "df_avTratamentoMilho" not in st.session_state:
+# Verifica se o DataFrame tratado está disponível no repositório compartilhado
+df_avTratamentoMilho = obter_dataframe("df_avTratamentoMilho")
+if df_avTratamentoMilho is None:
     st.error("O DataFrame de tratamento de milho não foi carregado. Volte para a página inicial e carregue os dados.")
     st.stop()
 
-# Usar o DataFrame tratado já pronto do session_state
-df_avTratamentoMilho = st.session_state["df_avTratamentoMilho"]
-
-filter_keys = [
-    ("macroRegiaoMilho", "Macro Região", "macro"),
-    ("conjuntaGeralMilhoSafrinha", "Conjunta Geral", "conjunta"),
-    ("subConjuntaMilhoSafrinha", "Sub Conjunta", "subconjunta"),
-    ("mrhMilho", "MRH", "mrh"),
-    ("regional", "Regional", "regional"),
-    ("siglaEstado", "Estado", "estado"),
-    ("nomeCidade", "Cidade", "cidade"),
-    ("nomeProdutor", "Produtor", "produtor"),
-    ("nomeFazenda", "Fazenda", "fazenda"),
-    ("nome", "Híbridos", "hibrido"),
-    ("displayName", "DTC Responsável", "responsavel"),
-]
-
-# Inicializa seleções no session_state
-for col, _, key in filter_keys:
-    if f"sel_{key}" not in st.session_state:
-        st.session_state[f"sel_{key}"] = []
-
 # =========================
 # Seleção de filtros
 # =========================
 
-with st.sidebar:
-    df_filtrado = df_avTratamentoMilho.copy()
-    for col, label, key in filter_keys:
-        options = sorted(
-            df_filtrado[col].dropna().unique(), key=lambda x: str(x))
-        # Limpa seleções inválidas
-        st.session_state[f"sel_{key}"] = [
-            v for v in st.session_state[f"sel_{key}"] if v in options]
-        selecionadas = []
-        with st.expander(label, expanded=False):
-            for opt in options:
-                checked = opt in st.session_state[f"sel_{key}"]
-                if st.checkbox(opt, value=checked, key=f"{key}_{opt}"):
-                    selecionadas.append(opt)
-        st.session_state[f"sel_{key}"] = selecionadas
-        if selecionadas:
-            df_filtrado = df_filtrado[df_filtrado[col].isin(selecionadas)]
-
-    # NOVO: Se todos os filtros estiverem vazios, mostra todos os dados
-    if all(len(st.session_state[f"sel_{key}"]) == 0 for _, _, key in filter_keys):
-        df_filtrado = df_avTratamentoMilho.copy()
+df_filtrado = filtrar_na_sidebar("df_avTratamentoMilho", df_avTratamentoMilho)
+chave = chave_pagina("03_Frequencia_de_Resposta")
+
+iniciar_pacote("03_Frequencia_de_Resposta")
 
 # =========================
 # Criação do DataFrame principal de análise
@@ -197,20 +163,17 @@ df_analise_conjunta_visualizacao = df_analise_conjunta[colunas_existentes].renam
 titulo_expander = "Dados Originais - Análise Conjunta da Produção e Componentes de Produção"
 with st.expander(titulo_expander, expanded=False):
     if not df_filtrado.empty:
-        st.dataframe(df_filtrado, use_container_width=True)
+        st.dataframe(formatar_datas_br(df_filtrado), use_container_width=True)
     else:
         st.info("Nenhum dado disponível para exibir.")
 
     # Botão para exportar em Excel o DataFrame filtrado original
-    buffer_filtro = io.BytesIO()
-    df_filtrado.to_excel(buffer_filtro, index=False,
-                         engine='xlsxwriter')  # type: ignore
-    buffer_filtro.seek(0)
-    st.download_button(
+    botao_excel(
         label="⬇️ Baixar Excel (dados originais - análise conjunta)",
-        data=buffer_filtro,
-        file_name="dados_originais_analise_conjunta.xlsx",
-        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        dados=df_filtrado,
+        chave=chave,
+        formatar_datas=True,
+        file_name="dados_originais_analise_conjunta.xlsx"
     )
 
 # =========================
@@ -315,15 +278,10 @@ with st.expander("Ver tabela de Produção e Componentes Produtivos", expanded=F
     )
 
     # Botão para exportar em Excel o DataFrame customizado
-    buffer = io.BytesIO()
-    df_analise_conjunta_visualizacao.to_excel(
-        buffer, index=False, engine='xlsxwriter')  # type: ignore
-    buffer.seek(0)
-    st.download_button(
+    botao_excel(
         label="⬇️ Baixar Excel (Produção e Componentes Produtivos)",
-        data=buffer,
-        file_name="producao_componentes.xlsx",
-        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        dados=df_analise_conjunta_visualizacao,
+        file_name="producao_componentes.xlsx"
     )
 # =========================
 # Agrupamento por fazendaRef e pares de indexTratamento
@@ -359,14 +317,14 @@ df_analise_conjunta[colunas_numericas] = df_analise_conjunta[colunas_numericas].
 # Realiza o agrupamento e calcula a média das colunas numéricas
 df_analise_conjunta_agrupado = (
     df_analise_conjunta
-    .groupby(group_cols, as_index=False)[colunas_numericas]
+    .groupby(group_cols, as_index=False, observed=True)[colunas_numericas]
     .mean()
 )
 
 # Recupera o nome do híbrido para cada (fazendaRef, indexTratamentoAgrupado)
 df_nome = (
     df_analise_conjunta
-    .groupby(['fazendaRef', 'indexTratamentoAgrupado'])['nome']
+    .groupby(['fazendaRef', 'indexTratamentoAgrupado'], observed=True)['nome']
     .first()
     .reset_index()
 )
@@ -491,15 +449,10 @@ with st.expander("Ver tabela de Dados Conjuntos por Híbrido", expanded=False):
         st.info("Nenhum dado disponível para exibir na tabela.")
 
     # Botão para exportar em Excel o DataFrame agrupado customizado
-    buffer_agrupado_vis = io.BytesIO()
-    df_analise_conjunta_agrupado_visualizacao.to_excel(
-        buffer_agrupado_vis, index=False, engine='xlsxwriter')  # type: ignore
-    buffer_agrupado_vis.seek(0)
-    st.download_button(
+    botao_excel(
         label="⬇️ Baixar Excel (Resumo da Conjunta de Produção)",
-        data=buffer_agrupado_vis,
-        file_name="conjunta_producao.xlsx",
-        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        dados=df_analise_conjunta_agrupado_visualizacao,
+        file_name="conjunta_producao.xlsx"
     )
 
 
@@ -522,13 +475,13 @@ else:
 if all(col in df_analise_conjunta.columns for col in ['fazendaRef', 'indexTratamentoAgrupado', 'prod_sc_ha_corr']):
     df_frequencia = (
         df_analise_conjunta
-        .groupby(['fazendaRef', 'indexTratamentoAgrupado'], as_index=False)
+        .groupby(['fazendaRef', 'indexTratamentoAgrupado'], as_index=False, observed=True)
         .agg({'prod_sc_ha_corr': 'mean'})
     )
     # Recupera o nome do híbrido para cada par (fazendaRef, indexTratamentoAgrupado)
     df_nome = (
         df_analise_conjunta
-        .groupby(['fazendaRef', 'indexTratamentoAgrupado'])['nome']
+        .groupby(['fazendaRef', 'indexTratamentoAgrupado'], observed=True)['nome']
         .first()
         .reset_index()
     )
@@ -536,7 +489,7 @@ if all(col in df_analise_conjunta.columns for col in ['fazendaRef', 'indexTratam
     if 'nomeFazenda' in df_analise_conjunta.columns:
         df_fazenda = (
             df_analise_conjunta
-            .groupby('fazendaRef')['nomeFazenda']
+            .groupby('fazendaRef', observed=True)['nomeFazenda']
             .first()
             .reset_index()
         )
@@ -570,7 +523,7 @@ if all(col in df_analise_conjunta.columns for col in ['fazendaRef', 'indexTratam
     if not df_frequencia.empty:
         # O nome da coluna de produção é 'Prod@13.5% (sc/ha)'
         df_frequencia['Prod_max_fazenda'] = df_frequencia.groupby(
-            'fazendaRef')['Prod@13.5% (sc/ha)'].transform('max')
+            'fazendaRef', observed=True)['Prod@13.5% (sc/ha)'].transform('max')
         df_frequencia['Diferença p/ Máx'] = df_frequencia['Prod_max_fazenda'] - \
             df_frequencia['Prod@13.5% (sc/ha)']
         df_frequencia['Prod Rel (%)'] = (
@@ -584,18 +537,18 @@ if all(col in df_analise_conjunta.columns for col in ['fazendaRef', 'indexTratam
 
         # Calcula o ranking global de cada híbrido dentro de cada fazenda
         _df_ranking_global = (
-            st.session_state["df_avTratamentoMilho"].copy()
+            df_avTratamentoMilho
             .assign(indexTratamentoAgrupado=lambda df: df['indexTratamento'].apply(agrupa_index))
-            .groupby(['fazendaRef', 'indexTratamentoAgrupado'])['prod_sc_ha_corr']
+            .groupby(['fazendaRef', 'indexTratamentoAgrupado'], observed=True)['prod_sc_ha_corr']
             .mean()
             .reset_index()
         )
         _df_ranking_global['Prod_max_fazenda'] = _df_ranking_global.groupby(
-            'fazendaRef')['prod_sc_ha_corr'].transform('max')
+            'fazendaRef', observed=True)['prod_sc_ha_corr'].transform('max')
         _df_ranking_global['Prod Rel (%)'] = (
             _df_ranking_global['prod_sc_ha_corr'] / _df_ranking_global['Prod_max_fazenda'] * 100).round(1)
         _df_ranking_global['Ranking_global'] = _df_ranking_global.groupby(
-            'fazendaRef')['Prod Rel (%)'].rank(ascending=False, method='min').astype('Int64')
+            'fazendaRef', observed=True)['Prod Rel (%)'].rank(ascending=False, method='min').astype('Int64')
         _df_ranking_global = _df_ranking_global[[
             'fazendaRef', 'indexTratamentoAgrupado', 'Ranking_global']]
         # Junta o ranking global fixo
@@ -627,7 +580,7 @@ if all(col in df_analise_conjunta.columns for col in ['fazendaRef', 'indexTratam
     if isinstance(df_frequencia, pd.DataFrame) and not df_frequencia.empty:
         freq_ranking = (
             df_frequencia
-            .groupby(['Híbrido', 'Ranking'])
+            .groupby(['Híbrido', 'Ranking'], observed=True)
             .size()
             .reset_index()
             .rename(columns={0: 'Frequência'})
@@ -748,7 +701,7 @@ if isinstance(df_frequencia, pd.DataFrame) and not df_frequencia.empty and all(c
     """, unsafe_allow_html=True)
     # Pivot para formato de matriz, usando média para resolver duplicidade
     df_heatmap = df_frequencia.pivot_table(
-        index='Fazenda', columns='Híbrido', values='Prod Rel (%)', aggfunc='mean'
+        index='Fazenda', columns='Híbrido', values='Prod Rel (%)', aggfunc='mean', observed=True
     )
 
     # Dicionário e funções auxiliares para este heatmap (produção relativa)
@@ -937,16 +890,10 @@ if df_frequencia_visualizacao is not None and not df_frequencia_visualizacao.emp
     )
 
     # Botão para exportar em Excel
-    buffer_freq_vis = io.BytesIO()
-    # type: ignore
-    df_frequencia_visualizacao.to_excel(
-        buffer_freq_vis, index=False, engine='xlsxwriter')  # type: ignore
-    buffer_freq_vis.seek(0)
-    st.download_button(
+    botao_excel(
         label='⬇️ Baixar Excel (Tabela Frequência Visualização)',
-        data=buffer_freq_vis,
-        file_name='frequencia_visualizacao.xlsx',
-        mime='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+        dados=df_frequencia_visualizacao,
+        file_name='frequencia_visualizacao.xlsx'
     )
 else:
     st.info("Nenhum dado disponível para exibir na tabela. Ajuste os filtros ou carregue os dados.")
@@ -970,7 +917,7 @@ if isinstance(df_frequencia, pd.DataFrame) and not df_frequencia.empty and all(c
     </div>
     """, unsafe_allow_html=True)
     df_heatmap_ranking = df_frequencia.pivot_table(
-        index='Fazenda', columns='Híbrido', values='Ranking', aggfunc='min'
+        index='Fazenda', columns='Híbrido', values='Ranking', aggfunc='min', observed=True
     )
     # Dicionário e funções auxiliares para este heatmap (ranking)
     import unicodedata
@@ -1067,3 +1014,8 @@ if isinstance(df_frequencia, pd.DataFrame) and not df_frequencia.empty and all(c
     fig.update_traces(textfont=dict(
         size=14, family="Arial Black, Arial, sans-serif", color="black"))
     st.plotly_chart(fig, use_container_width=True)
+
+# =========================
+# Pacote com todas as tabelas exportáveis
+# =========================
+secao_pacote("03_Frequencia_de_Resposta")
@@ -1,7 +1,11 @@
 from plotly.colors import n_colors
 import streamlit as st
+from data_processing.repositorio_dados import obter_dataframe
+from data_processing.formatacao import formatar_datas_br
+from data_processing.filtros_sidebar import filtrar_na_sidebar
+from data_processing.memoizacao import chave_pagina, memoizar
+from data_processing.exportacao import botao_excel, iniciar_pacote, secao_pacote
 import pandas as pd
-import io
 from st_aggrid import AgGrid, GridOptionsBuilder
 import numpy as np
 import plotly.express as px
@@ -37,54 +41,22 @@ st.markdown(
     unsafe_allow_html=True
 )
 
-# Verifica se o DataFrame tratado está disponível no session_state
-if "df_avTratamentoMilho" not in st.session_state:
+# Verifica se o DataFrame tratado está disponível no repositório compartilhado
+df_avTratamentoMilho = obter_dataframe("df_avTratamentoMilho")
+if df_avTratamentoMilho is None:
     st.error("O DataFrame de tratamento de milho não foi carregado. Volte para a página inicial e carregue os dados.")
     st.stop()
 
-# Usar o DataFrame tratado já pronto do session_state
-df_avTratamentoMilho = st.session_state["df_avTratamentoMilho"]
-
-filter_keys = [
-    ("macroRegiaoMilho", "Macro Região", "macro"),
-    ("conjuntaGeralMilhoSafrinha", "Conjunta Geral", "conjunta"),
-    ("subConjuntaMilhoSafrinha", "Sub Conjunta", "subconjunta"),
-    ("mrhMilho", "MRH", "mrh"),
-    ("regional", "Regional", "regional"),
-    ("siglaEstado", "Estado", "estado"),
-    ("nomeCidade", "Cidade", "cidade"),
-    ("nomeProdutor", "Produtor", "produtor"),
-    ("nomeFazenda", "Fazenda", "fazenda"),
-    ("nome", "Híbridos", "hibrido"),
-    ("displayName", "DTC Responsável", "responsavel"),
-]
-
-# Inicializa seleções no session_state
-for col, _, key in filter_keys:
-    if f"sel_{key}" not in st.session_state:
-        st.session_state[f"sel_{key}"] = []
-
 # =========================
 # Seleção de filtros
 # =========================
 
-with st.sidebar:
-    df_filtrado = df_avTratamentoMilho.copy()
-    for col, label, key in filter_keys:
-        options = sorted(
-            df_filtrado[col].dropna().unique(), key=lambda x: str(x))
-        # Limpa seleções inválidas
-        st.session_state[f"sel_{key}"] = [
-            v for v in st.session_state[f"sel_{key}"] if v in options]
-        selecionadas = []
-        with st.expander(label, expanded=False):
-            for opt in options:
-                checked = opt in st.session_state[f"sel_{key}"]
-                if st.checkbox(opt, value=checked, key=f"{key}_{opt}"):
-                    selecionadas.append(opt)
-        st.session_state[f"sel_{key}"] = selecionadas
-        if selecionadas:
-            df_filtrado = df_filtrado[df_filtrado[col].isin(selecionadas)]
+df_filtrado = filtrar_na_sidebar("df_avTratamentoMilho", df_avTratamentoMilho)
+
+iniciar_pacote("05_Sanidade")
+
+# Chave da página (versão dos dados + filtros ativos) para os resultados compartilhados entre as seções
+chave = chave_pagina("05_Sanidade")
 
 # =========================
 # Criação do DataFrame principal de análise
@@ -135,17 +107,15 @@ df_analise_sanidade_visualizacao = df_analise_sanidade[colunas_existentes].renam
 # Exibe o DataFrame filtrado original
 titulo_expander = "Dados Originais - Análise Sanidade"
 with st.expander(titulo_expander, expanded=False):
-    st.dataframe(df_filtrado, use_container_width=True)
+    st.dataframe(formatar_datas_br(df_filtrado), use_container_width=True)
 
     # Botão para exportar em Excel o DataFrame filtrado original
-    buffer_filtro = io.BytesIO()
-    df_filtrado.to_excel(buffer_filtro, index=False)  # type: ignore
-    buffer_filtro.seek(0)
-    st.download_button(
+    botao_excel(
         label="⬇️ Baixar Excel (dados originais - análise conjunta)",
-        data=buffer_filtro,
-        file_name="dados_originais_analise_sanidade.xlsx",
-        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        dados=df_filtrado,
+        chave=chave,
+        formatar_datas=True,
+        file_name="dados_originais_analise_sanidade.xlsx"
     )
 
 # =========================
@@ -238,14 +208,10 @@ AgGrid(
 )
 
 # Botão para exportar em Excel o DataFrame customizado
-buffer = io.BytesIO()
-df_analise_sanidade_visualizacao.to_excel(buffer, index=False)  # type: ignore
-buffer.seek(0)
-st.download_button(
+botao_excel(
     label="⬇️ Baixar Excel (Sanidade)",
-    data=buffer,
-    file_name="sanidade.xlsx",
-    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    dados=df_analise_sanidade_visualizacao,
+    file_name="sanidade.xlsx"
 )
 
 # =========================
@@ -282,14 +248,14 @@ df_analise_sanidade[colunas_numericas] = df_analise_sanidade[colunas_numericas].
 # Realiza o agrupamento e calcula a média das colunas numéricas
 df_analise_sanidade_agrupado = (
     df_analise_sanidade
-    .groupby(group_cols, as_index=False)[colunas_numericas]
+    .groupby(group_cols, as_index=False, observed=True)[colunas_numericas]
     .mean()
 )
 
 # Recupera o nome do híbrido para cada (fazendaRef, indexTratamentoAgrupado)
 df_nome = (
     df_analise_sanidade
-    .groupby(['fazendaRef', 'indexTratamentoAgrupado'])['nome']
+    .groupby(['fazendaRef', 'indexTratamentoAgrupado'], observed=True)['nome']
     .first()
     .reset_index()
 )
@@ -402,15 +368,10 @@ AgGrid(
 )
 
 # Botão para exportar em Excel o DataFrame agrupado customizado
-buffer_agrupado_vis = io.BytesIO()
-df_analise_sanidade_agrupado_visualizacao.to_excel(
-    buffer_agrupado_vis, index=False)  # type: ignore
-buffer_agrupado_vis.seek(0)
-st.download_button(
+botao_excel(
     label="⬇️ Baixar Excel (Resumo da Sanidade)",
-    data=buffer_agrupado_vis,
-    file_name="resumo_sanidade.xlsx",
-    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    dados=df_analise_sanidade_agrupado_visualizacao,
+    file_name="resumo_sanidade.xlsx"
 )
 
 # st.markdown(
@@ -443,94 +404,103 @@ _opcoes_doencas = {
     "GS": "tombamentoVerde"
 }
 
-# Sidebar: filtro para resumo estatístico das doenças
-with st.sidebar:
-    with st.expander("Selecionar Doença para Conjunta", expanded=False):
-        doencas_selecionadas = []
-        for key, val in _opcoes_doencas.items():
+def resumir_doencas(df_analise_sanidade):
+    """Média, mínimo, máximo e incidência de todas as doenças por híbrido."""
+    # ===== Resumo Estatístico das Doenças por Híbrido =====
+    colunas_presentes = list(_opcoes_doencas.values())
+    df_doencas = df_analise_sanidade
+
+    # 📊 Estatísticas principais
+    resumo = df_doencas.groupby("nome", observed=True).agg(
+        **{f"{col}_mean": (col, "mean") for col in colunas_presentes},
+        **{f"{col}_min": (col, "min") for col in colunas_presentes},
+        **{f"{col}_max": (col, "max") for col in colunas_presentes},
+    ).round(1).reset_index()
+
+    df_resumo_doencas = resumo.copy()
+
+    # ➕ Incidência %
+    for col in colunas_presentes:
+        total = df_doencas.groupby("nome", observed=True)[col].count()
+        abaixo_6 = df_doencas[df_doencas[col] < 6].groupby("nome", observed=True)[col].count()
+        incidencia = ((abaixo_6 / total) *
+                      100).round(1).reindex(total.index).fillna(0)
+        df_resumo_doencas[f"{col}_inc_per"] = df_resumo_doencas["nome"].map(
+            incidencia)
+    return df_resumo_doencas
+
+
+# Resumo de todas as doenças, uma vez por estado dos filtros: marcar doenças só escolhe colunas
+df_resumo_doencas = memoizar(
+    chave, "resumo_doencas", lambda: resumir_doencas(df_analise_sanidade))
+
+
+@st.fragment
+def secao_conjunta_doencas(df_resumo_doencas):
+    """Seleção das doenças e tabela conjunta; marcar uma doença reexecuta só esta seção."""
+    st.markdown("**Selecionar Doença para Conjunta**")
+    doencas_selecionadas = []
+    for coluna, key in zip(st.columns(len(_opcoes_doencas)), _opcoes_doencas):
+        with coluna:
             if st.checkbox(key, key=f"check_{key}"):
                 doencas_selecionadas.append(key)
 
-# ===== Resumo Estatístico das Doenças por Híbrido =====
-colunas_presentes = list(_opcoes_doencas.values())
-df_doencas = df_analise_sanidade.copy()
-
-# 📊 Estatísticas principais
-resumo = df_doencas.groupby("nome").agg(
-    **{f"{col}_mean": (col, "mean") for col in colunas_presentes},
-    **{f"{col}_min": (col, "min") for col in colunas_presentes},
-    **{f"{col}_max": (col, "max") for col in colunas_presentes},
-).round(1).reset_index()
-
-df_resumo_doencas = resumo.copy()
-
-# ➕ Incidência %
-for col in colunas_presentes:
-    total = df_doencas.groupby("nome")[col].count()
-    abaixo_6 = df_doencas[df_doencas[col] < 6].groupby("nome")[col].count()
-    incidencia = ((abaixo_6 / total) *
-                  100).round(1).reindex(total.index).fillna(0)
-    df_resumo_doencas[f"{col}_inc_per"] = df_resumo_doencas["nome"].map(
-        incidencia)
-
-# Exibe apenas as colunas das doenças selecionadas, renomeando conforme padrão
-colunas_exibir = ["nome"]
-rename_dict = {"nome": "Híbrido"}
-for doenca in doencas_selecionadas:
-    label = _doencas_labels[doenca]
-    col_prefix = _opcoes_doencas[doenca]
-    colunas_exibir += [
-        f"{col_prefix}_mean",
-        f"{col_prefix}_min",
-        f"{col_prefix}_max",
-        f"{col_prefix}_inc_per"
-    ]
-    rename_dict[f"{col_prefix}_mean"] = f"{label} média"
-    rename_dict[f"{col_prefix}_min"] = f"{label} min"
-    rename_dict[f"{col_prefix}_max"] = f"{label} max"
-    rename_dict[f"{col_prefix}_inc_per"] = f"{label} inc (%)"
-colunas_exibir = [
-    col for col in colunas_exibir if col in df_resumo_doencas.columns]
-df_resumo_aggrid = df_resumo_doencas[colunas_exibir].rename(
-    columns=rename_dict)
-
-if doencas_selecionadas:
-    from st_aggrid import AgGrid, GridOptionsBuilder
-    gb = GridOptionsBuilder.from_dataframe(df_resumo_aggrid)
-    gb.configure_default_column(cellStyle={'fontSize': '14px'})
-    gb.configure_grid_options(headerHeight=30)
-    custom_css = {
-        ".ag-header-cell-label": {"font-weight": "bold", "font-size": "15px", "color": "black"}}
-    st.markdown(f"""
-        <div style="background-color: #e7f0fa; border-left: 6px solid #0070C0; padding: 12px 18px; margin-bottom: 12px; border-radius: 6px; font-size: 1.15em; color: #22223b; font-weight: 600;">
-            Conjunta de Doenças — {', '.join(doencas_selecionadas)}
-        </div>
-    """, unsafe_allow_html=True)
-    AgGrid(df_resumo_aggrid, gridOptions=gb.build(), height=400,
-           custom_css=custom_css, use_container_width=True)
-    # Legenda das siglas
-    st.markdown(
-        """
-        <div style='margin-top: 12px; font-size: 1em; color: #444;'>
-            <b>Legenda:</b> <b>TUR</b>: Turcicum, <b>CER</b>: Cercospora, <b>MB</b>: Mancha Branca, <b>MPB</b>: Mancha Bipolaris, <b>FT</b>: Ferrugem Tropical, <b>ENF</b>: Enfezamento, <b>GS</b>: Green Snap
-        </div>
-        """,
-        unsafe_allow_html=True
-    )
-    # Botão para exportar em Excel
-    buffer_resumo = io.BytesIO()
-    with pd.ExcelWriter(buffer_resumo, engine="xlsxwriter") as writer:  # type: ignore
-        df_resumo_aggrid.to_excel(writer, index=False)
-    buffer_resumo.seek(0)
-    st.download_button(
-        label="⬇️ Baixar Excel (Conjunta de Doenças)",
-        data=buffer_resumo.getvalue(),
-        file_name="conjunta_doencas.xlsx",
-        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-    )
+    # Exibe apenas as colunas das doenças selecionadas, renomeando conforme padrão
+    colunas_exibir = ["nome"]
+    rename_dict = {"nome": "Híbrido"}
+    for doenca in doencas_selecionadas:
+        label = _doencas_labels[doenca]
+        col_prefix = _opcoes_doencas[doenca]
+        colunas_exibir += [
+            f"{col_prefix}_mean",
+            f"{col_prefix}_min",
+            f"{col_prefix}_max",
+            f"{col_prefix}_inc_per"
+        ]
+        rename_dict[f"{col_prefix}_mean"] = f"{label} média"
+        rename_dict[f"{col_prefix}_min"] = f"{label} min"
+        rename_dict[f"{col_prefix}_max"] = f"{label} max"
+        rename_dict[f"{col_prefix}_inc_per"] = f"{label} inc (%)"
+    colunas_exibir = [
+        col for col in colunas_exibir if col in df_resumo_doencas.columns]
+    df_resumo_aggrid = df_resumo_doencas[colunas_exibir].rename(
+        columns=rename_dict)
 
-else:
-    st.info("Selecione ao menos uma doença para visualizar a conjunta.")
+    if doencas_selecionadas:
+        from st_aggrid import AgGrid, GridOptionsBuilder
+        gb = GridOptionsBuilder.from_dataframe(df_resumo_aggrid)
+        gb.configure_default_column(cellStyle={'fontSize': '14px'})
+        gb.configure_grid_options(headerHeight=30)
+        custom_css = {
+            ".ag-header-cell-label": {"font-weight": "bold", "font-size": "15px", "color": "black"}}
+        st.markdown(f"""
+            <div style="background-color: #e7f0fa; border-left: 6px solid #0070C0; padding: 12px 18px; margin-bottom: 12px; border-radius: 6px; font-size: 1.15em; color: #22223b; font-weight: 600;">
+                Conjunta de Doenças — {', '.join(doencas_selecionadas)}
+            </div>
+        """, unsafe_allow_html=True)
+        AgGrid(df_resumo_aggrid, gridOptions=gb.build(), height=400,
+               custom_css=custom_css, use_container_width=True)
+        # Legenda das siglas
+        st.markdown(
+            """
+            <div style='margin-top: 12px; font-size: 1em; color: #444;'>
+                <b>Legenda:</b> <b>TUR</b>: Turcicum, <b>CER</b>: Cercospora, <b>MB</b>: Mancha Branca, <b>MPB</b>: Mancha Bipolaris, <b>FT</b>: Ferrugem Tropical, <b>ENF</b>: Enfezamento, <b>GS</b>: Green Snap
+            </div>
+            """,
+            unsafe_allow_html=True
+        )
+        # Botão para exportar em Excel
+        botao_excel(
+            label="⬇️ Baixar Excel (Conjunta de Doenças)",
+            dados=df_resumo_aggrid,
+            file_name="conjunta_doencas.xlsx"
+        )
+
+    else:
+        st.info("Selecione ao menos uma doença para visualizar a conjunta.")
+
+
+secao_conjunta_doencas(df_resumo_doencas)
 
 # ===== Resumo Estatístico de Grãos Ardidos por Híbrido =====
 df_graos_ardidos = df_analise_sanidade.copy()
@@ -540,97 +510,98 @@ df_graos_ardidos = df_analise_sanidade.copy()
 # Exemplo: 0 para contar qualquer valor > 0, 6 para > 6%
 LIMIAR_INCIDENCIA_GRAOS_ARDIDOS = 0
 
-# Verifica se a coluna grãos ardidos existe
-if "graosArdidos" in df_graos_ardidos.columns:
-    # 📊 Estatísticas principais para grãos ardidos
-    resumo = df_graos_ardidos.groupby("nome").agg(
-        graos_ardidos_mean=("graosArdidos", "mean"),
-        graos_ardidos_min=("graosArdidos", "min"),
-        graos_ardidos_max=("graosArdidos", "max"),
-    ).round(1).reset_index()
-
-    df_resumo_graos = resumo.copy()
-
-    # ➕ Incidência % para grãos ardidos (valores > LIMIAR_INCIDENCIA_GRAOS_ARDIDOS)
-    total_graos = df_graos_ardidos.groupby("nome")["graosArdidos"].count()
-    acima_limiar = df_graos_ardidos[df_graos_ardidos["graosArdidos"] >
-                                    LIMIAR_INCIDENCIA_GRAOS_ARDIDOS].groupby("nome")["graosArdidos"].count()
-    incidencia_graos = ((acima_limiar / total_graos) *
-                        100).round(1).reindex(total_graos.index).fillna(0)
-    df_resumo_graos["graos_ardidos_inc_per"] = df_resumo_graos["nome"].map(
-        incidencia_graos)
+@st.fragment
+def secao_graos_ardidos(df_graos_ardidos):
+    """Tabela de grãos ardidos por híbrido; o download reexecuta só esta seção."""
+    # Verifica se a coluna grãos ardidos existe
+    if "graosArdidos" in df_graos_ardidos.columns:
+        # 📊 Estatísticas principais para grãos ardidos
+        resumo = df_graos_ardidos.groupby("nome", observed=True).agg(
+            graos_ardidos_mean=("graosArdidos", "mean"),
+            graos_ardidos_min=("graosArdidos", "min"),
+            graos_ardidos_max=("graosArdidos", "max"),
+        ).round(1).reset_index()
+
+        df_resumo_graos = resumo.copy()
+
+        # ➕ Incidência % para grãos ardidos (valores > LIMIAR_INCIDENCIA_GRAOS_ARDIDOS)
+        total_graos = df_graos_ardidos.groupby("nome", observed=True)["graosArdidos"].count()
+        acima_limiar = df_graos_ardidos[df_graos_ardidos["graosArdidos"] >
+                                        LIMIAR_INCIDENCIA_GRAOS_ARDIDOS].groupby("nome", observed=True)["graosArdidos"].count()
+        incidencia_graos = ((acima_limiar / total_graos) *
+                            100).round(1).reindex(total_graos.index).fillna(0)
+        df_resumo_graos["graos_ardidos_inc_per"] = df_resumo_graos["nome"].map(
+            incidencia_graos)
+
+        # Preparação das colunas para exibição
+        colunas_exibir = [
+            "nome",
+            "graos_ardidos_mean",
+            "graos_ardidos_min",
+            "graos_ardidos_max",
+            "graos_ardidos_inc_per"
+        ]
+        # Renomear colunas para nomes mais legíveis
+        rename_dict = {
+            "nome": "Híbrido",
+            "graos_ardidos_mean": "ARD média",
+            "graos_ardidos_min": "ARD min",
+            "graos_ardidos_max": "ARD max",
+            "graos_ardidos_inc_per": "ARD inc (%)"
+        }
+        # Filtrar colunas existentes e renomear
+        colunas_exibir = [
+            col for col in colunas_exibir if col in df_resumo_graos.columns]
+        df_resumo_aggrid = df_resumo_graos[colunas_exibir].rename(
+            columns=rename_dict)
+
+        # Exibição da tabela
+        gb = GridOptionsBuilder.from_dataframe(df_resumo_aggrid)
+        gb.configure_default_column(cellStyle={'fontSize': '12px'})
+        gb.configure_grid_options(headerHeight=30)
+        for col in df_resumo_aggrid.columns:
+            gb.configure_column(
+                col,
+                headerClass='ag-header-bold',
+                menuTabs=['generalMenuTab', 'filterMenuTab', 'columnsMenuTab']
+            )
+        custom_css = {
+            ".ag-header-cell-label": {"font-weight": "bold", "font-size": "12px", "color": "black"},
+            ".ag-cell": {"color": "black", "font-size": "12px"}
+        }
+        # Cabeçalho estilizado
+        st.markdown(f"""
+            <div style="background-color: #e7f0fa; border-left: 6px solid #0070C0; padding: 12px 18px; margin-bottom: 12px; border-radius: 6px; font-size: 1.15em; color: #22223b; font-weight: 600;">
+                Análise de Grãos Ardidos por Híbrido
+            </div>
+        """, unsafe_allow_html=True)
+        # Tabela interativa
+        AgGrid(df_resumo_aggrid, gridOptions=gb.build(), height=400,
+               custom_css=custom_css, use_container_width=True)
+        # Legenda explicativa
+        st.markdown(
+            f"""
+            <div style='margin-top: 12px; font-size: 1em; color: #444;'>
+                <b>Legenda:</b> <b>ARD inc (%)</b>: Porcentagem de casos com grãos ardidos acima do limiar definido (maior valor = pior desempenho).<br>
+                <b>Limiar atual:</b> {LIMIAR_INCIDENCIA_GRAOS_ARDIDOS}
+            </div>
+            """,
+            unsafe_allow_html=True
+        )
+        # Botão para exportar em Excel
+        botao_excel(
+            label="⬇️ Baixar Excel (Grãos Ardidos)",
+            dados=df_resumo_aggrid,
+            file_name="analise_graos_ardidos.xlsx"
+        )
+    else:
+        st.error("Coluna 'graosArdidos' não encontrada no dataset.")
 
-    # Preparação das colunas para exibição
-    colunas_exibir = [
-        "nome",
-        "graos_ardidos_mean",
-        "graos_ardidos_min",
-        "graos_ardidos_max",
-        "graos_ardidos_inc_per"
-    ]
-    # Renomear colunas para nomes mais legíveis
-    rename_dict = {
-        "nome": "Híbrido",
-        "graos_ardidos_mean": "ARD média",
-        "graos_ardidos_min": "ARD min",
-        "graos_ardidos_max": "ARD max",
-        "graos_ardidos_inc_per": "ARD inc (%)"
-    }
-    # Filtrar colunas existentes e renomear
-    colunas_exibir = [
-        col for col in colunas_exibir if col in df_resumo_graos.columns]
-    df_resumo_aggrid = df_resumo_graos[colunas_exibir].rename(
-        columns=rename_dict)
 
-    # Exibição da tabela
-    gb = GridOptionsBuilder.from_dataframe(df_resumo_aggrid)
-    gb.configure_default_column(cellStyle={'fontSize': '12px'})
-    gb.configure_grid_options(headerHeight=30)
-    for col in df_resumo_aggrid.columns:
-        gb.configure_column(
-            col,
-            headerClass='ag-header-bold',
-            menuTabs=['generalMenuTab', 'filterMenuTab', 'columnsMenuTab']
-        )
-    custom_css = {
-        ".ag-header-cell-label": {"font-weight": "bold", "font-size": "12px", "color": "black"},
-        ".ag-cell": {"color": "black", "font-size": "12px"}
-    }
-    # Cabeçalho estilizado
-    st.markdown(f"""
-        <div style="background-color: #e7f0fa; border-left: 6px solid #0070C0; padding: 12px 18px; margin-bottom: 12px; border-radius: 6px; font-size: 1.15em; color: #22223b; font-weight: 600;">
-            Análise de Grãos Ardidos por Híbrido
-        </div>
-    """, unsafe_allow_html=True)
-    # Tabela interativa
-    AgGrid(df_resumo_aggrid, gridOptions=gb.build(), height=400,
-           custom_css=custom_css, use_container_width=True)
-    # Legenda explicativa
-    st.markdown(
-        f"""
-        <div style='margin-top: 12px; font-size: 1em; color: #444;'>
-            <b>Legenda:</b> <b>ARD inc (%)</b>: Porcentagem de casos com grãos ardidos acima do limiar definido (maior valor = pior desempenho).<br>
-            <b>Limiar atual:</b> {LIMIAR_INCIDENCIA_GRAOS_ARDIDOS}
-        </div>
-        """,
-        unsafe_allow_html=True
-    )
-    # Botão para exportar em Excel
-    buffer_resumo = io.BytesIO()
-    with pd.ExcelWriter(buffer_resumo, engine="xlsxwriter") as writer:
-        df_resumo_aggrid.to_excel(writer, index=False)
-    buffer_resumo.seek(0)
-    st.download_button(
-        label="⬇️ Baixar Excel (Grãos Ardidos)",
-        data=buffer_resumo.getvalue(),
-        file_name="analise_graos_ardidos.xlsx",
-        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-    )
-else:
-    st.error("Coluna 'graosArdidos' não encontrada no dataset.")
+secao_graos_ardidos(df_graos_ardidos)
 # Gráfico de Grãos Ardidos (%) por Híbrido
 
-df_graos_ardidos = df_analise_sanidade.groupby("nome", as_index=False)[
+df_graos_ardidos = df_analise_sanidade.groupby("nome", as_index=False, observed=True)[
     "graosArdidos"].mean()
 df_graos_ardidos = df_graos_ardidos.sort_values(
     by="graosArdidos", ascending=False)
@@ -760,3 +731,8 @@ fig_surv_ardidos.update_layout(
     plot_bgcolor="#f5f7fa"
 )
 st.plotly_chart(fig_surv_ardidos, use_container_width=True)
+
+# =========================
+# Pacote com todas as tabelas exportáveis
+# =========================
+secao_pacote("05_Sanidade")
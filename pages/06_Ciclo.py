@@ -1,6 +1,10 @@
 import streamlit as st
+from data_processing.repositorio_dados import obter_dataframe
+from data_processing.formatacao import formatar_datas_br
+from data_processing.filtros_sidebar import filtrar_na_sidebar
+from data_processing.memoizacao import chave_pagina
+from data_processing.exportacao import botao_excel, iniciar_pacote, secao_pacote
 import pandas as pd
-import io
 from st_aggrid import AgGrid, GridOptionsBuilder
 import numpy as np
 import plotly.express as px
@@ -36,54 +40,20 @@ st.markdown(
     unsafe_allow_html=True
 )
 
-# Verifica se o DataFrame tratado está disponível no session_state
-if "df_avTratamentoMilho" not in st.session_state:
+# Verifica se o DataFrame tratado está disponível no repositório compartilhado
+df_avTratamentoMilho = obter_dataframe("df_avTratamentoMilho")
+if df_avTratamentoMilho is None:
     st.error("O DataFrame de tratamento de milho não foi carregado. Volte para a página inicial e carregue os dados.")
     st.stop()
 
-# Usar o DataFrame tratado já pronto do session_state
-df_avTratamentoMilho = st.session_state["df_avTratamentoMilho"]
-
-filter_keys = [
-    ("macroRegiaoMilho", "Macro Região", "macro"),
-    ("conjuntaGeralMilhoSafrinha", "Conjunta Geral", "conjunta"),
-    ("subConjuntaMilhoSafrinha", "Sub Conjunta", "subconjunta"),
-    ("mrhMilho", "MRH", "mrh"),
-    ("regional", "Regional", "regional"),
-    ("siglaEstado", "Estado", "estado"),
-    ("nomeCidade", "Cidade", "cidade"),
-    ("nomeProdutor", "Produtor", "produtor"),
-    ("nomeFazenda", "Fazenda", "fazenda"),
-    ("nome", "Híbridos", "hibrido"),
-    ("displayName", "DTC Responsável", "responsavel"),
-]
-
-# Inicializa seleções no session_state
-for col, _, key in filter_keys:
-    if f"sel_{key}" not in st.session_state:
-        st.session_state[f"sel_{key}"] = []
-
 # =========================
 # Seleção de filtros
 # =========================
 
-with st.sidebar:
-    df_filtrado = df_avTratamentoMilho.copy()
-    for col, label, key in filter_keys:
-        options = sorted(
-            df_filtrado[col].dropna().unique(), key=lambda x: str(x))
-        # Limpa seleções inválidas
-        st.session_state[f"sel_{key}"] = [
-            v for v in st.session_state[f"sel_{key}"] if v in options]
-        selecionadas = []
-        with st.expander(label, expanded=False):
-            for opt in options:
-                checked = opt in st.session_state[f"sel_{key}"]
-                if st.checkbox(opt, value=checked, key=f"{key}_{opt}"):
-                    selecionadas.append(opt)
-        st.session_state[f"sel_{key}"] = selecionadas
-        if selecionadas:
-            df_filtrado = df_filtrado[df_filtrado[col].isin(selecionadas)]
+df_filtrado = filtrar_na_sidebar("df_avTratamentoMilho", df_avTratamentoMilho)
+chave = chave_pagina("06_Ciclo")
+
+iniciar_pacote("06_Ciclo")
 
 # =========================
 # Criação do DataFrame principal de análise
@@ -128,23 +98,21 @@ novos_nomes = {c[0]: c[1] for c in colunas_renomeadas}
 
 # Cria o DataFrame de visualização customizada a partir do df_analise_conjunta
 colunas_existentes = [c for c in colunas if c in df_analise_ciclo.columns]
-df_analise_ciclo_visualizacao = df_analise_ciclo[colunas_existentes].rename(
-    columns=novos_nomes)
+df_analise_ciclo_visualizacao = formatar_datas_br(df_analise_ciclo[colunas_existentes].rename(
+    columns=novos_nomes))
 
 # Exibe o DataFrame filtrado original
 titulo_expander = "Dados Originais - Análise Ciclos"
 with st.expander(titulo_expander, expanded=False):
-    st.dataframe(df_filtrado, use_container_width=True)
+    st.dataframe(formatar_datas_br(df_filtrado), use_container_width=True)
 
     # Botão para exportar em Excel o DataFrame filtrado original
-    buffer_filtro = io.BytesIO()
-    df_filtrado.to_excel(buffer_filtro, index=False)  # type: ignore
-    buffer_filtro.seek(0)
-    st.download_button(
+    botao_excel(
         label="⬇️ Baixar Excel (dados originais - análise ciclo)",
-        data=buffer_filtro,
-        file_name="dados_originais_analise_ciclo.xlsx",
-        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        dados=df_filtrado,
+        chave=chave,
+        formatar_datas=True,
+        file_name="dados_originais_analise_ciclo.xlsx"
     )
 
 # =========================
@@ -239,14 +207,10 @@ AgGrid(
 )
 
 # Botão para exportar em Excel o DataFrame customizado
-buffer = io.BytesIO()
-df_analise_ciclo_visualizacao.to_excel(buffer, index=False)  # type: ignore
-buffer.seek(0)
-st.download_button(
+botao_excel(
     label="⬇️ Baixar Excel (Ciclo)",
-    data=buffer,
-    file_name="ciclo.xlsx",
-    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    dados=df_analise_ciclo_visualizacao,
+    file_name="ciclo.xlsx"
 )
 
 # =========================
@@ -283,14 +247,14 @@ df_analise_ciclo[colunas_numericas] = df_analise_ciclo[colunas_numericas].replac
 # Realiza o agrupamento e calcula a média das colunas numéricas
 df_analise_ciclo_agrupado = (
     df_analise_ciclo
-    .groupby(group_cols, as_index=False)[colunas_numericas]
+    .groupby(group_cols, as_index=False, observed=True)[colunas_numericas]
     .mean()
 )
 
 # Recupera o nome do híbrido para cada (fazendaRef, indexTratamentoAgrupado)
 df_nome = (
     df_analise_ciclo
-    .groupby(['fazendaRef', 'indexTratamentoAgrupado'])['nome']
+    .groupby(['fazendaRef', 'indexTratamentoAgrupado'], observed=True)['nome']
     .first()
     .reset_index()
 )
@@ -398,15 +362,10 @@ AgGrid(
 )
 
 # Botão para exportar em Excel o DataFrame agrupado customizado
-buffer_agrupado_vis = io.BytesIO()
-df_analise_ciclo_agrupado_visualizacao.to_excel(
-    buffer_agrupado_vis, index=False)  # type: ignore
-buffer_agrupado_vis.seek(0)
-st.download_button(
+botao_excel(
     label="⬇️ Baixar Excel (Resumo da Ciclo)",
-    data=buffer_agrupado_vis,
-    file_name="resumo_ciclo.xlsx",
-    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    dados=df_analise_ciclo_agrupado_visualizacao,
+    file_name="resumo_ciclo.xlsx"
 )
 
 # =========================
@@ -490,7 +449,7 @@ if 'Umd (%)' in df_analise_ciclo_agrupado_visualizacao.columns and 'Prod@13.5% (
 if 'Híbrido' in df_analise_ciclo_agrupado_visualizacao.columns:
     # Cria o DataFrame agrupado por híbrido
     df_precocidade = df_analise_ciclo_agrupado_visualizacao.groupby(
-        'Híbrido', as_index=False).mean(numeric_only=True)
+        'Híbrido', as_index=False, observed=True).mean(numeric_only=True)
 
     if 'Umd (%)' in df_precocidade.columns and 'Prod@13.5% (sc/ha)' in df_precocidade.columns:
         st.markdown(
@@ -591,7 +550,7 @@ if 'Híbrido' in df_analise_ciclo_agrupado_visualizacao.columns and 'Flor Fem (d
         )
 
         # Agrupa por híbrido e calcula médias
-        df_flor_agrupado = df_flor.groupby('Híbrido', as_index=False).agg({
+        df_flor_agrupado = df_flor.groupby('Híbrido', as_index=False, observed=True).agg({
             'Flor Fem (dias)': 'mean',
             'Flor Masc (dias)': 'mean'
         }).round(1)
@@ -687,14 +646,10 @@ if 'Híbrido' in df_analise_ciclo_agrupado_visualizacao.columns and 'Flor Fem (d
         )
 
         # Botão para exportar dados do florescimento
-        buffer_flor = io.BytesIO()
-        df_flor_agrupado.to_excel(buffer_flor, index=False)
-        buffer_flor.seek(0)
-        st.download_button(
+        botao_excel(
             label="⬇️ Baixar Excel (Dados de Florescimento)",
-            data=buffer_flor,
-            file_name="florescimento_hibridos.xlsx",
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+            dados=df_flor_agrupado,
+            file_name="florescimento_hibridos.xlsx"
         )
 
         # Estatísticas resumidas
@@ -719,3 +674,8 @@ if 'Híbrido' in df_analise_ciclo_agrupado_visualizacao.columns and 'Flor Fem (d
             "Não há dados suficientes de florescimento para criar o gráfico.")
 else:
     st.info("Para visualizar o gráfico de florescimento, certifique-se de que os dados contêm informações de Flor Fem e Flor Masc.")
+
+# =========================
+# Pacote com todas as tabelas exportáveis
+# =========================
+secao_pacote("06_Ciclo")
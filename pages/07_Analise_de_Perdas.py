@@ -1,7 +1,11 @@
 from plotly.colors import n_colors
 import streamlit as st
+from data_processing.repositorio_dados import obter_dataframe
+from data_processing.formatacao import formatar_datas_br
+from data_processing.filtros_sidebar import filtrar_na_sidebar
+from data_processing.memoizacao import chave_pagina
+from data_processing.exportacao import botao_excel, iniciar_pacote, secao_pacote
 import pandas as pd
-import io
 from st_aggrid import AgGrid, GridOptionsBuilder
 import numpy as np
 import plotly.express as px
@@ -108,54 +112,20 @@ st.markdown(
     unsafe_allow_html=True
 )
 
-# Verifica se o DataFrame tratado está disponível no session_state
-if "df_avTratamentoMilho" not in st.session_state:
+# Verifica se o DataFrame tratado está disponível no repositório compartilhado
+df_avTratamentoMilho = obter_dataframe("df_avTratamentoMilho")
+if df_avTratamentoMilho is None:
     st.error("O DataFrame de tratamento de milho não foi carregado. Volte para a página inicial e carregue os dados.")
     st.stop()
 
-# Usar o DataFrame tratado já pronto do session_state
-df_avTratamentoMilho = st.session_state["df_avTratamentoMilho"]
-
-filter_keys = [
-    ("macroRegiaoMilho", "Macro Região", "macro"),
-    ("conjuntaGeralMilhoSafrinha", "Conjunta Geral", "conjunta"),
-    ("subConjuntaMilhoSafrinha", "Sub Conjunta", "subconjunta"),
-    ("mrhMilho", "MRH", "mrh"),
-    ("regional", "Regional", "regional"),
-    ("siglaEstado", "Estado", "estado"),
-    ("nomeCidade", "Cidade", "cidade"),
-    ("nomeProdutor", "Produtor", "produtor"),
-    ("nomeFazenda", "Fazenda", "fazenda"),
-    ("nome", "Híbridos", "hibrido"),
-    ("displayName", "DTC Responsável", "responsavel"),
-]
-
-# Inicializa seleções no session_state
-for col, _, key in filter_keys:
-    if f"sel_{key}" not in st.session_state:
-        st.session_state[f"sel_{key}"] = []
-
 # =========================
 # Seleção de filtros
 # =========================
 
-with st.sidebar:
-    df_filtrado = df_avTratamentoMilho.copy()
-    for col, label, key in filter_keys:
-        options = sorted(
-            df_filtrado[col].dropna().unique(), key=lambda x: str(x))
-        # Limpa seleções inválidas
-        st.session_state[f"sel_{key}"] = [
-            v for v in st.session_state[f"sel_{key}"] if v in options]
-        selecionadas = []
-        with st.expander(label, expanded=False):
-            for opt in options:
-                checked = opt in st.session_state[f"sel_{key}"]
-                if st.checkbox(opt, value=checked, key=f"{key}_{opt}"):
-                    selecionadas.append(opt)
-        st.session_state[f"sel_{key}"] = selecionadas
-        if selecionadas:
-            df_filtrado = df_filtrado[df_filtrado[col].isin(selecionadas)]
+df_filtrado = filtrar_na_sidebar("df_avTratamentoMilho", df_avTratamentoMilho)
+chave = chave_pagina("07_Analise_de_Perdas")
+
+iniciar_pacote("07_Analise_de_Perdas")
 
 # =========================
 # Criação do DataFrame principal de análise
@@ -204,17 +174,15 @@ df_analise_perdas_visualizacao = df_analise_perdas[colunas_existentes].rename(
 # Exibe o DataFrame filtrado original
 titulo_expander = "Dados Originais - Análise Perdas Físicas"
 with st.expander(titulo_expander, expanded=False):
-    st.dataframe(df_filtrado, use_container_width=True)
+    st.dataframe(formatar_datas_br(df_filtrado), use_container_width=True)
 
     # Botão para exportar em Excel o DataFrame filtrado original
-    buffer_filtro = io.BytesIO()
-    df_filtrado.to_excel(buffer_filtro, index=False)  # type: ignore
-    buffer_filtro.seek(0)
-    st.download_button(
+    botao_excel(
         label="⬇️ Baixar Excel (dados originais - análise perdas físicas)",
-        data=buffer_filtro,
-        file_name="dados_originais_perdas_fisicas.xlsx",
-        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        dados=df_filtrado,
+        chave=chave,
+        formatar_datas=True,
+        file_name="dados_originais_perdas_fisicas.xlsx"
     )
 
 # =========================
@@ -311,14 +279,10 @@ AgGrid(
 )
 
 # Botão para exportar em Excel o DataFrame customizado
-buffer = io.BytesIO()
-df_analise_perdas_visualizacao.to_excel(buffer, index=False)  # type: ignore
-buffer.seek(0)
-st.download_button(
+botao_excel(
     label="⬇️ Baixar Excel (Perdas Físicas)",
-    data=buffer,
-    file_name="perdas_fisicas.xlsx",
-    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    dados=df_analise_perdas_visualizacao,
+    file_name="perdas_fisicas.xlsx"
 )
 
 # =========================
@@ -344,14 +308,14 @@ df_analise_perdas[colunas_numericas] = df_analise_perdas[colunas_numericas].repl
 # Realiza o agrupamento e calcula a média das colunas numéricas
 df_analise_perdas_agrupado = (
     df_analise_perdas
-    .groupby(group_cols, as_index=False)[colunas_numericas]
+    .groupby(group_cols, as_index=False, observed=True)[colunas_numericas]
     .mean()
 )
 
 # Recupera o nome do híbrido para cada (fazendaRef, indexTratamentoAgrupado)
 df_nome = (
     df_analise_perdas
-    .groupby(['fazendaRef', 'indexTratamentoAgrupado'])['nome']
+    .groupby(['fazendaRef', 'indexTratamentoAgrupado'], observed=True)['nome']
     .first()
     .reset_index()
 )
@@ -458,15 +422,10 @@ AgGrid(
 )
 
 # Botão para exportar em Excel o DataFrame agrupado customizado
-buffer_agrupado_vis = io.BytesIO()
-df_analise_perdas_agrupado_visualizacao.to_excel(
-    buffer_agrupado_vis, index=False)  # type: ignore
-buffer_agrupado_vis.seek(0)
-st.download_button(
+botao_excel(
     label="⬇️ Baixar Excel (Resumo da Perdas Físicas)",
-    data=buffer_agrupado_vis,
-    file_name="resumo_perdas_fisicas.xlsx",
-    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    dados=df_analise_perdas_agrupado_visualizacao,
+    file_name="resumo_perdas_fisicas.xlsx"
 )
 # =========================
 # Sessão de Gráficos - Card estilizado
@@ -515,10 +474,10 @@ if all(col in df_analise_perdas.columns for col in ["nomeFazenda", "nome", "inde
     df_plot["indexTratamentoAgrupado"] = df_plot["indexTratamento"].apply(
         agrupa_index)
     # Agrupa por fazenda, híbrido e par, calcula média de perc_Acamadas
-    df_linhas = df_plot.groupby(["nomeFazenda", "nome", "indexTratamentoAgrupado"], as_index=False)[
+    df_linhas = df_plot.groupby(["nomeFazenda", "nome", "indexTratamentoAgrupado"], as_index=False, observed=True)[
         "perc_Acamadas"].mean()
     # Agrupa por fazenda e híbrido, tirando a média dos pares para evitar duplicatas
-    df_linhas_unica = df_linhas.groupby(['nomeFazenda', 'nome'], as_index=False)[
+    df_linhas_unica = df_linhas.groupby(['nomeFazenda', 'nome'], as_index=False, observed=True)[
         'perc_Acamadas'].mean()
     # Pivot para garantir todas as combinações fazenda × híbrido, preenchendo ausentes com zero
     df_pivot = df_linhas_unica.pivot(
@@ -600,10 +559,10 @@ if all(col in df_analise_perdas.columns for col in ["nomeFazenda", "nome", "inde
     df_plot_qbr["indexTratamentoAgrupado"] = df_plot_qbr["indexTratamento"].apply(
         agrupa_index)
     # Agrupa por fazenda, híbrido e par, calcula média de perc_Quebradas
-    df_linhas_qbr = df_plot_qbr.groupby(["nomeFazenda", "nome", "indexTratamentoAgrupado"], as_index=False)[
+    df_linhas_qbr = df_plot_qbr.groupby(["nomeFazenda", "nome", "indexTratamentoAgrupado"], as_index=False, observed=True)[
         "perc_Quebradas"].mean()
     # Agrupa por fazenda e híbrido, tirando a média dos pares para evitar duplicatas
-    df_linhas_qbr_unica = df_linhas_qbr.groupby(['nomeFazenda', 'nome'], as_index=False)[
+    df_linhas_qbr_unica = df_linhas_qbr.groupby(['nomeFazenda', 'nome'], as_index=False, observed=True)[
         'perc_Quebradas'].mean()
     # Pivot para garantir todas as combinações fazenda × híbrido, preenchendo ausentes com zero
     df_pivot_qbr = df_linhas_qbr_unica.pivot(
@@ -676,10 +635,10 @@ if all(col in df_analise_perdas.columns for col in ["nomeFazenda", "nome", "inde
         df_plot_dmn["indexTratamentoAgrupado"] = df_plot_dmn["indexTratamento"].apply(
             agrupa_index)
         # Agrupa por fazenda, híbrido e par, calcula média de perc_Dominadas
-        df_linhas_dmn = df_plot_dmn.groupby(["nomeFazenda", "nome", "indexTratamentoAgrupado"], as_index=False)[
+        df_linhas_dmn = df_plot_dmn.groupby(["nomeFazenda", "nome", "indexTratamentoAgrupado"], as_index=False, observed=True)[
             "perc_Dominadas"].mean()
         # Agrupa por fazenda e híbrido, tirando a média dos pares para evitar duplicatas
-        df_linhas_dmn_unica = df_linhas_dmn.groupby(['nomeFazenda', 'nome'], as_index=False)[
+        df_linhas_dmn_unica = df_linhas_dmn.groupby(['nomeFazenda', 'nome'], as_index=False, observed=True)[
             'perc_Dominadas'].mean()
         # Pivot para garantir todas as combinações fazenda × híbrido, preenchendo ausentes com zero
         df_pivot_dmn = df_linhas_dmn_unica.pivot(
@@ -752,10 +711,10 @@ if all(col in df_analise_perdas.columns for col in ["nomeFazenda", "nome", "inde
             df_plot_cp["indexTratamentoAgrupado"] = df_plot_cp["indexTratamento"].apply(
                 agrupa_index)
             # Agrupa por fazenda, híbrido e par, calcula média de perc_ColmoPodre
-            df_linhas_cp = df_plot_cp.groupby(["nomeFazenda", "nome", "indexTratamentoAgrupado"], as_index=False)[
+            df_linhas_cp = df_plot_cp.groupby(["nomeFazenda", "nome", "indexTratamentoAgrupado"], as_index=False, observed=True)[
                 "perc_ColmoPodre"].mean()
             # Agrupa por fazenda e híbrido, tirando a média dos pares para evitar duplicatas
-            df_linhas_cp_unica = df_linhas_cp.groupby(['nomeFazenda', 'nome'], as_index=False)[
+            df_linhas_cp_unica = df_linhas_cp.groupby(['nomeFazenda', 'nome'], as_index=False, observed=True)[
                 'perc_ColmoPodre'].mean()
             # Pivot para garantir todas as combinações fazenda × híbrido, preenchendo ausentes com zero
             df_pivot_cp = df_linhas_cp_unica.pivot(
@@ -828,10 +787,10 @@ if all(col in df_analise_perdas.columns for col in ["nomeFazenda", "nome", "inde
                 df_plot_total["indexTratamentoAgrupado"] = df_plot_total["indexTratamento"].apply(
                     agrupa_index)
                 # Agrupa por fazenda, híbrido e par, calcula média de perc_Total
-                df_linhas_total = df_plot_total.groupby(["nomeFazenda", "nome", "indexTratamentoAgrupado"], as_index=False)[
+                df_linhas_total = df_plot_total.groupby(["nomeFazenda", "nome", "indexTratamentoAgrupado"], as_index=False, observed=True)[
                     "perc_Total"].mean()
                 # Agrupa por fazenda e híbrido, tirando a média dos pares para evitar duplicatas
-                df_linhas_total_unica = df_linhas_total.groupby(['nomeFazenda', 'nome'], as_index=False)[
+                df_linhas_total_unica = df_linhas_total.groupby(['nomeFazenda', 'nome'], as_index=False, observed=True)[
                     'perc_Total'].mean()
                 # Pivot para garantir todas as combinações fazenda × híbrido, preenchendo ausentes com zero
                 df_pivot_total = df_linhas_total_unica.pivot(
@@ -897,7 +856,7 @@ st.markdown(
 )
 # Agrupa por nome (Híbrido) e calcula as médias das colunas de interesse
 df_resumo_perdas = (
-    df_analise_perdas.groupby("nome", as_index=False)[
+    df_analise_perdas.groupby("nome", as_index=False, observed=True)[
         ["perc_Acamadas", "perc_Quebradas", "perc_Dominadas", "perc_ColmoPodre"]
     ].mean()
 )
@@ -938,14 +897,10 @@ AgGrid(
     custom_css=custom_css
 )
 # Botão para exportar a tabela resumo em Excel
-_buffer_resumo = io.BytesIO()
-df_resumo_perdas.to_excel(_buffer_resumo, index=False)
-_buffer_resumo.seek(0)
-st.download_button(
+botao_excel(
     label="⬇️ Baixar Excel (Resumo de Perdas Físicas por Híbrido)",
-    data=_buffer_resumo,
-    file_name="resumo_perdas_fisicas_hibrido.xlsx",
-    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    dados=df_resumo_perdas,
+    file_name="resumo_perdas_fisicas_hibrido.xlsx"
 )
 
 # =========================
@@ -1318,3 +1273,8 @@ fig_surv_total.update_layout(
     plot_bgcolor="#f5f7fa"
 )
 st.plotly_chart(fig_surv_total, use_container_width=True)
+
+# =========================
+# Pacote com todas as tabelas exportáveis
+# =========================
+secao_pacote("07_Analise_de_Perdas")
@@ -1,7 +1,11 @@
 from st_aggrid import AgGrid, GridOptionsBuilder
 import streamlit as st
+from data_processing.repositorio_dados import obter_dataframe
+from data_processing.formatacao import formatar_datas_br
+from data_processing.filtros_sidebar import FILTROS_DENSIDADE, filtrar_na_sidebar
+from data_processing.memoizacao import chave_pagina
+from data_processing.exportacao import botao_excel, iniciar_pacote, secao_pacote
 import pandas as pd
-import io
 import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
@@ -36,55 +40,20 @@ st.markdown(
     unsafe_allow_html=True
 )
 
-# Verifica se o DataFrame tratado está disponível no session_state
-if "df_avTratamentoMilhoDensidade" not in st.session_state:
+# Verifica se o DataFrame tratado está disponível no repositório compartilhado
+df_avTratamentoMilhoDensidade = obter_dataframe("df_avTratamentoMilhoDensidade")
+if df_avTratamentoMilhoDensidade is None:
     st.error("O DataFrame de tratamento de densidade não foi carregado. Volte para a página inicial e carregue os dados.")
     st.stop()
 
-# Usar o DataFrame tratado já pronto do session_state
-df_avTratamentoMilhoDensidade = st.session_state["df_avTratamentoMilhoDensidade"]
-
-filter_keys = [
-    ("macroRegiaoMilho", "Macro Região", "macro"),
-    ("conjuntaGeralMilhoSafrinha", "Conjunta Geral", "conjunta"),
-    ("subConjuntaMilhoSafrinha", "Sub Conjunta", "subconjunta"),
-    ("mrhMilho", "MRH", "mrh"),
-    ("regional", "Regional", "regional"),
-    ("siglaEstado", "Estado", "estado"),
-    ("nomeCidade", "Cidade", "cidade"),
-    ("nomeProdutor", "Produtor", "produtor"),
-    ("nomeFazenda", "Fazenda", "fazenda"),
-    ("nome", "Híbridos", "hibrido"),
-    ("populacao_av4", "Densidade", "densidade"),
-    ("displayName", "DTC Responsável", "responsavel"),
-]
-
-# Inicializa seleções no session_state
-for col, _, key in filter_keys:
-    if f"sel_{key}" not in st.session_state:
-        st.session_state[f"sel_{key}"] = []
-
 # =========================
 # Seleção de filtros
 # =========================
 
-with st.sidebar:
-    df_filtrado = df_avTratamentoMilhoDensidade.copy()
-    for col, label, key in filter_keys:
-        options = sorted(
-            df_filtrado[col].dropna().unique(), key=lambda x: str(x))
-        # Limpa seleções inválidas
-        st.session_state[f"sel_{key}"] = [
-            v for v in st.session_state[f"sel_{key}"] if v in options]
-        selecionadas = []
-        with st.expander(label, expanded=False):
-            for opt in options:
-                checked = opt in st.session_state[f"sel_{key}"]
-                if st.checkbox(str(opt), value=checked, key=f"{key}_{opt}"):
-                    selecionadas.append(opt)
-        st.session_state[f"sel_{key}"] = selecionadas
-        if selecionadas:
-            df_filtrado = df_filtrado[df_filtrado[col].isin(selecionadas)]
+df_filtrado = filtrar_na_sidebar("df_avTratamentoMilhoDensidade", df_avTratamentoMilhoDensidade, FILTROS_DENSIDADE)
+chave = chave_pagina("08_Conjunta_Densidade", FILTROS_DENSIDADE)
+
+iniciar_pacote("08_Conjunta_Densidade")
 
 # =========================
 # Visualização e exportação do DataFrame filtrado RETIRAR POSTERIORMENTE
@@ -159,17 +128,15 @@ df_analise_densidade_visualizacao = df_analise_densidade[colunas_existentes].ren
 # Exibe o DataFrame filtrado original
 titulo_expander = "Dados Originais - Análise Densidade"
 with st.expander(titulo_expander, expanded=False):
-    st.dataframe(df_filtrado, use_container_width=True)
+    st.dataframe(formatar_datas_br(df_filtrado), use_container_width=True)
 
     # Botão para exportar em Excel o DataFrame filtrado original
-    buffer_filtro = io.BytesIO()
-    df_filtrado.to_excel(buffer_filtro, index=False)  # type: ignore
-    buffer_filtro.seek(0)
-    st.download_button(
+    botao_excel(
         label="⬇️ Baixar Excel (dados originais - análise densidade)",
-        data=buffer_filtro,
-        file_name="dados_originais_analise_densidade.xlsx",
-        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        dados=df_filtrado,
+        chave=chave,
+        formatar_datas=True,
+        file_name="dados_originais_analise_densidade.xlsx"
     )
 
 # =========================
@@ -263,14 +230,10 @@ AgGrid(
 )
 
 # Botão para exportar em Excel o DataFrame customizado
-buffer_custom = io.BytesIO()
-df_analise_densidade_visualizacao.to_excel(buffer_custom, index=False)
-buffer_custom.seek(0)
-st.download_button(
+botao_excel(
     label="⬇️ Baixar Excel (Análise de Densidade - Visualização Customizada)",
-    data=buffer_custom,
-    file_name="analise_densidade_customizada.xlsx",
-    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    dados=df_analise_densidade_visualizacao,
+    file_name="analise_densidade_customizada.xlsx"
 )
 
 # =========================
@@ -311,14 +274,14 @@ df_analise_densidade[colunas_numericas] = df_analise_densidade[colunas_numericas
 # Realiza o agrupamento e calcula a média das colunas numéricas
 df_analise_densidade_agrupado = (
     df_analise_densidade
-    .groupby(group_cols, as_index=False)[colunas_numericas]
+    .groupby(group_cols, as_index=False, observed=True)[colunas_numericas]
     .mean()
 )
 
 # Recupera o nome do híbrido para cada (fazendaRef, indexTratamentoAgrupado)
 df_nome = (
     df_analise_densidade
-    .groupby(['fazendaRef', 'indexTratamentoAgrupado'])['nome']
+    .groupby(['fazendaRef', 'indexTratamentoAgrupado'], observed=True)['nome']
     .first()
     .reset_index()
 )
@@ -433,15 +396,10 @@ AgGrid(
 )
 
 # Botão para exportar em Excel o DataFrame agrupado customizado
-buffer_agrupado_vis = io.BytesIO()
-df_analise_densidade_agrupado_visualizacao.to_excel(
-    buffer_agrupado_vis, index=False)  # type: ignore
-buffer_agrupado_vis.seek(0)
-st.download_button(
+botao_excel(
     label="⬇️ Baixar Excel (Resumo da densidade)",
-    data=buffer_agrupado_vis,
-    file_name="densidade_producao.xlsx",
-    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    dados=df_analise_densidade_agrupado_visualizacao,
+    file_name="densidade_producao.xlsx"
 )
 
 # =========================
@@ -505,7 +463,7 @@ colunas_resumo_existentes = [
 
 # Cria o resumo agrupando por nome (Híbrido) e populacao_av4 (Densidade)
 df_resumo_hibrido_densidade = df_analise_densidade_agrupado.groupby(
-    ['nome', 'populacao_av4'])[colunas_resumo_existentes].mean().reset_index()
+    ['nome', 'populacao_av4'], observed=True)[colunas_resumo_existentes].mean().reset_index()
 
 # Renomeia colunas para visualização
 renomear_resumo = {
@@ -582,15 +540,10 @@ AgGrid(
 )
 
 # Botão para exportar em Excel o resumo por Híbrido e Densidade
-buffer_resumo = io.BytesIO()
-df_resumo_hibrido_densidade.to_excel(
-    buffer_resumo, index=False)  # type: ignore
-buffer_resumo.seek(0)
-st.download_button(
+botao_excel(
     label="⬇️ Baixar Excel (Resumo por Híbrido e Densidade)",
-    data=buffer_resumo,
-    file_name="resumo_hibrido_densidade.xlsx",
-    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    dados=df_resumo_hibrido_densidade,
+    file_name="resumo_hibrido_densidade.xlsx"
 )
 
 # =========================
@@ -721,15 +674,10 @@ AgGrid(
 )
 
 # Botão para exportar o DataFrame de estatísticas (AgGrid) para Excel
-buffer_estatisticas_aggrid = io.BytesIO()
-estatisticas_aggrid.to_excel(
-    buffer_estatisticas_aggrid, index=False)  # type: ignore
-buffer_estatisticas_aggrid.seek(0)
-st.download_button(
+botao_excel(
     label="⬇️ Baixar Excel (Estatísticas - análise densidade)",
-    data=buffer_estatisticas_aggrid,
-    file_name="estatisticas_descritivas_analise_densidade.xlsx",
-    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    dados=estatisticas_aggrid,
+    file_name="estatisticas_descritivas_analise_densidade.xlsx"
 )
 # =========================
 # Sessão de Gráficos - Card estilizado
@@ -1504,3 +1452,8 @@ with st.expander('Box Plot - Perda Total (%)', expanded=False):
         showlegend=False
     )
     st.plotly_chart(fig, use_container_width=True)
+
+# =========================
+# Pacote com todas as tabelas exportáveis
+# =========================
+secao_pacote("08_Conjunta_Densidade")
@@ -1,7 +1,11 @@
 from st_aggrid import AgGrid, GridOptionsBuilder
 import streamlit as st
+from data_processing.repositorio_dados import obter_dataframe
+from data_processing.formatacao import formatar_datas_br
+from data_processing.filtros_sidebar import FILTROS_DENSIDADE, filtrar_na_sidebar
+from data_processing.memoizacao import chave_pagina
+from data_processing.exportacao import botao_excel, iniciar_pacote, secao_pacote
 import pandas as pd
-import io
 import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
@@ -36,55 +40,20 @@ st.markdown(
     unsafe_allow_html=True
 )
 
-# Verifica se o DataFrame tratado está disponível no session_state
-if "df_avTratamentoMilhoDensidade" not in st.session_state:
+# Verifica se o DataFrame tratado está disponível no repositório compartilhado
+df_avTratamentoMilhoDensidade = obter_dataframe("df_avTratamentoMilhoDensidade")
+if df_avTratamentoMilhoDensidade is None:
     st.error("O DataFrame de tratamento de densidade não foi carregado. Volte para a página inicial e carregue os dados.")
     st.stop()
 
-# Usar o DataFrame tratado já pronto do session_state
-df_avTratamentoMilhoDensidade = st.session_state["df_avTratamentoMilhoDensidade"]
-
-filter_keys = [
-    ("macroRegiaoMilho", "Macro Região", "macro"),
-    ("conjuntaGeralMilhoSafrinha", "Conjunta Geral", "conjunta"),
-    ("subConjuntaMilhoSafrinha", "Sub Conjunta", "subconjunta"),
-    ("mrhMilho", "MRH", "mrh"),
-    ("regional", "Regional", "regional"),
-    ("siglaEstado", "Estado", "estado"),
-    ("nomeCidade", "Cidade", "cidade"),
-    ("nomeProdutor", "Produtor", "produtor"),
-    ("nomeFazenda", "Fazenda", "fazenda"),
-    ("nome", "Híbridos", "hibrido"),
-    ("populacao_av4", "Densidade", "densidade"),
-    ("displayName", "DTC Responsável", "responsavel"),
-]
-
-# Inicializa seleções no session_state
-for col, _, key in filter_keys:
-    if f"sel_{key}" not in st.session_state:
-        st.session_state[f"sel_{key}"] = []
-
 # =========================
 # Seleção de filtros
 # =========================
 
-with st.sidebar:
-    df_filtrado = df_avTratamentoMilhoDensidade.copy()
-    for col, label, key in filter_keys:
-        options = sorted(
-            df_filtrado[col].dropna().unique(), key=lambda x: str(x))
-        # Limpa seleções inválidas
-        st.session_state[f"sel_{key}"] = [
-            v for v in st.session_state[f"sel_{key}"] if v in options]
-        selecionadas = []
-        with st.expander(label, expanded=False):
-            for opt in options:
-                checked = opt in st.session_state[f"sel_{key}"]
-                if st.checkbox(str(opt), value=checked, key=f"{key}_{opt}"):
-                    selecionadas.append(opt)
-        st.session_state[f"sel_{key}"] = selecionadas
-        if selecionadas:
-            df_filtrado = df_filtrado[df_filtrado[col].isin(selecionadas)]
+df_filtrado = filtrar_na_sidebar("df_avTratamentoMilhoDensidade", df_avTratamentoMilhoDensidade, FILTROS_DENSIDADE)
+chave = chave_pagina("09_Analise_Densidade", FILTROS_DENSIDADE)
+
+iniciar_pacote("09_Analise_Densidade")
 
 # =========================
 # Visualização e exportação do DataFrame filtrado RETIRAR POSTERIORMENTE
@@ -159,17 +128,15 @@ df_analise_densidade_visualizacao = df_analise_densidade[colunas_existentes].ren
 # Exibe o DataFrame filtrado original
 titulo_expander = "Dados Originais - Análise Densidade"
 with st.expander(titulo_expander, expanded=False):
-    st.dataframe(df_filtrado, use_container_width=True)
+    st.dataframe(formatar_datas_br(df_filtrado), use_container_width=True)
 
     # Botão para exportar em Excel o DataFrame filtrado original
-    buffer_filtro = io.BytesIO()
-    df_filtrado.to_excel(buffer_filtro, index=False)  # type: ignore
-    buffer_filtro.seek(0)
-    st.download_button(
+    botao_excel(
         label="⬇️ Baixar Excel (dados originais - análise densidade)",
-        data=buffer_filtro,
-        file_name="dados_originais_analise_densidade.xlsx",
-        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        dados=df_filtrado,
+        chave=chave,
+        formatar_datas=True,
+        file_name="dados_originais_analise_densidade.xlsx"
     )
 
 # =========================
@@ -263,14 +230,10 @@ AgGrid(
 )
 
 # Botão para exportar em Excel o DataFrame customizado
-buffer_custom = io.BytesIO()
-df_analise_densidade_visualizacao.to_excel(buffer_custom, index=False)
-buffer_custom.seek(0)
-st.download_button(
+botao_excel(
     label="⬇️ Baixar Excel (Análise de Densidade - Visualização Customizada)",
-    data=buffer_custom,
-    file_name="analise_densidade_customizada.xlsx",
-    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    dados=df_analise_densidade_visualizacao,
+    file_name="analise_densidade_customizada.xlsx"
 )
 
 # =========================
@@ -311,14 +274,14 @@ df_analise_densidade[colunas_numericas] = df_analise_densidade[colunas_numericas
 # Realiza o agrupamento e calcula a média das colunas numéricas
 df_analise_densidade_agrupado = (
     df_analise_densidade
-    .groupby(group_cols, as_index=False)[colunas_numericas]
+    .groupby(group_cols, as_index=False, observed=True)[colunas_numericas]
     .mean()
 )
 
 # Recupera o nome do híbrido para cada (fazendaRef, indexTratamentoAgrupado)
 df_nome = (
     df_analise_densidade
-    .groupby(['fazendaRef', 'indexTratamentoAgrupado'])['nome']
+    .groupby(['fazendaRef', 'indexTratamentoAgrupado'], observed=True)['nome']
     .first()
     .reset_index()
 )
@@ -433,15 +396,10 @@ AgGrid(
 )
 
 # Botão para exportar em Excel o DataFrame agrupado customizado
-buffer_agrupado_vis = io.BytesIO()
-df_analise_densidade_agrupado_visualizacao.to_excel(
-    buffer_agrupado_vis, index=False)  # type: ignore
-buffer_agrupado_vis.seek(0)
-st.download_button(
+botao_excel(
     label="⬇️ Baixar Excel (Resumo da densidade)",
-    data=buffer_agrupado_vis,
-    file_name="densidade_producao.xlsx",
-    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    dados=df_analise_densidade_agrupado_visualizacao,
+    file_name="densidade_producao.xlsx"
 )
 
 # =========================
@@ -648,14 +606,10 @@ with st.expander("📊 Box Plot - Densidades até 50.000 plantas/ha", expanded=F
             )
 
         # Botão para exportar dados filtrados
-        buffer_boxplot = io.BytesIO()
-        df_filtrado_50000.to_excel(buffer_boxplot, index=False)  # type: ignore
-        buffer_boxplot.seek(0)
-        st.download_button(
+        botao_excel(
             label="⬇️ Baixar Excel (Dados para Box Plot - até 50.000 plantas/ha)",
-            data=buffer_boxplot,
-            file_name="dados_boxplot_ate_50000_plantas_ha.xlsx",
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+            dados=df_filtrado_50000,
+            file_name="dados_boxplot_ate_50000_plantas_ha.xlsx"
         )
 
     else:
@@ -809,15 +763,10 @@ with st.expander("📊 Box Plot - Densidades entre 50.000 e 57.000 plantas/ha",
             )
 
         # Botão para exportar dados filtrados
-        buffer_boxplot_50000_57000 = io.BytesIO()
-        df_filtrado_50000_57000.to_excel(
-            buffer_boxplot_50000_57000, index=False)  # type: ignore
-        buffer_boxplot_50000_57000.seek(0)
-        st.download_button(
+        botao_excel(
             label="⬇️ Baixar Excel (Dados para Box Plot - 50.000 a 57.000 plantas/ha)",
-            data=buffer_boxplot_50000_57000,
-            file_name="dados_boxplot_50000_a_57000_plantas_ha.xlsx",
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+            dados=df_filtrado_50000_57000,
+            file_name="dados_boxplot_50000_a_57000_plantas_ha.xlsx"
         )
 
     else:
@@ -971,15 +920,10 @@ with st.expander("📊 Box Plot - Densidades entre 57.000 e 65.000 plantas/ha",
             )
 
         # Botão para exportar dados filtrados
-        buffer_boxplot_57000_65000 = io.BytesIO()
-        df_filtrado_57000_65000.to_excel(
-            buffer_boxplot_57000_65000, index=False)  # type: ignore
-        buffer_boxplot_57000_65000.seek(0)
-        st.download_button(
+        botao_excel(
             label="⬇️ Baixar Excel (Dados para Box Plot - 57.000 a 65.000 plantas/ha)",
-            data=buffer_boxplot_57000_65000,
-            file_name="dados_boxplot_57000_a_65000_plantas_ha.xlsx",
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+            dados=df_filtrado_57000_65000,
+            file_name="dados_boxplot_57000_a_65000_plantas_ha.xlsx"
         )
 
     else:
@@ -1133,15 +1077,10 @@ with st.expander("📊 Box Plot - Densidades entre 65.000 e 74.000 plantas/ha",
             )
 
         # Botão para exportar dados filtrados
-        buffer_boxplot_65000_74000 = io.BytesIO()
-        df_filtrado_65000_74000.to_excel(
-            buffer_boxplot_65000_74000, index=False)  # type: ignore
-        buffer_boxplot_65000_74000.seek(0)
-        st.download_button(
+        botao_excel(
             label="⬇️ Baixar Excel (Dados para Box Plot - 65.000 a 74.000 plantas/ha)",
-            data=buffer_boxplot_65000_74000,
-            file_name="dados_boxplot_65000_a_74000_plantas_ha.xlsx",
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+            dados=df_filtrado_65000_74000,
+            file_name="dados_boxplot_65000_a_74000_plantas_ha.xlsx"
         )
 
     else:
@@ -1294,15 +1233,10 @@ with st.expander("📊 Box Plot - Densidades maiores que 74.000 plantas/ha", exp
             )
 
         # Botão para exportar dados filtrados
-        buffer_boxplot_maior_74000 = io.BytesIO()
-        df_filtrado_maior_74000.to_excel(
-            buffer_boxplot_maior_74000, index=False)  # type: ignore
-        buffer_boxplot_maior_74000.seek(0)
-        st.download_button(
+        botao_excel(
             label="⬇️ Baixar Excel (Dados para Box Plot - maiores que 74.000 plantas/ha)",
-            data=buffer_boxplot_maior_74000,
-            file_name="dados_boxplot_maior_74000_plantas_ha.xlsx",
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+            dados=df_filtrado_maior_74000,
+            file_name="dados_boxplot_maior_74000_plantas_ha.xlsx"
         )
 
     else:
@@ -1424,7 +1358,7 @@ with st.expander("📊 Box Plot - Todas as Faixas de Densidade", expanded=False)
         )
 
         # Adiciona estatísticas por faixa
-        stats_por_faixa = df_todas_faixas_filtrado.groupby('faixa_densidade')['prod_kg_ha_corr'].agg([
+        stats_por_faixa = df_todas_faixas_filtrado.groupby('faixa_densidade', observed=True)['prod_kg_ha_corr'].agg([
             'count', 'mean', 'median', 'std', 'min', 'max'
         ]).round(1)
 
@@ -1492,26 +1426,18 @@ with st.expander("📊 Box Plot - Todas as Faixas de Densidade", expanded=False)
         )
 
         # Botão para exportar dados com facetas
-        buffer_facetas = io.BytesIO()
-        df_todas_faixas_filtrado.to_excel(
-            buffer_facetas, index=False)  # type: ignore
-        buffer_facetas.seek(0)
-        st.download_button(
+        botao_excel(
             label="⬇️ Baixar Excel (Dados com Facetas por Faixa de Densidade)",
-            data=buffer_facetas,
-            file_name="dados_boxplot_facetas_por_faixa_densidade.xlsx",
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+            dados=df_todas_faixas_filtrado,
+            file_name="dados_boxplot_facetas_por_faixa_densidade.xlsx"
         )
 
         # Botão para exportar estatísticas por faixa
-        buffer_stats_faixas = io.BytesIO()
-        stats_por_faixa.to_excel(buffer_stats_faixas)  # type: ignore
-        buffer_stats_faixas.seek(0)
-        st.download_button(
+        botao_excel(
             label="⬇️ Baixar Excel (Estatísticas por Faixa de Densidade)",
-            data=buffer_stats_faixas,
+            dados=stats_por_faixa,
             file_name="estatisticas_por_faixa_densidade.xlsx",
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+            index=True
         )
 
     else:
@@ -1687,15 +1613,10 @@ with st.expander("📊 Box Plot - Densidades até 50.000 plantas/ha (Sacas/ha)",
             )
 
         # Botão para exportar dados filtrados
-        buffer_boxplot_sc = io.BytesIO()
-        df_filtrado_50000_sc.to_excel(
-            buffer_boxplot_sc, index=False)  # type: ignore
-        buffer_boxplot_sc.seek(0)
-        st.download_button(
+        botao_excel(
             label="⬇️ Baixar Excel (Dados para Box Plot - até 50.000 plantas/ha - Sacas)",
-            data=buffer_boxplot_sc,
-            file_name="dados_boxplot_ate_50000_plantas_ha_sacas.xlsx",
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+            dados=df_filtrado_50000_sc,
+            file_name="dados_boxplot_ate_50000_plantas_ha_sacas.xlsx"
         )
 
     else:
@@ -1849,15 +1770,10 @@ with st.expander("📊 Box Plot - Densidades entre 50.000 e 57.000 plantas/ha (S
             )
 
         # Botão para exportar dados filtrados
-        buffer_boxplot_50000_57000_sc = io.BytesIO()
-        df_filtrado_50000_57000_sc.to_excel(
-            buffer_boxplot_50000_57000_sc, index=False)  # type: ignore
-        buffer_boxplot_50000_57000_sc.seek(0)
-        st.download_button(
+        botao_excel(
             label="⬇️ Baixar Excel (Dados para Box Plot - 50.000 a 57.000 plantas/ha - Sacas)",
-            data=buffer_boxplot_50000_57000_sc,
-            file_name="dados_boxplot_50000_a_57000_plantas_ha_sacas.xlsx",
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+            dados=df_filtrado_50000_57000_sc,
+            file_name="dados_boxplot_50000_a_57000_plantas_ha_sacas.xlsx"
         )
 
     else:
@@ -2011,15 +1927,10 @@ with st.expander("📊 Box Plot - Densidades entre 57.000 e 65.000 plantas/ha (S
             )
 
         # Botão para exportar dados filtrados
-        buffer_boxplot_57000_65000_sc = io.BytesIO()
-        df_filtrado_57000_65000_sc.to_excel(
-            buffer_boxplot_57000_65000_sc, index=False)  # type: ignore
-        buffer_boxplot_57000_65000_sc.seek(0)
-        st.download_button(
+        botao_excel(
             label="⬇️ Baixar Excel (Dados para Box Plot - 57.000 a 65.000 plantas/ha - Sacas)",
-            data=buffer_boxplot_57000_65000_sc,
-            file_name="dados_boxplot_57000_a_65000_plantas_ha_sacas.xlsx",
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+            dados=df_filtrado_57000_65000_sc,
+            file_name="dados_boxplot_57000_a_65000_plantas_ha_sacas.xlsx"
         )
 
     else:
@@ -2173,15 +2084,10 @@ with st.expander("📊 Box Plot - Densidades entre 65.000 e 74.000 plantas/ha (S
             )
 
         # Botão para exportar dados filtrados
-        buffer_boxplot_65000_74000_sc = io.BytesIO()
-        df_filtrado_65000_74000_sc.to_excel(
-            buffer_boxplot_65000_74000_sc, index=False)  # type: ignore
-        buffer_boxplot_65000_74000_sc.seek(0)
-        st.download_button(
+        botao_excel(
             label="⬇️ Baixar Excel (Dados para Box Plot - 65.000 a 74.000 plantas/ha - Sacas)",
-            data=buffer_boxplot_65000_74000_sc,
-            file_name="dados_boxplot_65000_a_74000_plantas_ha_sacas.xlsx",
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+            dados=df_filtrado_65000_74000_sc,
+            file_name="dados_boxplot_65000_a_74000_plantas_ha_sacas.xlsx"
         )
 
     else:
@@ -2334,15 +2240,10 @@ with st.expander("📊 Box Plot - Densidades maiores que 74.000 plantas/ha (Saca
             )
 
         # Botão para exportar dados filtrados
-        buffer_boxplot_maior_74000_sc = io.BytesIO()
-        df_filtrado_maior_74000_sc.to_excel(
-            buffer_boxplot_maior_74000_sc, index=False)  # type: ignore
-        buffer_boxplot_maior_74000_sc.seek(0)
-        st.download_button(
+        botao_excel(
             label="⬇️ Baixar Excel (Dados para Box Plot - maiores que 74.000 plantas/ha - Sacas)",
-            data=buffer_boxplot_maior_74000_sc,
-            file_name="dados_boxplot_maior_74000_plantas_ha_sacas.xlsx",
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+            dados=df_filtrado_maior_74000_sc,
+            file_name="dados_boxplot_maior_74000_plantas_ha_sacas.xlsx"
         )
 
     else:
@@ -2464,7 +2365,7 @@ with st.expander("📊 Box Plot com Facetas - Todas as Faixas de Densidade (Saca
         )
 
         # Adiciona estatísticas por faixa
-        stats_por_faixa_sc = df_todas_faixas_filtrado_sc.groupby('faixa_densidade')['prod_sc_ha_corr'].agg([
+        stats_por_faixa_sc = df_todas_faixas_filtrado_sc.groupby('faixa_densidade', observed=True)['prod_sc_ha_corr'].agg([
             'count', 'mean', 'median', 'std', 'min', 'max'
         ]).round(1)
 
@@ -2532,26 +2433,18 @@ with st.expander("📊 Box Plot com Facetas - Todas as Faixas de Densidade (Saca
         )
 
         # Botão para exportar dados com facetas
-        buffer_facetas_sc = io.BytesIO()
-        df_todas_faixas_filtrado_sc.to_excel(
-            buffer_facetas_sc, index=False)  # type: ignore
-        buffer_facetas_sc.seek(0)
-        st.download_button(
+        botao_excel(
             label="⬇️ Baixar Excel (Dados com Facetas por Faixa de Densidade - Sacas)",
-            data=buffer_facetas_sc,
-            file_name="dados_boxplot_facetas_por_faixa_densidade_sacas.xlsx",
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+            dados=df_todas_faixas_filtrado_sc,
+            file_name="dados_boxplot_facetas_por_faixa_densidade_sacas.xlsx"
         )
 
         # Botão para exportar estatísticas por faixa
-        buffer_stats_faixas_sc = io.BytesIO()
-        stats_por_faixa_sc.to_excel(buffer_stats_faixas_sc)  # type: ignore
-        buffer_stats_faixas_sc.seek(0)
-        st.download_button(
+        botao_excel(
             label="⬇️ Baixar Excel (Estatísticas por Faixa de Densidade - Sacas)",
-            data=buffer_stats_faixas_sc,
+            dados=stats_por_faixa_sc,
             file_name="estatisticas_por_faixa_densidade_sacas.xlsx",
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+            index=True
         )
 
     else:
@@ -2748,15 +2641,10 @@ with st.expander("📈 Gráfico de Dispersão - Produção (kg/ha) vs Populaçã
             )
 
         # Botão para exportar dados de correlação
-        buffer_correlacao_kg = io.BytesIO()
-        df_correlacao_kg.to_excel(
-            buffer_correlacao_kg, index=False)  # type: ignore
-        buffer_correlacao_kg.seek(0)
-        st.download_button(
+        botao_excel(
             label="⬇️ Baixar Excel (Dados para Correlação - kg/ha)",
-            data=buffer_correlacao_kg,
-            file_name="dados_correlacao_producao_kg_ha.xlsx",
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+            dados=df_correlacao_kg,
+            file_name="dados_correlacao_producao_kg_ha.xlsx"
         )
 
     else:
@@ -2923,15 +2811,10 @@ with st.expander("📈 Gráfico de Dispersão - Produção (sc/ha) vs Populaçã
             )
 
         # Botão para exportar dados de correlação
-        buffer_correlacao_sc = io.BytesIO()
-        df_correlacao_sc.to_excel(
-            buffer_correlacao_sc, index=False)  # type: ignore
-        buffer_correlacao_sc.seek(0)
-        st.download_button(
+        botao_excel(
             label="⬇️ Baixar Excel (Dados para Correlação - sc/ha)",
-            data=buffer_correlacao_sc,
-            file_name="dados_correlacao_producao_sc_ha.xlsx",
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+            dados=df_correlacao_sc,
+            file_name="dados_correlacao_producao_sc_ha.xlsx"
         )
 
     else:
@@ -3059,14 +2942,11 @@ with st.expander("📊 Matriz de Correlação - Variáveis de Produção e Densi
         )
 
         # Botão para exportar matriz de correlação
-        buffer_matriz = io.BytesIO()
-        matriz_correlacao.to_excel(buffer_matriz)  # type: ignore
-        buffer_matriz.seek(0)
-        st.download_button(
+        botao_excel(
             label="⬇️ Baixar Excel (Matriz de Correlação)",
-            data=buffer_matriz,
+            dados=matriz_correlacao,
             file_name="matriz_correlacao_producao_densidade.xlsx",
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+            index=True
         )
 
     else:
@@ -3254,14 +3134,10 @@ with st.expander("📈 Análise de Regressão Linear - Produção vs População
         """)
 
         # Botão para exportar dados de regressão
-        buffer_regressao = io.BytesIO()
-        df_regressao.to_excel(buffer_regressao, index=False)  # type: ignore
-        buffer_regressao.seek(0)
-        st.download_button(
+        botao_excel(
             label="⬇️ Baixar Excel (Dados para Regressão Linear)",
-            data=buffer_regressao,
-            file_name="dados_regressao_linear_producao_populacao.xlsx",
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+            dados=df_regressao,
+            file_name="dados_regressao_linear_producao_populacao.xlsx"
         )
 
     else:
@@ -3450,15 +3326,10 @@ with st.expander("📈 Análise de Regressão Linear - Produção (sc/ha) vs Pop
         """)
 
         # Botão para exportar dados de regressão
-        buffer_regressao_sc = io.BytesIO()
-        df_regressao_sc.to_excel(
-            buffer_regressao_sc, index=False)  # type: ignore
-        buffer_regressao_sc.seek(0)
-        st.download_button(
+        botao_excel(
             label="⬇️ Baixar Excel (Dados para Regressão Linear - sc/ha)",
-            data=buffer_regressao_sc,
-            file_name="dados_regressao_linear_producao_sc_populacao.xlsx",
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+            dados=df_regressao_sc,
+            file_name="dados_regressao_linear_producao_sc_populacao.xlsx"
         )
 
     # =========================
@@ -3646,15 +3517,16 @@ with st.expander("📈 Análise de Regressão Linear - Produção (sc/ha) vs Pop
         )
 
         # Botão para exportar dados dos pontos
-        buffer_pontos = io.BytesIO()
-        df_pontos.to_excel(buffer_pontos, index=False)
-        buffer_pontos.seek(0)
-        st.download_button(
+        botao_excel(
             label="⬇️ Baixar Excel (Pontos da Equação da Reta)",
-            data=buffer_pontos,
-            file_name="pontos_equacao_retta_producao_populacao.xlsx",
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+            dados=df_pontos,
+            file_name="pontos_equacao_retta_producao_populacao.xlsx"
         )
 
     else:
         st.warning("Não há dados suficientes para análise de regressão linear.")
+
+# =========================
+# Pacote com todas as tabelas exportáveis
+# =========================
+secao_pacote("09_Analise_Densidade")
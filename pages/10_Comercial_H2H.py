@@ -1,25 +1,23 @@
 import itertools
-import time
 from st_aggrid import AgGrid, GridOptionsBuilder
 import plotly.express as px
 import streamlit as st
 import pandas as pd
-import io
 import numpy as np
 import plotly.graph_objects as go
-from supabase import create_client
+from data_processing.dados_comercial import AGRUPAMENTOS_OUTLIERS, CRITERIOS_OUTLIERS, barra_carregamento_comercial, chave_comercial, obter_df_comercial, obter_gd_milho, obter_gd_milho_tratado
+from data_processing.filtros_sidebar import selecionar_opcoes
+from data_processing.formatacao import formatar_datas_br
+from data_processing.analise_h2h import detalhar_h2h_comercial, indice_h2h_comercial, resumo_h2h_comercial
+from data_processing.exportacao import botao_excel, iniciar_pacote, secao_pacote
 import requests
 import unicodedata
 import datetime
-import os
 import tempfile
 from plotly.colors import qualitative as plotly_qual
 from scipy.stats import zscore
 from st_aggrid.shared import JsCode
 
-gd_milho_2024 = None
-gd_milho_2023 = None
-
 # =====================
 # 1. IMPORTS E CONFIGS
 # =====================
@@ -30,12 +28,11 @@ SUPABASE_KEY = st.secrets["SUPABASE_KEY"]
 if not SUPABASE_URL or not SUPABASE_KEY:
     st.warning(
         "URL ou chave do Supabase não encontrada. Defina as variáveis de ambiente SUPABASE_URL e SUPABASE_KEY.")
-    supabase = None
-else:
-    supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
 
 st.set_page_config(page_title="Painel GD", layout="wide")
 
+iniciar_pacote("10_Comercial_H2H")
+
 # =========================
 # Header customizado do dashboard
 # =========================
@@ -69,42 +66,7 @@ st.markdown(
 # 2. CARREGAMENTO DE DADOS (RESULTADOS, FAZENDA, USUARIO)
 # =====================
 
-
-def carregar_tabela_supabase(nome_tabela):
-    response = supabase.table(nome_tabela).select("*").execute()
-    if response.data:
-        return pd.DataFrame(response.data)
-    else:
-        return pd.DataFrame()
-
-
-@st.cache_data
-def fetch_table(nome_tabela):
-    return carregar_tabela_supabase(nome_tabela)
-
-
-TABELAS_COMERCIAL = ["resultados", "fazenda", "usuarios"]
-
-with st.sidebar:
-    st.markdown("### 🔄 Carregamento de Dados Comerciais")
-    st.markdown("Escolha como deseja carregar os dados:")
-    if st.button("🔄 Carregar Dados Comerciais com cache (mais rápido)"):
-        dataframes = {tabela: fetch_table(tabela)
-                      for tabela in TABELAS_COMERCIAL}
-        for nome, df in dataframes.items():
-            st.session_state[nome] = df
-        st.success("✅ Dados comerciais carregados e armazenados!")
-    if st.button("♻️ Carregar Dados Comerciais sem cache (mais lento)"):
-        start_time = time.time()
-        fetch_table.clear()  # limpa o cache da função
-        # carregar_tabela_supabase.clear()  # NÃO EXISTE .clear() para função normal
-        dataframes = {tabela: fetch_table(tabela)
-                      for tabela in TABELAS_COMERCIAL}
-        for nome, df in dataframes.items():
-            st.session_state[nome] = df
-        total_time = time.time() - start_time
-        st.success(
-            f"✅ Dados comerciais carregados direto do Supabase! (Tempo: {total_time:.2f}s)")
+barra_carregamento_comercial(SUPABASE_URL, SUPABASE_KEY)
 
 # =========================
 # VISUALIZAÇÃO DAS TABELAS CARREGADAS (BLOCO FÁCIL DE COMENTAR)
@@ -129,254 +91,11 @@ with st.sidebar:
 # --- FIM VISUALIZAÇÃO TABELAS ---
 
 # =========================
-# SEÇÃO DE TRATAMENTO DO DATAFRAME RESULTADOS
-# =========================
-# --- INÍCIO TRATAMENTO DF RESULTADOS ---
-if "resultados" in st.session_state and not st.session_state["resultados"].empty:
-    df_resultados_tratado = st.session_state["resultados"].copy()
-    colunas_remover = [
-        "criado_em",
-        "cultura",
-        "pop_inicial",
-        "tratamento_id",
-        "area_total",
-        "observacoes",
-        "fazenda_id",
-        "modificado_por",
-        "modificado_em",
-        "pmg",
-        "avariados"
-    ]
-    df_resultados_tratado = df_resultados_tratado.drop(
-        columns=[col for col in colunas_remover if col in df_resultados_tratado.columns], errors="ignore")
-    # Converter datas para formato brasileiro
-    for col_data in ["data_plantio", "data_colheita"]:
-        if col_data in df_resultados_tratado.columns:
-            df_resultados_tratado[col_data] = pd.to_datetime(
-                df_resultados_tratado[col_data], errors='coerce').dt.strftime('%d/%m/%Y')
-    # Remover pontos da coluna pop_final
-    if "pop_final" in df_resultados_tratado.columns:
-        df_resultados_tratado["pop_final"] = df_resultados_tratado["pop_final"].astype(
-            str).str.replace('.', '', regex=False)
-    # Trocar vírgula por ponto em umid_colheita e resultado
-    for col_float in ["umid_colheita", "resultado"]:
-        if col_float in df_resultados_tratado.columns:
-            df_resultados_tratado[col_float] = df_resultados_tratado[col_float].astype(
-                str).str.replace(',', '.', regex=False)
-    # Converter fazenda e produtor para caixa alta
-    for col_upper in ["fazenda", "produtor"]:
-        if col_upper in df_resultados_tratado.columns:
-            df_resultados_tratado[col_upper] = df_resultados_tratado[col_upper].astype(
-                str).str.upper()
-    # Criar coluna prod_sc_ha_corr corrigindo a umidade para 13.5%
-    if "umid_colheita" in df_resultados_tratado.columns and "resultado" in df_resultados_tratado.columns:
-        # Converter para float (caso ainda estejam como string)
-        df_resultados_tratado["umid_colheita"] = pd.to_numeric(
-            df_resultados_tratado["umid_colheita"], errors="coerce")
-        df_resultados_tratado["resultado"] = pd.to_numeric(
-            df_resultados_tratado["resultado"], errors="coerce")
-        df_resultados_tratado["prod_sc_ha_corr"] = df_resultados_tratado["resultado"] * (
-            (100 - df_resultados_tratado["umid_colheita"]) / (100 - 13.5)
-        )
-        df_resultados_tratado["prod_sc_ha_corr"] = df_resultados_tratado["prod_sc_ha_corr"].round(
-            1)
-    # Criar coluna key como concatenação de fazenda_produtor
-    if "fazenda" in df_resultados_tratado.columns and "produtor" in df_resultados_tratado.columns:
-        df_resultados_tratado["key"] = df_resultados_tratado["fazenda"].astype(
-            str) + "_" + df_resultados_tratado["produtor"].astype(str)
-    # Criar coluna safra baseada na coluna epoca
-    if "epoca" in df_resultados_tratado.columns:
-        def definir_safra(epoca):
-            if pd.isna(epoca) or str(epoca).strip() == "":
-                return "2025"
-            epoca_str = str(epoca).strip().lower()
-            if epoca_str == "safrinha":
-                return "2025"
-            elif epoca_str == "safra":
-                return "2024-2025"
-            else:
-                return "2025"
-        df_resultados_tratado["safra"] = df_resultados_tratado["epoca"].apply(
-            definir_safra)
-    # Remover linhas onde prod_sc_ha_corr é 0 ou vazio
-    if "prod_sc_ha_corr" in df_resultados_tratado.columns:
-        df_resultados_tratado = df_resultados_tratado[
-            df_resultados_tratado["prod_sc_ha_corr"].notna() & (
-                df_resultados_tratado["prod_sc_ha_corr"] != 0) & (df_resultados_tratado["prod_sc_ha_corr"] != "")
-        ]
-else:
-    df_resultados_tratado = None
-# --- FIM TRATAMENTO DF RESULTADOS ---
-
-# =========================
-# VISUALIZAÇÃO E EXPORTAÇÃO DO DATAFRAME TRATADO (BLOCO FÁCIL DE COMENTAR)
-# =========================
-# --- INÍCIO VISUALIZAÇÃO/EXPORTAÇÃO DF_RESULTADOS_TRATADO ---
-# if df_resultados_tratado is not None and not df_resultados_tratado.empty:
-#     st.markdown("### Tabela: resultados tratados")
-#     st.dataframe(df_resultados_tratado, use_container_width=True)
-#     buffer_tratado = io.BytesIO()
-#     df_resultados_tratado.to_excel(buffer_tratado, index=False)
-#     buffer_tratado.seek(0)
-#     st.download_button(
-#         label="⬇️ Baixar Excel (resultados_tratados)",
-#         data=buffer_tratado,
-#         file_name="resultados_tratados.xlsx",
-#         mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-#     )
-# else:
-#     st.info("Tabela resultados tratados não gerada ou está vazia.")
-# --- FIM VISUALIZAÇÃO/EXPORTAÇÃO DF_RESULTADOS_TRATADO ---
-
-# =========================
-# SEÇÃO DE TRATAMENTO DO DATAFRAME FAZENDA
+# GD MILHO 2025 (tratamento compartilhado pelas páginas comerciais, em cache por versão dos dados)
 # =========================
-# --- INÍCIO TRATAMENTO DF FAZENDA ---
-if "fazenda" in st.session_state and not st.session_state["fazenda"].empty:
-    df_fazenda_tratada = st.session_state["fazenda"].copy()
-    colunas_remover_fazenda = [
-        "criado_em",
-        "modificado_por",
-        "textura_solo",
-        "fertilidade_solo",
-        "isIrrigado",
-        "tipo_GD",
-        "latitude",
-        "longitude",
-        "altitude",
-        "observacoes",
-        "aut_imagem",
-        "modificado_em",
-        "criado_por",
-        "codigo_estado",
-        "cidade_id",
-        "estado_id"
-    ]
-    df_fazenda_tratada = df_fazenda_tratada.drop(
-        columns=[col for col in colunas_remover_fazenda if col in df_fazenda_tratada.columns], errors="ignore")
-    # Deixar produtor e fazenda em caixa alta
-    for col in ["produtor", "fazenda"]:
-        if col in df_fazenda_tratada.columns:
-            df_fazenda_tratada[col] = df_fazenda_tratada[col].astype(
-                str).str.upper()
-    # Criar coluna key como concatenação de fazenda_produtor
-    if "fazenda" in df_fazenda_tratada.columns and "produtor" in df_fazenda_tratada.columns:
-        df_fazenda_tratada["key"] = df_fazenda_tratada["fazenda"].astype(
-            str) + "_" + df_fazenda_tratada["produtor"].astype(str)
-else:
-    df_fazenda_tratada = None
-# --- FIM TRATAMENTO DF FAZENDA ---
-
-# =========================
-# MERGE RESULTADOS + FAZENDA PARA CRIAR gd_milho_2025
-# =========================
-# --- INÍCIO MERGE GD_MILHO_2025 ---
-gd_milho_2025 = None
-if df_resultados_tratado is not None and not df_resultados_tratado.empty and \
-   df_fazenda_tratada is not None and not df_fazenda_tratada.empty:
-    # Verificar se a coluna 'key' existe em ambos os DataFrames
-    if "key" in df_resultados_tratado.columns and "key" in df_fazenda_tratada.columns:
-        # Seleciona apenas as colunas chave e as desejadas de fazenda
-        cols_fazenda = ["key"]
-        for col in ["nome_cidade", "nome_estado"]:
-            if col in df_fazenda_tratada.columns:
-                cols_fazenda.append(col)
-        gd_milho_2025 = df_resultados_tratado.merge(
-            df_fazenda_tratada[cols_fazenda],
-            on="key",
-            how="left"
-        )
-    else:
-        gd_milho_2025 = None
-else:
-    gd_milho_2025 = None
-# --- FIM MERGE GD_MILHO_2025 ---
-
-# =========================
-# MERGE gd_milho_2025 + usuarios (trazendo nome do usuário)
-# =========================
-# --- INÍCIO MERGE GD_MILHO_2025 + USUARIOS ---
-if gd_milho_2025 is not None and not gd_milho_2025.empty and \
-   "usuarios" in st.session_state and not st.session_state["usuarios"].empty:
-    usuarios_df = st.session_state["usuarios"]
-    # Seleciona apenas as colunas necessárias
-    usuarios_df = usuarios_df[[
-        col for col in usuarios_df.columns if col in ("usuario_id", "nome")]].copy()
-    usuarios_df = usuarios_df.rename(columns={"nome": "nome_usuario"})
-    gd_milho_2025 = gd_milho_2025.merge(
-        usuarios_df,
-        left_on="criado_por",
-        right_on="usuario_id",
-        how="left"
-    )
-    gd_milho_2025 = gd_milho_2025.drop(columns=["usuario_id"], errors="ignore")
-# --- FIM MERGE GD_MILHO_2025 + USUARIOS ---
-
-# Adicionar coluna siglaEstado baseada em nome_estado
-if gd_milho_2025 is not None and "nome_estado" in gd_milho_2025.columns:
-    estados_siglas = {
-        "Acre": "AC", "Alagoas": "AL", "Amapá": "AP", "Amazonas": "AM", "Bahia": "BA",
-        "Ceará": "CE", "Distrito Federal": "DF", "Espírito Santo": "ES", "Goiás": "GO",
-        "Maranhão": "MA", "Mato Grosso": "MT", "Mato Grosso do Sul": "MS", "Minas Gerais": "MG",
-        "Pará": "PA", "Paraíba": "PB", "Paraná": "PR", "Pernambuco": "PE", "Piauí": "PI",
-        "Rio de Janeiro": "RJ", "Rio Grande do Norte": "RN", "Rio Grande do Sul": "RS",
-        "Rondônia": "RO", "Roraima": "RR", "Santa Catarina": "SC", "São Paulo": "SP",
-        "Sergipe": "SE", "Tocantins": "TO"
-    }
-    gd_milho_2025["siglaEstado"] = gd_milho_2025["nome_estado"].map(
-        estados_siglas)
-
-# Deixar nome_usuario em caixa alta
-if gd_milho_2025 is not None and "nome_usuario" in gd_milho_2025.columns:
-    gd_milho_2025["nome_usuario"] = gd_milho_2025["nome_usuario"].astype(
-        str).str.upper()
-
-# Criar coluna cidade_siglaEstado ANTES da renomeação/reordenação
-if gd_milho_2025 is not None and not gd_milho_2025.empty:
-    # Usar nome_cidade se existir, senão cidade (caso já tenha sido renomeada)
-    col_cidade = None
-    if "nome_cidade" in gd_milho_2025.columns:
-        col_cidade = "nome_cidade"
-    elif "cidade" in gd_milho_2025.columns:
-        col_cidade = "cidade"
-    if col_cidade and "siglaEstado" in gd_milho_2025.columns:
-        gd_milho_2025["cidade_siglaEstado"] = gd_milho_2025[col_cidade].astype(
-            str) + "_" + gd_milho_2025["siglaEstado"].astype(str)
-
-# Dicionário de renomeação e seleção de colunas permanece igual
-if gd_milho_2025 is not None and not gd_milho_2025.empty:
-    renomear = {
-        "produtor": "cliente",
-        "nome_cidade": "cidade",
-        "tratamento": "hibrido",
-        "umid_colheita": "umidade",
-        "nome_usuario": "responsavel"
-    }
-    colunas_ordem = [
-        "cliente",
-        "siglaEstado",
-        "cidade",
-        "cidade_siglaEstado",
-        "hibrido",
-        "pop_final",
-        "data_plantio",
-        "data_colheita",
-        "prod_sc_ha_corr",
-        "umidade",
-        "safra",
-        "responsavel"
-    ]
-    gd_milho_2025 = gd_milho_2025.rename(columns=renomear)
-    colunas_existentes = [
-        col for col in colunas_ordem if col in gd_milho_2025.columns]
-    gd_milho_2025 = gd_milho_2025[colunas_existentes]
-
-# Remover linhas onde cidade ou hibrido estão vazios ou nulos
-if gd_milho_2025 is not None and not gd_milho_2025.empty:
-    gd_milho_2025 = gd_milho_2025[
-        gd_milho_2025['cidade'].notna() & (gd_milho_2025['cidade'] != '') &
-        gd_milho_2025['hibrido'].notna() & (gd_milho_2025['hibrido'] != '')
-    ]
+gd_milho_2025 = obter_gd_milho("2025")
+# Chaves baratas dos dados de cada seção (sem percorrer os DataFrames) para os downloads
+chave_gd = chave_comercial("10_Comercial_H2H")
 
 # =========================
 # VISUALIZAÇÃO E EXPORTAÇÃO DO DATAFRAME gd_milho_2025 (BLOCO FÁCIL DE COMENTAR)
@@ -401,15 +120,13 @@ if gd_milho_2025 is not None and not gd_milho_2025.empty:
     """,
         unsafe_allow_html=True
     )
-    st.dataframe(gd_milho_2025, use_container_width=True)
-    buffer_gd = io.BytesIO()
-    gd_milho_2025.to_excel(buffer_gd, index=False)
-    buffer_gd.seek(0)
-    st.download_button(
+    st.dataframe(formatar_datas_br(gd_milho_2025), use_container_width=True)
+    botao_excel(
         label="⬇️ Baixar Excel (gd_milho_2025)",
-        data=buffer_gd,
-        file_name="gd_milho_2025.xlsx",
-        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        dados=gd_milho_2025,
+        chave=chave_gd,
+        formatar_datas=True,
+        file_name="gd_milho_2025.xlsx"
     )
 else:
     st.info("Tabela gd_milho_2025 não gerada ou está vazia.")
@@ -421,68 +138,20 @@ else:
 # --- INÍCIO REMOÇÃO OUTLIERS Z-SCORE ---
 
 
-def remover_outliers_zscore(df, colunas, threshold=3.0):
-    df_limpo = df.copy()
-    outlier_mask = pd.Series(False, index=df.index)
-    log_remocao = pd.Series("", index=df.index)
-    parametros = {}
-    for coluna in colunas:
-        serie = df[coluna].dropna()
-        media = serie.mean()
-        std = serie.std()
-        z_scores = ((serie - media) / std).abs()
-        mask = z_scores > threshold
-        # Reindexar para alinhar com o DataFrame original
-        mask_full = pd.Series(False, index=df.index)
-        mask_full[serie.index] = mask
-        outlier_mask = outlier_mask | mask_full
-        for idx in serie.index[mask]:
-            valor = df.at[idx, coluna]
-            z = z_scores.at[idx]
-            if valor < media:
-                log_remocao.at[idx] += f"Outlier em {coluna} (abaixo do limiar: média - {threshold}*std = {media - threshold*std:.2f}, z-score={z:.2f}); "
-            else:
-                log_remocao.at[idx] += f"Outlier em {coluna} (acima do limiar: média + {threshold}*std = {media + threshold*std:.2f}, z-score={z:.2f}); "
-        parametros[coluna] = {
-            'media': media,
-            'std': std,
-            'limite_inferior': media - threshold*std,
-            'limite_superior': media + threshold*std
-        }
-    df_removidos = df[outlier_mask].copy()
-    if not df_removidos.empty:
-        df_removidos['log_remocao'] = log_remocao[outlier_mask].str.strip('; ')
-    df_limpo = df[~outlier_mask].copy()
-    return df_limpo, df_removidos, parametros
-
-
 # Ajuste do threshold do Z-Score na barra lateral
 threshold_zscore = st.sidebar.number_input(
-    'Threshold do Z-Score para remoção de outliers', min_value=1.0, max_value=5.0, value=3.0, step=0.1, format="%0.1f")
+    'Threshold do Z-Score para remoção de outliers', min_value=1.0, max_value=5.0, value=3.0, step=0.1, format="%0.1f",
+    help="No critério IQR é o múltiplo do intervalo interquartil (1.5 é o valor usual).")
+metodo_outliers = CRITERIOS_OUTLIERS[st.sidebar.selectbox(
+    'Critério de outliers', list(CRITERIOS_OUTLIERS), key='criterio_outliers_comercial')]
+agrupar_outliers = AGRUPAMENTOS_OUTLIERS[st.sidebar.selectbox(
+    'Estatísticas de outliers por', list(AGRUPAMENTOS_OUTLIERS), key='agrupar_outliers_comercial')]
 
-# Remoção de outliers por Z-Score para gd_milho_2025
-if gd_milho_2025 is not None and not gd_milho_2025.empty:
-    gd_milho_2025_tratado, gd_milho_2025_outliers, parametros_zscore = remover_outliers_zscore(
-        gd_milho_2025, ['prod_sc_ha_corr', 'umidade'], threshold=threshold_zscore
-    )
-else:
-    gd_milho_2025_tratado, gd_milho_2025_outliers, parametros_zscore = None, None, None
-
-# Remoção de outliers por Z-Score para gd_milho_2024
-if gd_milho_2024 is not None and not gd_milho_2024.empty:
-    gd_milho_2024_tratado, gd_milho_2024_outliers_tratado, parametros_zscore_2024_tratado = remover_outliers_zscore(
-        gd_milho_2024, ['prod_sc_ha_corr', 'umidade'], threshold=threshold_zscore
-    )
-else:
-    gd_milho_2024_tratado, gd_milho_2024_outliers_tratado, parametros_zscore_2024_tratado = None, None, None
-
-# Remoção de outliers por Z-Score para gd_milho_2023
-if gd_milho_2023 is not None and not gd_milho_2023.empty:
-    gd_milho_2023_tratado, gd_milho_2023_outliers_tratado, parametros_zscore_2023_tratado = remover_outliers_zscore(
-        gd_milho_2023, ['prod_sc_ha_corr', 'umidade'], threshold=threshold_zscore
-    )
-else:
-    gd_milho_2023_tratado, gd_milho_2023_outliers_tratado, parametros_zscore_2023_tratado = None, None, None
+# Remoção de outliers por Z-Score para gd_milho_2025 (em cache por threshold)
+gd_milho_2025_tratado, gd_milho_2025_outliers, parametros_zscore = obter_gd_milho_tratado(
+    "2025", threshold_zscore, agrupar_outliers, metodo_outliers)
+chave_outliers = chave_comercial(
+    "10_Comercial_H2H", threshold=threshold_zscore, agrupar_por=agrupar_outliers, metodo=metodo_outliers)
 
 
 # Visualização dos outliers removidos
@@ -505,22 +174,18 @@ if gd_milho_2025_outliers is not None and not gd_milho_2025_outliers.empty:
     """,
         unsafe_allow_html=True
     )
-    st.dataframe(gd_milho_2025_outliers, use_container_width=True)
-    buffer_outliers = io.BytesIO()
-    gd_milho_2025_outliers.to_excel(buffer_outliers, index=False)
-    buffer_outliers.seek(0)
-    st.download_button(
+    st.dataframe(formatar_datas_br(gd_milho_2025_outliers), use_container_width=True)
+    botao_excel(
         label="⬇️ Baixar Excel (outliers_removidos)",
-        data=buffer_outliers,
+        dados=gd_milho_2025_outliers,
+        chave=chave_outliers,
+        formatar_datas=True,
         file_name="outliers_removidos.xlsx",
-        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
         key="download_outliers_removidos"
     )
     # Exibir parâmetros do Z-Score usados
-    st.markdown("**Parâmetros do Z-Score por coluna:**")
-    for coluna, info in parametros_zscore.items():
-        st.markdown(
-            f"<div style='background: #f5f7fa; border-radius: 8px; padding: 10px; margin-bottom: 8px;'><b>{coluna}</b><br>Média: {info['media']:.2f} | Desvio padrão: {info['std']:.2f}<br>Limite inferior: {info['limite_inferior']:.2f} | Limite superior: {info['limite_superior']:.2f}</div>", unsafe_allow_html=True)
+    st.markdown("**Parâmetros dos outliers por coluna:**")
+    st.dataframe(parametros_zscore, hide_index=True, use_container_width=True)
 else:
     st.info("Nenhuma linha foi removida como outlier com o threshold atual.")
 
@@ -545,15 +210,13 @@ if gd_milho_2025_tratado is not None and not gd_milho_2025_tratado.empty:
     """,
         unsafe_allow_html=True
     )
-    st.dataframe(gd_milho_2025_tratado, use_container_width=True)
-    buffer_gd_tratado = io.BytesIO()
-    gd_milho_2025_tratado.to_excel(buffer_gd_tratado, index=False)
-    buffer_gd_tratado.seek(0)
-    st.download_button(
+    st.dataframe(formatar_datas_br(gd_milho_2025_tratado), use_container_width=True)
+    botao_excel(
         label="⬇️ Baixar Excel (gd_milho_2025_tratado)",
-        data=buffer_gd_tratado,
+        dados=gd_milho_2025_tratado,
+        chave=chave_outliers,
+        formatar_datas=True,
         file_name="gd_milho_2025_tratado.xlsx",
-        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
         key="download_gd_milho_2025_tratado"
     )
 else:
@@ -563,10 +226,8 @@ else:
 # VISUALIZAÇÃO DO ARQUIVO EXCEL gd_milho_2024 (BLOCO FÁCIL DE COMENTAR)
 # =========================
 # --- INÍCIO VISUALIZAÇÃO/EXPORTAÇÃO GD_MILHO_2024 ---
-gd_milho_2024 = None
-caminho_gd_2024 = os.path.join("datasets", "gd_milho_2024.xlsx")
-if os.path.exists(caminho_gd_2024):
-    gd_milho_2024 = pd.read_excel(caminho_gd_2024)
+gd_milho_2024 = obter_gd_milho("2024")
+if gd_milho_2024 is not None:
     st.markdown("### Resultados 2024")
     st.markdown(
         """
@@ -585,15 +246,13 @@ if os.path.exists(caminho_gd_2024):
     """,
         unsafe_allow_html=True
     )
-    st.dataframe(gd_milho_2024, use_container_width=True)
-    buffer_gd_2024 = io.BytesIO()
-    gd_milho_2024.to_excel(buffer_gd_2024, index=False)
-    buffer_gd_2024.seek(0)
-    st.download_button(
+    st.dataframe(formatar_datas_br(gd_milho_2024), use_container_width=True)
+    botao_excel(
         label="⬇️ Baixar Excel (gd_milho_2024)",
-        data=buffer_gd_2024,
+        dados=gd_milho_2024,
+        chave=chave_gd,
+        formatar_datas=True,
         file_name="gd_milho_2024.xlsx",
-        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
         key="download_gd_milho_2024"
     )
 else:
@@ -604,12 +263,9 @@ else:
 # REMOÇÃO DE OUTLIERS (Z-SCORE) EM gd_milho_2024 (BLOCO FÁCIL DE COMENTAR)
 # =========================
 # --- INÍCIO REMOÇÃO OUTLIERS Z-SCORE gd_milho_2024 ---
-gd_milho_2024_tratado, gd_milho_2024_outliers_tratado, parametros_zscore_2024_tratado = None, None, None
+gd_milho_2024_tratado, gd_milho_2024_outliers_tratado, parametros_zscore_2024_tratado = obter_gd_milho_tratado(
+    "2024", threshold_zscore, agrupar_outliers, metodo_outliers)
 if gd_milho_2024 is not None and not gd_milho_2024.empty:
-    # Reutiliza a função remover_outliers_zscore já definida
-    gd_milho_2024_tratado, gd_milho_2024_outliers_tratado, parametros_zscore_2024_tratado = remover_outliers_zscore(
-        gd_milho_2024, ['prod_sc_ha_corr', 'umidade'], threshold=threshold_zscore
-    )
     # Visualização dos outliers removidos
     # st.markdown("### Linhas removidas como outliers (Z-Score) - gd_milho_2024")
     st.markdown(
@@ -630,23 +286,18 @@ if gd_milho_2024 is not None and not gd_milho_2024.empty:
         unsafe_allow_html=True
     )
     if gd_milho_2024_outliers_tratado is not None and not gd_milho_2024_outliers_tratado.empty:
-        st.dataframe(gd_milho_2024_outliers_tratado, use_container_width=True)
-        buffer_outliers_2024 = io.BytesIO()
-        gd_milho_2024_outliers_tratado.to_excel(
-            buffer_outliers_2024, index=False)
-        buffer_outliers_2024.seek(0)
-        st.download_button(
+        st.dataframe(formatar_datas_br(gd_milho_2024_outliers_tratado), use_container_width=True)
+        botao_excel(
             label="⬇️ Baixar Excel (outliers_removidos_2024)",
-            data=buffer_outliers_2024,
+            dados=gd_milho_2024_outliers_tratado,
+            chave=chave_outliers,
+            formatar_datas=True,
             file_name="outliers_removidos_2024.xlsx",
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
             key="download_outliers_removidos_2024"
         )
         # Exibir parâmetros do Z-Score usados
-        st.markdown("**Parâmetros do Z-Score por coluna (gd_milho_2024):**")
-        for coluna, info in parametros_zscore_2024_tratado.items():
-            st.markdown(
-                f"<div style='background: #f5f7fa; border-radius: 8px; padding: 10px; margin-bottom: 8px;'><b>{coluna}</b><br>Média: {info['media']:.2f} | Desvio padrão: {info['std']:.2f}<br>Limite inferior: {info['limite_inferior']:.2f} | Limite superior: {info['limite_superior']:.2f}</div>", unsafe_allow_html=True)
+        st.markdown("**Parâmetros dos outliers por coluna (gd_milho_2024):**")
+        st.dataframe(parametros_zscore_2024_tratado, hide_index=True, use_container_width=True)
     else:
         st.info("Nenhuma linha foi removida como outlier com o threshold atual.")
     # Visualização do DataFrame tratado (sem outliers)
@@ -669,15 +320,13 @@ if gd_milho_2024 is not None and not gd_milho_2024.empty:
         unsafe_allow_html=True
     )
     if gd_milho_2024_tratado is not None and not gd_milho_2024_tratado.empty:
-        st.dataframe(gd_milho_2024_tratado, use_container_width=True)
-        buffer_gd_2024_tratado = io.BytesIO()
-        gd_milho_2024_tratado.to_excel(buffer_gd_2024_tratado, index=False)
-        buffer_gd_2024_tratado.seek(0)
-        st.download_button(
+        st.dataframe(formatar_datas_br(gd_milho_2024_tratado), use_container_width=True)
+        botao_excel(
             label="⬇️ Baixar Excel (gd_milho_2024_tratado)",
-            data=buffer_gd_2024_tratado,
+            dados=gd_milho_2024_tratado,
+            chave=chave_outliers,
+            formatar_datas=True,
             file_name="gd_milho_2024_tratado.xlsx",
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
             key="download_gd_milho_2024_tratado"
         )
     else:
@@ -688,10 +337,8 @@ if gd_milho_2024 is not None and not gd_milho_2024.empty:
 # VISUALIZAÇÃO E TRATAMENTO DO ARQUIVO EXCEL gd_milho_2023 (BLOCO FÁCIL DE COMENTAR)
 # =========================
 # --- INÍCIO VISUALIZAÇÃO/EXPORTAÇÃO/TRATAMENTO GD_MILHO_2023 ---
-gd_milho_2023 = None
-caminho_gd_2023 = os.path.join("datasets", "gd_milho_2023.xlsx")
-if os.path.exists(caminho_gd_2023):
-    gd_milho_2023 = pd.read_excel(caminho_gd_2023)
+gd_milho_2023 = obter_gd_milho("2023")
+if gd_milho_2023 is not None:
     st.markdown("### Resultados 2023")
     st.markdown(
         """
@@ -710,21 +357,18 @@ if os.path.exists(caminho_gd_2023):
     """,
         unsafe_allow_html=True
     )
-    st.dataframe(gd_milho_2023, use_container_width=True)
-    buffer_gd_2023 = io.BytesIO()
-    gd_milho_2023.to_excel(buffer_gd_2023, index=False)
-    buffer_gd_2023.seek(0)
-    st.download_button(
+    st.dataframe(formatar_datas_br(gd_milho_2023), use_container_width=True)
+    botao_excel(
         label="⬇️ Baixar Excel (gd_milho_2023)",
-        data=buffer_gd_2023,
+        dados=gd_milho_2023,
+        chave=chave_gd,
+        formatar_datas=True,
         file_name="gd_milho_2023.xlsx",
-        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
         key="download_gd_milho_2023"
     )
     # Remoção de outliers por Z-Score
-    gd_milho_2023_tratado, gd_milho_2023_outliers_tratado, parametros_zscore_2023_tratado = remover_outliers_zscore(
-        gd_milho_2023, ['prod_sc_ha_corr', 'umidade'], threshold=threshold_zscore
-    )
+    gd_milho_2023_tratado, gd_milho_2023_outliers_tratado, parametros_zscore_2023_tratado = obter_gd_milho_tratado(
+        "2023", threshold_zscore, agrupar_outliers, metodo_outliers)
     # st.markdown("### Linhas removidas como outliers (Z-Score) - gd_milho_2023")
     st.markdown(
         """
@@ -744,22 +388,17 @@ if os.path.exists(caminho_gd_2023):
         unsafe_allow_html=True
     )
     if gd_milho_2023_outliers_tratado is not None and not gd_milho_2023_outliers_tratado.empty:
-        st.dataframe(gd_milho_2023_outliers_tratado, use_container_width=True)
-        buffer_outliers_2023 = io.BytesIO()
-        gd_milho_2023_outliers_tratado.to_excel(
-            buffer_outliers_2023, index=False)
-        buffer_outliers_2023.seek(0)
-        st.download_button(
+        st.dataframe(formatar_datas_br(gd_milho_2023_outliers_tratado), use_container_width=True)
+        botao_excel(
             label="⬇️ Baixar Excel (outliers_removidos_2023)",
-            data=buffer_outliers_2023,
+            dados=gd_milho_2023_outliers_tratado,
+            chave=chave_outliers,
+            formatar_datas=True,
             file_name="outliers_removidos_2023.xlsx",
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
             key="download_outliers_removidos_2023"
         )
-        st.markdown("**Parâmetros do Z-Score por coluna (gd_milho_2023):**")
-        for coluna, info in parametros_zscore_2023_tratado.items():
-            st.markdown(
-                f"<div style='background: #f5f7fa; border-radius: 8px; padding: 10px; margin-bottom: 8px;'><b>{coluna}</b><br>Média: {info['media']:.2f} | Desvio padrão: {info['std']:.2f}<br>Limite inferior: {info['limite_inferior']:.2f} | Limite superior: {info['limite_superior']:.2f}</div>", unsafe_allow_html=True)
+        st.markdown("**Parâmetros dos outliers por coluna (gd_milho_2023):**")
+        st.dataframe(parametros_zscore_2023_tratado, hide_index=True, use_container_width=True)
     else:
         st.info("Nenhuma linha foi removida como outlier com o threshold atual.")
     # st.markdown("### Tabela: gd_milho_2023 (sem outliers)")
@@ -781,15 +420,13 @@ if os.path.exists(caminho_gd_2023):
         unsafe_allow_html=True
     )
     if gd_milho_2023_tratado is not None and not gd_milho_2023_tratado.empty:
-        st.dataframe(gd_milho_2023_tratado, use_container_width=True)
-        buffer_gd_2023_tratado = io.BytesIO()
-        gd_milho_2023_tratado.to_excel(buffer_gd_2023_tratado, index=False)
-        buffer_gd_2023_tratado.seek(0)
-        st.download_button(
+        st.dataframe(formatar_datas_br(gd_milho_2023_tratado), use_container_width=True)
+        botao_excel(
             label="⬇️ Baixar Excel (gd_milho_2023_tratado)",
-            data=buffer_gd_2023_tratado,
+            dados=gd_milho_2023_tratado,
+            chave=chave_outliers,
+            formatar_datas=True,
             file_name="gd_milho_2023_tratado.xlsx",
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
             key="download_gd_milho_2023_tratado"
         )
     else:
@@ -827,44 +464,12 @@ else:
 #         st.info("Nenhum DataFrame tratado disponível para concatenar em df_comercial.")
 # --- FIM CONCATENAÇÃO/EXPORTAÇÃO DF_COMERCIAL ---
 
-# =========================
-# FUNÇÃO CACHEADA PARA PREPARAR DF_COMERCIAL
-# =========================
-
-
-@st.cache_data
-def preparar_df_comercial(gd_milho_2025_tratado, gd_milho_2024_tratado, gd_milho_2023_tratado):
-    lista_df = []
-    for df in [gd_milho_2025_tratado, gd_milho_2024_tratado, gd_milho_2023_tratado]:
-        if df is not None and not df.empty:
-            lista_df.append(df)
-    df_comercial = None
-    if lista_df:
-        df_comercial = pd.concat(lista_df, ignore_index=True)
-        # Merge com base_municipios
-        caminho_base_municipios = os.path.join(
-            "datasets", "base_municipios_regioes_soja_milho.xlsx")
-        if os.path.exists(caminho_base_municipios):
-            base_municipios = pd.read_excel(caminho_base_municipios)
-            cols_base = ["cidade_siglaEstado", "mrhMilho", "macroRegiaoMilho",
-                         "subConjuntaMilhoSafrinha", "conjuntaGeralMilhoSafrinha"]
-            base_municipios = base_municipios[[
-                col for col in cols_base if col in base_municipios.columns]]
-            if df_comercial is not None and not df_comercial.empty:
-                df_comercial = df_comercial.merge(
-                    base_municipios,
-                    on="cidade_siglaEstado",
-                    how="left"
-                )
-    return df_comercial
-
-
 # =========================
 # FILTRO INTERATIVO NO SIDEBAR PARA df_comercial (BLOCO FÁCIL DE COMENTAR)
 # =========================
 # --- INÍCIO FILTRO SIDEBAR DF_FILTRADO ---
-df_comercial = preparar_df_comercial(
-    gd_milho_2025_tratado, gd_milho_2024_tratado, gd_milho_2023_tratado)
+df_comercial = obter_df_comercial(
+    threshold_zscore, agrupar_por=agrupar_outliers, metodo=metodo_outliers)
 df_filtrado = None
 if df_comercial is not None and not df_comercial.empty:
     df_filtrado = df_comercial.copy()
@@ -885,19 +490,12 @@ if df_comercial is not None and not df_comercial.empty:
         for col, label, key in filter_keys:
             options = sorted(
                 df_filtrado[col].dropna().unique(), key=lambda x: str(x))
-            # Limpa seleções inválidas
-            st.session_state[f"sel_{key}"] = [
-                v for v in st.session_state[f"sel_{key}"] if v in options]
-            selecionadas = []
-            with st.expander(label, expanded=False):
-                for opt in options:
-                    checked = opt in st.session_state[f"sel_{key}"]
-                    if st.checkbox(str(opt), value=checked, key=f"{key}_{opt}"):
-                        selecionadas.append(opt)
-            st.session_state[f"sel_{key}"] = selecionadas
+            selecionadas = selecionar_opcoes(label, key, options)
             if selecionadas:
                 df_filtrado = df_filtrado[df_filtrado[col].isin(
                     selecionadas)]
+    chave_filtrado = chave_comercial("10_Comercial_H2H", filter_keys, threshold=threshold_zscore,
+                                     agrupar_por=agrupar_outliers, metodo=metodo_outliers)
     # st.markdown("### Resultados GD Milho")
     # st.markdown(
         # """
@@ -975,7 +573,7 @@ if df_filtrado is not None and not df_filtrado.empty:
         ".ag-cell": {"font-size": "1em", "color": "#222"}
     }
     AgGrid(
-        df_filtrado_customizado,
+        formatar_datas_br(df_filtrado_customizado),
         gridOptions=grid_options,
         enable_enterprise_modules=True,
         fit_columns_on_grid_load=False,
@@ -985,20 +583,79 @@ if df_filtrado is not None and not df_filtrado.empty:
         custom_css=custom_css
     )
     # Botão para exportar em Excel o DataFrame customizado
-    buffer = io.BytesIO()
-    df_filtrado_customizado.to_excel(buffer, index=False)
-    buffer.seek(0)
-    st.download_button(
+    botao_excel(
         label="⬇️ Baixar Excel (Geração de Demanda - Milho)",
-        data=buffer,
-        file_name="geracao_demanda_milho.xlsx",
-        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        dados=df_filtrado_customizado,
+        chave=chave_filtrado,
+        formatar_datas=True,
+        file_name="geracao_demanda_milho.xlsx"
     )
 else:
     st.info("Nenhum dado disponível para exibir em Geração de Demanda - Milho.")
 # --- FIM GERAÇÃO DE DEMANDA MILHO ---
 
 
+# =========================
+# H2H COMERCIAL - TODOS OS PARES DE HÍBRIDOS DO FILTRO
+# =========================
+st.markdown('<h3 style="margin-top: 2em; margin-bottom: 0.5em; color: #0070C0; font-weight: 700;">Ranking H2H de todos os pares de híbridos</h3>', unsafe_allow_html=True)
+if df_analise_h2h is not None:
+    if st.button('Rodar H2H de todos os pares', key='btn_run_h2h_todos_comercial'):
+        st.session_state['run_h2h_todos_comercial'] = True
+    if st.session_state.get('run_h2h_todos_comercial', False):
+        # Repetições do híbrido no mesmo local e safra entram pela média; resultado em cache por filtro
+        with st.spinner('Calculando H2H de todos os pares...'):
+            df_resumo_h2h_comercial = resumo_h2h_comercial(df_analise_h2h)
+        if df_resumo_h2h_comercial.empty:
+            st.info('Nenhum par de híbridos com local e safra em comum.')
+        else:
+            df_ranking_h2h = df_resumo_h2h_comercial.sort_values(
+                ['Difference_mean', 'Percentage_of_Win'], ascending=False).rename(columns={
+                    'Head_mean': 'Head prod@13.5% (sc/ha)',
+                    'Check_mean': 'Check prod@13.5% (sc/ha)',
+                    'Difference_mean': 'Diferença média (sc/ha)',
+                    'Difference_sd': 'DP diferença (sc/ha)',
+                    'Number_of_Win': 'Vitórias',
+                    'Number_Of_Comparison': 'Comparações',
+                    'Percentage_of_Win': 'Vitórias (%)',
+                    'p_value_t': 'p-valor (t pareado)',
+                    'p_value_sign': 'p-valor (sinal)',
+                    'CI95_low': 'IC95% inf (sc/ha)',
+                    'CI95_high': 'IC95% sup (sc/ha)',
+                }).drop(columns=['t_statistic'])
+            colunas_1_casa = ['Head prod@13.5% (sc/ha)', 'Check prod@13.5% (sc/ha)', 'Diferença média (sc/ha)',
+                              'DP diferença (sc/ha)', 'Vitórias (%)', 'IC95% inf (sc/ha)', 'IC95% sup (sc/ha)']
+            df_ranking_h2h[colunas_1_casa] = df_ranking_h2h[colunas_1_casa].round(1)
+            df_ranking_h2h[['p-valor (t pareado)', 'p-valor (sinal)']] = df_ranking_h2h[[
+                'p-valor (t pareado)', 'p-valor (sinal)']].round(3)
+            gb_ranking = GridOptionsBuilder.from_dataframe(df_ranking_h2h)
+            gb_ranking.configure_default_column(
+                editable=False, groupable=True, filter=True, resizable=True, cellStyle={'fontSize': '13px'})
+            gb_ranking.configure_grid_options(headerHeight=32)
+            with st.expander("Ver ranking H2H de todos os pares", expanded=True):
+                AgGrid(
+                    df_ranking_h2h,
+                    gridOptions=gb_ranking.build(),
+                    enable_enterprise_modules=True,
+                    fit_columns_on_grid_load=False,
+                    theme="streamlit",
+                    height=500,
+                    reload_data=True,
+                    custom_css={
+                        ".ag-header-cell-label": {"font-weight": "bold", "font-size": "1.15em", "color": "#222"},
+                        ".ag-cell": {"color": "#222", "font-size": "1em"}
+                    },
+                    key="aggrid_h2h_todos_comercial"
+                )
+                botao_excel(
+                    label='⬇️ Baixar Excel (H2H todos os pares)',
+                    dados=df_ranking_h2h,
+                    file_name='h2h_todos_os_pares_milho.xlsx'
+                )
+            with st.expander("Matriz de diferença média (Head × Check, sc/ha)", expanded=False):
+                st.dataframe(df_ranking_h2h.pivot(index='Head', columns='Check',
+                                                  values='Diferença média (sc/ha)'), use_container_width=True)
+
 # =========================
 # SELEÇÃO DE HÍBRIDOS PARA ANÁLISE H2H (NA PÁGINA PRINCIPAL)
 # =========================
@@ -1029,46 +686,33 @@ else:
 # ANÁLISE HEAD TO HEAD (H2H) - MILHO (APENAS PARA O PAR SELECIONADO)
 # =========================
 if st.session_state.get('run_h2h', False) and head_selected and check_selected:
-    resultados_h2h = []
-    locais = pd.Series(df_analise_h2h['cidade_siglaEstado']).dropna().unique()
-    for local in locais:
-        row_head = df_analise_h2h[(df_analise_h2h['hibrido'] == head_selected) & (
-            df_analise_h2h['cidade_siglaEstado'] == local)]
-        row_check = df_analise_h2h[(df_analise_h2h['hibrido'] == check_selected) & (
-            df_analise_h2h['cidade_siglaEstado'] == local)]
-        if not isinstance(row_head, pd.DataFrame):
-            row_head = pd.DataFrame(row_head)
-        if not isinstance(row_check, pd.DataFrame):
-            row_check = pd.DataFrame(row_check)
-        if not row_head.empty and not row_check.empty:
-            head_mean = row_head.iloc[0]['prod_sc_ha_corr'] if 'prod_sc_ha_corr' in row_head else None
-            check_mean = row_check.iloc[0]['prod_sc_ha_corr'] if 'prod_sc_ha_corr' in row_check else None
-            diff = head_mean - check_mean if head_mean is not None and check_mean is not None else None
-            vitoria = int(diff > 0) if diff is not None else None
-            resultados_h2h.append({
-                'Local': local,
-                'Head': head_selected,
-                'Check': check_selected,
-                'Head prod@13.5% (sc/ha)': head_mean,
-                'Check prod@13.5% (sc/ha)': check_mean,
-                'Diferença (sc/ha)': diff,
-                'Vitória Head': vitoria,
-                'Head umidade (%)': row_head.iloc[0]['umidade'] if 'umidade' in row_head else None,
-                'Check umidade (%)': row_check.iloc[0]['umidade'] if 'umidade' in row_check else None,
-            })
-    df_resultado_h2h = pd.DataFrame(resultados_h2h)
+    # Comparações por local e safra (média das repetições), a partir do índice em cache
+    df_resultado_h2h = detalhar_h2h_comercial(
+        indice_h2h_comercial(df_analise_h2h), head_selected, check_selected).rename(columns={
+            'Head_mean': 'Head prod@13.5% (sc/ha)',
+            'Check_mean': 'Check prod@13.5% (sc/ha)',
+            'Difference': 'Diferença (sc/ha)',
+            'Number_of_Win': 'Vitória Head',
+            'Head_umd': 'Head umidade (%)',
+            'Check_umd': 'Check umidade (%)',
+            'Head_parcelas': 'Head parcelas',
+            'Check_parcelas': 'Check parcelas',
+        }).round({'Head umidade (%)': 1, 'Check umidade (%)': 1})
     # Exibição
     if not df_resultado_h2h.empty:
         # Seleção e ordenação das colunas conforme solicitado
         colunas_ordem = [
             'Local',
+            'Safra',
             'Head',
             'Head umidade (%)',
             'Head prod@13.5% (sc/ha)',
             'Check',
             'Check umidade (%)',
             'Check prod@13.5% (sc/ha)',
-            'Diferença (sc/ha)'
+            'Diferença (sc/ha)',
+            'Head parcelas',
+            'Check parcelas'
         ]
         colunas_existentes = [
             col for col in colunas_ordem if col in df_resultado_h2h.columns]
@@ -1200,14 +844,10 @@ if st.session_state.get('run_h2h', False) and head_selected and check_selected:
                 allow_unsafe_jscode=True
             )
             # Botão para exportar em Excel
-            buffer_h2h = io.BytesIO()
-            df_resultado_h2h.to_excel(buffer_h2h, index=False)
-            buffer_h2h.seek(0)
-            st.download_button(
+            botao_excel(
                 label='⬇️ Baixar Excel (Análise H2H - Milho)',
-                data=buffer_h2h,
-                file_name='analise_h2h_milho.xlsx',
-                mime='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+                dados=df_resultado_h2h,
+                file_name='analise_h2h_milho.xlsx'
             )
         # ====== CARTÕES DE RESUMO H2H (agora abaixo da tabela) ======
         if 'Diferença (sc/ha)' in df_resultado_h2h.columns:
@@ -1317,6 +957,10 @@ if st.session_state.get('run_h2h', False) and head_selected and check_selected:
                 if nome_col_local not in df_graf_sorted.columns:
                     df_graf_sorted[nome_col_local] = df_graf_sorted.index.astype(
                         str)
+                elif 'Safra' in df_graf_sorted.columns:
+                    # O mesmo local pode aparecer em mais de uma safra
+                    df_graf_sorted[nome_col_local] = df_graf_sorted[nome_col_local].astype(
+                        str) + ' (' + df_graf_sorted['Safra'].astype(str) + ')'
                 st.markdown(f"""
                     <div style='background-color: #e7f0fa; border-left: 6px solid #0070C0; padding: 10px 18px; margin-bottom: 8px; border-radius: 6px; font-size: 1.1em; color: #22223b; font-weight: 600;'>
                         Diferença de Produtividade por Local — <b>{head_selected} × {check_selected}</b>
@@ -1360,28 +1004,15 @@ if st.session_state.get('run_h2h', False) and head_selected and check_selected:
 
     # (Removido: bloco de Análise MultiCheck)
 
-# =========================
-# GARANTIR FORMATO DE DATA BRASILEIRO EM data_plantio E data_colheita
-# =========================
-
-
-def formatar_datas_br(df):
-    for col in ["data_plantio", "data_colheita"]:
-        if col in df.columns:
-            df[col] = pd.to_datetime(
-                df[col], errors='coerce').dt.strftime('%d/%m/%Y')
-    return df
-
-
-for _df in [gd_milho_2025, gd_milho_2024, gd_milho_2023, gd_milho_2025_tratado, gd_milho_2024_tratado, gd_milho_2023_tratado, df_comercial]:
-    if _df is not None and not _df.empty:
-        formatar_datas_br(_df)
-
 # --- DEBUG: SHAPES DOS DATAFRAMES ANTES E DEPOIS DOS FILTROS E OUTLIERS ---
 # (Removido)
 
 # --- DEBUG: VALORES ÚNICOS DA COLUNA SAFRA ---
 # (Removido)
 
-# E dentro da função preparar_df_comercial, remova todos os st.write de debug antes e depois do merge.
 # --- FIM DEBUG ---
+
+# =========================
+# Pacote com todas as tabelas exportáveis
+# =========================
+secao_pacote("10_Comercial_H2H")
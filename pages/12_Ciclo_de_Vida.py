@@ -1,4 +1,5 @@
 import streamlit as st
+from data_processing.exportacao import MIME_EXCEL, gerar_excel
 import plotly.graph_objects as go
 import plotly.express as px
 from plotly.subplots import make_subplots
@@ -733,15 +734,8 @@ with col4:
             ], columns=["Produto", "Estágio", "Estratégia Produto"])
 
             # Salvar como Excel
-            import io
-            buffer = io.BytesIO()
-            with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
-                df_export.to_excel(
-                    writer, sheet_name='Portfolio_Produtos', index=False)
-            buffer.seek(0)
-
-            st.download_button("Baixar Excel", buffer,
-                               "portfolio_produtos.xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+            st.download_button("Baixar Excel", gerar_excel({"Portfolio_Produtos": df_export}),
+                               "portfolio_produtos.xlsx", MIME_EXCEL)
 
 # Footer
 st.markdown("---")
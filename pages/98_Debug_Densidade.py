@@ -1,26 +1,26 @@
 import streamlit as st
+from data_processing.repositorio_dados import obter_dataframe
+from data_processing.formatacao import formatar_datas_br
+from data_processing.exportacao import botao_excel, iniciar_pacote, secao_pacote
 import pandas as pd
 import numpy as np
 
 st.title("🛠️ Debug de Densidade - DataFrames e Variáveis")
 
+iniciar_pacote("98_Debug_Densidade")
+
 # DataFrame final do processamento de densidade
 st.header("DataFrame Final (Tratado) - Densidade")
-df_final = st.session_state.get("df_avTratamentoMilhoDensidade")
+df_final = formatar_datas_br(obter_dataframe("df_avTratamentoMilhoDensidade"))
 if df_final is not None:
     st.write(f"Shape: {df_final.shape}")
     st.dataframe(df_final.head(20), use_container_width=True)
     st.write("Colunas:", df_final.columns.tolist())
     # Botão para exportar para Excel
-    import io
-    buffer = io.BytesIO()
-    df_final.to_excel(buffer, index=False)
-    buffer.seek(0)
-    st.download_button(
+    botao_excel(
         label="⬇️ Baixar Excel do DataFrame Final (Densidade)",
-        data=buffer,
-        file_name="df_avTratamentoMilhoDensidade_debug.xlsx",
-        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        dados=df_final,
+        file_name="df_avTratamentoMilhoDensidade_debug.xlsx"
     )
 else:
     st.warning("DataFrame final de densidade não carregado.")
@@ -30,18 +30,14 @@ else:
 
 def debug_intermediario(nome, label):
     st.header(label)
-    df = st.session_state.get(nome)
+    df = formatar_datas_br(obter_dataframe(nome))
     if df is not None:
         st.write(f"Shape: {df.shape}")
         st.dataframe(df.head(20), use_container_width=True)
-        buffer = io.BytesIO()
-        df.to_excel(buffer, index=False)
-        buffer.seek(0)
-        st.download_button(
+        botao_excel(
             label=f"⬇️ Baixar Excel do {label}",
-            data=buffer,
-            file_name=f"{nome}_debug.xlsx",
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+            dados=df,
+            file_name=f"{nome}_debug.xlsx"
         )
     else:
         st.warning(f"{label} não carregado.")
@@ -53,3 +49,8 @@ for nome, label in [
     ("df_av4TratamentoMilho_merged_densidade", "DataFrame Intermediário AV4"),
 ]:
     debug_intermediario(nome, label)
+
+# =========================
+# Pacote com todas as tabelas exportáveis
+# =========================
+secao_pacote("98_Debug_Densidade")
@@ -1,83 +1,68 @@
 import streamlit as st
+from data_processing.repositorio_dados import obter_dataframe
+from data_processing.formatacao import formatar_datas_br
+from data_processing.exportacao import botao_excel, iniciar_pacote, secao_pacote
 import pandas as pd
 import numpy as np
 
 st.title("🛠️ Página de Debug de DataFrames e Variáveis")
 
+iniciar_pacote("99_Debug")
+
 # DataFrames principais do processamento
 st.header("DataFrame Final (Tratado)")
-df_final = st.session_state.get("df_avTratamentoMilho")
+df_final = formatar_datas_br(obter_dataframe("df_avTratamentoMilho"))
 if df_final is not None:
     st.write(f"Shape: {df_final.shape}")
     st.dataframe(df_final.head(20), use_container_width=True)
     st.write("Colunas:", df_final.columns.tolist())
     # Botão para exportar para Excel
-    import io
-    buffer = io.BytesIO()
-    df_final.to_excel(buffer, index=False)
-    buffer.seek(0)
-    st.download_button(
+    botao_excel(
         label="⬇️ Baixar Excel do DataFrame Final",
-        data=buffer,
-        file_name="df_avTratamentoMilho_debug.xlsx",
-        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        dados=df_final,
+        file_name="df_avTratamentoMilho_debug.xlsx"
     )
 else:
     st.warning("DataFrame final não carregado.")
 
 st.header("DataFrame Intermediário AV2")
-df_av2 = st.session_state.get("df_av2TratamentoMilho_merged")
+df_av2 = formatar_datas_br(obter_dataframe("df_av2TratamentoMilho_merged"))
 if df_av2 is not None:
     st.write(f"Shape: {df_av2.shape}")
     st.dataframe(df_av2.head(20), use_container_width=True)
     # Botão para exportar para Excel
-    import io
-    buffer_av2 = io.BytesIO()
-    df_av2.to_excel(buffer_av2, index=False)
-    buffer_av2.seek(0)
-    st.download_button(
+    botao_excel(
         label="⬇️ Baixar Excel do DataFrame AV2",
-        data=buffer_av2,
-        file_name="df_av2TratamentoMilho_merged_debug.xlsx",
-        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        dados=df_av2,
+        file_name="df_av2TratamentoMilho_merged_debug.xlsx"
     )
 else:
     st.warning("DataFrame AV2 não carregado.")
 
 st.header("DataFrame Intermediário AV3")
-df_av3 = st.session_state.get("df_av3TratamentoMilho_merged")
+df_av3 = formatar_datas_br(obter_dataframe("df_av3TratamentoMilho_merged"))
 if df_av3 is not None:
     st.write(f"Shape: {df_av3.shape}")
     st.dataframe(df_av3.head(20), use_container_width=True)
     # Botão para exportar para Excel
-    import io
-    buffer_av3 = io.BytesIO()
-    df_av3.to_excel(buffer_av3, index=False)
-    buffer_av3.seek(0)
-    st.download_button(
+    botao_excel(
         label="⬇️ Baixar Excel do DataFrame AV3",
-        data=buffer_av3,
-        file_name="df_av3TratamentoMilho_merged_debug.xlsx",
-        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        dados=df_av3,
+        file_name="df_av3TratamentoMilho_merged_debug.xlsx"
     )
 else:
     st.warning("DataFrame AV3 não carregado.")
 
 st.header("DataFrame Intermediário AV4")
-df_av4 = st.session_state.get("df_av4TratamentoMilho_merged")
+df_av4 = formatar_datas_br(obter_dataframe("df_av4TratamentoMilho_merged"))
 if df_av4 is not None:
     st.write(f"Shape: {df_av4.shape}")
     st.dataframe(df_av4.head(20), use_container_width=True)
     # Botão para exportar para Excel
-    import io
-    buffer_av4 = io.BytesIO()
-    df_av4.to_excel(buffer_av4, index=False)
-    buffer_av4.seek(0)
-    st.download_button(
+    botao_excel(
         label="⬇️ Baixar Excel do DataFrame AV4",
-        data=buffer_av4,
-        file_name="df_av4TratamentoMilho_merged_debug.xlsx",
-        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        dados=df_av4,
+        file_name="df_av4TratamentoMilho_merged_debug.xlsx"
     )
 else:
     st.warning("DataFrame AV4 não carregado.")
@@ -461,3 +446,8 @@ if df_final is not None:
         else:
             st.warning(
                 f"Colunas necessárias para o cálculo de {diff_col} não encontradas no DataFrame.")
+
+# =========================
+# Pacote com todas as tabelas exportáveis
+# =========================
+secao_pacote("99_Debug")
@@ -0,0 +1,2 @@
+# Pacote de testes: com este arquivo o pytest põe a raiz do repositório no sys.path e os testes
+# importam data_processing também quando rodados com "pytest" (e não só "python -m pytest").
@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_processing.filtros_sidebar import _identidade_coluna, _indexar_coluna
+
+# =========================
+# Chave do cache dos índices de filtro: cópias rasas reaproveitam o índice, colunas alteradas não
+# =========================
+
+LINHAS = 1_000
+
+
+@pytest.fixture
+def df_filtros():
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        "macroRegiaoMilho": pd.Categorical(rng.choice(["Norte", "Sul", "Leste"], LINHAS)),
+        "nomeCidade": rng.choice(np.array(["Rio Verde", "Jataí", "Sorriso"], dtype=object), LINHAS),
+        "populacao_av4": rng.choice([60000.0, 80000.0, 100000.0], LINHAS),
+    })
+
+
+@pytest.mark.parametrize("coluna", ["macroRegiaoMilho", "nomeCidade", "populacao_av4"])
+def test_copia_rasa_mantem_identidade(df_filtros, coluna):
+    copia = df_filtros.copy(deep=False)
+    assert _identidade_coluna(copia[coluna]) == _identidade_coluna(df_filtros[coluna])
+
+
+@pytest.mark.parametrize("coluna, valor", [
+    ("macroRegiaoMilho", "Sul"), ("nomeCidade", "Sorriso"), ("populacao_av4", 60000.0)])
+def test_coluna_editada_muda_identidade(df_filtros, coluna, valor):
+    copia = df_filtros.copy(deep=False)
+    copia.loc[copia[coluna] != valor, coluna] = valor
+    assert _identidade_coluna(copia[coluna]) != _identidade_coluna(df_filtros[coluna])
+
+
+def test_categorias_renomeadas_mudam_identidade(df_filtros):
+    copia = df_filtros.copy(deep=False)
+    copia["macroRegiaoMilho"] = copia["macroRegiaoMilho"].cat.rename_categories(str.upper)
+    assert _identidade_coluna(copia["macroRegiaoMilho"]) != _identidade_coluna(df_filtros["macroRegiaoMilho"])
+
+
+def test_linhas_filtradas_mudam_identidade(df_filtros):
+    filtrado = df_filtros[df_filtros["populacao_av4"] > 60000.0]
+    for coluna in df_filtros.columns:
+        assert _identidade_coluna(filtrado[coluna]) != _identidade_coluna(df_filtros[coluna])
+
+
+def test_opcoes_numericas_em_ordem_de_valor(df_filtros):
+    indice = _indexar_coluna(df_filtros["populacao_av4"])
+    assert [indice["valores"][i] for i in indice["ordem"]] == [60000.0, 80000.0, 100000.0]
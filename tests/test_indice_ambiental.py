@@ -0,0 +1,64 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_processing.indice_ambiental import calcular_indice_ambiental
+
+# =========================
+# Regressão do índice ambiental vetorizado: o np.polyfit por híbrido da página, sobre as médias
+# dos locais juntadas por merge, serve de referência para inclinação e intercepto
+# =========================
+
+LINHAS = 20_000
+
+
+def retas_original(df_analise_conjunta):
+    media_local = df_analise_conjunta.groupby('fazendaRef', observed=True)['prod_sc_ha_corr'].mean().reset_index().rename(
+        columns={'prod_sc_ha_corr': 'media_local_sc_ha'})
+    df_indice_ambiental = df_analise_conjunta.merge(media_local, on='fazendaRef', how='left')
+    coeficientes = {}
+    for hibrido in df_indice_ambiental['nome'].dropna().unique():
+        dados_hibrido = df_indice_ambiental[df_indice_ambiental['nome'] == hibrido]
+        x = dados_hibrido['media_local_sc_ha']
+        y = dados_hibrido['prod_sc_ha_corr']
+        mask = pd.notnull(x) & pd.notnull(y)
+        if mask.sum() > 1:
+            with warnings.catch_warnings():
+                # Híbrido num só local: polyfit avisa que o ajuste é mal condicionado
+                warnings.simplefilter("ignore")
+                coeficientes[hibrido] = np.polyfit(x[mask], y[mask], 1)
+    return coeficientes
+
+
+@pytest.fixture(scope="module")
+def df_sintetico():
+    rng = np.random.default_rng(3)
+    locais = rng.integers(0, 300, LINHAS)
+    efeito_local = rng.normal(0, 25, 300)
+    hibridos = rng.integers(0, 120, LINHAS)
+    sensibilidade = rng.uniform(0.6, 1.4, 120)
+    producao = 150 + sensibilidade[hibridos] * efeito_local[locais] + rng.normal(0, 8, LINHAS)
+    df = pd.DataFrame({
+        "fazendaRef": pd.Categorical([f"FZ{i:03d}" for i in locais]),
+        "nome": np.array([f"H{i:03d}" for i in hibridos], dtype=object),
+        "prod_sc_ha_corr": producao,
+    })
+    df.loc[rng.random(LINHAS) < 0.02, "prod_sc_ha_corr"] = np.nan
+    df.loc[rng.random(LINHAS) < 0.01, "nome"] = None
+    # Híbrido com um único local: sem inclinação definida
+    df.loc[df["nome"] == "H000", "fazendaRef"] = "FZ000"
+    return df
+
+
+def test_retas_por_hibrido(df_sintetico):
+    ajustes = calcular_indice_ambiental(df_sintetico)["ajustes"]
+    referencia = retas_original(df_sintetico)
+    assert len(referencia) > 100
+    for hibrido, (inclinacao, intercepto) in referencia.items():
+        if hibrido == "H000":
+            assert np.isnan(ajustes.loc[hibrido, "inclinacao"])
+            continue
+        assert ajustes.loc[hibrido, "inclinacao"] == pytest.approx(inclinacao, rel=1e-9)
+        assert ajustes.loc[hibrido, "intercepto"] == pytest.approx(intercepto, rel=1e-9)
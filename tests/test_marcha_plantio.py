@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_processing.marcha_plantio import calcular_marcha_plantio
+
+# =========================
+# Regressão da marcha de plantio com busca ordenada: a contagem data a data (plantios <= data) da
+# página serve de referência, na janela fixa semanal e nas curvas diárias separadas por grupo
+# =========================
+
+LINHAS = 20_000
+
+
+def marcha_original(df_marcha_plantio, ano=2025, inicio="01-01", fim="04-30"):
+    df_marcha_plantio = df_marcha_plantio.dropna(subset=['data_plantio'])
+    df_marcha_plantio = df_marcha_plantio[df_marcha_plantio['data_plantio'].dt.year == ano]
+    semanas = pd.date_range(start=pd.Timestamp(f"{ano}-{inicio}"), end=pd.Timestamp(f"{ano}-{fim}"), freq='W-MON')
+    percentuais_cumulativos = []
+    for semana in semanas:
+        plantios_ate_semana = df_marcha_plantio[df_marcha_plantio['data_plantio'] <= semana].shape[0]
+        total_plantios = df_marcha_plantio.shape[0]
+        percentuais_cumulativos.append((plantios_ate_semana / total_plantios) * 100 if total_plantios > 0 else 0)
+    return pd.DataFrame({'Data': semanas, 'Percentual_Cumulativo': percentuais_cumulativos})
+
+
+@pytest.fixture(scope="module")
+def df_sintetico():
+    rng = np.random.default_rng(11)
+    df = pd.DataFrame({
+        "data_plantio": pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 700, LINHAS), unit="D"),
+        "macroRegiaoMilho": rng.choice(np.array(["Norte", "Sul", None], dtype=object), LINHAS),
+    })
+    df.loc[rng.random(LINHAS) < 0.02, "data_plantio"] = pd.NaT
+    return df
+
+
+def test_janela_semanal(df_sintetico):
+    marcha = calcular_marcha_plantio(df_sintetico, inicio="01-01", fim="04-30")
+    marcha = marcha[marcha["Ano"] == 2025].reset_index(drop=True)
+    referencia = marcha_original(df_sintetico)
+    pd.testing.assert_series_equal(marcha["Data"], referencia["Data"], check_names=False)
+    np.testing.assert_allclose(marcha["Percentual_Cumulativo"], referencia["Percentual_Cumulativo"])
+
+
+def test_curvas_diarias_por_grupo(df_sintetico):
+    marcha = calcular_marcha_plantio(df_sintetico, separar_por="macroRegiaoMilho", freq="D")
+    datas = df_sintetico.dropna(subset=["data_plantio"])
+    for (ano, regiao), curva in marcha.groupby(["Ano", "macroRegiaoMilho"], dropna=False):
+        grupo = datas[(datas["data_plantio"].dt.year == ano) & (
+            datas["macroRegiaoMilho"].isna() if pd.isna(regiao) else datas["macroRegiaoMilho"] == regiao)]
+        esperado = [int((grupo["data_plantio"] <= data).sum()) for data in curva["Data"]]
+        assert curva["Plantios_Acumulados"].tolist() == esperado
+        assert (curva["Total_Plantios"] == len(grupo)).all()
+        assert curva["Percentual_Cumulativo"].iloc[-1] == 100
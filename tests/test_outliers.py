@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_processing.outliers import remover_outliers
+
+# =========================
+# Regressão da remoção de outliers vetorizada: remover_outliers_zscore, o laço por coluna e linha
+# das páginas comerciais, serve de referência para as linhas removidas, o log e os parâmetros
+# =========================
+
+LINHAS = 20_000
+COLUNAS = ["prod_sc_ha_corr", "umidade"]
+
+
+def remover_outliers_zscore_original(df, colunas, threshold=3.0):
+    outlier_mask = pd.Series(False, index=df.index)
+    log_remocao = pd.Series("", index=df.index)
+    parametros = {}
+    for coluna in colunas:
+        serie = df[coluna].dropna()
+        media = serie.mean()
+        std = serie.std()
+        z_scores = ((serie - media) / std).abs()
+        mask = z_scores > threshold
+        mask_full = pd.Series(False, index=df.index)
+        mask_full[serie.index] = mask
+        outlier_mask = outlier_mask | mask_full
+        for idx in serie.index[mask]:
+            valor = df.at[idx, coluna]
+            z = z_scores.at[idx]
+            if valor < media:
+                log_remocao.at[idx] += f"Outlier em {coluna} (abaixo do limiar: média - {threshold}*std = {media - threshold*std:.2f}, z-score={z:.2f}); "
+            else:
+                log_remocao.at[idx] += f"Outlier em {coluna} (acima do limiar: média + {threshold}*std = {media + threshold*std:.2f}, z-score={z:.2f}); "
+        parametros[coluna] = {
+            'media': media,
+            'std': std,
+            'limite_inferior': media - threshold*std,
+            'limite_superior': media + threshold*std
+        }
+    df_removidos = df[outlier_mask].copy()
+    if not df_removidos.empty:
+        df_removidos['log_remocao'] = log_remocao[outlier_mask].str.strip('; ')
+    df_limpo = df[~outlier_mask].copy()
+    return df_limpo, df_removidos, parametros
+
+
+@pytest.fixture(scope="module")
+def gd_sintetico():
+    rng = np.random.default_rng(7)
+    producao = rng.normal(150, 20, LINHAS)
+    producao[rng.random(LINHAS) < 0.01] = rng.choice([20.0, 320.0], 1)
+    umidade = rng.normal(18, 2, LINHAS)
+    umidade[rng.random(LINHAS) < 0.01] = 35.0
+    df = pd.DataFrame({
+        "prod_sc_ha_corr": producao,
+        "umidade": umidade,
+        "macroRegiaoMilho": rng.choice(["Norte", "Sul", "Leste", "Oeste"], LINHAS),
+    })
+    df.loc[rng.random(LINHAS) < 0.03, "umidade"] = np.nan
+    # Índice fora de ordem, como depois de filtros
+    return df.set_index(rng.permutation(LINHAS) * 3)
+
+
+@pytest.mark.parametrize("threshold", [2.0, 3.0])
+def test_zscore_global(gd_sintetico, threshold):
+    limpo, removidos, parametros = remover_outliers(gd_sintetico, COLUNAS, threshold)
+    limpo_ref, removidos_ref, parametros_ref = remover_outliers_zscore_original(gd_sintetico, COLUNAS, threshold)
+    assert not removidos_ref.empty
+    pd.testing.assert_frame_equal(limpo, limpo_ref)
+    pd.testing.assert_frame_equal(removidos, removidos_ref)
+    for coluna, esperado in parametros_ref.items():
+        linha = parametros[parametros["coluna"] == coluna].iloc[0]
+        assert linha["base_inferior"] == pytest.approx(esperado["media"])
+        assert linha["escala"] == pytest.approx(esperado["std"])
+        assert linha["limite_inferior"] == pytest.approx(esperado["limite_inferior"])
+        assert linha["limite_superior"] == pytest.approx(esperado["limite_superior"])
+
+
+def test_zscore_por_grupo(gd_sintetico):
+    # Por grupo equivale ao laço original aplicado em cada grupo separadamente
+    limpo, removidos, _ = remover_outliers(
+        gd_sintetico, COLUNAS, 2.5, grupos=gd_sintetico["macroRegiaoMilho"])
+    partes = [remover_outliers_zscore_original(grupo, COLUNAS, 2.5)
+              for _, grupo in gd_sintetico.groupby("macroRegiaoMilho")]
+    limpo_ref = pd.concat([parte[0] for parte in partes])
+    removidos_ref = pd.concat([parte[1] for parte in partes])
+    pd.testing.assert_frame_equal(limpo.sort_index(), limpo_ref.sort_index())
+    pd.testing.assert_frame_equal(removidos.sort_index(), removidos_ref.sort_index())
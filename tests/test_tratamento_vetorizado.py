@@ -0,0 +1,156 @@
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_processing.codigo_tratamento import calcular_colunas_derivadas
+from data_processing.formatacao import formatar_datas_br
+
+# =========================
+# Regressão da vetorização de calcular_colunas_derivadas: as funções linha a linha originais
+# (apply) servem de referência para PMG corrigido, alturas, datas e ciclos
+# =========================
+
+LINHAS = 100_000
+UMIDADE_PADRAO = 13.5
+COLUNAS_DATA = {
+    "dataPlantioMilho": "plantio",
+    "dataColheitaMilho": "colheita",
+    "dataFlorescimentoFeminina": "dataFlorFem",
+    "dataFlorescimentoMasculina": "dataFlorMasc",
+}
+DIAS = {
+    "ciclo_dias": "colheita",
+    "flor_fem_dias": "dataFlorFem",
+    "flor_masc_dias": "dataFlorMasc",
+}
+
+
+def corr_pmg_original(row):
+    return (
+        row["media_PMG"] * (100 - row["media_umd_PMG"]) / (100 - UMIDADE_PADRAO)
+        if pd.notnull(row["media_PMG"]) and pd.notnull(row["media_umd_PMG"]) and row["media_PMG"] != 0 and row["media_umd_PMG"] != 0
+        else np.nan
+    )
+
+
+def padronizar_altura_para_metros_original(valor):
+    try:
+        if pd.isnull(valor):
+            return np.nan
+        if isinstance(valor, str):
+            valor = valor.replace(',', '.').strip()
+        valor = float(valor)
+        if valor > 10:
+            return valor / 100
+        return valor
+    except Exception:
+        return np.nan
+
+
+def timestamp_para_data_br_original(valor):
+    try:
+        if pd.notnull(valor) and valor != 0:
+            return pd.to_datetime(valor, unit='s').strftime('%d/%m/%Y')
+        else:
+            return ""
+    except Exception:
+        return ""
+
+
+def diff_dias_original(data_fim, data_ini):
+    try:
+        if pd.isnull(data_fim) or pd.isnull(data_ini) or data_fim == '' or data_ini == '':
+            return np.nan
+        d1 = datetime.strptime(str(data_fim), '%d/%m/%Y')
+        d2 = datetime.strptime(str(data_ini), '%d/%m/%Y')
+        return (d1 - d2).days
+    except Exception:
+        return np.nan
+
+
+def _timestamps(rng, n):
+    """Segundos entre 2022 e 2025, com zeros, nulos e textos vazios/inválidos."""
+    valores = rng.integers(1_640_000_000, 1_760_000_000, n).astype(object)
+    sorteio = rng.random(n)
+    valores[sorteio < 0.05] = 0
+    valores[(sorteio >= 0.05) & (sorteio < 0.10)] = np.nan
+    valores[(sorteio >= 0.10) & (sorteio < 0.12)] = ""
+    valores[(sorteio >= 0.12) & (sorteio < 0.13)] = "abc"
+    return valores
+
+
+@pytest.fixture(scope="module")
+def df_sintetico():
+    rng = np.random.default_rng(42)
+    n = LINHAS
+    pmg = rng.uniform(200, 450, n)
+    pmg[rng.random(n) < 0.05] = 0
+    pmg[rng.random(n) < 0.05] = np.nan
+    umidade = rng.uniform(10, 30, n)
+    umidade[rng.random(n) < 0.05] = 0
+    umidade[rng.random(n) < 0.05] = np.nan
+
+    # Alturas em metros e em centímetros, como número e como texto com vírgula
+    altura = rng.uniform(1.0, 3.0, n)
+    altura = np.where(rng.random(n) < 0.4, altura * 100, altura).round(2)
+    altura_alt = altura.astype(object)
+    texto = rng.random(n) < 0.2
+    altura_alt[texto] = [f" {v:.2f} ".replace(".", ",") for v in altura[texto]]
+    altura_alt[rng.random(n) < 0.03] = np.nan
+    altura_alt[rng.random(n) < 0.01] = "n/a"
+    altura_aie = altura / 2
+    altura_aie[rng.random(n) < 0.03] = np.nan
+
+    df = pd.DataFrame({
+        "media_PMG": pmg,
+        "media_umd_PMG": umidade,
+        "media_ALT": altura_alt,
+        "media_AIE": altura_aie,
+    })
+    for coluna in COLUNAS_DATA:
+        df[coluna] = _timestamps(rng, n)
+    return df
+
+
+@pytest.fixture(scope="module")
+def resultados(df_sintetico):
+    """(referência linha a linha, saída vetorizada) para o mesmo DataFrame."""
+    referencia = df_sintetico.copy()
+    referencia["corr_PMG"] = referencia.apply(corr_pmg_original, axis=1)
+    for coluna in ("media_ALT", "media_AIE"):
+        referencia[f"{coluna}_m"] = referencia[coluna].apply(padronizar_altura_para_metros_original)
+    for col_orig, col_novo in COLUNAS_DATA.items():
+        referencia[col_novo] = referencia[col_orig].apply(timestamp_para_data_br_original)
+    for col_novo, col_fim in DIAS.items():
+        referencia[col_novo] = referencia.apply(
+            lambda row: diff_dias_original(row[col_fim], row["plantio"]), axis=1)
+    return referencia, calcular_colunas_derivadas(df_sintetico.copy())
+
+
+def test_corr_pmg(resultados):
+    referencia, novo = resultados
+    pd.testing.assert_series_equal(novo["corr_PMG"], referencia["corr_PMG"], check_dtype=False)
+
+
+@pytest.mark.parametrize("coluna", ["media_ALT_m", "media_AIE_m"])
+def test_altura_em_metros(resultados, coluna):
+    referencia, novo = resultados
+    pd.testing.assert_series_equal(
+        novo[coluna].astype(float), referencia[coluna].astype(float), check_dtype=False)
+
+
+@pytest.mark.parametrize("coluna", list(COLUNAS_DATA.values()))
+def test_datas(resultados, coluna):
+    # As datas tratadas ficam em datetime64; formatadas, voltam ao texto original ("" sem data)
+    referencia, novo = resultados
+    pd.testing.assert_series_equal(
+        formatar_datas_br(novo[[coluna]])[coluna], referencia[coluna], check_dtype=False)
+
+
+@pytest.mark.parametrize("coluna", list(DIAS))
+def test_dias(resultados, coluna):
+    referencia, novo = resultados
+    pd.testing.assert_series_equal(
+        novo[coluna].astype(float), referencia[coluna].astype(float), check_dtype=False)